@@ -54,7 +54,25 @@ class Cache(object):
         self.db[key] = new_hash
         return stale
 
+    def get(self, key, default=None):
+        """Return the value for the `key` cache entry.
+
+        :param str key: Key for the cache entry to look up.
+        :param default: Value to return if there is no such entry.
+        """
+        return self.db.get(key, default)
+
+    def set(self, key, value):
+        """Set the value for the `key` cache entry.
+
+        :param str key: Key for the cache entry to set.
+        :param value: Value to store. It must be serializable to JSON.
+        """
+        self.db[key] = value
+
     def save(self):
         """Save the content of the cache to a file."""
+        # Sort keys so that the cache file does not depend on the order in
+        # which entries were added.
         with open(self.cache_file, 'w') as f:
-            json.dump(self.db, f)
+            json.dump(self.db, f, sort_keys=True)
@@ -1483,6 +1483,11 @@ class CompileCtx(object):
             argument and return an instance of a
             ``langkit.passes.AbstractPass`` subclass.
 
+        :param str|None pass_profile: If provided, measure the time and memory
+            usage of each compilation pass, print a summary table and write
+            detailed measurements to this file, in the Chrome trace event
+            format. See ``langkit.passes.PassProfile``.
+
         See langkit.emitter.Emitter's constructor for other supported keyword
         arguments.
         """
@@ -1499,6 +1504,10 @@ class CompileCtx(object):
         plugin_passes = [self.load_plugin_pass(p)
                          for p in kwargs.pop('plugin_passes', [])]
 
+        from langkit.passes import PassProfile
+        pass_profile = kwargs.pop('pass_profile', None)
+        profile = PassProfile() if pass_profile else None
+
         # Compute the list of passes to run:
 
         # First compile the DSL
@@ -1517,12 +1526,16 @@ class CompileCtx(object):
         # We can now run the pipeline
         with names.camel_with_underscores, global_context(self):
             try:
-                self.run_passes(all_passes)
+                self.run_passes(all_passes, profile)
                 if not check_only and self.emitter is not None:
                     self.emitter.cache.save()
             finally:
                 self.emitter = None
 
+        if profile:
+            print(profile.format_table())
+            profile.write_trace(pass_profile)
+
     def prepare_compilation(self):
         """
         Prepare this context to compile the DSL.
@@ -1697,6 +1710,10 @@ class CompileCtx(object):
             errors_checkpoint_pass,
 
             GrammarRulePass('compile parsers', Parser.compile),
+            GlobalPass('compute parsers FIRST sets',
+                       self.grammar.compute_first_sets),
+            GlobalPass('select memoized parsing rules',
+                       self.grammar.select_memoized_rules),
             GrammarRulePass('compute nodes parsers correspondence',
                             self.unparsers.compute),
             ASTNodePass('warn imprecise field type annotations',
@@ -1749,20 +1766,24 @@ class CompileCtx(object):
             EmitterPass('emit Python playground',
                         Emitter.emit_python_playground),
             EmitterPass('emit GDB helpers', Emitter.emit_gdb_helpers),
+            EmitterPass('render and write sources', Emitter.write_sources),
 
             GlobalPass('report unused documentation entries',
                        lambda ctx: ctx.documentations.report_unused()),
         ]
 
-    def run_passes(self, passes):
+    def run_passes(self, passes, profile=None):
         """
         Run the given passes through the pass manager.
 
         :param list[langkit.passes.AbstractPass]: List of compilation passes to
             go through.
+
+        :param langkit.passes.PassProfile|None profile: If provided, record
+            performance measurements for passes in this profile.
         """
         from langkit.passes import PassManager
-        pass_manager = PassManager()
+        pass_manager = PassManager(profile)
         pass_manager.add(*passes)
         pass_manager.run(self)
 
@@ -2595,6 +2616,15 @@ class CompileCtx(object):
                     annotations[caller] = callee_annot
                     queue.add(caller)
 
+        # Memoized results cannot track what user-provided external
+        # properties use, so flag all properties that may call them.
+        queue = {p for p in back_graph if p.external and p.prefix is not None}
+        while queue:
+            callee = queue.pop()
+            callee.has_untracked_deps = True
+            queue.update(caller for caller in back_graph[callee]
+                         if not caller.has_untracked_deps)
+
         for prop, annot in sorted(annotations.items(),
                                   key=lambda p: p[0].qualname):
             if not prop.memoized or annot.memoizable:
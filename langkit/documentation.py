@@ -23,6 +23,7 @@ All templates can use the "lang" parameter, which contains "ada", "c" or
 
 from __future__ import absolute_import, division, print_function
 
+from contextlib import contextmanager
 import textwrap
 
 from mako.template import Template
@@ -52,6 +53,35 @@ class DocDatabase(object):
         self._used.add(key)
         return self._dict[key]
 
+    @contextmanager
+    def record_usage(self):
+        """
+        Context manager to record the documentation entries used in a block of
+        code.
+
+        This yields a set, which contains the names of the entries used in the
+        block when leaving it. These entries are still considered as used for
+        the whole database.
+        """
+        saved_used = self._used
+        self._used = set()
+        try:
+            yield self._used
+        finally:
+            saved_used.update(self._used)
+            self._used = saved_used
+
+    def mark_used(self, names):
+        """
+        Consider the given documentation entries as used. This is useful when
+        code generation happens in another process or is skipped because the
+        generated code is up-to-date.
+
+        :param collections.Iterable[str] names: Names for the documentation
+            entries to mark.
+        """
+        self._used.update(names)
+
     def report_unused(self):
         """
         Report all documentation entries that have not been used on the
@@ -288,6 +318,62 @@ base_langkit_docs = {
         Debug helper. Set whether ``Property_Error`` exceptions raised in
         ``Populate_Lexical_Env`` should be discarded. They are by default.
     """,
+    'langkit.context_memoization_stats': """
+        Return the number of memoized property results that were kept and
+        dropped so far when invalidating caches after units were parsed or
+        reparsed in this context. Only the results that may depend on the
+        (re)parsed units are dropped.
+    """,
+    'langkit.context_set_cache_budget': """
+        Set the maximum total number of entries in the memoization tables of
+        all units in this context to ``Memoization_Entries``, and the maximum
+        total number of entries in the lookup caches of all lexical
+        environments in this context to ``Lookup_Cache_Entries``. Zero means
+        no limit, which is the default.
+
+        Budgets are enforced when entries are created: creating an entry that
+        makes the context go over budget evicts the least recently used
+        entries, which can belong to the table of another unit or to the
+        lookup cache of another environment. Entries for computations that
+        are still in progress are never evicted.
+    """,
+    'langkit.context_memoization_cache_stats': """
+        Return the current number of entries, the budget (zero if unbounded)
+        and the number of hits, misses and evictions so far for the
+        memoization tables of all the units in this context.
+    """,
+    'langkit.context_lookup_cache_stats': """
+        Return the current number of entries, the budget (zero if unbounded)
+        and the number of hits, misses and evictions so far for the lookup
+        caches of all lexical environments in this context.
+    """,
+    'langkit.context_lexical_env_stats': """
+        Return lookup statistics for lexical environments of the given kind:
+        number of lookups, of lookup cache hits and misses, of lookups that
+        were detected as infinite recursions and of stale lookup caches that
+        were cleared. Kinds are 0 for primary environments, 1 for orphaned
+        ones, 2 for grouped ones and 3 for rebound ones. Only primary
+        environments have lookup caches.
+
+        Note that these statistics are shared by all analysis contexts.
+    """,
+    'langkit.context_lexical_env_stats_generic': """
+        Return lookup statistics for all kinds of lexical environments,
+        together with statistics about pools of environment rebindings.
+
+        Note that these statistics are shared by all analysis contexts.
+    """,
+    'langkit.context_rebindings_pool_stats': """
+        Return the number of lexical environments that have a pool of
+        environment rebindings and the total number of rebindings in these
+        pools.
+
+        Note that these statistics are shared by all analysis contexts.
+    """,
+    'langkit.context_reset_lexical_env_stats': """
+        Reset all the lookup counters for lexical environments. Rebindings
+        pool sizes are not affected.
+    """,
     'langkit.context_set_logic_resolution_timeout': """
         If ``Timeout`` is greater than zero, set a timeout for the resolution
         of logic equations. The unit is the number of steps in ANY/ALL
@@ -310,6 +396,15 @@ base_langkit_docs = {
         parsing failure, return an analysis unit anyway: errors are described
         as diagnostics of the returned analysis unit.
     """,
+    'langkit.get_units_from_files': """
+        Like ``Get_From_File``, but for each file in ``Filenames``: return
+        the corresponding analysis units in the same order.
+
+        Lexing and parsing, which work only on the data of the unit to
+        parse, are done in ``Jobs`` tasks, each with its own parser. The rest,
+        for instance the update of lexical environments for units that are
+        reparsed, is done in the calling task, in the order of ``Filenames``.
+    """,
     'langkit.get_unit_from_buffer': """
         Create a new analysis unit for ``Filename`` or return the existing one
         if any. Whether the analysis unit already exists or not, (re)parse it
@@ -394,6 +489,22 @@ base_langkit_docs = {
         Return the number of trivias in this unit. This is 0 for units that
         were parsed with trivia analysis disabled.
     """,
+    'langkit.unit_export_tokens': """
+        Serialize all the tokens and trivias in this unit into flat arrays,
+        in source order.
+
+        If ``Capacity`` is lower than the number of tokens and trivias in this
+        unit, do not write anything. Otherwise, for each token index ``I``,
+        write the kind of the token in ``Kinds[I]``, 1 in ``Trivia_Flags[I]``
+        if it is a trivia (0 otherwise), the 0-based offsets of its first
+        character and of the character that follows its last one in the
+        source buffer in ``Offsets[2 * I]`` and ``Offsets[2 * I + 1]``, and
+        its start line, start column, end line and end column in the four
+        ``Slocs`` items starting at index ``4 * I``. Arrays that are null are
+        not written.
+
+        In both cases, return the number of tokens and trivias in this unit.
+    """,
     'langkit.unit_text': """
         Return the source buffer associated to this unit.
     """,
@@ -473,6 +584,40 @@ base_langkit_docs = {
         Return the Nth child for in this node's fields and store it into
         *CHILD_P.  Return zero on failure (when N is too big).
     """,
+    'langkit.node_flatten': """
+        Serialize the tree rooted at ``Node`` into flat arrays, numbering
+        nodes in prefix order starting from 0 for ``Node`` itself. Null
+        children are skipped.
+
+        If ``Capacity`` is lower than the number of nodes in the tree, do not
+        write anything. Otherwise, for each node index ``I``, write the kind
+        of the node in ``Kinds[I]``, the index of its parent in
+        ``Parents[I]``, the index of its first child in
+        ``First_Children[I]``, the index of its next sibling in
+        ``Next_Siblings[I]``, the indexes of its first and last tokens in
+        ``Token_Starts[I]`` and ``Token_Ends[I]``, and its start line, start
+        column, end line and end column in the four ``Slocs`` items starting
+        at index ``4 * I``. Indexes are -1 when there is no such node or token
+        (for instance, ghost nodes have no last token). Arrays that are null
+        are not written.
+
+        In both cases, return the number of nodes in the tree.
+    """,
+    'langkit.node_findall': """
+        Look for all the nodes in the tree rooted at ``Node`` (included) whose
+        kind is in the ``Kinds`` set, and store them, in prefix order, into
+        a new array in ``*Result_P``.
+
+        ``Kinds`` must point to an array that contains one byte for each node
+        kind value (as returned by ``${capi.get_name('node_kind')}``), plus
+        one unused byte at index 0: a node kind is in the set if the byte at
+        its value is not 0.
+
+        If ``Limit`` is positive, stop looking for nodes as soon as ``Limit``
+        of them were found.
+
+        Return zero on failure, non-zero on success.
+    """,
     'langkit.node_is_null': """
         Return whether this node is a null node reference.
     """,
@@ -7,19 +7,29 @@ from __future__ import absolute_import, division, print_function
 import ast
 from distutils.spawn import find_executable
 from glob import glob
+import hashlib
 from io import StringIO
 import json
+import multiprocessing
 import os
 from os import path
 import subprocess
+import sys
+import traceback
+from types import (BuiltinFunctionType, ClassType, CodeType, FunctionType,
+                   MethodType, ModuleType)
 
 from funcy import keep
+import mako
+from mako.template import Template
 
 from langkit.caching import Cache
 from langkit.compile_context import ADA_BODY, ADA_SPEC, get_context
-from langkit.diagnostics import Severity, check_source_language
+from langkit.diagnostics import (DiagnosticError, Severity,
+                                 check_source_language)
 import langkit.names as names
-from langkit.template_utils import add_template_dir
+from langkit.template_utils import (add_template_dir, set_template_cache_dir,
+                                    template_dirs)
 from langkit.utils import Colors, printcol
 
 
@@ -116,6 +126,201 @@ def write_ada_file(out_dir, source_kind, qual_name, content,
     write_source_file(file_path, content, post_process)
 
 
+def describe_value(value, memo=None):
+    """
+    Return a JSON-serializable description of ``value``, to be used in input
+    signatures for generated sources.
+
+    Compiled types and node data are described by their name only: their
+    description must come from somewhere else if generated code depends on
+    them. Other objects, including functions, are described by a digest of
+    their state, computed recursively (see ``describe_object``). Values whose
+    state is not available get a description that is different each time, so
+    that the sources that depend on them are always rendered again.
+
+    :param dict[int, (object, str|None)]|None memo: Digests for the objects
+        described so far, so that objects reachable through several paths
+        are described only once. The digest for objects whose description is
+        being computed is None. Objects must not change while a memo is in
+        use.
+    :rtype: object
+    """
+    from langkit.compiled_types import AbstractNodeData, CompiledType, TypeRepo
+
+    if memo is None:
+        memo = {}
+
+    if value is None or isinstance(value, (bool, int, long, float,
+                                           basestring)):
+        return value
+    elif isinstance(value, names.Name):
+        return value.camel
+    elif isinstance(value, CompiledType):
+        return ['type', describe_value(value.name)]
+    elif isinstance(value, AbstractNodeData):
+        return ['data', value.qualname]
+    elif isinstance(value, TypeRepo.Defer):
+        return describe_value(value.get(), memo)
+    elif isinstance(value, Template):
+        return ['template', value.source]
+    elif isinstance(value, (type, ClassType)):
+        return ['class', value.__module__, value.__name__]
+    elif isinstance(value, ModuleType):
+        return ['module', value.__name__]
+    elif isinstance(value, (list, tuple)):
+        return [describe_value(v, memo) for v in value]
+    elif isinstance(value, (set, frozenset)):
+        return sorted(describe_value(v, memo) for v in value)
+    elif isinstance(value, dict):
+        return sorted([describe_value(k, memo), describe_value(v, memo)]
+                      for k, v in value.items())
+
+    try:
+        _, digest = memo[id(value)]
+    except KeyError:
+        pass
+    else:
+        # If we reach an object whose description is being computed, we
+        # found a cycle, which brings no information that the rest of the
+        # description does not already contain.
+        return ['object', type(value).__name__, digest]
+
+    memo[id(value)] = (value, None)
+    desc = describe_object(value, memo=memo)
+    digest = (None if desc is None else
+              hashlib.md5(json.dumps(desc)).hexdigest())
+    memo[id(value)] = (value, digest)
+    return (['object', type(value).__name__, digest] if digest else
+            ['unknown', os.urandom(16).encode('hex')])
+
+
+def describe_object(obj, excluded_attrs=(), memo=None):
+    """
+    Return a JSON-serializable description of the attributes of ``obj``, or
+    None if its state is not available. See ``describe_value``.
+
+    Functions (such as lambdas in the language specification) are described
+    by their name, their code, their default argument values, the values
+    captured in their closure and the values of the globals they reference.
+
+    :param excluded_attrs: Names for the attributes to leave out of the
+        description. Source locations are always left out, as they do not
+        affect generated code.
+    :type excluded_attrs: collections.Container[str]
+    :param memo: See ``describe_value``.
+    :rtype: list|None
+    """
+    if memo is None:
+        memo = {}
+    memo.setdefault(id(obj), (obj, None))
+
+    if isinstance(obj, FunctionType):
+        cells = []
+        for cell in obj.__closure__ or ():
+            try:
+                cells.append(describe_value(cell.cell_contents, memo))
+            except ValueError:
+                # This cell is empty
+                cells.append(['empty-cell'])
+        return ['function', obj.__module__, obj.__name__,
+                _describe_code(obj.__code__, obj.__globals__, memo),
+                describe_value(obj.__defaults__, memo), cells]
+    elif isinstance(obj, MethodType):
+        return ['method', describe_value(obj.__func__, memo),
+                describe_value(obj.__self__, memo)]
+    elif isinstance(obj, BuiltinFunctionType):
+        return ['builtin', getattr(obj, '__module__', None), obj.__name__,
+                describe_value(obj.__self__, memo)]
+
+    attrs = {}
+    has_state = hasattr(obj, '__dict__') or type(obj) is object
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        for name in ((slots, ) if isinstance(slots, basestring) else slots):
+            if name not in ('__dict__', '__weakref__'):
+                has_state = True
+                if hasattr(obj, name):
+                    attrs[name] = getattr(obj, name)
+    if not has_state:
+        return None
+    attrs.update(getattr(obj, '__dict__', {}))
+
+    return [type(obj).__name__] + [
+        [name, describe_value(attrs[name], memo)]
+        for name in sorted(attrs)
+        if name != 'location' and name not in excluded_attrs
+    ]
+
+
+def _describe_code(code, globals_dict, memo):
+    """
+    Return a JSON-serializable description for a code object. Helper for
+    ``describe_object``.
+
+    :param CodeType code: Code object to describe.
+    :param dict[str, object] globals_dict: Globals for the function that this
+        code object belongs to. The description includes the values of the
+        globals that this code references.
+    :param memo: See ``describe_value``.
+    :rtype: list
+    """
+    return [
+        'code', code.co_name, code.co_argcount, code.co_flags,
+        hashlib.md5(code.co_code).hexdigest(),
+        list(code.co_varnames), list(code.co_freevars),
+        [_describe_code(c, globals_dict, memo) if isinstance(c, CodeType)
+         else describe_value(c, memo)
+         for c in code.co_consts],
+        [[name, describe_value(globals_dict[name], memo)
+          if name in globals_dict else None]
+         for name in code.co_names]
+    ]
+
+
+def tree_digest(m, root, predicate=None):
+    """
+    Update the ``m`` hash object with the names and content of all files in
+    the ``root`` directory tree.
+
+    :param m: Hash object to update.
+    :param str root: Directory to process.
+    :param predicate: If provided, process only files whose name satisfies
+        this predicate.
+    :type predicate: None|(str) -> bool
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if predicate and not predicate(filename):
+                continue
+            filepath = path.join(dirpath, filename)
+            m.update(filepath)
+            with open(filepath, 'rb') as f:
+                m.update(f.read())
+
+
+def _render_pending_source(index):
+    """
+    Render the ``index``th pending source of the current emitter. This runs in
+    the worker processes of ``Emitter.write_sources``.
+
+    :param int index: Index of the source in the list of pending sources.
+    :rtype: (str, list[str])
+    """
+    try:
+        return get_context().emitter.render_source(index)
+    except DiagnosticError:
+        # Diagnostics have already been printed: just notify the parent
+        # process.
+        raise DiagnosticError()
+    except Exception:
+        # Arbitrary exceptions may not survive pickling between processes, so
+        # forward the traceback instead.
+        raise RuntimeError('Error while rendering a source:\n{}'.format(
+            traceback.format_exc()
+        ))
+
+
 class Emitter(object):
     """
     Code and data holder for code emission.
@@ -126,7 +331,7 @@ class Emitter(object):
                  no_property_checks=False, generate_astdoc=True,
                  generate_gdb_hook=True, pretty_print=False,
                  post_process_ada=None, post_process_cpp=None,
-                 post_process_python=None):
+                 post_process_python=None, lexer_backend='case', jobs=1):
         """
         Generate sources for the analysis library. Also emit a tiny program
         useful for testing purposes.
@@ -169,6 +374,14 @@ class Emitter(object):
         :param post_process_python: Optional post-processing for generated
             Python source code.
         :type post_process_python: None|(str) -> str
+
+        :param str lexer_backend: Name of the code generation backend for the
+            lexer state machine: "case" lowers each state to case statements
+            while "table" generates transition tables. See
+            langkit.lexer.Lexer.dfa_backends.
+
+        :param int jobs: Number of processes to use in order to render
+            templates. Generated sources do not depend on it.
         """
         self.context = context
         self.verbosity = context.verbosity
@@ -183,6 +396,10 @@ class Emitter(object):
         # TODO: contain the add_template_dir calls to this context (i.e. avoid
         # global mutation).
 
+        # Keep compiled templates across runs, as compiling big templates is
+        # expensive.
+        set_template_cache_dir(os.path.join(self.lib_root, 'obj', 'mako'))
+
         if self.extensions_dir:
             add_template_dir(self.extensions_dir)
 
@@ -196,6 +413,8 @@ class Emitter(object):
         self.post_process_ada = post_process_ada
         self.post_process_cpp = post_process_cpp
         self.post_process_python = post_process_python
+        self.lexer_backend = lexer_backend
+        self.jobs = jobs
 
         # Automatically add all source files in the "extensions/src" directory
         # to the generated library project.
@@ -234,6 +453,163 @@ class Emitter(object):
         :type: langkit.lexer.regexp.DFACodeGenHolder
         """
 
+        self._signatures = {}
+        """
+        Cache for input signatures. See the "signature" method.
+
+        :type: dict[str, str]
+        """
+
+        self._pending_sources = []
+        """
+        List of sources to generate during the "write sources" pass, in
+        scheduling order. See the "add_source" method.
+
+        :type: list[(str, () -> str, (str) -> None)]
+        """
+
+    input_domains = ('base', 'language', 'property_bodies', 'parser_bodies')
+    """
+    Names for the domains of code generation inputs. Each generated source
+    depends on a subset of these domains and is rendered only if the
+    signature of one of its domains changed since the previous run:
+
+    * "base": Langkit itself, templates, extensions and code generation
+      options. All generated sources implicitly depend on it.
+
+    * "language": everything that describes the language specification:
+      lexer, types, fields and properties interfaces, but not the bodies of
+      properties and parsers.
+
+    * "property_bodies": generated code for the bodies of properties.
+
+    * "parser_bodies": generated code for parsers.
+    """
+
+    template_inputs = {
+        'pkg_implementation_body_ada': ('language', 'property_bodies'),
+        'parsers/pkg_main_body_ada': ('language', 'parser_bodies'),
+        'pkg_unparsing_impl_body_ada': ('language', 'parser_bodies'),
+    }
+    """
+    Input domains for Ada module templates that depend on more than the
+    "language" domain.
+
+    :type: dict[str, tuple[str]]
+    """
+
+    def signature(self, domain):
+        """
+        Return a digest for the inputs in the given domain. See
+        ``input_domains``.
+
+        :param str domain: Name of the input domain.
+        :rtype: str
+        """
+        try:
+            return self._signatures[domain]
+        except KeyError:
+            pass
+
+        m = hashlib.md5()
+        ctx = self.context
+
+        if domain == 'base':
+            langkit_dir = path.dirname(path.realpath(__file__))
+            tree_digest(m, langkit_dir, lambda f: f.endswith('.py'))
+            for d in template_dirs():
+                tree_digest(m, d)
+            if self.extensions_dir and path.isdir(self.extensions_dir):
+                tree_digest(m, self.extensions_dir)
+            m.update(json.dumps([
+                langkit_dir, self.lib_root, mako.__version__,
+                self.no_property_checks, self.generate_gdb_hook,
+                self.pretty_print, self.lexer_backend,
+                [(fn.__module__, fn.__name__) if fn else None
+                 for fn in (self.post_process_ada, self.post_process_cpp,
+                            self.post_process_python)],
+            ]))
+
+        elif domain == 'language':
+            from langkit.compiled_types import CompiledTypeRepo
+
+            # Properties bodies are part of the "property_bodies" domain,
+            # and their interface is described separately.
+            prop_excluded = {'prop_def', 'untyped_wrapper_def', 'expr',
+                             'constructed_expr', 'vars'}
+
+            types = set(CompiledTypeRepo.type_dict.values())
+            types.update(ctx.astnode_types, ctx.composite_types,
+                         ctx.enum_types)
+            memo = {}
+            desc = [
+                ctx.lexer.signature,
+                sorted(ctx.grammar.rules),
+                describe_object(ctx, {'emitter'}, memo),
+            ]
+            for t in sorted(types, key=lambda t: (t.name.camel,
+                                                  type(t).__name__)):
+                desc.append(describe_object(t, memo=memo))
+                for f in t.get_abstract_node_data(include_inherited=False):
+                    desc.append(describe_object(f, prop_excluded, memo))
+                    if f.is_property:
+                        desc.append([
+                            [a.name.lower, describe_value(a.type),
+                             a.is_artificial]
+                            for a in f.arguments
+                        ])
+            m.update(json.dumps(desc))
+
+        elif domain == 'property_bodies':
+            m.update(json.dumps(sorted(
+                [prop.qualname, prop.prop_def, prop.untyped_wrapper_def]
+                for prop in ctx.all_properties(include_inherited=False)
+            )))
+
+        elif domain == 'parser_bodies':
+            m.update(json.dumps([
+                [describe_value(parser.name), parser.spec, parser.body]
+                for parser in ctx.generated_parsers
+            ]))
+
+        else:
+            assert False, 'Invalid input domain: {}'.format(domain)
+
+        result = m.hexdigest()
+        self._signatures[domain] = result
+        return result
+
+    def is_up_to_date(self, file_path, domains, *args):
+        """
+        Return whether ``file_path`` was generated during a previous run from
+        the same inputs, in which case there is no need to render it again.
+
+        :param str file_path: Path of the source file to generate.
+        :param collections.Iterable[str] domains: Input domains that the
+            generation of this source file depends on, in addition to the
+            "base" domain. See ``input_domains``.
+        :param args: Additional inputs for this source file (template name,
+            template arguments, ...). See ``describe_value``.
+        :rtype: bool
+        """
+        inputs = json.dumps(
+            [self.signature(d) for d in ('base', ) + tuple(domains)] +
+            describe_value(list(args))
+        )
+        if (self.cache.is_stale('inputs:{}'.format(file_path), inputs) or
+                not path.exists(file_path)):
+            return False
+
+        # As we do not render this source, consider that it still uses the
+        # same documentation entries as during its last generation.
+        self.context.documentations.mark_used(
+            self.cache.get('docs:{}'.format(file_path), [])
+        )
+        if self.verbosity.debug:
+            printcol('Skipping up-to-date source: {}'.format(file_path),
+                     Colors.OKBLUE)
+        return True
+
     def setup_directories(self, ctx):
         """
         Make sure the tree of directories needed for code generation exists.
@@ -262,13 +638,14 @@ class Emitter(object):
         main_project_file = os.path.join(
             self.lib_path, 'gnat', '{}.gpr'.format(self.lib_name_low),
         )
-        write_source_file(
+        self.add_source(
             main_project_file,
-            ctx.render_template(
+            lambda: ctx.render_template(
                 'project_file',
                 lib_name=ctx.ada_api_settings.lib_name,
                 os_path=os.path,
-            )
+            ),
+            lambda content: write_source_file(main_project_file, content)
         )
 
     def emit_astdoc(self, ctx):
@@ -280,11 +657,19 @@ class Emitter(object):
 
         from langkit import astdoc
 
-        f = StringIO()
-        astdoc.write_astdoc(ctx, f)
-        f.seek(0)
-        write_source_file(os.path.join(self.share_path, 'ast-types.html'),
-                          f.read())
+        file_path = os.path.join(self.share_path, 'ast-types.html')
+        if self.is_up_to_date(file_path, ('language', ), 'astdoc'):
+            return
+
+        def render():
+            f = StringIO()
+            astdoc.write_astdoc(ctx, f)
+            return f.getvalue()
+
+        self.add_source(
+            file_path, render,
+            lambda content: write_source_file(file_path, content)
+        )
 
     def generate_lexer_dfa(self, ctx):
         """
@@ -296,16 +681,20 @@ class Emitter(object):
             [ctx.lib_name, names.Name('Lexer_State_Machine')])
 
         # Generate the lexer state machine iff the file is missing or its
-        # signature has changed since last time.
+        # signature (including the backend to use) has changed since last
+        # time.
         stale_lexer_spec = write_source_file(
             os.path.join(
                 self.lib_root, 'obj',
                 '{}_lexer_signature.txt'
                 .format(ctx.short_name_or_long.lower)),
-            json.dumps(ctx.lexer.signature, indent=2)
+            json.dumps([self.lexer_backend, ctx.lexer.signature], indent=2)
         )
         if not os.path.exists(lexer_sm_body) or stale_lexer_spec:
-            self.dfa_code = ctx.lexer.build_dfa_code(ctx)
+            self.dfa_code = ctx.lexer.build_dfa_code(ctx, self.lexer_backend)
+        elif self.verbosity.debug:
+            printcol('Skipping up-to-date source: {}'.format(lexer_sm_body),
+                     Colors.OKBLUE)
 
     def emit_ada_lib(self, ctx):
         """
@@ -365,39 +754,49 @@ class Emitter(object):
         """
         Emit sources and the project file for mains.
         """
-        with names.camel_with_underscores:
-            write_ada_file(
-                path.join(self.lib_root, 'src'),
-                ADA_BODY, [names.Name('Parse')],
-                ctx.render_template('main_parse_ada'),
-                self.post_process_ada
+        src_dir = path.join(self.lib_root, 'src')
+        qual_name = [names.Name('Parse')]
+        parse_path = ada_file_path(src_dir, ADA_BODY, qual_name)
+        if not self.is_up_to_date(parse_path, ('language', ),
+                                  'main_parse_ada'):
+            def render():
+                with names.camel_with_underscores:
+                    return ctx.render_template('main_parse_ada')
+
+            self.add_source(
+                parse_path, render,
+                lambda content: write_ada_file(src_dir, ADA_BODY, qual_name,
+                                               content, self.post_process_ada)
             )
 
         imain_project_file = os.path.join(self.lib_root, 'src', 'mains.gpr')
-        write_source_file(
+        self.add_source(
             imain_project_file,
-            ctx.render_template(
+            lambda: ctx.render_template(
                 'mains_project_file',
                 lib_name=ctx.ada_api_settings.lib_name,
                 source_dirs=self.main_source_dirs,
                 main_programs=self.main_programs
-            )
+            ),
+            lambda content: write_source_file(imain_project_file, content)
         )
 
     def emit_c_api(self, ctx):
         """
         Generate header and binding body for the external C API.
         """
-        def render(template_name):
-            return ctx.render_template(template_name)
-
-        with names.lower:
-            write_cpp_file(
-                path.join(
-                    self.include_path,
-                    '{}.h'.format(ctx.c_api_settings.lib_name)),
-                render('c_api/header_c'),
-                self.post_process_cpp
+        def render():
+            with names.lower:
+                return ctx.render_template('c_api/header_c')
+
+        header_path = path.join(self.include_path,
+                                '{}.h'.format(ctx.c_api_settings.lib_name))
+        if not self.is_up_to_date(header_path, ('language', ),
+                                  'c_api/header_c'):
+            self.add_source(
+                header_path, render,
+                lambda content: write_cpp_file(header_path, content,
+                                               self.post_process_cpp)
             )
 
         self.write_ada_module(
@@ -464,13 +863,15 @@ class Emitter(object):
                 )
                 return code
 
-        with names.camel:
-            code = ctx.render_template(
-                'python_api/module_py',
-                c_api=ctx.c_api_settings,
-                pyapi=ctx.python_api_settings,
-            )
+        def render():
+            with names.camel:
+                return ctx.render_template(
+                    'python_api/module_py',
+                    c_api=ctx.c_api_settings,
+                    pyapi=ctx.python_api_settings,
+                )
 
+        def write(code):
             # If pretty-printing failed, write the original code anyway in
             # order to ease debugging.
             exc = None
@@ -479,18 +880,22 @@ class Emitter(object):
             except SyntaxError as exc:
                 pp_code = code
 
-            write_source_file(os.path.join(package_dir, '__init__.py'),
-                              pp_code,
-                              self.post_process_python)
+            write_source_file(module_path, pp_code, self.post_process_python)
             if exc:
                 raise exc
 
+        module_path = os.path.join(package_dir, '__init__.py')
+        if not self.is_up_to_date(module_path, ('language', ),
+                                  'python_api/module_py'):
+            self.add_source(module_path, render, write)
+
         # Emit the setup.py script to easily install the Python binding
         setup_py_file = os.path.join(self.lib_root, 'python', 'setup.py')
-        write_source_file(
+        self.add_source(
             setup_py_file,
-            ctx.render_template('python_api/setup_py'),
-            self.post_process_python
+            lambda: ctx.render_template('python_api/setup_py'),
+            lambda content: write_source_file(setup_py_file, content,
+                                              self.post_process_python)
         )
 
     def emit_python_playground(self, ctx):
@@ -500,16 +905,20 @@ class Emitter(object):
         if not ctx.python_api_settings:
             return
 
+        def write(content):
+            write_source_file(playground_file, content,
+                              self.post_process_python)
+            os.chmod(playground_file, 0o775)
+
         playground_file = os.path.join(self.lib_root, 'bin', 'playground')
-        write_source_file(
+        self.add_source(
             playground_file,
-            ctx.render_template(
+            lambda: ctx.render_template(
                 'python_api/playground_py',
                 module_name=ctx.python_api_settings.module_name
             ),
-            self.post_process_python
+            write
         )
-        os.chmod(playground_file, 0o775)
 
     def emit_gdb_helpers(self, ctx):
         """
@@ -519,25 +928,29 @@ class Emitter(object):
 
         # Always emit the ".gdbinit.py" GDB script
         lib_name = ctx.ada_api_settings.lib_name.lower()
-        write_source_file(
+        self.add_source(
             gdbinit_path,
-            ctx.render_template(
+            lambda: ctx.render_template(
                 'gdb_py',
                 langkit_path=os.path.dirname(os.path.dirname(__file__)),
                 lib_name=lib_name,
                 prefix=ctx.short_name_or_long.lower,
             ),
-            self.post_process_python
+            lambda content: write_source_file(gdbinit_path, content,
+                                              self.post_process_python)
         )
 
         # Generate the C file to embed the absolute path to this script in the
         # generated library only if requested.
         if self.generate_gdb_hook:
-            write_source_file(
-                os.path.join(self.src_path, 'gdb.c'),
-                ctx.render_template('gdb_c', gdbinit_path=gdbinit_path,
-                                    os_name=os.name),
-                self.post_process_cpp
+            gdb_c_path = os.path.join(self.src_path, 'gdb.c')
+            self.add_source(
+                gdb_c_path,
+                lambda: ctx.render_template('gdb_c',
+                                            gdbinit_path=gdbinit_path,
+                                            os_name=os.name),
+                lambda content: write_source_file(gdb_c_path, content,
+                                                  self.post_process_cpp)
             )
 
     def write_ada_module(self, out_dir, template_base_name, qual_name,
@@ -563,20 +976,119 @@ class Emitter(object):
             qual_name_str = '.'.join(n.camel_with_underscores
                                      for n in qual_name)
             with_clauses = self.context.with_clauses[(qual_name_str, kind)]
+            template_name = '{}{}_ada'.format(
+                template_base_name +
+                # If the base name ends with a /, we don't put a "_"
+                # separator.
+                ('' if template_base_name.endswith('/') else '_'),
+                kind
+            )
+            full_qual_name = [self.context.lib_name] + qual_name
+
+            # Do not render the template if its inputs did not change since
+            # the last generation.
+            file_path = ada_file_path(out_dir, kind, full_qual_name)
+            if self.is_up_to_date(
+                file_path,
+                self.template_inputs.get(template_name, ('language', )),
+                template_name, with_clauses
+            ):
+                continue
+
+            self.add_source(
+                file_path,
+                self._ada_module_renderer(template_name, with_clauses),
+                self._ada_module_writer(out_dir, kind, full_qual_name)
+            )
+
+    def _ada_module_renderer(self, template_name, with_clauses):
+        """
+        Return a rendering callback for ``add_source`` for an Ada module.
+        """
+        def render():
             with names.camel_with_underscores:
-                write_ada_file(
-                    out_dir=out_dir,
-                    source_kind=kind,
-                    qual_name=[self.context.lib_name] + qual_name,
-                    content=self.context.render_template(
-                        '{}{}_ada'.format(
-                            template_base_name +
-                            # If the base name ends with a /, we don't
-                            # put a "_" separator.
-                            ('' if template_base_name.endswith('/') else '_'),
-                            kind
-                        ),
-                        with_clauses=with_clauses,
-                    ),
-                    post_process=self.post_process_ada
+                return self.context.render_template(
+                    template_name, with_clauses=with_clauses
                 )
+        return render
+
+    def _ada_module_writer(self, out_dir, kind, qual_name):
+        """
+        Return a writing callback for ``add_source`` for an Ada module.
+        """
+        return lambda content: write_ada_file(
+            out_dir=out_dir,
+            source_kind=kind,
+            qual_name=qual_name,
+            content=content,
+            post_process=self.post_process_ada
+        )
+
+    def add_source(self, file_path, render, write):
+        """
+        Schedule the generation of a source file. It is rendered and written
+        during the "write sources" pass, possibly in parallel with other
+        sources: see the ``jobs`` constructor argument.
+
+        :param str file_path: Path of the source file to generate.
+
+        :param render: Callback that returns the content of the source file.
+            As it may run in a separate process, it must not have side effects
+            that the rest of code generation relies on.
+        :type render: () -> str
+
+        :param write: Callback to write the rendered content to the source
+            file. Writing callbacks always run in this process, in scheduling
+            order.
+        :type write: (str) -> None
+        """
+        self._pending_sources.append((file_path, render, write))
+
+    def render_source(self, index):
+        """
+        Render the ``index``th pending source.
+
+        :param int index: Index of the source in the list of pending sources.
+        :return: The rendered content and the names of documentation entries
+            that rendering used.
+        :rtype: (str, list[str])
+        """
+        _, render, _ = self._pending_sources[index]
+        with self.context.documentations.record_usage() as used_docs:
+            content = render()
+        return content, sorted(used_docs)
+
+    def write_sources(self, ctx):
+        """
+        Render all pending sources and write them.
+        """
+        sources = self._pending_sources
+        indexes = range(len(sources))
+
+        # Rendering templates is CPU-bound: when requested, distribute it
+        # among processes. Workers are forked after all sources have been
+        # scheduled, so they inherit the whole compilation context. Fall back
+        # to sequential rendering on platforms that cannot fork.
+        jobs = min(self.jobs, len(sources))
+        if jobs > 1 and hasattr(os, 'fork'):
+            pool = multiprocessing.Pool(jobs)
+            try:
+                # Waiting without timeout makes Pool.map_async ignore
+                # KeyboardInterrupt in Python 2, so use a huge one instead.
+                results = pool.map_async(_render_pending_source, indexes,
+                                         chunksize=1).get(sys.maxint)
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            results = [self.render_source(i) for i in indexes]
+
+        # Always write sources from this process and in scheduling order, so
+        # that the output (including the cache) is the same whatever the
+        # number of jobs.
+        for (file_path, _, write), (content, used_docs) in zip(sources,
+                                                               results):
+            ctx.documentations.mark_used(used_docs)
+            self.cache.set('docs:{}'.format(file_path), used_docs)
+            write(content)
+        self._pending_sources = []
@@ -3180,6 +3180,14 @@ class PropertyDef(AbstractNodeData):
         self.call_memoizable = call_memoizable
         self.memoize_in_populate = memoize_in_populate
 
+        self.has_untracked_deps = False
+        """
+        Whether this property may call user-provided external properties,
+        directly or not. As the memoization machinery cannot track what such
+        properties use, the results memoized for this property are considered
+        to depend on everything (see CompileCtx.check_memoized).
+        """
+
         self.external = external
 
         self._uses_entity_info = uses_entity_info
@@ -4027,6 +4035,16 @@ class PropertyDef(AbstractNodeData):
                 self.struct.name +
                 self.name).camel_with_underscores
 
+    @property
+    def memoization_key_length(self):
+        """
+        Return the number of items in memoization keys for this property: one
+        for the node, one per argument and one for the entity info, if used.
+
+        :rtype: int
+        """
+        return 1 + len(self.arguments) + (1 if self.uses_entity_info else 0)
+
     @property
     def reason_for_no_memoization(self):
         """
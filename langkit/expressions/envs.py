@@ -105,13 +105,21 @@ class EnvGet(AbstractExpression):
                 result.append(self.sequential_from.render_pre())
                 args.append(('From', self.sequential_from.render_expr()))
 
+            # When memoization is enabled, go through the wrappers that record
+            # the lookup as a dependency of the memoized results being
+            # computed.
+            prefix = ('Env_Get' if get_context().has_memoization
+                      else 'AST_Envs.Get')
+
             if self.only_first:
-                result_expr = 'AST_Envs.Get_First ({})'.format(
+                result_expr = '{}_First ({})'.format(
+                    prefix,
                     ', '.join('{} => {}'.format(n, v) for n, v in args)
                 )
             else:
-                result_expr = '{} (AST_Envs.Get ({}))'.format(
+                result_expr = '{} ({} ({}))'.format(
                     self.type.constructor_name,
+                    prefix,
                     ', '.join('{} => {}'.format(n, v) for n, v in args)
                 )
 
@@ -49,6 +49,66 @@ class TDH(object):
                      self._vector_item(self.value['trivias'], trivia_no)['t'],
                      token_no, trivia_no)
 
+    def text(self, first, last):
+        """
+        Return the text in the source buffer between the "first" and "last"
+        indexes (both included).
+
+        :rtype: unicode
+        """
+        length = last - first + 1
+        if length <= 0:
+            return u''
+
+        # Fetch the fat pointer, the bounds and then go subscript the
+        # underlying array ourselves. The source buffer can be stored either
+        # with 4 bytes per character, or with 1 byte per character for
+        # Latin-1-only sources.
+        char = gdb.lookup_type('character').pointer()
+        src_buffer = self.value['source_buffer']
+        if not src_buffer['P_ARRAY']:
+            src_buffer = self.value['narrow_source_buffer']
+            text_addr = (src_buffer['P_ARRAY'].cast(char) +
+                         (first - src_buffer['P_BOUNDS']['LB0']))
+            return text_addr.string('latin-1', length=length)
+
+        uint32_t = gdb.lookup_type('uint32_t').pointer()
+        text_addr = (src_buffer['P_ARRAY'].cast(uint32_t) +
+                     (first - src_buffer['P_BOUNDS']['LB0']))
+        return (text_addr.cast(char)
+                .string('latin-1', length=4 * length)
+                .decode('utf32'))
+
+    def sloc(self, index):
+        """
+        Compute the source location for the character at "index" in the
+        source buffer, just like the Get_Sloc function in Ada.
+
+        :rtype: Sloc
+        """
+        # Look for the last line that starts before "index" or at "index"
+        lines = self.value['lines']
+        first = 1
+        last = int(lines['size'])
+        while first < last:
+            middle = (first + last + 1) // 2
+            if int(self._vector_item(lines, middle)) <= index:
+                first = middle
+            else:
+                last = middle - 1
+
+        # Then compute the column number from the start of this line
+        tab_stop = int(self.value['tab_stop'])
+        column = 0
+        line_start = int(self._vector_item(lines, first))
+        for c in self.text(line_start, index - 1):
+            if c == u'\t':
+                column = (column + tab_stop) // tab_stop * tab_stop
+            else:
+                column += 1
+
+        return Sloc(first, column + 1)
+
 
 class Token(object):
     """
@@ -67,28 +127,15 @@ class Token(object):
 
     @property
     def sloc_range(self):
-        return SlocRange(self.value['sloc_range'])
+        return SlocRange(
+            self.tdh.sloc(int(self.value['source_first'])),
+            self.tdh.sloc(int(self.value['source_last']) + 1)
+        )
 
     @property
     def text(self):
-        # Fetch the fat pointer, the bounds and then go subscript the
-        # underlying array ourselves.
-        src_buffer = self.tdh.value['source_buffer']
-        first = int(self.value['source_first'])
-        last = int(self.value['source_last'])
-
-        length = last - first + 1
-        if length <= 0:
-            return u''
-
-        uint32_t = gdb.lookup_type('uint32_t').pointer()
-        text_addr = (src_buffer['P_ARRAY'].cast(uint32_t) +
-                     (first - src_buffer['P_BOUNDS']['LB0']))
-
-        char = gdb.lookup_type('character').pointer()
-        return (text_addr.cast(char)
-                .string('latin-1', length=4 * length)
-                .decode('utf32'))
+        return self.tdh.text(int(self.value['source_first']),
+                             int(self.value['source_last']))
 
     def __repr__(self):
         return '<Token {} {}/{} at {} {}>'.format(
@@ -107,11 +154,9 @@ class Sloc(object):
 
 
 class SlocRange(object):
-    def __init__(self, value):
-        self.start = Sloc(int(value['start_line']),
-                          int(value['start_column']))
-        self.end = Sloc(int(value['end_line']),
-                        int(value['end_column']))
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
 
     def __repr__(self):
         return '{}-{}'.format(self.start, self.end)
@@ -7,8 +7,10 @@ import re
 from langkit.compile_context import get_context
 from langkit.diagnostics import (Context, check_source_language,
                                  extract_library_location)
-from langkit.lexer.regexp import DFACodeGenHolder, NFAState, RegexpCollection
+from langkit.lexer.regexp import (DFACodeGenHolder, DFATableCodeGenHolder,
+                                  NFAState, RegexpCollection)
 from langkit.names import Name
+from langkit.utils import Colors, printcol
 
 
 # All "signature" properties in classes below are used to identify the whole
@@ -608,21 +610,54 @@ class Lexer(object):
         """
         self.newline_after.update(tokens)
 
-    def build_dfa_code(self, context):
+    dfa_backends = {
+        holder.backend: holder
+        for holder in (DFACodeGenHolder, DFATableCodeGenHolder)
+    }
+    """
+    Mapping from backend names to the corresponding holders for the code
+    generation of the lexer state machine.
+
+    :type: dict[str, type]
+    """
+
+    @staticmethod
+    def get_action(labels):
         """
-        Build the DFA that implements this lexer (self.dfa_code).
+        Return the action for a DFA state whose NFA labels are ``labels``.
+
+        If this set of labels contains one or several actions, get the most
+        prioritary one and leave out the integer used to encode priority. See
+        compile_rules for how these integers are computed.
+
+        :param set[(int, Action)] labels: Labels for a DFA state.
+        :rtype: Action|None
         """
-        assert context.nfa_start is not None
+        sorted_actions = sorted(labels)
+        return sorted_actions[0][1] if sorted_actions else None
 
-        def get_action(labels):
-            # If this set of labels contain one or several actions, get the
-            # most prioritary one and leave out the integer used to encode
-            # priority. See compile_rules for how these integers are computed.
-            sorted_actions = sorted(labels)
-            return sorted_actions[0][1] if sorted_actions else None
+    def build_dfa_code(self, context, backend='case'):
+        """
+        Build the DFA that implements this lexer (self.dfa_code).
 
-        # Compute the corresponding DFA
-        return DFACodeGenHolder(context.nfa_start.to_dfa(), get_action)
+        :param str backend: Name of the code generation backend for the state
+            machine. See Lexer.dfa_backends.
+        """
+        assert context.nfa_start is not None
+        get_action = self.get_action
+
+        # Compute the corresponding DFA and minimize it: subset construction
+        # creates a lot of redundant states (for instance for keywords, which
+        # are also identifiers).
+        dfa = context.nfa_start.to_dfa()
+        minimized_dfa = dfa.minimize(get_action)
+        if context.verbosity.debug:
+            printcol('Lexer DFA minimization: {} states -> {} states'.format(
+                len(dfa.reachable_states()),
+                len(minimized_dfa.reachable_states())
+            ), Colors.OKBLUE)
+
+        return self.dfa_backends[backend](minimized_dfa, get_action)
 
     def get_token(self, literal):
         """
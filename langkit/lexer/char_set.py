@@ -1,5 +1,6 @@
 from __future__ import absolute_import, division, print_function
 
+import heapq
 import os.path
 import unicodedata
 
@@ -77,6 +78,29 @@ class CharSet(object):
             result.add_int_range(l, h)
         return result
 
+    @classmethod
+    def from_sorted_int_ranges(cls, items):
+        """
+        Create a character set from ranges sorted by their low bound.
+
+        Unlike ``from_int_ranges``, this takes advantage of the ordering to
+        run in linear time.
+
+        :param iterable[(int, int)] items: Sorted list of ranges. They can
+            overlap.
+        :rtype: CharSet
+        """
+        result = cls()
+        ranges = result.ranges
+        for l, h in items:
+            assert l <= h <= MAXUNICODE
+            if ranges and l <= ranges[-1][1] + 1:
+                if h > ranges[-1][1]:
+                    ranges[-1] = (ranges[-1][0], h)
+            else:
+                ranges.append((l, h))
+        return result
+
     def __repr__(self):
         ranges = []
         for l, h in self.ranges:
@@ -119,11 +143,8 @@ class CharSet(object):
         :rtype: CharSet
         """
         assert isinstance(other, CharSet)
-        result = CharSet()
-        for cs in (self, other):
-            for l, h in cs.ranges:
-                result.add_int_range(l, h)
-        return result
+        return CharSet.from_sorted_int_ranges(heapq.merge(self.ranges,
+                                                          other.ranges))
 
     @property
     def is_empty(self):
@@ -191,22 +212,20 @@ class CharSet(object):
 
         :rtype: (CharSet, CharSet)
         """
-        ascii = CharSet()
-        non_ascii = CharSet()
-
-        def add_range(char_set, l, h):
-            char_set.add_int_range(l, h)
+        ascii = []
+        non_ascii = []
 
         for l, h in self.ranges:
             if h < 128:
-                ascii.add_int_range(l, h)
+                ascii.append((l, h))
             elif l < 128:
-                ascii.add_int_range(l, 127)
-                non_ascii.add_int_range(128, h)
+                ascii.append((l, 127))
+                non_ascii.append((128, h))
             else:
-                non_ascii.add_int_range(l, h)
+                non_ascii.append((l, h))
 
-        return (ascii, non_ascii)
+        return (CharSet.from_sorted_int_ranges(ascii),
+                CharSet.from_sorted_int_ranges(non_ascii))
 
     def overlaps_with(self, other):
         """
@@ -220,16 +239,17 @@ class CharSet(object):
         def overlap(r1, r2):
             return r1[0] <= r2[1] and r1[1] >= r2[0]
 
-        self_r = list(self.ranges)
-        other_r = list(other.ranges)
-
-        while self_r and other_r:
-            # Remove the first item from one list if it precedes (without
-            # overlapping) the first item from the other list.
-            if self_r[0][0] > other_r[0][1]:
-                other_r.pop(0)
-            elif self_r[0][1] < other_r[0][0]:
-                self_r.pop(0)
+        self_r = self.ranges
+        other_r = other.ranges
+        i = j = 0
+
+        while i < len(self_r) and j < len(other_r):
+            # Skip the current item from one list if it precedes (without
+            # overlapping) the current item from the other list.
+            if self_r[i][0] > other_r[j][1]:
+                j += 1
+            elif self_r[i][1] < other_r[j][0]:
+                i += 1
             else:
                 return True
         return False
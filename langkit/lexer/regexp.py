@@ -1,13 +1,14 @@
 from __future__ import absolute_import, division, print_function
 
-from collections import defaultdict
+from collections import defaultdict, deque
 from contextlib import contextmanager
+import heapq
 import itertools
 import re
 
 
 from langkit.diagnostics import check_source_language
-from langkit.lexer.char_set import CharSet
+from langkit.lexer.char_set import CharSet, MAXUNICODE
 from langkit.lexer.unicode_data import unicode_categories_char_sets
 
 
@@ -91,6 +92,62 @@ class SequenceReader(object):
         return self.index == len(self.sequence)
 
 
+def char_classes(char_sets):
+    """
+    Split the set of characters in ``char_sets`` into disjoint classes so that
+    each input character set is the union of some of these classes.
+
+    Return a couple: the list of classes and a mapping from each input
+    character set to the sorted list of indexes for the classes it contains.
+    Characters that belong to none of the input character sets belong to no
+    class.
+
+    :param iterable[CharSet] char_sets: Character sets to split.
+    :rtype: (list[CharSet], dict[CharSet, list[int]])
+    """
+    char_sets = sorted(set(char_sets), key=lambda cs: cs.ranges)
+
+    # Linearize the boundaries of all character sets (see
+    # NFAState.deterministic_transitions for a similar process): for each
+    # event character, register the indexes of character sets that start at
+    # this character and the ones that stop right before it.
+    events = defaultdict(lambda: ([], []))
+    for i, char_set in enumerate(char_sets):
+        for low, high in char_set.ranges:
+            events[low][0].append(i)
+            events[high + 1][1].append(i)
+
+    # Follow the stream of events: all characters that belong to the same set
+    # of input character sets form a class.
+    classes = []
+    signatures = []
+    signature_to_class = {}
+
+    active = set()
+    last_char = None
+    for char, (adding, removing) in sorted(events.iteritems()):
+        if active:
+            signature = frozenset(active)
+            try:
+                class_id = signature_to_class[signature]
+            except KeyError:
+                class_id = len(classes)
+                signature_to_class[signature] = class_id
+                classes.append(CharSet())
+                signatures.append(signature)
+            classes[class_id].add_int_range(last_char, char - 1)
+        active.difference_update(removing)
+        active.update(adding)
+        last_char = char
+
+    charset_classes = {char_set: [] for char_set in char_sets}
+    for class_id, signature in enumerate(signatures):
+        for i in signature:
+            charset_classes[char_sets[i]].append(class_id)
+
+    return (classes, charset_classes)
+
+
 class RegexpCollection(object):
 
     class Parser(object):
@@ -530,27 +587,44 @@ class NFAState(object):
         self.transitions.append((chars, next_state))
 
     @staticmethod
-    def follow_spontaneous_transitions(states):
+    def follow_spontaneous_transitions(states, closures=None):
         """
         Return the set of states that can be reached from the given set of
         states following spontaneous transitions.
 
         :param set[NFAState] states: List of starting states.
-        :rtype: set[NFAState]
+        :param None|dict[NFAState, frozenset[NFAState]] closures: If provided,
+            cache for the set of states reachable from a single state. Use it
+            when computing many sets of states from the same NFA.
+        :rtype: frozenset[NFAState]
         """
-        result = set()
-
-        def process(state):
-            if state in result:
-                return
-            result.add(state)
-            for chars, next_state in state.transitions:
-                if chars is None:
-                    process(next_state)
+        def closure(state):
+            try:
+                return closures[state]
+            except (KeyError, TypeError):
+                pass
+
+            result = {state}
+            to_visit = [state]
+            while to_visit:
+                for chars, next_state in to_visit.pop().transitions:
+                    if chars is None and next_state not in result:
+                        result.add(next_state)
+                        to_visit.append(next_state)
+            result = frozenset(result)
+
+            if closures is not None:
+                closures[state] = result
+            return result
+
+        states = list(states)
+        if len(states) == 1:
+            return closure(states[0])
 
+        result = set()
         for state in states:
-            process(state)
-        return result
+            result.update(closure(state))
+        return frozenset(result)
 
     @staticmethod
     def reachable_nonspontaneous_transitions(states):
@@ -580,12 +654,12 @@ class NFAState(object):
         Return a value that can be used as a dict key/set element to represent
         a set of states.
 
-        :rtype: set[states]
+        :rtype: frozenset[NFAState]
         """
-        return tuple(sorted(states))
+        return frozenset(states)
 
     @staticmethod
-    def deterministic_transitions(states):
+    def deterministic_transitions(states, closures=None):
         """
         Return the set of deterministic (non-spontaneous and disjoint)
         transitions that leave the "states" sub-graph.
@@ -599,7 +673,9 @@ class NFAState(object):
 
         :param list[NFAState] states: Set of states from which we compute
             transitions.
-        :rtype: dict[tuple[NFAState], CharSet]
+        :param None|dict[NFAState, frozenset[NFAState]] closures: See
+            follow_spontaneous_transitions.
+        :rtype: dict[frozenset[NFAState], CharSet]
         """
         # First, collect for each reachable state the set of characters that
         # allow to reach that state.
@@ -617,65 +693,68 @@ class NFAState(object):
 
         # Linearize the transition labels: flatten all character sets to have a
         # stream of "start range"/"end range" of transitions considering all
-        # input characters.
+        # input characters. For efficiency, represent sets of reachable states
+        # as bit masks: each event toggles the bit for one state.
         #
         # For instance, for the following transitions: {
         #    S1: [a:z],
         #    S2: [a:h, s],
         #    S3: [f:l]
         # }
-        # we will get the following stream of events: {
-        #    'a': Event(adding=S1;S2),
-        #    'f': Event(adding=S3),
-        #    'h': Event(removing=S2),
-        #    'l': Event(removing=S3),
-        #    's': Event(adding=S2,removing=S2),
-        #    'z': Event(removing=S1),
+        # we will get the following stream of events (a state is toggled at
+        # the first character in a range and right after the range): {
+        #    'a': S1, S2,
+        #    'f': S3,
+        #    'i': S2,
+        #    'm': S3,
+        #    's': S2,
+        #    't': S2,
+        #    '{': S1,
         # }.
-        class Event(object):
-            def __init__(self):
-                self.adding = set()
-                self.removing = set()
-
-        events = defaultdict(Event)
-        for next_state, chars in transitions.iteritems():
-            for r in chars.ranges:
-                events[r[0]].adding.add(next_state)
-                events[r[1]].removing.add(next_state)
-        events = sorted(events.iteritems())
-
-        # The final step is to compute the set of transitions for which
-        # character sets are disjoint: just follow the stream of events.
-
-        result = defaultdict(CharSet)
-
-        def add_transition(low, high, states):
-            if not states:
-                return
-            states = NFAState.follow_spontaneous_transitions(states)
-            result[NFAState.hashable_state_set(states)].add_int_range(low,
-                                                                      high)
+        next_states = list(transitions)
+        events = []
+        for i, next_state in enumerate(next_states):
+            bit = 1 << i
+            for low, high in transitions[next_state].ranges:
+                events.append((low, bit))
+                events.append((high + 1, bit))
+        events.sort()
+
+        # Follow the stream of events to compute the disjoint character ranges
+        # for each set of reachable states.
+        mask_ranges = defaultdict(list)
 
         # Set of states "active" for the current position in the events stream
-        states = set()
+        mask = 0
 
         # Character for the last event we processed
         last_char = None
 
-        for char, event in events:
-            assert event.adding or event.removing
-
-            if event.adding:
-                add_transition(last_char, char - 1, states)
-                states = states.union(event.adding)
+        for char, bit in events:
+            if char != last_char:
+                if mask:
+                    mask_ranges[mask].append((last_char, char - 1))
                 last_char = char
+            mask ^= bit
+
+        # The final step is to follow spontaneous transitions from these sets
+        # of states. Different sets can yield the same destination, so merge
+        # the corresponding ranges.
+        result_ranges = defaultdict(list)
+        for mask, ranges in mask_ranges.iteritems():
+            dest = NFAState.follow_spontaneous_transitions(
+                (s for i, s in enumerate(next_states) if mask & (1 << i)),
+                closures
+            )
+            result_ranges[dest].append(ranges)
 
-            if event.removing:
-                add_transition(last_char, char, states)
-                states = states.difference(event.removing)
-                last_char = char + 1
-
-        return result
+        return {
+            dest: CharSet.from_sorted_int_ranges(
+                ranges_list[0] if len(ranges_list) == 1 else
+                heapq.merge(*ranges_list)
+            )
+            for dest, ranges_list in result_ranges.iteritems()
+        }
 
     def to_dfa(self):
         """
@@ -683,44 +762,40 @@ class NFAState(object):
 
         :rtype: DFAState
         """
-        result = None
-
         # Mapping from sets of NFAState nodes (see NFAState.hashable_state_set)
         # to the corresponding DFAState nodes.
         dfa_states = {}
 
-        # List of tuple[NFAState], CharSet and tuple[NFAState] for the
-        # transitions that constitute the DFA.
-        transitions = []
-
-        queue = {
-            self.hashable_state_set(
-                self.follow_spontaneous_transitions([self])
-            )
-        }
-        while queue:
-            states = queue.pop()
-            if states in dfa_states:
-                return
+        # Sets of NFAState nodes for which we still have to compute
+        # transitions.
+        queue = deque()
 
-            new_node = DFAState(labels={s.label for s in states
-                                        if s.label is not None})
-            dfa_states[states] = new_node
-            if result is None:
-                result = new_node
+        # Cache for spontaneous transitions closures. See
+        # NFAState.follow_spontaneous_transitions.
+        closures = {}
 
+        def get_dfa_state(states):
+            try:
+                return dfa_states[states]
+            except KeyError:
+                pass
+            result = DFAState(labels={s.label for s in states
+                                      if s.label is not None})
+            dfa_states[states] = result
+            queue.append(states)
+            return result
+
+        result = get_dfa_state(
+            self.follow_spontaneous_transitions([self], closures)
+        )
+        while queue:
+            states = queue.popleft()
+            dfa_state = dfa_states[states]
             for next_states, char_set in self.deterministic_transitions(
-                states
+                states, closures
             ).iteritems():
-                if next_states not in dfa_states:
-                    queue.add(next_states)
-                transitions.append((states, char_set, next_states))
+                dfa_state.add_transition(char_set, get_dfa_state(next_states))
 
-        for states, char_set, next_states in transitions:
-            dfa_states[states].add_transition(char_set,
-                                              dfa_states[next_states])
-
-        assert result
         return result
 
     def to_dot(self):
@@ -777,6 +852,143 @@ class DFAState(object):
 
         self.transitions.append((chars, next_state))
 
+    @property
+    def sorted_transitions(self):
+        """
+        Return the list of transitions from this state, sorted by character
+        sets.
+
+        :rtype: list[(CharSet, DFAState)]
+        """
+        return sorted(self.transitions, key=lambda t: t[0].ranges)
+
+    def reachable_states(self):
+        """
+        Return the list of states reachable from this one (including itself),
+        in breadth-first order. Transitions are followed in the order of their
+        character sets so that the result is deterministic.
+
+        :rtype: list[DFAState]
+        """
+        result = [self]
+        visited = {self}
+        i = 0
+        while i < len(result):
+            for _, next_state in result[i].sorted_transitions:
+                if next_state not in visited:
+                    visited.add(next_state)
+                    result.append(next_state)
+            i += 1
+        return result
+
+    def minimize(self, get_action):
+        """
+        Return the minimal DFA that is equivalent to this one.
+
+        This implements Hopcroft's partition refinement algorithm. Two states
+        are considered equivalent if ``get_action`` returns the same action
+        for their labels and if, for all input characters, they transition to
+        equivalent states (or both have no transition).
+
+        :param get_action: Function that returns the action associated to a
+            set of labels.
+        :type get_action: (set[T]) -> U
+
+        :rtype: DFAState
+        """
+        states = self.reachable_states()
+        state_ids = {s: i for i, s in enumerate(states)}
+
+        # Hopcroft's algorithm works on a finite alphabet: split the set of
+        # all characters into classes so that each transition label is the
+        # union of some of them.
+        classes, charset_classes = char_classes(
+            char_set for s in states for char_set, _ in s.transitions
+        )
+
+        # For each character class, map destination states to the list of
+        # states that transition to them.
+        inverse = [defaultdict(list) for _ in classes]
+        for s in states:
+            for char_set, next_state in s.transitions:
+                for c in charset_classes[char_set]:
+                    inverse[c][state_ids[next_state]].append(state_ids[s])
+
+        # Start with states grouped by action. Iterate on states in
+        # breadth-first order so that block numbering is deterministic.
+        blocks = []
+        block_of = []
+        action_blocks = {}
+        for i, s in enumerate(states):
+            action = get_action(s.labels)
+            try:
+                b = action_blocks[action]
+            except KeyError:
+                b = len(blocks)
+                action_blocks[action] = b
+                blocks.append(set())
+            blocks[b].add(i)
+            block_of.append(b)
+
+        # Missing transitions implicitly go to a "sink" state, which is alone
+        # in its own block. Putting all the other initial blocks in the work
+        # queue is enough to distinguish states that transition to the sink:
+        # no need to materialize it.
+        queue = deque((b, c) for b in range(len(blocks))
+                      for c in range(len(classes)))
+        queued = set(queue)
+
+        while queue:
+            splitter = queue.popleft()
+            queued.remove(splitter)
+            b, c = splitter
+
+            # Compute the set of states that transition to block "b" on class
+            # "c" and group them by block.
+            touched_blocks = defaultdict(set)
+            for dest in blocks[b]:
+                for src in inverse[c].get(dest, ()):
+                    touched_blocks[block_of[src]].add(src)
+
+            # Split blocks that are only partly included in that set. The
+            # smallest half gets a new block: it is the only one that needs to
+            # be queued as a splitter.
+            for y, y_in in sorted(touched_blocks.iteritems()):
+                if len(y_in) == len(blocks[y]):
+                    continue
+                y_out = blocks[y] - y_in
+                small, large = sorted([y_in, y_out], key=len)
+                new_block = len(blocks)
+                blocks[y] = large
+                blocks.append(small)
+                for s in small:
+                    block_of[s] = new_block
+                for d in range(len(classes)):
+                    queued.add((new_block, d))
+                    queue.append((new_block, d))
+
+        # Create one state per block. Use the first state in each block as a
+        # representative: all its transitions go to equivalent states, so
+        # just merge transitions whose destinations land in the same block.
+        new_states = [DFAState(labels=set(states[min(block)].labels))
+                      for block in blocks]
+        for block, new_state in zip(blocks, new_states):
+            representative = states[min(block)]
+            dest_blocks = []
+            dest_char_sets = {}
+            for char_set, next_state in representative.sorted_transitions:
+                dest = block_of[state_ids[next_state]]
+                try:
+                    dest_char_sets[dest] = dest_char_sets[dest] | char_set
+                except KeyError:
+                    dest_blocks.append(dest)
+                    dest_char_sets[dest] = char_set
+            for dest in dest_blocks:
+                new_state.add_transition(dest_char_sets[dest],
+                                         new_states[dest])
+
+        return new_states[block_of[0]]
+
     def to_dot(self):
         """
         Return a dot script representing this DFA.
@@ -791,6 +1003,16 @@ class DFAState(object):
 class DFACodeGenHolder(object):
     """
     Holder for convenient data structures to generate code for the DFA.
+
+    The generated code has one block per DFA state and lowers transitions to
+    case statements and gotos.
+    """
+
+    backend = 'case'
+    """
+    Name of the code generation backend for this holder.
+
+    :type: str
     """
 
     class State(object):
@@ -860,7 +1082,7 @@ class DFACodeGenHolder(object):
 
             :param dict[DFAState, str] state_labels: Labels for all DFA states.
             """
-            for char_set, next_state in sorted(self._transitions):
+            for char_set, next_state in self._transitions:
                 label = state_labels[next_state]
                 ascii, non_ascii = char_set.split_ascii_subsets
 
@@ -888,19 +1110,17 @@ class DFACodeGenHolder(object):
         # We store them in a list (self.states) to have deterministic code
         # emission, but we also maintain a set (visited_states) for fast
         # membership test.
-        visited_states = set()
+        visited_states = {dfa}
 
-        queue = [dfa]
+        queue = deque([dfa])
         while queue:
-            state = queue.pop(0)
-            if state in visited_states:
-                continue
-            visited_states.add(state)
+            state = queue.popleft()
 
             # Compute transition and queue unvisited nodes
-            transitions = sorted(state.transitions)
+            transitions = state.sorted_transitions
             for char_set, next_state in transitions:
-                if next_state not in queue:
+                if next_state not in visited_states:
+                    visited_states.add(next_state)
                     queue.append(next_state)
 
             self.states.append(self.State(
@@ -959,3 +1179,278 @@ class DFACodeGenHolder(object):
             lines.extend(ranges)
             lines.append(');')
         return '\n'.join(prefix + line for line in lines)
+
+
+def _ada_aggregate(segments, first, last, default, prefix):
+    """
+    Helper to generate an Ada named array aggregate.
+
+    :param list[(int, int, T)] segments: Sorted list of disjoint index
+        ranges (both bounds included) and the corresponding values. Values are
+        formatted with ``str``.
+    :param int first: First index for the array.
+    :param int last: Last index for the array.
+    :param str default: Value for indexes that ``segments`` does not cover.
+    :param str prefix: Prefix for each line (indentation).
+    :rtype: str
+    """
+    # Merge adjacent segments that have the same value and check whether the
+    # whole index range is covered.
+    merged = []
+    covered = 0
+    for low, high, value in segments:
+        value = str(value)
+        covered += high - low + 1
+        if merged and merged[-1][1] == low - 1 and merged[-1][2] == value:
+            merged[-1] = (merged[-1][0], high, value)
+        else:
+            merged.append((low, high, value))
+
+    assocs = ['{} => {}'.format(low if low == high else
+                                '{} .. {}'.format(low, high),
+                                value_image)
+              for low, high, value_image in merged
+              if value_image != default or covered == last - first + 1]
+    if covered != last - first + 1:
+        assocs.append('others => {}'.format(default))
+
+    return '({})'.format((',\n' + prefix + ' ').join(assocs))
+
+
+class DFATableCodeGenHolder(object):
+    """
+    Holder for data structures to generate a table-driven implementation of
+    the DFA.
+
+    Input characters are first mapped to equivalence classes: a direct lookup
+    table handles ASCII characters and a two-level table (pages of
+    ``page_size`` characters, with identical pages shared) handles the rest of
+    the Unicode range. The next state is then looked up in a transition table
+    indexed by the current state and the character class. States that have
+    the same transitions share the same table row.
+
+    Compared to DFACodeGenHolder, this generates much less code for big
+    automatons, which compiles faster and is more cache-friendly.
+    """
+
+    backend = 'table'
+    """
+    See DFACodeGenHolder.backend.
+    """
+
+    page_size = 256
+    """
+    Number of characters in each page of the two-level class table.
+
+    :type: int
+    """
+
+    def __init__(self, dfa, get_action):
+        states = dfa.reachable_states()
+        state_ids = {s: i for i, s in enumerate(states, 1)}
+
+        self.states_count = len(states)
+        """
+        Number of states in the automaton. States are numbered from 1 and the
+        first one is the starting state: 0 means "no state".
+
+        :type: int
+        """
+
+        # Split the set of characters into classes. Class 0 is reserved for
+        # characters that do not appear in any transition.
+        classes, charset_classes = char_classes(
+            char_set for s in states for char_set, _ in s.transitions
+        )
+
+        self.classes_count = len(classes)
+        """
+        Number of character classes, excluding the "no transition" class (0).
+
+        :type: int
+        """
+
+        # Compute transition table rows, sharing identical ones
+        self.rows = []
+        """
+        List of distinct transition rows. Rows are numbered from 1. Each row
+        is a sorted list of (character class, next state) couples: classes
+        that do not appear have no transition.
+
+        :type: list[list[(int, int)]]
+        """
+
+        self.state_rows = []
+        """
+        For each state (in order), number of its transition row.
+
+        :type: list[int]
+        """
+
+        row_ids = {}
+        for s in states:
+            row = []
+            for char_set, next_state in s.transitions:
+                row.extend((c + 1, state_ids[next_state])
+                           for c in charset_classes[char_set])
+            row = tuple(sorted(row))
+            try:
+                row_id = row_ids[row]
+            except KeyError:
+                self.rows.append(row)
+                row_id = len(self.rows)
+                row_ids[row] = row_id
+            self.state_rows.append(row_id)
+
+        # Compute actions
+        self.actions = []
+        """
+        List of distinct actions. Actions are numbered from 1: 0 means "no
+        action".
+
+        :type: list[langkit.lexer.RuleAction]
+        """
+
+        self.state_actions = []
+        """
+        For each state (in order), number of the action to execute when
+        reaching it.
+
+        :type: list[int]
+        """
+
+        action_ids = {}
+        for s in states:
+            action = get_action(s.labels)
+            if action is None:
+                action_id = 0
+            else:
+                try:
+                    action_id = action_ids[action]
+                except KeyError:
+                    self.actions.append(action)
+                    action_id = len(self.actions)
+                    action_ids[action] = action_id
+            self.state_actions.append(action_id)
+
+        # Compute the ASCII class table and the pages for the rest of the
+        # Unicode range.
+        ascii_segments = []
+        page_segments = defaultdict(list)
+        for class_id, char_set in enumerate(classes, 1):
+            for low, high in char_set.ranges:
+                if low < 128:
+                    ascii_segments.append((low, min(high, 127), class_id))
+                    low = 128
+                while low <= high:
+                    page, offset = divmod(low, self.page_size)
+                    page_last = min(high,
+                                    (page + 1) * self.page_size - 1)
+                    page_segments[page].append(
+                        (offset, page_last - page * self.page_size, class_id)
+                    )
+                    low = page_last + 1
+
+        self.ascii_classes = sorted(ascii_segments)
+        """
+        Sorted list of ASCII character ranges and their class.
+
+        :type: list[(int, int, int)]
+        """
+
+        self.pages = [()]
+        """
+        List of distinct pages. Each page is a sorted list of character
+        ranges (as offsets in the page) and their class. The first page
+        contains no class.
+
+        :type: list[tuple[(int, int, int)]]
+        """
+
+        self.page_map = []
+        """
+        Sorted list of page number ranges and the corresponding index in
+        ``self.pages``. Pages that do not appear map to the first page.
+
+        :type: list[(int, int, int)]
+        """
+
+        page_ids = {(): 0}
+        for page in sorted(page_segments):
+            segments = tuple(sorted(page_segments[page]))
+            try:
+                page_id = page_ids[segments]
+            except KeyError:
+                page_id = len(self.pages)
+                self.pages.append(segments)
+                page_ids[segments] = page_id
+            self.page_map.append((page, page, page_id))
+
+    @property
+    def pages_count(self):
+        """
+        Number of pages needed to cover the whole Unicode range.
+
+        :rtype: int
+        """
+        return (MAXUNICODE + 1) // self.page_size
+
+    def ada_table_decls(self, prefix):
+        """
+        Helper to generate the Ada declarations for the lookup tables.
+        """
+        lines = [
+            'type Character_Class is range 0 .. {};'.format(
+                self.classes_count),
+            'type State_Id is range 0 .. {};'.format(self.states_count),
+            'type Row_Id is range 1 .. {};'.format(len(self.rows)),
+            'type Action_Id is range 0 .. {};'.format(len(self.actions)),
+            'type Page_Id is range 0 .. {};'.format(len(self.pages) - 1),
+            '',
+            'No_State : constant State_Id := 0;',
+            '',
+            'type Class_Page is array (0 .. {}) of Character_Class;'.format(
+                self.page_size - 1),
+            'type Transition_Row is array (Character_Class) of State_Id;',
+            '',
+            'Ascii_Classes : constant array (0 .. 127) of Character_Class :=',
+            '  {};'.format(_ada_aggregate(
+                self.ascii_classes, 0, 127, '0', prefix + '  ')),
+            '',
+            'Page_Map : constant array (0 .. {}) of Page_Id :='.format(
+                self.pages_count - 1),
+            '  {};'.format(_ada_aggregate(
+                self.page_map, 0, self.pages_count - 1, '0', prefix + '  ')),
+            '',
+            'Class_Pages : constant array (Page_Id) of Class_Page :=',
+        ]
+        lines.append('  {};'.format(_ada_aggregate(
+            [(i, i, _ada_aggregate(page, 0, self.page_size - 1, '0',
+                                   prefix + '        '))
+             for i, page in enumerate(self.pages)],
+            0, len(self.pages) - 1, '(others => 0)', prefix + '  ')))
+
+        rows_segments = ([(c, c, str(s)) for c, s in row] for row in self.rows)
+        lines.extend([
+            '',
+            'Transitions : constant array (Row_Id) of Transition_Row :=',
+            '  {};'.format(_ada_aggregate(
+                [(i, i, _ada_aggregate(row_segments, 0, self.classes_count,
+                                       'No_State', prefix + '        '))
+                 for i, row_segments in enumerate(rows_segments, 1)],
+                1, len(self.rows), '(others => No_State)', prefix + '  ')),
+            '',
+            'State_Rows : constant array (State_Id range 1 .. {}) of Row_Id'
+            ' :='.format(self.states_count),
+            '  {};'.format(_ada_aggregate(
+                [(i, i, str(r)) for i, r in enumerate(self.state_rows, 1)],
+                1, self.states_count, '1', prefix + '  ')),
+            '',
+            'State_Actions : constant array (State_Id range 1 .. {})'
+            ' of Action_Id :='.format(self.states_count),
+            '  {};'.format(_ada_aggregate(
+                [(i, i, str(a)) for i, a in enumerate(self.state_actions, 1)],
+                1, self.states_count, '0', prefix + '  ')),
+        ])
+        return '\n'.join(prefix + line if line else ''
+                         for line in lines)
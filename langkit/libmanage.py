@@ -22,6 +22,7 @@ from langkit.diagnostics import (
     WarningSet, check_source_language, extract_library_location
 )
 from langkit.langkit_support import LangkitSupport
+from langkit.lexer import Lexer
 from langkit.utils import Colors, Log, col, printcol
 
 
@@ -175,6 +176,12 @@ class ManageScript(object):
             help='Run cProfile and langkit, and generate a data file'
                  ' "langkit.prof".'
         )
+        args_parser.add_argument(
+            '--pass-profile', metavar='FILE',
+            help='Measure time and memory usage for each compilation pass:'
+                 ' print a summary table and write detailed measurements to'
+                 ' FILE, in the Chrome trace event format (JSON).'
+        )
         args_parser.add_argument(
             '--diagnostic-style', '-D', type=DiagnosticStyle,
             default=DiagnosticStyle.default,
@@ -230,6 +237,12 @@ class ManageScript(object):
             self.do_generate, True
         )
         self.add_generate_args(generate_parser)
+        generate_parser.add_argument(
+            '--jobs', '-j', type=int, default=1,
+            help='Number of processes to use in order to render generated'
+                 ' sources (default: 1). The "make" subcommand uses the build'
+                 ' --jobs argument for this.'
+        )
 
         #########
         # Build #
@@ -353,6 +366,14 @@ class ManageScript(object):
                  ' can be abitrary inserted between two tokens without'
                  ' affecting lexing.'
         )
+        subparser.add_argument(
+            '--lexer-backend', choices=sorted(Lexer.dfa_backends),
+            default='case',
+            help='Code generation backend for the lexer state machine: "case"'
+                 ' lowers each state to case statements, "table" generates'
+                 ' compact transition tables, which compile faster for big'
+                 ' lexers (default: case).'
+        )
         subparser.add_argument(
             '--no-gdb-hook', action='store_true',
             help='Do not generate the ".debug_gdb_script" section. This'
@@ -632,6 +653,9 @@ class ManageScript(object):
                           generate_unparser=args.generate_unparser,
                           generate_astdoc=not args.no_astdoc,
                           generate_gdb_hook=not args.no_gdb_hook,
+                          lexer_backend=args.lexer_backend,
+                          jobs=args.jobs,
+                          pass_profile=args.pass_profile,
                           plugin_passes=args.plugin_pass,
                           pretty_print=not args.no_pretty_print)
 
@@ -37,7 +37,9 @@ from langkit.diagnostics import (
 )
 from langkit.expressions import resolve_property
 from langkit.lexer import TokenAction, WithSymbol
-from langkit.utils import copy_with, issubtype, type_check_instance
+from langkit.utils import (
+    Colors, copy_with, issubtype, printcol, type_check_instance
+)
 from langkit.utils.types import TypeSet
 
 
@@ -355,6 +357,330 @@ class Grammar(object):
             severity=Severity.warning
         )
 
+    def compute_first_sets(self, context):
+        """
+        Compute FIRST sets for all parsers in this grammar. See
+        ``Parser.first_set``.
+
+        :type context: langkit.compile_context.CompileCtx
+        """
+        # Rules can reference each other (and themselves), so compute FIRST
+        # sets iteratively until we reach a fixpoint. All rules start with an
+        # empty FIRST set.
+        changed = True
+        while changed:
+            changed = False
+            for _, rule in sorted(self.rules.items()):
+                old_first_set = rule.first_set
+                if rule.compute_first_set() != old_first_set:
+                    changed = True
+
+        # Tokens that sub-parsers test before failing do not contribute to
+        # the fixpoint: compute them one more time now that FIRST sets for
+        # all rules are known.
+        for _, rule in sorted(self.rules.items()):
+            rule.compute_first_set()
+
+    def select_memoized_rules(self, context):
+        """
+        Determine which parsing rules need a memo table. See
+        ``Parser.is_memoized``.
+
+        A memo table saves work only when a parsing function is called more
+        than once at the same token index. This happens only when parsers
+        backtrack (Or alternatives, Opt and List parsers, error recovery) and
+        when rules that can match the empty sequence run one after the
+        other. This pass computes the sets of rules that each parser calls at
+        its start position and after it, and the same sets for what runs
+        after it. A rule needs a memo table if a parser that fails can
+        call it at some position and the parsers that run after the failure
+        can call it again at the same position. Left-recursive rules always
+        need one, as their parsing function uses it to grow the seed parse.
+
+        :type context: langkit.compile_context.CompileCtx
+        """
+        rules = sorted(self.rules.items())
+
+        def tokens(parser):
+            return parser.first_set[0]
+
+        def nullable(parser):
+            return parser.first_set[1]
+
+        def tokens_intersect(tokens1, tokens2):
+            if tokens1 is None or tokens2 is None:
+                return tokens1 != frozenset() and tokens2 != frozenset()
+            return bool(tokens1 & tokens2)
+
+        # Check that memoization is forced only on grammar rules
+        def check_forced(parser):
+            with parser.diagnostic_context:
+                check_source_language(
+                    parser.forced_memoization is None or parser.is_root,
+                    'Memoization can be forced only on grammar rules'
+                )
+            for child in parser.children:
+                check_forced(child)
+
+        for _, rule in rules:
+            check_forced(rule)
+
+        # First compute, for each parser, the set of rules it calls at its
+        # start position and the set of rules it calls after its start
+        # position. Rules reference each other, so iterate until we reach a
+        # fixpoint.
+        rule_calls = {name: (frozenset(), frozenset()) for name, _ in rules}
+        node_calls = {}
+        dont_skip_rules = [name for name, rule in rules
+                           if rule.is_dont_skip_parser]
+
+        def rule_call(name):
+            start, later = rule_calls[name]
+            return (start | {name}, later)
+
+        def all_calls(parser):
+            start, later = node_calls[parser]
+            return start | later
+
+        def visit_calls(parser):
+            if isinstance(parser, Defer):
+                result = rule_call(parser.name)
+            elif isinstance(parser, Skip):
+                # Skip parsers run all the dont-skip rules at their start
+                # position before skipping a token.
+                calls = [rule_call(name) for name in dont_skip_rules]
+                result = (frozenset().union(*[s for s, _ in calls]),
+                          frozenset().union(*[l for _, l in calls]))
+            else:
+                # Sub-parsers of Row parsers run at the start position only
+                # if the previous ones matched the empty sequence. List
+                # parsers run their sub-parsers at the start position first,
+                # and then after it.
+                start = set()
+                later = set()
+                sequence = isinstance(parser, (_Row, List))
+                in_prefix = True
+                for i, child in enumerate(parser.children):
+                    child_start, child_later = visit_calls(child)
+                    if in_prefix:
+                        start.update(child_start)
+                    if (isinstance(parser, List)
+                            or isinstance(parser, _Row) and i > 0):
+                        later.update(child_start)
+                    later.update(child_later)
+                    if sequence and not nullable(child):
+                        in_prefix = False
+                result = (frozenset(start), frozenset(later))
+            node_calls[parser] = result
+            return result
+
+        changed = True
+        while changed:
+            changed = False
+            for name, rule in rules:
+                calls = visit_calls(rule)
+                if calls != rule_calls[name]:
+                    rule_calls[name] = calls
+                    changed = True
+
+        # Then compute, for each parser, what runs after it when it succeeds:
+        # the set of rules called at its end position, the set of rules
+        # called at any position and the FIRST set for the rest of the input.
+        no_after = (frozenset(), frozenset(), frozenset())
+        rule_after = {name: no_after for name, _ in rules}
+        node_after = {}
+
+        def union(after1, after2):
+            return (after1[0] | after2[0], after1[1] | after2[1],
+                    _first_set_union(after1[2], after2[2]))
+
+        def then(parsers, after):
+            """
+            Return what runs at the start of ``parsers`` (a sequence of
+            parsers), given that ``after`` runs right after them.
+            """
+            for p in reversed(parsers):
+                start = node_calls[p][0]
+                after = (start | (after[0] if nullable(p) else frozenset()),
+                         all_calls(p) | after[1],
+                         _first_set_union(
+                             tokens(p),
+                             after[2] if nullable(p) else frozenset()))
+            return after
+
+        def visit_after(parser, after):
+            node_after[parser] = union(node_after.get(parser, no_after),
+                                       after)
+            if isinstance(parser, Defer):
+                rule_after[parser.name] = union(rule_after[parser.name],
+                                                after)
+            elif isinstance(parser, _Row):
+                for i, child in enumerate(parser.parsers):
+                    visit_after(child, then(parser.parsers[i + 1:], after))
+            elif isinstance(parser, List):
+                # After an element, the list parser tries to parse a
+                # separator and another element, and then the parser that
+                # follows the list runs at the end of the last element.
+                loop = [parser.parser] + keep([parser.sep])
+                next_elements = union(after, (
+                    frozenset(),
+                    frozenset().union(*[all_calls(p) for p in loop]),
+                    reduce(_first_set_union, [tokens(p) for p in loop])
+                ))
+                element_after = union(after,
+                                      then(loop[1:] + loop[:1],
+                                           next_elements))
+                visit_after(parser.parser, element_after)
+                if parser.sep:
+                    visit_after(parser.sep,
+                                then([parser.parser], element_after))
+            else:
+                for child in parser.children:
+                    visit_after(child, after)
+
+        changed = True
+        while changed:
+            old_rule_after = dict(rule_after)
+            node_after = {}
+            for name, rule in rules:
+                visit_after(rule, rule_after[name])
+            changed = rule_after != old_rule_after
+
+        # Finally look for parsers that can call the same rule twice at the
+        # same position.
+        reasons = {}
+
+        def add_memoized(names, reason):
+            for name in names:
+                reasons.setdefault(name, reason)
+
+        def check_failure(failing, after_start, after_later, after_tokens):
+            """
+            Memoize rules that the ``failing`` parser can call and that the
+            parsers that run after its failure, at the same position, can call
+            again.
+
+            :param Parser failing: Parser that fails.
+            :param frozenset[str] after_start: Rules that the parsers that run
+                after the failure can call at the position where ``failing``
+                started.
+            :param frozenset[str] after_later: Rules that these parsers can
+                call after this position.
+            :param frozenset[TokenAction]|None after_tokens: FIRST set for
+                these parsers.
+            """
+            start, later = node_calls[failing]
+            add_memoized(start & after_start, 'backtracking')
+
+            # Both must consume the same token to call rules after the start
+            # position.
+            if tokens_intersect(tokens(failing), after_tokens):
+                add_memoized(later & after_later, 'backtracking')
+
+        def visit_conflicts(parser):
+            after_start, after_any_pos, after_tokens = node_after[parser]
+
+            # Rules that can match the empty sequence can be followed by
+            # calls at the same position.
+            if nullable(parser):
+                add_memoized(node_calls[parser][0] & after_start,
+                             'empty match')
+
+            if isinstance(parser, Or):
+                alts = parser.parsers
+                for i, alt in enumerate(alts):
+                    alt_dispatch = parser.dispatch_tokens(alt)
+                    for next_alt in alts[i + 1:]:
+                        # Both alternatives run at the same position only if
+                        # the current token can be dispatched to both.
+                        next_dispatch = parser.dispatch_tokens(next_alt)
+                        if (alt_dispatch is None or next_dispatch is None
+                                or set(alt_dispatch) & set(next_dispatch)):
+                            check_failure(
+                                alt,
+                                node_calls[next_alt][0],
+                                node_calls[next_alt][1] | after_any_pos,
+                                tokens(next_alt))
+                        if nullable(next_alt):
+                            check_failure(alt, after_start, after_any_pos,
+                                          after_tokens)
+
+            elif isinstance(parser, Opt):
+                check_failure(parser.parser, after_start, after_any_pos,
+                              after_tokens)
+
+            elif isinstance(parser, List):
+                # When an element (or a separator and the next element) fails
+                # to parse, parsing resumes after the last parsed element.
+                check_failure(parser.parser, after_start, after_any_pos,
+                              after_tokens)
+                if parser.sep:
+                    check_failure(parser.sep, after_start, after_any_pos,
+                                  after_tokens)
+                    if tokens_intersect(tokens(parser.sep), after_tokens):
+                        add_memoized(all_calls(parser.parser) & after_any_pos,
+                                     'backtracking')
+                    if nullable(parser.sep):
+                        check_failure(parser.parser, after_start,
+                                      after_any_pos, after_tokens)
+
+            elif isinstance(parser, _Transform) and _has_no_backtrack(parser):
+                # After recovering from a failure, parsing resumes at the
+                # furthest position where parsing failed, whatever parsers
+                # ran before.
+                add_memoized(after_any_pos, 'error recovery')
+
+            elif isinstance(parser, Skip):
+                add_memoized(all_calls(parser), 'dont-skip rule')
+
+            for child in parser.children:
+                visit_conflicts(child)
+
+        for name, rule in rules:
+            # The parsing function for left-recursive rules runs again at the
+            # same position until the parsed sequence stops growing.
+            if rule.is_left_recursive():
+                add_memoized([name], 'left recursion')
+                add_memoized(all_calls(rule), 'left recursion')
+            visit_conflicts(rule)
+
+        # Apply overrides from the grammar and store the result in rule
+        # parsers.
+        for name, rule in rules:
+            reason = reasons.get(name)
+            if rule.forced_memoization is not None:
+                with rule.diagnostic_context:
+                    check_source_language(
+                        rule.forced_memoization
+                        or not rule.is_left_recursive(),
+                        'Left-recursive rules must be memoized'
+                    )
+                reason = 'forced' if rule.forced_memoization else None
+            rule.is_memoized = reason is not None
+            rule.memoization_reason = reason
+
+            with rule.diagnostic_context:
+                check_source_language(
+                    rule.memo_size >= 1 and rule.memo_ways >= 1,
+                    'Memo tables must have at least one set of one entry'
+                )
+
+        if context.verbosity.info:
+            printcol('Packrat memoization: {} out of {} parsing rules'
+                     ' memoized'.format(len([r for _, r in rules
+                                             if r.is_memoized]),
+                                        len(rules)),
+                     Colors.OKBLUE)
+        if context.verbosity.debug:
+            for name, rule in rules:
+                print('  {}: {}'.format(
+                    name,
+                    'memoized ({}), {} sets of {} entries'.format(
+                        rule.memoization_reason, rule.memo_size,
+                        rule.memo_ways
+                    ) if rule.is_memoized else 'not memoized'
+                ))
+
     def check_main_rule(self, context):
         """
         Emit an error if the main parsing rule is missing.
@@ -441,6 +767,62 @@ class Parser(object):
         generation.
         """
 
+        self.first_set = (frozenset(), False)
+        """
+        FIRST set for this parser, computed during the "compute parsers FIRST
+        sets" pass: set of token kinds that can start the sequences this
+        parser accepts (None if it can be anything), and whether this parser
+        can succeed on a token that is not in this set (for instance because
+        it can match the empty sequence).
+
+        Or parsers use it to avoid trying alternatives that cannot match the
+        current token.
+
+        :type: (frozenset[TokenAction]|None, bool)
+        """
+
+        self.forced_memoization = None
+        """
+        If not None, whether the parsing function for the rule that this
+        parser implements must keep a memo table, regardless of what the
+        "select memoized parsing rules" pass computes. See the memoize method.
+
+        :type: bool|None
+        """
+
+        self.is_memoized = True
+        """
+        For grammar rules, whether the corresponding parsing function keeps a
+        memo table, to avoid parsing again at a position where it already ran.
+        This is computed during the "select memoized parsing rules" pass: see
+        Grammar.select_memoized_rules.
+        """
+
+        self.memoization_reason = None
+        """
+        If this parser is a memoized rule, short description for why it needs
+        memoization.
+
+        :type: str|None
+        """
+
+        self.memo_size = 16
+        self.memo_ways = 1
+        """
+        For memoized grammar rules, number of sets in the memo table and
+        number of entries in each set. See the memoize method.
+        """
+
+        self.fail_token = None
+        """
+        Kind for the last token that this parser tests before failing, when
+        the current token is not in its FIRST set, or None if it does not test
+        any. This is used to preserve the parsing error diagnostics of Or
+        parsers that skip alternatives.
+
+        :type: TokenAction|None
+        """
+
     def traverse_create_vars(self, start_pos):
         """
         This method will traverse the parser tree and create variables for
@@ -657,6 +1039,52 @@ class Parser(object):
         """
         raise NotImplementedError()
 
+    def compute_first_set(self, in_loop=False):
+        """
+        Compute the FIRST set for this parser and all its sub-parsers. See
+        ``first_set``.
+
+        :param bool in_loop: Whether this parser can run several times during
+            the same call to the parsing function for the enclosing rule (i.e.
+            it is inside a List parser).
+        :return: The computed FIRST set.
+        :rtype: (frozenset[TokenAction]|None, bool)
+        """
+        tokens, nullable, self.fail_token = self._compute_first_set(in_loop)
+        self.first_set = (tokens, nullable)
+        return self.first_set
+
+    def _compute_first_set(self, in_loop):
+        """
+        Implementation for compute_first_set. Subclasses must override this
+        and call compute_first_set on all their sub-parsers.
+
+        :param bool in_loop: See compute_first_set.
+        :return: The FIRST set and the fail token for this parser.
+        :rtype: (frozenset[TokenAction]|None, bool, TokenAction|None)
+        """
+        raise NotImplementedError()
+
+    def _sequence_first_set(self, parsers, in_loop):
+        """
+        Helper for _compute_first_set implementations. Compute the FIRST set
+        for a sequence of parsers, as in _Row parsers.
+
+        :param list[Parser] parsers: Parsers in the sequence.
+        :param bool in_loop: See compute_first_set.
+        :rtype: (frozenset[TokenAction]|None, bool, TokenAction|None)
+        """
+        first_sets = [(p.compute_first_set(in_loop), p.fail_token)
+                      for p in parsers]
+        tokens = frozenset()
+        fail_token = None
+        for (p_tokens, p_nullable), p_fail_token in first_sets:
+            tokens = _first_set_union(tokens, p_tokens)
+            fail_token = p_fail_token or fail_token
+            if not p_nullable:
+                return (tokens, False, fail_token)
+        return (tokens, True, fail_token)
+
     @property
     def can_parse_token_node(self):
         """
@@ -859,6 +1287,49 @@ class Parser(object):
         """
         return DontSkip(self, *parsers)
 
+    def memoize(self, enabled=None, size=None, ways=None):
+        """
+        Return the self parser, modified to force memoization on (or off, if
+        `enabled` is False) for the grammar rule it implements, regardless of
+        which rules langkit determines can run several times at the same
+        position::
+
+            expr=Or(G.call, G.name).memoize(),
+            atom=Or(G.name, G.num).memoize(False),
+
+        Left-recursive rules must always be memoized.
+
+        Memo tables keep results for a limited number of positions: results
+        at positions N and N + `size` go to the same set of `ways` entries,
+        and when all entries in a set are used, the least recently stored
+        one is dropped. Rules that backtrack across long sequences of tokens
+        can use bigger tables::
+
+            decl=Or(G.subp_decl, G.subp_body).memoize(size=64, ways=2),
+
+        Passing only `size` and/or `ways` changes the geometry of the memo
+        table if langkit decides to memoize the rule, but does not force
+        memoization on.
+
+        :param bool|None enabled: Whether the parsing function must keep a
+            memo table. If None, force memoization on only when neither
+            `size` nor `ways` is provided.
+        :param int|None size: If provided, number of sets in the memo table.
+            16 by default.
+        :param int|None ways: If provided, number of entries in each set of
+            the memo table. 1 by default.
+        :rtype: Parser
+        """
+        if enabled is None and size is None and ways is None:
+            enabled = True
+        if enabled is not None:
+            self.forced_memoization = enabled
+        if size is not None:
+            self.memo_size = size
+        if ways is not None:
+            self.memo_ways = ways
+        return self
+
 
 class _Token(Parser):
     """
@@ -884,6 +1355,9 @@ class _Token(Parser):
     def _is_left_recursive(self, rule_name):
         return False
 
+    def _compute_first_set(self, in_loop):
+        return (frozenset([self.val]), False, self.val)
+
     def __init__(self, val, match_text=""):
         """
         Create a parser that matches a specific token.
@@ -990,6 +1464,11 @@ class Skip(Parser):
     def _precise_types(self):
         return TypeSet([self.type])
 
+    def _compute_first_set(self, in_loop):
+        # Skip parsers accept any token, except the termination one
+        self.dest_node_parser.compute_first_set(in_loop)
+        return (None, False, None)
+
     def create_vars_after(self, start_pos):
         self.init_vars(res_var=self.dest_node_parser.res_var)
         self.dummy_node = VarDef('skip_dummy', T.root_node)
@@ -1038,6 +1517,10 @@ class DontSkip(Parser):
     def _precise_types(self):
         return self.subparser.precise_types
 
+    def _compute_first_set(self, in_loop):
+        self.subparser.compute_first_set(in_loop)
+        return self.subparser.first_set + (self.subparser.fail_token, )
+
     def create_vars_after(self, start_pos):
         self.init_vars(self.subparser.pos_var, self.subparser.res_var)
 
@@ -1073,6 +1556,14 @@ class Or(Parser):
         # ... and we want to memoize the result.
         self.cached_type = None
 
+        self.kind_var = None
+        """
+        If not None, variable that contains the kind of the current token
+        during code generation. See the dispatch_tokens method.
+
+        :type: VarDef
+        """
+
     def can_parse_token_node(self):
         return all(p.can_parse_token_node for p in self.parsers)
 
@@ -1134,8 +1625,58 @@ class Or(Parser):
         finally:
             self.is_processing_type = False
 
+    def _compute_first_set(self, in_loop):
+        tokens = frozenset()
+        fail_token = None
+        nullable = False
+        for p in self.parsers:
+            p_tokens, p_nullable = p.compute_first_set(in_loop)
+            tokens = _first_set_union(tokens, p_tokens)
+            if not nullable:
+                # Alternatives after the first nullable one never run when
+                # the current token is not in the FIRST set.
+                fail_token = p.fail_token or fail_token
+                nullable = p_nullable
+        return (tokens, nullable, fail_token)
+
+    def dispatch_tokens(self, parser):
+        """
+        Return the set of token kinds for which the ``parser`` alternative
+        must be tried, or None if it must always be tried.
+
+        Ordered choice semantics are preserved as an alternative that is not
+        tried would have failed anyway. The generated code records the failure
+        of an alternative that is not tried in ``Last_Fail`` just like the
+        alternative would have (see ``Parser.fail_token``), so parsing error
+        diagnostics are preserved too.
+
+        There is one exception: when a memoized rule already failed at the
+        current token, calling it again does not record its failure another
+        time, whereas not trying an alternative that starts with a call to
+        this rule always does. The diagnostic can then mention the token that
+        this rule expects instead of the token that an alternative tried
+        between the two calls expects. As memo tables can drop entries (see
+        ``Parser.memoize``), such diagnostics already depend on memoization.
+
+        :param Parser parser: Alternative in this Or parser.
+        :rtype: list[TokenAction]|None
+        """
+        tokens, nullable = parser.first_set
+
+        # Testing the token kind of a single token parser is not cheaper than
+        # running the parser itself. Also always try alternatives for which we
+        # do not know what failure to record.
+        if (not tokens or nullable or isinstance(parser, _Token)
+                or parser.fail_token is None):
+            return None
+        return sorted(tokens, key=lambda t: t.dsl_name)
+
     def create_vars_after(self, start_pos):
         self.init_vars()
+        self.kind_var = (
+            VarDef('or_kind', 'Token_Kind')
+            if any(self.dispatch_tokens(p) for p in self.parsers) else None
+        )
 
     def generate_code(self):
         return self.render('or_code_ada', exit_label=gen_name("Exit_Or"))
@@ -1144,6 +1685,33 @@ class Or(Parser):
         return all(p.discard() for p in self.parsers)
 
 
+def _first_set_union(tokens1, tokens2):
+    """
+    Return the union of two sets of tokens from FIRST sets.
+
+    :type tokens1: frozenset[TokenAction]|None
+    :type tokens2: frozenset[TokenAction]|None
+    :rtype: frozenset[TokenAction]|None
+    """
+    return (None if tokens1 is None or tokens2 is None else
+            tokens1 | tokens2)
+
+
+def _has_no_backtrack(parser):
+    """
+    Return whether ``parser`` is part of a no_backtrack hierarchy, i.e.
+    whether it contains a NoBacktrack parser in the same rule, not inside an Or
+    parser. See Parser.traverse_nobacktrack.
+
+    :param Parser parser: The parser to evaluate.
+    :rtype: bool
+    """
+    return isinstance(parser, NoBacktrack) or any(
+        _has_no_backtrack(c) for c in parser.children
+        if not isinstance(c, Or)
+    )
+
+
 def always_make_progress(parser):
     """
     Return whether `parser` cannot match an empty sequence of tokens.
@@ -1262,6 +1830,9 @@ class _Row(Parser):
     def children(self):
         return self.parsers
 
+    def _compute_first_set(self, in_loop):
+        return self._sequence_first_set(self.parsers, in_loop)
+
     def _eval_type(self):
         # A _Row parser never yields a concrete result itself
         return None
@@ -1371,6 +1942,12 @@ class List(Parser):
     def _precise_types(self):
         return TypeSet([self.type])
 
+    def _compute_first_set(self, in_loop):
+        tokens, nullable = self.parser.compute_first_set(True)
+        if self.sep:
+            self.sep.compute_first_set(True)
+        return (tokens, nullable or self.empty_valid, self.parser.fail_token)
+
     def _compile(self):
         # Ensure this list parser will build concrete list nodes.
         # TODO: we should be able to do this in _eval_type directly.
@@ -1503,6 +2080,15 @@ class Opt(Parser):
                 if self._booleanize is None else
                 TypeSet([self.type]))
 
+    def _compute_first_set(self, in_loop):
+        tokens, _ = self.parser.compute_first_set(in_loop)
+
+        # When its sub-parser fails, an error Opt parser emits a diagnostic,
+        # so running it has side effects even if the current token is not in
+        # its FIRST set.
+        return (None if self._is_error else tokens, True,
+                self.parser.fail_token)
+
     def create_vars_after(self, start_pos):
         self.init_vars(
             self.parser.pos_var,
@@ -1550,6 +2136,10 @@ class _Extract(Parser):
     def _precise_types(self):
         return self.parser.parsers[self.index].precise_types
 
+    def _compute_first_set(self, in_loop):
+        self.parser.compute_first_set(in_loop)
+        return self.parser.first_set + (self.parser.fail_token, )
+
     def create_vars_after(self, start_pos):
         self.init_vars(
             self.parser.pos_var, self.parser.subresults[self.index]
@@ -1587,6 +2177,10 @@ class Discard(Parser):
         # Discard parsers return nothing
         return None
 
+    def _compute_first_set(self, in_loop):
+        self.parser.compute_first_set(in_loop)
+        return self.parser.first_set + (self.parser.fail_token, )
+
     def create_vars_after(self, start_pos):
         self.init_vars(self.parser.pos_var, self.parser.res_var)
 
@@ -1648,6 +2242,11 @@ class Defer(Parser):
     def _precise_types(self):
         return self.parser.precise_types
 
+    def _compute_first_set(self, in_loop):
+        # The referenced rule runs in its own parsing function: use its FIRST
+        # set as computed so far by Grammar.compute_first_sets.
+        return self.parser.first_set + (self.parser.fail_token, )
+
     def create_vars_after(self, start_pos):
         self.init_vars()
 
@@ -1706,6 +2305,18 @@ class _Transform(Parser):
     def _precise_types(self):
         return TypeSet([self.type])
 
+    def _compute_first_set(self, in_loop):
+        tokens, nullable = self.parser.compute_first_set(in_loop)
+
+        # If this parser is part of a no_backtrack hierarchy, it recovers from
+        # failures once a NoBacktrack parser has run, even on the first token.
+        # This can happen for the first token only if the NoBacktrack parser
+        # ran during a previous iteration of a List parser (the other case is
+        # handled by NoBacktrack's FIRST set).
+        if in_loop and _has_no_backtrack(self):
+            tokens = None
+        return (tokens, nullable, self.parser.fail_token)
+
     @property
     def fields_parsers(self):
         """
@@ -1816,6 +2427,9 @@ class Null(Parser):
     def _precise_types(self):
         return TypeSet([self.type])
 
+    def _compute_first_set(self, in_loop):
+        return (frozenset(), True, None)
+
 
 _ = Discard
 
@@ -1869,6 +2483,15 @@ class Predicate(Parser):
     def _precise_types(self):
         return self.parser.precise_types
 
+    def _compute_first_set(self, in_loop):
+        tokens, nullable = self.parser.compute_first_set(in_loop)
+
+        # If the sub-parser can succeed without consuming the current token,
+        # the predicate can fail and document this failure, so this parser
+        # must always run.
+        return (None if nullable else tokens, nullable,
+                self.parser.fail_token)
+
     def _compile(self):
         # Resolve the property reference and make sure it has the expected
         # signature: (parser-result-type) -> bool.
@@ -1910,6 +2533,11 @@ class NoBacktrack(Parser):
     def __repr__(self):
         return "NoBacktrack"
 
+    def _compute_first_set(self, in_loop):
+        # Once this runs, the enclosing Transform parsers recover from
+        # failures, so parsers that contain it can succeed on any token.
+        return (None, True, None)
+
     def create_vars_after(self, start_pos):
         self.pos_var = start_pos
 
@@ -4,6 +4,12 @@ Helpers to manage compilation passes.
 
 from __future__ import absolute_import, division, print_function
 
+from contextlib import contextmanager
+import json
+import os
+import sys
+import time
+
 from langkit.compiled_types import CompiledTypeRepo
 from langkit.diagnostics import errors_checkpoint
 from langkit.utils import Colors, printcol
@@ -14,9 +20,14 @@ class PassManager(object):
     Holder for compilation passes. Handles passes sequential execution.
     """
 
-    def __init__(self):
+    def __init__(self, profile=None):
+        """
+        :param PassProfile|None profile: If provided, measure the performance
+            of each pass and record it in this profile.
+        """
         self.frozen = False
         self.passes = []
+        self.profile = profile
 
     def add(self, *passes):
         """
@@ -51,7 +62,183 @@ class PassManager(object):
                 if (not isinstance(p, MajorStepPass)
                         and context.verbosity.debug):  # no-code-coverage
                     printcol('Running pass: {}'.format(p.name), Colors.YELLOW)
-                p.run(context)
+                if self.profile and not isinstance(p, MajorStepPass):
+                    with self.profile.measure(p):
+                        p.run(context)
+                else:
+                    p.run(context)
+
+
+def _max_rss():
+    """
+    Return the peak resident set size for this process so far, in KiB, or
+    None if this is not available on this platform.
+
+    :rtype: int|None
+    """
+    try:
+        import resource
+    except ImportError:  # no-code-coverage
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on Darwin and in KiB on other systems
+    return max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+
+def _cpu_time():
+    """
+    Return the CPU time (user and system) used by this process and its
+    terminated children so far, in seconds.
+
+    :rtype: float
+    """
+    return sum(os.times()[:4])
+
+
+class PassProfile(object):
+    """
+    Performance measurements for compilation passes: wall-clock time, CPU
+    time and peak memory usage increase.
+    """
+
+    class Record(object):
+        """
+        Measurements for one pass execution.
+        """
+
+        def __init__(self, name, kind, start, wall_time, cpu_time,
+                     max_rss_increase):
+            self.name = name
+            """
+            Name of the pass.
+
+            :type: str
+            """
+
+            self.kind = kind
+            """
+            Name of the pass class (GlobalPass, PropertyPass, ...).
+
+            :type: str
+            """
+
+            self.start = start
+            """
+            Time at which the pass started, in seconds since the start of the
+            profile.
+
+            :type: float
+            """
+
+            self.wall_time = wall_time
+            """
+            Wall-clock time spent in the pass, in seconds.
+
+            :type: float
+            """
+
+            self.cpu_time = cpu_time
+            """
+            CPU time spent in the pass, in seconds. This includes the time
+            spent in subprocesses that the pass waited for.
+
+            :type: float
+            """
+
+            self.max_rss_increase = max_rss_increase
+            """
+            Increase of the peak resident set size during the pass, in KiB, or
+            None if not available.
+
+            :type: int|None
+            """
+
+    def __init__(self):
+        self.start_time = time.time()
+        """
+        Reference time for the start of records.
+
+        :type: float
+        """
+
+        self.records = []
+        """
+        Measurements for all passes executed so far, in execution order.
+
+        :type: list[PassProfile.Record]
+        """
+
+    @contextmanager
+    def measure(self, p):
+        """
+        Context manager to record the performance of the ``p`` pass, which
+        runs in the managed block.
+
+        :param AbstractPass p: Pass to measure.
+        """
+        start_rss = _max_rss()
+        start_cpu = _cpu_time()
+        start_wall = time.time()
+        try:
+            yield
+        finally:
+            wall_time = time.time() - start_wall
+            cpu_time = _cpu_time() - start_cpu
+            end_rss = _max_rss()
+            self.records.append(PassProfile.Record(
+                p.name, type(p).__name__, start_wall - self.start_time,
+                wall_time, cpu_time,
+                None if start_rss is None else end_rss - start_rss
+            ))
+
+    def format_table(self):
+        """
+        Return a table that summarizes the recorded measurements, slowest
+        passes first.
+
+        :rtype: str
+        """
+        lines = ['{:>9} {:>9} {:>11}  {}'.format(
+            'Wall (s)', 'CPU (s)', 'RSS+ (KiB)', 'Pass'
+        )]
+        for r in sorted(self.records, key=lambda r: (-r.wall_time, r.name)):
+            lines.append('{:>9.3f} {:>9.3f} {:>11}  {} ({})'.format(
+                r.wall_time, r.cpu_time,
+                '?' if r.max_rss_increase is None else r.max_rss_increase,
+                r.name, r.kind
+            ))
+        lines.append('{:>9.3f} {:>9.3f} {:>11}  Total'.format(
+            sum(r.wall_time for r in self.records),
+            sum(r.cpu_time for r in self.records),
+            ''
+        ))
+        return '\n'.join(lines)
+
+    def write_trace(self, filename):
+        """
+        Write recorded measurements to ``filename`` in the Chrome trace event
+        format. The result can be loaded in chrome://tracing or Perfetto, and
+        is plain JSON for other tools.
+
+        :param str filename: Name of the file to write.
+        """
+        pid = os.getpid()
+        events = []
+        for r in self.records:
+            events.append({
+                'name': r.name,
+                'cat': r.kind,
+                'ph': 'X',
+                'ts': int(r.start * 1e6),
+                'dur': int(r.wall_time * 1e6),
+                'pid': pid,
+                'tid': 0,
+                'args': {'cpu_time': r.cpu_time,
+                         'max_rss_increase': r.max_rss_increase},
+            })
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f,
+                      indent=2, sort_keys=True)
 
 
 class AbstractPass(object):
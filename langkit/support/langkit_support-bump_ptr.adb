@@ -31,6 +31,11 @@ package body Langkit_Support.Bump_Ptr is
 
    procedure Dealloc is new Ada.Unchecked_Deallocation
      (Bump_Ptr_Pool_Type, Bump_Ptr_Pool);
+   procedure Dealloc is new Ada.Unchecked_Deallocation
+     (Page_Cache_Type, Page_Cache);
+
+   procedure Free_Pages (Pages : Pages_Vector.Vector; First : Positive);
+   --  Free all pages in Pages, starting from the one at index First
 
    function Align (Size, Alignment : Storage_Offset) return Storage_Offset
      with Inline;
@@ -49,6 +54,137 @@ package body Langkit_Support.Bump_Ptr is
       end if;
    end Align;
 
+   ----------------
+   -- Free_Pages --
+   ----------------
+
+   procedure Free_Pages (Pages : Pages_Vector.Vector; First : Positive) is
+   begin
+      for PI in First .. Last_Index (Pages) loop
+         Free (Get (Pages, PI));
+      end loop;
+   end Free_Pages;
+
+   ---------------------
+   -- Page_Cache_Type --
+   ---------------------
+
+   protected body Page_Cache_Type is
+
+      ---------
+      -- Get --
+      ---------
+
+      procedure Get (Page : out Page_Ptr) is
+      begin
+         Page := (if Length (Pages) = 0
+                  then System.Null_Address
+                  else Pop (Pages));
+      end Get;
+
+      ---------
+      -- Put --
+      ---------
+
+      procedure Put (Pages : Pages_Vector.Vector; Last_Kept : out Natural) is
+         Available : constant Natural :=
+           (if Capacity > Length (Page_Cache_Type.Pages)
+            then Capacity - Length (Page_Cache_Type.Pages)
+            else 0);
+      begin
+         Last_Kept := Natural'Min (Last_Index (Pages), Available);
+         for PI in First_Index (Pages) .. Last_Kept loop
+            Append (Page_Cache_Type.Pages, Get (Pages, PI));
+         end loop;
+      end Put;
+
+      ------------------
+      -- Set_Capacity --
+      ------------------
+
+      procedure Set_Capacity
+        (Capacity : Natural; Excess : in out Pages_Vector.Vector) is
+      begin
+         Page_Cache_Type.Capacity := Capacity;
+         while Length (Pages) > Capacity loop
+            Append (Excess, Pop (Pages));
+         end loop;
+      end Set_Capacity;
+
+      -----------
+      -- Clear --
+      -----------
+
+      procedure Clear (Excess : in out Pages_Vector.Vector) is
+      begin
+         while Length (Pages) > 0 loop
+            Append (Excess, Pop (Pages));
+         end loop;
+         Destroy (Pages);
+      end Clear;
+
+      ----------------
+      -- Page_Count --
+      ----------------
+
+      function Page_Count return Natural is
+      begin
+         return Length (Pages);
+      end Page_Count;
+
+   end Page_Cache_Type;
+
+   -----------------------
+   -- Create_Page_Cache --
+   -----------------------
+
+   function Create_Page_Cache
+     (Capacity : Natural := Default_Page_Cache_Capacity) return Page_Cache
+   is
+      Result : constant Page_Cache := new Page_Cache_Type;
+   begin
+      Set_Capacity (Result, Capacity);
+      return Result;
+   end Create_Page_Cache;
+
+   ------------------
+   -- Set_Capacity --
+   ------------------
+
+   procedure Set_Capacity (Cache : Page_Cache; Capacity : Natural) is
+      Excess : Pages_Vector.Vector;
+   begin
+      Cache.Set_Capacity (Capacity, Excess);
+      Free_Pages (Excess, First_Index (Excess));
+      Destroy (Excess);
+   end Set_Capacity;
+
+   ------------------
+   -- Cached_Pages --
+   ------------------
+
+   function Cached_Pages (Cache : Page_Cache) return Natural is
+   begin
+      return Cache.Page_Count;
+   end Cached_Pages;
+
+   -------------
+   -- Destroy --
+   -------------
+
+   procedure Destroy (Cache : in out Page_Cache) is
+      Excess : Pages_Vector.Vector;
+   begin
+      if Cache = No_Page_Cache then
+         return;
+      end if;
+
+      Cache.Clear (Excess);
+      Free_Pages (Excess, First_Index (Excess));
+      Destroy (Excess);
+      Dealloc (Cache);
+   end Destroy;
+
    ------------
    -- Create --
    ------------
@@ -58,6 +194,43 @@ package body Langkit_Support.Bump_Ptr is
       return new Bump_Ptr_Pool_Type;
    end Create;
 
+   ------------
+   -- Create --
+   ------------
+
+   function Create (Cache : Page_Cache) return Bump_Ptr_Pool is
+      Result : constant Bump_Ptr_Pool := new Bump_Ptr_Pool_Type;
+   begin
+      Result.Cache := Cache;
+      return Result;
+   end Create;
+
+   --------------------
+   -- Allocated_Size --
+   --------------------
+
+   function Allocated_Size (Pool : Bump_Ptr_Pool) return Storage_Count is
+   begin
+      return (if Pool = No_Pool then 0 else Pool.Allocated_Size);
+   end Allocated_Size;
+
+   ---------------
+   -- Get_Stats --
+   ---------------
+
+   function Get_Stats (Pool : Bump_Ptr_Pool) return Pool_Stats is
+   begin
+      if Pool = No_Pool then
+         return (others => <>);
+      end if;
+
+      return (Pages           => Length (Pool.Pages),
+              Large_Objects   => Length (Pool.Large_Objects),
+              Allocated_Bytes => Pool.Allocated_Size,
+              Used_Bytes      => Pool.Used_Size,
+              Wasted_Bytes    => Pool.Wasted_Size);
+   end Get_Stats;
+
    ----------
    -- Free --
    ----------
@@ -68,15 +241,21 @@ package body Langkit_Support.Bump_Ptr is
          return;
       end if;
 
-      --  Free every page allocated
+      --  Give pages back to the page cache, if any, and free the ones it
+      --  cannot keep. Large objects are never cached as their size varies.
 
-      --  TODO: Might be interresting at some point to keep a global cache of
-      --  pages ourself, since we always use the same size.
+      declare
+         Last_Kept : Natural := 0;
+      begin
+         if Pool.Cache /= No_Page_Cache then
+            Pool.Cache.Put (Pool.Pages, Last_Kept);
+         end if;
+         Free_Pages (Pool.Pages, Last_Kept + 1);
+      end;
+      Free_Pages (Pool.Large_Objects, First_Index (Pool.Large_Objects));
 
-      for PI in First_Index (Pool.Pages) .. Last_Index (Pool.Pages) loop
-         Free (Get (Pool.Pages, PI));
-      end loop;
       Destroy (Pool.Pages);
+      Destroy (Pool.Large_Objects);
       Dealloc (Pool);
    end Free;
 
@@ -90,31 +269,53 @@ package body Langkit_Support.Bump_Ptr is
       Obj_Offset : Storage_Offset;
    begin
 
-      --  If the required size is bigger than the page size, we'll allocate a
-      --  special page the size of the required object. Basically we fall-back
-      --  on regular alloc mechanism, but this ensures that we can handle all
-      --  allocations transparently via this allocator.
+      Pool.Used_Size := Pool.Used_Size + S;
 
-      if S > Page_Size then
-         declare
-            Mem : constant System.Address := System.Memory.Alloc (size_t (S));
-         begin
+      --  When we don't have enough space to allocate the chunk in the current
+      --  page, we need more memory.
 
-            --  Append the allocated memory to the pool pages, so that it is
-            --  freed on pool free, but don't touch at the current_page, so
-            --  it can keep being used next time.
-
-            Append (Pool.Pages, Mem);
-            return Mem;
-         end;
-      end if;
+      if Page_Size - Pool.Current_Offset < S then
 
-      --  When we don't have enough space to allocate the chunk, allocate a new
-      --  page.
+         --  If the required size is bigger than the page size, or big enough
+         --  that starting a new page for it would waste a lot of space in the
+         --  current one, we'll allocate a special block the size of the
+         --  required object. Basically we fall-back on regular alloc
+         --  mechanism, but this ensures that we can handle all allocations
+         --  transparently via this allocator.
+
+         if S > Large_Object_Size then
+            declare
+               Mem : constant System.Address :=
+                  System.Memory.Alloc (size_t (S));
+            begin
+
+               --  Keep track of the allocated memory so that it is freed on
+               --  pool free, but don't touch at the current_page, so it can
+               --  keep being used next time.
+
+               Append (Pool.Large_Objects, Mem);
+               Pool.Allocated_Size := Pool.Allocated_Size + S;
+               return Mem;
+            end;
+         end if;
+
+         --  Otherwise, switch to a new page, reusing a cached one if possible
+
+         if Pool.Current_Offset < Page_Size then
+            Pool.Wasted_Size :=
+               Pool.Wasted_Size + (Page_Size - Pool.Current_Offset);
+         end if;
+
+         Pool.Current_Page := System.Null_Address;
+         if Pool.Cache /= No_Page_Cache then
+            Pool.Cache.Get (Pool.Current_Page);
+         end if;
+         if Pool.Current_Page = System.Null_Address then
+            Pool.Current_Page := System.Memory.Alloc (Page_Size);
+         end if;
 
-      if Page_Size - Pool.Current_Offset < S then
-         Pool.Current_Page := System.Memory.Alloc (Page_Size);
          Append (Pool.Pages, Pool.Current_Page);
+         Pool.Allocated_Size := Pool.Allocated_Size + Page_Size;
          Pool.Current_Offset := 0;
       end if;
 
@@ -42,10 +42,26 @@ package body Langkit_Support.Lexical_Env is
    --  Whether lookup cache is enabled for the given lexical environment.
    --  Note that for now, this is only a global setting (not per env).
 
+   Current_Epoch : Env_Epoch := 1;
+   --  Current value of the logical clock for lookup caches (see Env_Epoch)
+
+   procedure Invalidate_Lookup_Cache (Self : Lexical_Env) with Inline;
+   --  Record that Self was just modified, so that the lookup caches of Self
+   --  and of all the environments that have Self in their parent chain are
+   --  reset before their next use.
+
+   function Chain_Modified_Epoch (Env : Lexical_Env) return Env_Epoch
+      with Pre => Env.Kind = Primary;
+   --  Return the epoch of the most recent modification of Env or of one of
+   --  its parents. The result is memoized in Env for the current epoch, so
+   --  this is O(1) unless some environment was modified since the last call.
+
    function Is_Lookup_Cache_Valid (Env : Lexical_Env) return Boolean
+   is
+     (Chain_Modified_Epoch (Env) <= Env.Env.Lookup_Cache_Epoch)
       with Pre => Env.Kind = Primary;
-   --  Return whether Env's lookup cache is valid. This will check every
-   --  Lookup_Cache_Valid flag up Env's parent chain.
+   --  Return whether Env's lookup cache is valid, i.e. whether neither Env
+   --  nor its parents were modified since the last reset of the cache.
 
    function Wrap
      (Env   : Lexical_Env_Access;
@@ -98,6 +114,31 @@ package body Langkit_Support.Lexical_Env is
    procedure Reset_Lookup_Cache (Self : Lexical_Env);
    --  Reset Self's lexical environment lookup cache
 
+   procedure Add_Lookup_Cache_Entry (Self : Lexical_Env; Is_Miss : Boolean);
+   --  Account for the entry that was just inserted in Self's lookup cache.
+   --  If Is_Miss, also count a cache miss and evict entries from the set of
+   --  caches that Self's one belongs to so that it stays within its budget.
+   --  Eviction must not happen when inserting a computed entry, as it could
+   --  destroy the result vector that the caller is about to return.
+
+   procedure Sweep_Lookup_Cache
+     (Env     : Lexical_Env_Access;
+      Count   : Positive;
+      Evicted : out Natural;
+      Wrapped : out Boolean);
+   --  Move the hand of Env's lookup cache towards the end of the cache,
+   --  removing up to Count entries that were not used since the hand last
+   --  went over them and clearing the reference bit of the other ones. Set
+   --  Evicted to the number of removed entries and Wrapped to whether the
+   --  hand reached the end of the cache.
+
+   procedure Evict_Lookup_Cache_Entries (Caches : in out Lookup_Cache_Set);
+   --  Remove entries from the lookup caches in Caches until they contain no
+   --  more entries than Caches.Stats.Budget, or until all remaining entries
+   --  are being computed. Entries to remove are chosen using the CLOCK
+   --  algorithm, which approximates LRU, with a hand that goes over each
+   --  cache in turn.
+
    ----------------
    -- Text_Image --
    ----------------
@@ -114,36 +155,208 @@ package body Langkit_Support.Lexical_Env is
       return To_Text (Ret);
    end Text_Image;
 
-   ---------------------------
-   -- Is_Lookup_Cache_Valid --
-   ---------------------------
+   -----------------------------
+   -- Invalidate_Lookup_Cache --
+   -----------------------------
 
-   function Is_Lookup_Cache_Valid (Env : Lexical_Env) return Boolean is
-      P : Lexical_Env;
+   procedure Invalidate_Lookup_Cache (Self : Lexical_Env) is
    begin
-      if Env.Env.Lookup_Cache_Valid then
-         P := Parent (Env);
-         return (P in Null_Lexical_Env | Empty_Env
-                 or else Is_Lookup_Cache_Valid (P));
-      else
-         return False;
+      Current_Epoch := Current_Epoch + 1;
+      Self.Env.Modified_Epoch := Current_Epoch;
+   end Invalidate_Lookup_Cache;
+
+   --------------------------
+   -- Chain_Modified_Epoch --
+   --------------------------
+
+   function Chain_Modified_Epoch (Env : Lexical_Env) return Env_Epoch is
+      E      : Lexical_Env_Type renames Env.Env.all;
+      P      : Lexical_Env;
+      Result : Env_Epoch;
+   begin
+      if E.Chain_Checked_Epoch = Current_Epoch then
+         return E.Chain_Modified_Epoch;
+      end if;
+
+      Result := E.Modified_Epoch;
+      P := Parent (Env);
+      if P not in Null_Lexical_Env | Empty_Env then
+         Result := Env_Epoch'Max (Result, Chain_Modified_Epoch (P));
+      end if;
+      Dec_Ref (P);
+
+      --  Dynamic parent links can resolve to another environment without
+      --  any modification, so the result can be reused only for static ones.
+
+      if not E.Parent.Dynamic then
+         E.Chain_Modified_Epoch := Result;
+         E.Chain_Checked_Epoch := Current_Epoch;
       end if;
-   end Is_Lookup_Cache_Valid;
+      return Result;
+   end Chain_Modified_Epoch;
+
+   ---------------------
+   -- Reset_Env_Stats --
+   ---------------------
+
+   procedure Reset_Env_Stats is
+   begin
+      Env_Stats.Per_Kind := (others => <>);
+   end Reset_Env_Stats;
 
    ------------------------
    -- Reset_Lookup_Cache --
    ------------------------
 
    procedure Reset_Lookup_Cache (Self : Lexical_Env) is
+      Caches : constant Lookup_Cache_Set_Access := Self.Env.Lookup_Caches;
    begin
       for C of Self.Env.Lookup_Cache loop
          C.Elements.Destroy;
       end loop;
 
+      --  Unregister Self from its set of caches, moving the last environment
+      --  of the set to Self's slot to keep the set compact.
+
+      if Caches /= null then
+         Caches.Stats.Entries :=
+            Caches.Stats.Entries - Natural (Self.Env.Lookup_Cache.Length);
+
+         if Self.Env.Lookup_Cache_Index /= 0 then
+            declare
+               Index : constant Positive := Self.Env.Lookup_Cache_Index;
+               Last  : constant Lexical_Env_Access := Caches.Envs.Pop;
+            begin
+               if Last /= Self.Env then
+                  Caches.Envs.Set (Index, Last);
+                  Last.Lookup_Cache_Index := Index;
+               end if;
+               Self.Env.Lookup_Cache_Index := 0;
+            end;
+         end if;
+      end if;
+
       Self.Env.Lookup_Cache.Clear;
-      Self.Env.Lookup_Cache_Valid := True;
+      Self.Env.Lookup_Cache_Hand := Lookup_Cache_Maps.No_Element;
+      Self.Env.Lookup_Cache_Epoch := Current_Epoch;
    end Reset_Lookup_Cache;
 
+   ----------------------------
+   -- Add_Lookup_Cache_Entry --
+   ----------------------------
+
+   procedure Add_Lookup_Cache_Entry (Self : Lexical_Env; Is_Miss : Boolean)
+   is
+      Caches : constant Lookup_Cache_Set_Access := Self.Env.Lookup_Caches;
+   begin
+      if Caches = null then
+         return;
+      end if;
+
+      Caches.Stats.Entries := Caches.Stats.Entries + 1;
+      if Self.Env.Lookup_Cache_Index = 0 then
+         Caches.Envs.Append (Self.Env);
+         Self.Env.Lookup_Cache_Index := Caches.Envs.Length;
+      end if;
+
+      if Is_Miss then
+         Caches.Stats.Misses := Caches.Stats.Misses + 1;
+         if Caches.Stats.Budget > 0 then
+            Evict_Lookup_Cache_Entries (Caches.all);
+         end if;
+      end if;
+   end Add_Lookup_Cache_Entry;
+
+   ------------------------
+   -- Sweep_Lookup_Cache --
+   ------------------------
+
+   procedure Sweep_Lookup_Cache
+     (Env     : Lexical_Env_Access;
+      Count   : Positive;
+      Evicted : out Natural;
+      Wrapped : out Boolean)
+   is
+      use Lookup_Cache_Maps;
+
+      Cache : Map renames Env.Lookup_Cache;
+      Hand  : Cursor renames Env.Lookup_Cache_Hand;
+   begin
+      Evicted := 0;
+      if not Has_Element (Hand) then
+         Hand := Cache.First;
+      end if;
+
+      while Evicted < Count and then Has_Element (Hand) loop
+         declare
+            Cur : Cursor := Hand;
+            Val : Lookup_Cache_Entry := Element (Cur);
+         begin
+            Hand := Next (Cur);
+
+            --  Entries being computed must stay: they are needed to detect
+            --  infinite recursions.
+
+            if Val.State = Computed then
+               if Val.Referenced then
+                  Val.Referenced := False;
+                  Cache.Replace_Element (Cur, Val);
+               else
+                  Val.Elements.Destroy;
+                  Cache.Delete (Cur);
+                  Evicted := Evicted + 1;
+               end if;
+            end if;
+         end;
+      end loop;
+
+      Wrapped := not Has_Element (Hand);
+   end Sweep_Lookup_Cache;
+
+   --------------------------------
+   -- Evict_Lookup_Cache_Entries --
+   --------------------------------
+
+   procedure Evict_Lookup_Cache_Entries (Caches : in out Lookup_Cache_Set) is
+      Stats   : Cache_Stats renames Caches.Stats;
+      Evicted : Natural;
+      Wrapped : Boolean;
+
+      Visits : Natural := 2 * Caches.Envs.Length + 1;
+      --  Two rounds over all caches are enough to evict any entry that is not
+      --  being computed: the first one clears all reference bits. The hand
+      --  may start in the middle of a cache, hence the extra visit.
+   begin
+      while Stats.Entries > Stats.Budget and then Visits > 0 loop
+         if Caches.Hand > Caches.Envs.Length then
+            Caches.Hand := 1;
+         end if;
+
+         Sweep_Lookup_Cache
+           (Caches.Envs.Get (Caches.Hand),
+            Stats.Entries - Stats.Budget,
+            Evicted,
+            Wrapped);
+         Stats.Entries := Stats.Entries - Evicted;
+         Stats.Evictions := Stats.Evictions + Cache_Counter (Evicted);
+         if Wrapped then
+            Caches.Hand := Caches.Hand + 1;
+         end if;
+
+         Visits := Visits - 1;
+      end loop;
+   end Evict_Lookup_Cache_Entries;
+
+   -------------
+   -- Destroy --
+   -------------
+
+   procedure Destroy (Self : in out Lookup_Cache_Set) is
+   begin
+      Self.Envs.Destroy;
+      Self.Hand := 1;
+   end Destroy;
+
    -----------------------
    -- Simple_Env_Getter --
    -----------------------
@@ -319,8 +532,10 @@ package body Langkit_Support.Lexical_Env is
          else
             if Old_Env.Env.Rebindings_Pool = null then
                Old_Env.Env.Rebindings_Pool := new Env_Rebindings_Pools.Map;
+               Env_Stats.Rebindings_Pools := Env_Stats.Rebindings_Pools + 1;
             end if;
             Old_Env.Env.Rebindings_Pool.Insert (New_Env, Result);
+            Env_Stats.Pooled_Rebindings := Env_Stats.Pooled_Rebindings + 1;
          end if;
 
          Register_Rebinding (Env_Node (Old_Env), Result.all'Address);
@@ -394,7 +609,9 @@ package body Langkit_Support.Lexical_Env is
      (Parent            : Env_Getter;
       Node              : Node_Type;
       Transitive_Parent : Boolean := False;
-      Owner             : Unit_T) return Lexical_Env is
+      Owner             : Unit_T;
+      Lookup_Caches     : Lookup_Cache_Set_Access := null) return Lexical_Env
+   is
    begin
       if Parent /= No_Env_Getter then
          Inc_Ref (Parent);
@@ -408,8 +625,14 @@ package body Langkit_Support.Lexical_Env is
             Referenced_Envs          => <>,
             Map                      => new Internal_Envs.Map,
             Rebindings_Pool          => null,
-            Lookup_Cache_Valid       => True,
+            Lookup_Cache_Epoch       => Current_Epoch,
+            Modified_Epoch           => 0,
+            Chain_Modified_Epoch     => 0,
+            Chain_Checked_Epoch      => 0,
             Lookup_Cache             => Lookup_Cache_Maps.Empty_Map,
+            Lookup_Cache_Hand        => Lookup_Cache_Maps.No_Element,
+            Lookup_Caches            => Lookup_Caches,
+            Lookup_Cache_Index       => 0,
             Rebindings_Assoc_Ref_Env => -1),
          Owner => Owner);
    end Create_Lexical_Env;
@@ -438,7 +661,7 @@ package body Langkit_Support.Lexical_Env is
          return;
       end if;
 
-      Self.Env.Lookup_Cache_Valid := False;
+      Invalidate_Lookup_Cache (Self);
       Map.Insert (Key, Internal_Map_Node_Vectors.Empty_Vector, C, Dummy);
       Reference (Map, C).Element.Append (Node);
    end Add;
@@ -467,7 +690,7 @@ package body Langkit_Support.Lexical_Env is
          end if;
       end loop;
 
-      Self.Env.Lookup_Cache_Valid := False;
+      Invalidate_Lookup_Cache (Self);
    end Remove;
 
    ---------------
@@ -506,7 +729,7 @@ package body Langkit_Support.Lexical_Env is
            Self.Env.Referenced_Envs.Last_Index;
       end if;
 
-      Self.Env.Lookup_Cache_Valid := False;
+      Invalidate_Lookup_Cache (Self);
    end Reference;
 
    ---------------
@@ -531,7 +754,7 @@ package body Langkit_Support.Lexical_Env is
          Self.Env.Rebindings_Assoc_Ref_Env :=
            Self.Env.Referenced_Envs.Last_Index;
       end if;
-      Self.Env.Lookup_Cache_Valid := False;
+      Invalidate_Lookup_Cache (Self);
    end Reference;
 
    ---------
@@ -741,11 +964,17 @@ package body Langkit_Support.Lexical_Env is
 
       Found_Rebinding : Boolean := False;
 
+      Kind_Stats : Env_Kind_Stats renames Env_Stats.Per_Kind (Primary);
+      --  Lookup caches exist only in primary environments
+
    begin
       if Self in Empty_Env then
          return Empty_Lookup_Result_Array;
       end if;
 
+      Env_Stats.Per_Kind (Self.Kind).Gets :=
+         Env_Stats.Per_Kind (Self.Kind).Gets + 1;
+
       if Has_Trace then
          Traces.Trace
            (Rec, "Get_Internal env="
@@ -795,18 +1024,35 @@ package body Langkit_Support.Lexical_Env is
 
          if not Is_Lookup_Cache_Valid (Self) then
             Reset_Lookup_Cache (Self);
+            Kind_Stats.Cache_Resets := Kind_Stats.Cache_Resets + 1;
          end if;
 
          declare
             Val : constant Lookup_Cache_Entry :=
-              (Computing, Empty_Lookup_Result_Vector);
+              (Computing, Empty_Lookup_Result_Vector, True);
          begin
             Self.Env.Lookup_Cache.Insert
               (Res_Key, Val, Cached_Res_Cursor, Inserted);
          end;
 
-         if not Inserted then
+         if Inserted then
+            Kind_Stats.Cache_Misses := Kind_Stats.Cache_Misses + 1;
+            Add_Lookup_Cache_Entry (Self, Is_Miss => True);
+
+         else
             Res_Val := Element (Cached_Res_Cursor);
+            if Self.Env.Lookup_Caches /= null then
+               declare
+                  Stats : Cache_Stats renames Self.Env.Lookup_Caches.Stats;
+               begin
+                  Stats.Hits := Stats.Hits + 1;
+                  if Stats.Budget > 0 and then not Res_Val.Referenced then
+                     Res_Val.Referenced := True;
+                     Self.Env.Lookup_Cache.Replace_Element
+                       (Cached_Res_Cursor, Res_Val);
+                  end if;
+               end;
+            end if;
 
             if Has_Trace then
                Traces.Trace
@@ -816,10 +1062,13 @@ package body Langkit_Support.Lexical_Env is
 
             case Res_Val.State is
                when Computing =>
+                  Kind_Stats.Recursion_Hits := Kind_Stats.Recursion_Hits + 1;
                   return Empty_Lookup_Result_Array;
                when Computed =>
+                  Kind_Stats.Cache_Hits := Kind_Stats.Cache_Hits + 1;
                   return Res_Val.Elements.To_Array;
-               when None => null;
+               when None =>
+                  Kind_Stats.Cache_Misses := Kind_Stats.Cache_Misses + 1;
             end case;
          end if;
       end if;
@@ -919,9 +1168,19 @@ package body Langkit_Support.Lexical_Env is
 
       if Has_Lookup_Cache (Self) and then Lookup_Kind = Recursive then
          declare
-            Val : constant Lookup_Cache_Entry := (Computed, Local_Results);
+            Val : constant Lookup_Cache_Entry :=
+              (Computed, Local_Results, True);
          begin
-            Self.Env.Lookup_Cache.Include (Res_Key, Val);
+            --  Nested lookups may have reset this cache, removing the entry
+            --  we created for this lookup: create it again in that case.
+
+            Self.Env.Lookup_Cache.Insert
+              (Res_Key, Val, Cached_Res_Cursor, Inserted);
+            if Inserted then
+               Add_Lookup_Cache_Entry (Self, Is_Miss => False);
+            else
+               Self.Env.Lookup_Cache.Replace_Element (Cached_Res_Cursor, Val);
+            end if;
          end;
 
          return Local_Results.To_Array;
@@ -1237,7 +1496,13 @@ package body Langkit_Support.Lexical_Env is
             Reset_Lookup_Cache (Self);
 
             --  Release the pool of rebindings
-            Destroy (Self.Env.Rebindings_Pool);
+            if Self.Env.Rebindings_Pool /= null then
+               Env_Stats.Rebindings_Pools := Env_Stats.Rebindings_Pools - 1;
+               Env_Stats.Pooled_Rebindings :=
+                  Env_Stats.Pooled_Rebindings
+                  - Natural (Self.Env.Rebindings_Pool.Length);
+               Destroy (Self.Env.Rebindings_Pool);
+            end if;
 
          when Orphaned =>
             Dec_Ref (Self.Env.Orphaned_Env);
@@ -1937,7 +2202,7 @@ package body Langkit_Support.Lexical_Env is
          return;
       end if;
 
-      Self.Env.Lookup_Cache_Valid := False;
+      Invalidate_Lookup_Cache (Self);
 
       for I in Self.Env.Referenced_Envs.First_Index
             .. Self.Env.Referenced_Envs.Last_Index
@@ -1973,7 +2238,7 @@ package body Langkit_Support.Lexical_Env is
 
    procedure Reset_Caches (Self : Lexical_Env) is
    begin
-      Self.Env.Lookup_Cache_Valid := False;
+      Invalidate_Lookup_Cache (Self);
    end Reset_Caches;
 
    --------------
@@ -21,10 +21,14 @@
 -- <http://www.gnu.org/licenses/>.                                          --
 ------------------------------------------------------------------------------
 
+with Ada.Strings.Fixed;
+
 package body Langkit_Support.Packrat is
 
-   function Entry_Index (Offset : Token_Index) return Natural is
-     (Integer (Offset) mod Memo_Size);
+   function Set_Index
+     (Memo : Memo_Type; Offset : Token_Index) return Positive
+   is
+     (Integer (Offset) mod Memo.Size + 1);
 
    -----------
    -- Clear --
@@ -32,7 +36,7 @@ package body Langkit_Support.Packrat is
 
    procedure Clear (Memo : in out Memo_Type) is
    begin
-      for E of Memo loop
+      for E of Memo.Entries loop
          E.State := No_Result;
       end loop;
    end Clear;
@@ -41,14 +45,26 @@ package body Langkit_Support.Packrat is
    -- Get --
    ---------
 
-   function Get (Memo : Memo_Type; Offset : Token_Index) return Memo_Entry is
-      E : Memo_Entry renames Memo (Entry_Index (Offset));
+   function Get
+     (Memo : in out Memo_Type; Offset : Token_Index) return Memo_Entry
+   is
+      Index : constant Positive := Set_Index (Memo, Offset);
    begin
-      if E.Offset = Offset then
-         return E;
-      else
-         return (State => No_Result, others => <>);
-      end if;
+      for Way in 1 .. Memo.Ways loop
+         declare
+            E : Memo_Entry renames Memo.Entries (Index, Way);
+         begin
+            if E.State = No_Result then
+               exit;
+            elsif E.Offset = Offset then
+               Memo.Stats.Hits := Memo.Stats.Hits + 1;
+               return E;
+            end if;
+         end;
+      end loop;
+
+      Memo.Stats.Misses := Memo.Stats.Misses + 1;
+      return (State => No_Result, others => <>);
    end Get;
 
    ---------
@@ -60,12 +76,78 @@ package body Langkit_Support.Packrat is
                   Instance          : T;
                   Offset, Final_Pos : Token_Index)
    is
-      E : Memo_Entry renames Memo (Entry_Index (Offset));
+      Index : constant Positive := Set_Index (Memo, Offset);
+      Last  : Positive := Memo.Ways;
    begin
-      E := (State     => (if Is_Success then Success else Failure),
-            Instance  => Instance,
-            Offset    => Offset,
-            Final_Pos => Final_Pos);
+      --  Look for the entry to replace: the entry for the same offset if
+      --  there is one, the first unused one otherwise, or the least recently
+      --  set one if all are used.
+
+      for Way in 1 .. Memo.Ways loop
+         declare
+            E : Memo_Entry renames Memo.Entries (Index, Way);
+         begin
+            if E.State = No_Result or else E.Offset = Offset then
+               Last := Way;
+               exit;
+            end if;
+         end;
+      end loop;
+
+      declare
+         E : Memo_Entry renames Memo.Entries (Index, Last);
+      begin
+         if E.State /= No_Result and then E.Offset /= Offset then
+            Memo.Stats.Evictions := Memo.Stats.Evictions + 1;
+         end if;
+      end;
+
+      --  Keep entries sorted from the most recently set to the least recently
+      --  set.
+
+      for Way in reverse 2 .. Last loop
+         Memo.Entries (Index, Way) := Memo.Entries (Index, Way - 1);
+      end loop;
+
+      Memo.Entries (Index, 1) :=
+        (State     => (if Is_Success then Success else Failure),
+         Instance  => Instance,
+         Offset    => Offset,
+         Final_Pos => Final_Pos);
    end Set;
 
+   -----------
+   -- Stats --
+   -----------
+
+   function Stats (Memo : Memo_Type) return Memo_Stats is
+   begin
+      return Memo.Stats;
+   end Stats;
+
+   -----------------
+   -- Reset_Stats --
+   -----------------
+
+   procedure Reset_Stats (Memo : in out Memo_Type) is
+   begin
+      Memo.Stats := (others => <>);
+   end Reset_Stats;
+
+   -----------
+   -- Image --
+   -----------
+
+   function Image (Memo : Memo_Type) return String is
+      function Img (N : Natural) return String is
+        (Ada.Strings.Fixed.Trim (Natural'Image (N), Ada.Strings.Left));
+      function Img (N : Memo_Counter) return String is
+        (Ada.Strings.Fixed.Trim (Memo_Counter'Image (N), Ada.Strings.Left));
+   begin
+      return Img (Memo.Size) & " sets of " & Img (Memo.Ways) & " entries, "
+             & Img (Memo.Stats.Hits) & " hits, "
+             & Img (Memo.Stats.Misses) & " misses, "
+             & Img (Memo.Stats.Evictions) & " evictions";
+   end Image;
+
 end Langkit_Support.Packrat;
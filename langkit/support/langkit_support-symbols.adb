@@ -82,6 +82,72 @@ package body Langkit_Support.Symbols is
       pragma Warnings (On, "value not in range");
    end Precomputed_Symbol;
 
+   -----------
+   -- Shard --
+   -----------
+
+   protected body Shard is
+
+      ----------
+      -- Find --
+      ----------
+
+      procedure Find
+        (T      : Text_Type;
+         Hash   : Hash_Type;
+         Create : Boolean;
+         Result : out Symbol_Type)
+      is
+         use Sets;
+
+         Position : constant Cursor :=
+            Symbols.Find ((T'Unrestricted_Access, Hash));
+      begin
+         --  If we already have such a symbol, return the access we already
+         --  internalized. Otherwise, give up if asked to.
+
+         if Has_Element (Position) then
+            Result := Element (Position).Symbol;
+            return;
+         elsif not Create then
+            Result := null;
+            return;
+         end if;
+
+         --  At this point, we know we have to internalize a new symbol
+
+         Result := new Text_Type'(T);
+         Symbols.Insert ((Result, Hash));
+      end Find;
+
+      -------------
+      -- Destroy --
+      -------------
+
+      procedure Destroy is
+         use Sets;
+         C : Cursor := Symbols.First;
+      begin
+         while Has_Element (C) loop
+            declare
+               --  We keep Symbol_Type to be a constant access everywhere for
+               --  simplification, but we know symbol tables are the only
+               --  owners of these, so stripping the "constant" attribute away
+               --  here is known to be safe.
+
+               function Convert is new Ada.Unchecked_Conversion
+                 (Symbol_Type, Text_Access);
+               To_Free : Text_Access := Convert (Element (C).Symbol);
+            begin
+               Next (C);
+               Free (To_Free);
+            end;
+         end loop;
+         Symbols.Clear;
+      end Destroy;
+
+   end Shard;
+
    ----------
    -- Find --
    ----------
@@ -92,25 +158,16 @@ package body Langkit_Support.Symbols is
       Create : Boolean := True)
       return Symbol_Type
    is
-      use Sets;
+      --  Use the highest bits of the hash to select the shard, so that
+      --  symbols in a shard still use all buckets in its set.
 
-      T_Acc  : Symbol_Type := T'Unrestricted_Access;
-      Result : constant Cursor := ST.Symbols.Find (T_Acc);
+      H      : constant Hash_Type := Hash (T);
+      Index  : constant Shard_Index :=
+         Shard_Index'Mod (H / (Hash_Type'Modulus / Shard_Count));
+      Result : Symbol_Type;
    begin
-      --  If we already have such a symbol, return the access we already
-      --  internalized. Otherwise, give up if asked to.
-
-      if Has_Element (Result) then
-         return Element (Result);
-      elsif not Create then
-         return null;
-      end if;
-
-      --  At this point, we know we have to internalize a new symbol
-
-      T_Acc := new Text_Type'(T);
-      ST.Symbols.Insert (T_Acc);
-      return T_Acc;
+      ST.Shards (Index).Find (T, H, Create, Result);
+      return Result;
    end Find;
 
    -------------
@@ -118,23 +175,9 @@ package body Langkit_Support.Symbols is
    -------------
 
    procedure Destroy (ST : in out Symbol_Table) is
-      use Sets;
-      C : Cursor := ST.Symbols.First;
    begin
-      while Has_Element (C) loop
-         declare
-            --  We keep Symbol_Type to be a constant access everywhere for
-            --  simplification, but we know symbol tables are the only owners
-            --  of these, so stripping the "constant" attribute away here is
-            --  known to be safe.
-
-            function Convert is new Ada.Unchecked_Conversion
-              (Symbol_Type, Text_Access);
-            To_Free : Text_Access := Convert (Element (C));
-         begin
-            Next (C);
-            Free (To_Free);
-         end;
+      for S of ST.Shards loop
+         S.Destroy;
       end loop;
       Deallocate (ST);
    end Destroy;
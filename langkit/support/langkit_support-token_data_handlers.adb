@@ -27,6 +27,24 @@ package body Langkit_Support.Token_Data_Handlers is
      (TDH   : Token_Data_Handler;
       Index : Token_Index) return Token_Index_Vectors.Elements_Array;
 
+   function Line_Of
+     (TDH : Token_Data_Handler; Index : Natural) return Positive;
+   --  Return the index in TDH.Lines of the line that contains the character
+   --  at Index in TDH's source buffer.
+
+   procedure Free_Wide_Slices (TDH : in out Token_Data_Handler);
+   --  Free all the decoded copies that TDH.Wide_Slices and
+   --  TDH.Retired_Wide_Slices contain and remove them.
+
+   function Source_Char
+     (TDH : Token_Data_Handler; Index : Positive) return Wide_Wide_Character
+   is (if TDH.Source_Buffer /= null
+       then TDH.Source_Buffer (Index)
+       else Wide_Wide_Character'Val
+              (Character'Pos (TDH.Narrow_Source_Buffer (Index))))
+      with Inline;
+   --  Return the source character at Index, whatever the storage mode
+
    generic
       type Key_Type is private;
       --  Type of the value used to sort vector elements
@@ -108,7 +126,8 @@ package body Langkit_Support.Token_Data_Handlers is
 
    function Has_Source_Buffer (TDH : Token_Data_Handler) return Boolean is
    begin
-      return TDH.Source_Buffer /= null;
+      return TDH.Source_Buffer /= null
+             or else TDH.Narrow_Source_Buffer /= null;
    end Has_Source_Buffer;
 
    ----------------
@@ -118,13 +137,19 @@ package body Langkit_Support.Token_Data_Handlers is
    procedure Initialize (TDH : out Token_Data_Handler; Symbols : Symbol_Table)
    is
    begin
-      TDH := (Source_Buffer     => null,
-              Source_First      => <>,
-              Source_Last       => <>,
-              Tokens            => <>,
-              Symbols           => Symbols,
-              Tokens_To_Trivias => <>,
-              Trivias           => <>);
+      TDH := (Source_Buffer        => null,
+              Narrow_Source_Buffer => null,
+              Source_First         => <>,
+              Source_Last          => <>,
+              Tokens               => <>,
+              Symbols              => Symbols,
+              Tokens_To_Trivias    => <>,
+              Trivias              => <>,
+              Lines                => <>,
+              First_Tabs           => <>,
+              Tab_Stop             => <>,
+              Wide_Slices          => <>,
+              Retired_Wide_Slices  => <>);
    end Initialize;
 
    -----------
@@ -135,18 +160,153 @@ package body Langkit_Support.Token_Data_Handlers is
      (TDH           : in out Token_Data_Handler;
       Source_Buffer : Text_Access;
       Source_First  : Positive;
-      Source_Last   : Natural) is
+      Source_Last   : Natural;
+      Tab_Stop      : Positive)
+   is
+      First_Tab : Natural := Natural'Last;
+      --  Index of the first horizontal tabulation in the current line, if any
    begin
       Free (TDH.Source_Buffer);
+      GNAT.Strings.Free (TDH.Narrow_Source_Buffer);
+      Free_Wide_Slices (TDH);
       TDH.Source_Buffer := Source_Buffer;
       TDH.Source_First := Source_First;
       TDH.Source_Last := Source_Last;
+      TDH.Tab_Stop := Tab_Stop;
 
       Clear (TDH.Tokens);
       Clear (TDH.Trivias);
       Clear (TDH.Tokens_To_Trivias);
+
+      --  Build the tables of line starts and of first horizontal tabulations
+      --  in a single pass over the source buffer.
+
+      Clear (TDH.Lines);
+      Clear (TDH.First_Tabs);
+      Append (TDH.Lines, Source_First);
+      for I in Source_First .. Source_Last loop
+         if Source_Buffer (I) = Chars.LF then
+            Append (TDH.Lines, I + 1);
+            Append (TDH.First_Tabs, First_Tab);
+            First_Tab := Natural'Last;
+         elsif Source_Buffer (I) = Chars.HT and then First_Tab = Natural'Last
+         then
+            First_Tab := I;
+         end if;
+      end loop;
+      Append (TDH.First_Tabs, First_Tab);
    end Reset;
 
+   --------------------------
+   -- Narrow_Source_Buffer --
+   --------------------------
+
+   procedure Narrow_Source_Buffer (TDH : in out Token_Data_Handler) is
+   begin
+      if TDH.Source_Buffer = null then
+         return;
+      end if;
+
+      declare
+         Source : Text_Type renames
+            TDH.Source_Buffer (TDH.Source_First .. TDH.Source_Last);
+      begin
+         for C of Source loop
+            if Wide_Wide_Character'Pos (C) > Character'Pos (Character'Last)
+            then
+               return;
+            end if;
+         end loop;
+
+         TDH.Narrow_Source_Buffer :=
+            new String (TDH.Source_First .. TDH.Source_Last);
+         for I in Source'Range loop
+            TDH.Narrow_Source_Buffer (I) :=
+               Character'Val (Wide_Wide_Character'Pos (Source (I)));
+         end loop;
+      end;
+      Free (TDH.Source_Buffer);
+   end Narrow_Source_Buffer;
+
+   -------------------------
+   -- Widen_Source_Buffer --
+   -------------------------
+
+   procedure Widen_Source_Buffer (TDH : in out Token_Data_Handler) is
+   begin
+      if TDH.Source_Buffer = null then
+         TDH.Source_Buffer := new Text_Type'
+           (Source_Slice (TDH, TDH.Source_First, TDH.Source_Last));
+         GNAT.Strings.Free (TDH.Narrow_Source_Buffer);
+      end if;
+   end Widen_Source_Buffer;
+
+   -----------------------
+   -- Wide_Source_Slice --
+   -----------------------
+
+   procedure Wide_Source_Slice
+     (TDH    : in out Token_Data_Handler;
+      First  : Positive;
+      Last   : Natural;
+      Buffer : out Text_Cst_Access)
+   is
+      First_Line : Positive;
+      Last_Line  : Positive;
+      Slice      : Text_Access;
+   begin
+      if TDH.Source_Buffer /= null then
+         Buffer := Text_Cst_Access (TDH.Source_Buffer);
+         return;
+      end if;
+
+      First_Line := Line_Of (TDH, First);
+      Last_Line := Line_Of (TDH, Natural'Max (First, Last));
+
+      if TDH.Wide_Slices.Is_Empty then
+         for Dummy in 1 .. TDH.Lines.Length loop
+            TDH.Wide_Slices.Append (null);
+         end loop;
+      end if;
+
+      --  Reuse the decoded copy for First_Line if it contains the requested
+      --  slice. Otherwise, decode all the lines that contain the slice.
+
+      Slice := TDH.Wide_Slices.Get (First_Line);
+      if Slice = null or else Slice'Last < Last then
+         if Slice /= null then
+            TDH.Retired_Wide_Slices.Append (Slice);
+         end if;
+
+         Slice := new Text_Type'
+           (Source_Slice
+              (TDH,
+               TDH.Lines.Get (First_Line),
+               (if Last_Line = TDH.Lines.Last_Index
+                then TDH.Source_Last
+                else TDH.Lines.Get (Last_Line + 1) - 1)));
+         TDH.Wide_Slices.Set (First_Line, Slice);
+      end if;
+
+      Buffer := Text_Cst_Access (Slice);
+   end Wide_Source_Slice;
+
+   ----------------------
+   -- Free_Wide_Slices --
+   ----------------------
+
+   procedure Free_Wide_Slices (TDH : in out Token_Data_Handler) is
+   begin
+      for I in 1 .. TDH.Wide_Slices.Length loop
+         Free (TDH.Wide_Slices.Get_Access (I).all);
+      end loop;
+      for I in 1 .. TDH.Retired_Wide_Slices.Length loop
+         Free (TDH.Retired_Wide_Slices.Get_Access (I).all);
+      end loop;
+      TDH.Wide_Slices.Clear;
+      TDH.Retired_Wide_Slices.Clear;
+   end Free_Wide_Slices;
+
    ----------
    -- Free --
    ----------
@@ -154,9 +314,15 @@ package body Langkit_Support.Token_Data_Handlers is
    procedure Free (TDH : in out Token_Data_Handler) is
    begin
       Free (TDH.Source_Buffer);
+      GNAT.Strings.Free (TDH.Narrow_Source_Buffer);
+      Free_Wide_Slices (TDH);
+      TDH.Wide_Slices.Destroy;
+      TDH.Retired_Wide_Slices.Destroy;
       Destroy (TDH.Tokens);
       Destroy (TDH.Trivias);
       Destroy (TDH.Tokens_To_Trivias);
+      Destroy (TDH.Lines);
+      Destroy (TDH.First_Tabs);
       TDH.Symbols := No_Symbol_Table;
    end Free;
 
@@ -167,13 +333,19 @@ package body Langkit_Support.Token_Data_Handlers is
    procedure Move (Destination, Source : in out Token_Data_Handler) is
    begin
       Destination := Source;
-      Source := (Source_Buffer     => null,
-                 Source_First      => <>,
-                 Source_Last       => <>,
-                 Tokens            => <>,
-                 Symbols           => No_Symbol_Table,
-                 Tokens_To_Trivias => <>,
-                 Trivias           => <>);
+      Source := (Source_Buffer        => null,
+                 Narrow_Source_Buffer => null,
+                 Source_First         => <>,
+                 Source_Last          => <>,
+                 Tokens               => <>,
+                 Symbols              => No_Symbol_Table,
+                 Tokens_To_Trivias    => <>,
+                 Trivias              => <>,
+                 Lines                => <>,
+                 First_Tabs           => <>,
+                 Tab_Stop             => <>,
+                 Wide_Slices          => <>,
+                 Retired_Wide_Slices  => <>);
    end Move;
 
    --------------------------
@@ -493,11 +665,12 @@ package body Langkit_Support.Token_Data_Handlers is
             declare
                Triv_Index     : constant Natural := Natural (Key_Trivia);
                Tok_Index      : constant Natural := Element_Index - 1;
-               Key_Start_Sloc : constant Source_Location := Start_Sloc
-                 (TDH.Trivias.Get (Triv_Index).T.Sloc_Range);
+               Key_Start_Sloc : constant Source_Location := Sloc_Start
+                 (TDH, TDH.Trivias.Get (Triv_Index).T);
             begin
                return Compare
-                 (TDH.Tokens.Get (Tok_Index).Sloc_Range, Key_Start_Sloc);
+                 (Sloc_Range (TDH, TDH.Tokens.Get (Tok_Index)),
+                  Key_Start_Sloc);
             end;
          end if;
 
@@ -539,13 +712,13 @@ package body Langkit_Support.Token_Data_Handlers is
         (Sloc        : Source_Location;
          Dummy_Index : Positive;
          Token       : Stored_Token_Data) return Relative_Position
-      is (Compare (Token.Sloc_Range, Sloc));
+      is (Compare (Sloc_Range (TDH, Token), Sloc));
 
       function Compare
         (Sloc        : Source_Location;
          Dummy_Index : Positive;
          Trivia      : Trivia_Node) return Relative_Position
-      is (Compare (Trivia.T.Sloc_Range, Sloc));
+      is (Compare (Sloc_Range (TDH, Trivia.T), Sloc));
 
       function Token_Floor is new Floor
         (Key_Type        => Source_Location,
@@ -576,7 +749,7 @@ package body Langkit_Support.Token_Data_Handlers is
 
       declare
          function SS (Token : Stored_Token_Data) return Source_Location is
-           (Start_Sloc (Token.Sloc_Range));
+           (Sloc_Start (TDH, Token));
 
          Tok_Sloc  : constant Source_Location := SS (TDH.Tokens.Get (Token));
          Triv_Sloc : constant Source_Location :=
@@ -594,6 +767,204 @@ package body Langkit_Support.Token_Data_Handlers is
       end;
    end Lookup_Token;
 
+   ------------------
+   -- Source_Slice --
+   ------------------
+
+   function Source_Slice
+     (TDH   : Token_Data_Handler;
+      First : Positive;
+      Last  : Natural) return Text_Type is
+   begin
+      if TDH.Source_Buffer /= null then
+         return TDH.Source_Buffer (First .. Last);
+      end if;
+
+      return Result : Text_Type (First .. Last) do
+         for I in Result'Range loop
+            Result (I) := Source_Char (TDH, I);
+         end loop;
+      end return;
+   end Source_Slice;
+
+   -------------
+   -- Line_Of --
+   -------------
+
+   function Line_Of
+     (TDH : Token_Data_Handler; Index : Natural) return Positive
+   is
+      First : Positive := TDH.Lines.First_Index;
+      Last  : Natural := TDH.Lines.Last_Index;
+   begin
+      --  Look for the last line that starts before Index or at Index
+
+      while First < Last loop
+         declare
+            Middle : constant Positive := (First + Last + 1) / 2;
+         begin
+            if TDH.Lines.Get (Middle) <= Index then
+               First := Middle;
+            else
+               Last := Middle - 1;
+            end if;
+         end;
+      end loop;
+      return First;
+   end Line_Of;
+
+   --------------
+   -- Get_Sloc --
+   --------------
+
+   function Get_Sloc
+     (TDH : Token_Data_Handler; Index : Natural) return Source_Location
+   is
+      Line      : constant Positive := Line_Of (TDH, Index);
+      Start     : constant Positive := TDH.Lines.Get (Line);
+      First_Tab : constant Natural := TDH.First_Tabs.Get (Line);
+      Column    : Natural;
+   begin
+      --  Compute the (zero-based) column number from the start of the line
+      --  that contains Index.
+      --
+      --  TODO: use the Unicode algorithm to account for grapheme clusters.
+
+      --  All characters before the first horizontal tabulation of the line
+      --  take one column, so there is no need to scan them.
+
+      if Index <= First_Tab then
+         return (Line   => Line_Number (Line),
+                 Column => Column_Number'Mod (Index - Start + 1));
+      end if;
+
+      Column := First_Tab - Start;
+      for I in First_Tab .. Index - 1 loop
+         if Source_Char (TDH, I) = Chars.HT then
+            --  Make horizontal tabulations move by stride of Tab_Stop
+            --  columns, as usually implemented in code editors.
+
+            Column := (Column + TDH.Tab_Stop) / TDH.Tab_Stop * TDH.Tab_Stop;
+         else
+            Column := Column + 1;
+         end if;
+      end loop;
+
+      return (Line   => Line_Number (Line),
+              Column => Column_Number'Mod (Column + 1));
+   end Get_Sloc;
+
+   --------------------
+   -- Iterate_Tokens --
+   --------------------
+
+   procedure Iterate_Tokens (TDH : Token_Data_Handler) is
+      subtype Index_Type is Trivia_Vectors.Index_Type;
+
+      Line   : Positive := 1;
+      Index  : Positive := 1;
+      Column : Natural := 0;
+      --  Position of the last character whose source location was computed:
+      --  Line is its index in TDH.Lines, Index its index in the source buffer
+      --  and Column its zero-based column number.
+
+      function Sloc_At (I : Positive) return Source_Location;
+      --  Return the source location of the character at index I in the
+      --  source buffer, moving the current position to it. I must not be
+      --  before the current position.
+
+      procedure Process_Token (T : Stored_Token_Data; Is_Trivia : Boolean);
+      --  Compute the source location range of T and call Process on it
+
+      procedure Process_Trivias (Token : Token_Index);
+      --  Process all trivia that come after Token (or the leading trivia if
+      --  Token is No_Token_Index).
+
+      -------------
+      -- Sloc_At --
+      -------------
+
+      function Sloc_At (I : Positive) return Source_Location is
+      begin
+         --  Move to the last line that starts before I or at I
+
+         while Line < TDH.Lines.Last_Index
+               and then TDH.Lines.Get (Line + 1) <= I
+         loop
+            Line := Line + 1;
+            Index := TDH.Lines.Get (Line);
+            Column := 0;
+         end loop;
+
+         --  Then update the column number just like Get_Sloc does
+
+         for J in Index .. I - 1 loop
+            if Source_Char (TDH, J) = Chars.HT then
+               Column := (Column + TDH.Tab_Stop) / TDH.Tab_Stop * TDH.Tab_Stop;
+            else
+               Column := Column + 1;
+            end if;
+         end loop;
+         Index := I;
+
+         return (Line   => Line_Number (Line),
+                 Column => Column_Number'Mod (Column + 1));
+      end Sloc_At;
+
+      -------------------
+      -- Process_Token --
+      -------------------
+
+      procedure Process_Token (T : Stored_Token_Data; Is_Trivia : Boolean) is
+         Start : constant Source_Location := Sloc_At (T.Source_First);
+         Stop  : constant Source_Location := Sloc_At (T.Source_Last + 1);
+      begin
+         Process (T, Is_Trivia, Make_Range (Start, Stop));
+      end Process_Token;
+
+      ---------------------
+      -- Process_Trivias --
+      ---------------------
+
+      procedure Process_Trivias (Token : Token_Index) is
+         Trivia : Token_Index;
+      begin
+         if Natural (Token) >= Length (TDH.Tokens_To_Trivias) then
+            return;
+         end if;
+
+         Trivia := Token_Index
+           (Get (TDH.Tokens_To_Trivias, Index_Type (Token + 1)));
+         if Trivia = No_Token_Index then
+            return;
+         end if;
+
+         loop
+            declare
+               Node : constant Trivia_Node :=
+                  Get (TDH.Trivias, Index_Type (Trivia));
+            begin
+               Process_Token (Node.T, Is_Trivia => True);
+               exit when not Node.Has_Next;
+            end;
+            Trivia := Trivia + 1;
+         end loop;
+      end Process_Trivias;
+
+   begin
+      if not Has_Source_Buffer (TDH) then
+         return;
+      end if;
+      Index := TDH.Lines.Get (Line);
+
+      Process_Trivias (No_Token_Index);
+      for Token in First_Token_Index .. Last_Token (TDH) loop
+         Process_Token (Token_Vectors.Get (TDH.Tokens, Natural (Token)),
+                        Is_Trivia => False);
+         Process_Trivias (Token);
+      end loop;
+   end Iterate_Tokens;
+
    ----------
    -- Data --
    ----------
@@ -1,8 +1,13 @@
 from __future__ import absolute_import, division, print_function
 
+import glob
+import hashlib
 import os.path
+import posixpath
+import re
 import sys
 
+import mako
 import mako.exceptions
 from mako.lookup import TemplateLookup
 
@@ -44,20 +49,111 @@ class Renderer(object):
 
 
 _template_dirs = []
-_template_lookup = None
+_template_lookup = TemplateLookup(directories=_template_dirs,
+                                  strict_undefined=True)
 ":type: mako.utils.TemplateLookup"
 
+_template_cache_dir = None
+"""
+If not None, directory in which to store compiled templates across runs.
+
+:type: str|None
+"""
+
 
 def add_template_dir(path):
-    global _template_lookup
+    """
+    Add a directory in which to look for templates. Templates in directories
+    that were added first have precedence.
+
+    :param str path: Directory to add.
+    """
+    path = posixpath.normpath(path)
+    if path in _template_dirs:
+        return
+
+    # Update the existing lookup rather than creating a new one, so that
+    # already compiled templates are kept. As new directories have the lowest
+    # priority, this does not change how already loaded templates resolve.
     _template_dirs.append(path)
-    _template_lookup = TemplateLookup(directories=_template_dirs,
-                                      strict_undefined=True)
+    _template_lookup.directories.append(path)
+
+
+def set_template_cache_dir(path):
+    """
+    Set the directory in which to cache compiled templates across runs.
+
+    Loading a template then reuses its compiled Python module from a
+    previous run, as long as the template file did not change. Compiled
+    modules are keyed by template file path and content, and the cache
+    directory is specific to the Mako version in use. Modules compiled for
+    previous versions of a template are removed when it is loaded, so that
+    the cache does not grow across template changes.
+
+    :param str path: Cache directory. It is created if needed.
+    """
+    global _template_cache_dir
+    _template_cache_dir = os.path.join(
+        path, 'mako-{}'.format(mako.__version__)
+    )
+    _template_lookup.modulename_callable = _template_module_filename
+
+
+def _template_module_filename(filename, uri):
+    """
+    Return the name of the Python module file for the given template. See
+    mako.lookup.TemplateLookup's ``modulename_callable`` argument.
+
+    :param str filename: Path to the template file.
+    :param str uri: Template URI.
+    :rtype: str
+    """
+    m = hashlib.md5(filename)
+    with open(filename, 'rb') as f:
+        m.update(f.read())
+    base_name = posixpath.splitext(uri.lstrip('/'))[0]
+    result = os.path.join(
+        _template_cache_dir,
+        '{}_{}.py'.format(base_name, m.hexdigest())
+    )
+    _prune_template_modules(base_name, result)
+    return result
+
+
+_module_suffix_re = re.compile(r'_[0-9a-f]{32}\.pyc?$')
+
+
+def _prune_template_modules(base_name, module_filename):
+    """
+    Remove from the cache directory the compiled modules for the template
+    ``base_name`` (and their bytecode files), except ``module_filename``.
+
+    :param str base_name: Template URI, without its extension.
+    :param str module_filename: Path to the up-to-date compiled module.
+    """
+    prefix = os.path.join(_template_cache_dir, base_name)
+    for filename in glob.glob(prefix + '_*.py*'):
+        if (_module_suffix_re.match(filename[len(prefix):]) and
+                not filename.startswith(module_filename)):
+            try:
+                os.remove(filename)
+            except OSError:  # no-code-coverage
+                # Another process may have removed it already
+                pass
 
 
 add_template_dir(os.path.join(os.path.dirname(os.path.realpath(__file__)),
                               'templates'))
 
 
+def template_dirs():
+    """
+    Return the list of directories used to look for templates.
+
+    :rtype: list[str]
+    """
+    return list(_template_dirs)
+
+
 def mako_template(file_name):
     return _template_lookup.get_template("{}.mako".format(file_name))
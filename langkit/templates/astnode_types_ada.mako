@@ -374,7 +374,8 @@
         (Parent            => ${"No_Env_Getter" if add_env.no_parent else "G"},
          Node              => Self,
          Transitive_Parent => ${call_prop(add_env.transitive_parent_prop)},
-         Owner             => Self.Unit);
+         Owner             => Self.Unit,
+         Lookup_Caches     => Self.Unit.Context.Lookup_Caches'Access);
 
       Initial_Env := Self.Self_Env;
 
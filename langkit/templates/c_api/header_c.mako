@@ -237,6 +237,63 @@ ${capi.get_name("context_discard_errors_in_populate_lexical_env")}(
         ${analysis_context_type} context,
         int discard);
 
+${c_doc('langkit.context_memoization_stats')}
+extern void
+${capi.get_name("context_memoization_stats")}(
+        ${analysis_context_type} context,
+        int *kept_entries,
+        int *dropped_entries);
+
+${c_doc('langkit.context_set_cache_budget')}
+extern void
+${capi.get_name("context_set_cache_budget")}(
+        ${analysis_context_type} context,
+        int memoization_entries,
+        int lookup_cache_entries);
+
+${c_doc('langkit.context_memoization_cache_stats')}
+extern void
+${capi.get_name("context_memoization_cache_stats")}(
+        ${analysis_context_type} context,
+        int *entries,
+        int *budget,
+        uint64_t *hits,
+        uint64_t *misses,
+        uint64_t *evictions);
+
+${c_doc('langkit.context_lookup_cache_stats')}
+extern void
+${capi.get_name("context_lookup_cache_stats")}(
+        ${analysis_context_type} context,
+        int *entries,
+        int *budget,
+        uint64_t *hits,
+        uint64_t *misses,
+        uint64_t *evictions);
+
+${c_doc('langkit.context_lexical_env_stats')}
+extern void
+${capi.get_name("context_lexical_env_stats")}(
+        ${analysis_context_type} context,
+        int kind,
+        uint64_t *gets,
+        uint64_t *cache_hits,
+        uint64_t *cache_misses,
+        uint64_t *recursion_hits,
+        uint64_t *cache_resets);
+
+${c_doc('langkit.context_rebindings_pool_stats')}
+extern void
+${capi.get_name("context_rebindings_pool_stats")}(
+        ${analysis_context_type} context,
+        int *rebindings_pools,
+        int *pooled_rebindings);
+
+${c_doc('langkit.context_reset_lexical_env_stats')}
+extern void
+${capi.get_name("context_reset_lexical_env_stats")}(
+        ${analysis_context_type} context);
+
 ${c_doc('langkit.get_unit_from_file')}
 extern ${analysis_unit_type}
 ${capi.get_name("get_analysis_unit_from_file")}(
@@ -246,6 +303,18 @@ ${capi.get_name("get_analysis_unit_from_file")}(
         int reparse,
         ${grammar_rule_type} rule);
 
+${c_doc('langkit.get_units_from_files')}
+extern void
+${capi.get_name("get_analysis_units_from_files")}(
+        ${analysis_context_type} context,
+        const char **filenames,
+        int count,
+        const char *charset,
+        int reparse,
+        ${grammar_rule_type} rule,
+        int jobs,
+        ${analysis_unit_type} *units);
+
 ${c_doc('langkit.get_unit_from_buffer')}
 extern ${analysis_unit_type}
 ${capi.get_name("get_analysis_unit_from_buffer")}(
@@ -290,6 +359,15 @@ ${c_doc('langkit.unit_trivia_count')}
 extern int
 ${capi.get_name('unit_trivia_count')}(${analysis_unit_type} unit);
 
+${c_doc('langkit.unit_export_tokens')}
+extern int
+${capi.get_name('unit_export_tokens')}(${analysis_unit_type} unit,
+                                       int capacity,
+                                       int *kinds,
+                                       int *trivia_flags,
+                                       int *offsets,
+                                       int *slocs);
+
 ${c_doc('langkit.unit_filename')}
 extern char *
 ${capi.get_name('unit_filename')}(${analysis_unit_type} unit);
@@ -376,6 +454,26 @@ ${capi.get_name("node_child")}(${entity_type} *node,
                                unsigned n,
                                ${entity_type}* child_p);
 
+${c_doc('langkit.node_flatten')}
+extern int
+${capi.get_name("node_flatten")}(${entity_type} *node,
+                                 int capacity,
+                                 int *kinds,
+                                 int *parents,
+                                 int *first_children,
+                                 int *next_siblings,
+                                 int *token_starts,
+                                 int *token_ends,
+                                 int *slocs);
+
+${c_doc('langkit.node_findall')}
+extern int
+${capi.get_name("node_findall")}(
+    ${entity_type} *node,
+    const unsigned char *kinds,
+    int limit,
+    ${root_entity.array.c_type(capi).name} *result_p);
+
 ${c_doc('langkit.text_to_locale_string')}
 extern char *
 ${capi.get_name("text_to_locale_string")}(${text_type} *text);
@@ -19,9 +19,11 @@ with GNATCOLL.Iconv;
 
 with Langkit_Support.Diagnostics; use Langkit_Support.Diagnostics;
 with Langkit_Support.Text;        use Langkit_Support.Text;
+with Langkit_Support.Vectors;
 
 with ${ada_lib_name}.Analysis;   use ${ada_lib_name}.Analysis;
 with ${ada_lib_name}.Converters; use ${ada_lib_name}.Converters;
+with ${ada_lib_name}.Iterators;
 
 ${exts.with_clauses(with_clauses)}
 
@@ -159,6 +161,133 @@ package body ${ada_lib_name}.Implementation.C is
          Set_Last_Exception (Exc);
    end;
 
+   procedure ${capi.get_name("context_memoization_stats")}
+     (Context                       : ${analysis_context_type};
+      Kept_Entries, Dropped_Entries : access int)
+   is
+      Kept, Dropped : Natural;
+   begin
+      Clear_Last_Exception;
+      Get_Memoization_Stats (Context, Kept, Dropped);
+      Kept_Entries.all := int (Kept);
+      Dropped_Entries.all := int (Dropped);
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_set_cache_budget")}
+     (Context                                   : ${analysis_context_type};
+      Memoization_Entries, Lookup_Cache_Entries : int) is
+   begin
+      Clear_Last_Exception;
+      Set_Cache_Budget
+        (Context,
+         Natural (Memoization_Entries),
+         Natural (Lookup_Cache_Entries));
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_memoization_cache_stats")}
+     (Context                  : ${analysis_context_type};
+      Entries, Budget          : access int;
+      Hits, Misses, Evictions  : access Unsigned_64)
+   is
+   begin
+      Clear_Last_Exception;
+      declare
+         Stats : constant Analysis.Cache_Stats :=
+           Get_Memoization_Cache_Stats (Context);
+      begin
+         Entries.all := int (Stats.Entries);
+         Budget.all := int (Stats.Budget);
+         Hits.all := Unsigned_64 (Stats.Hits);
+         Misses.all := Unsigned_64 (Stats.Misses);
+         Evictions.all := Unsigned_64 (Stats.Evictions);
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_lookup_cache_stats")}
+     (Context                  : ${analysis_context_type};
+      Entries, Budget          : access int;
+      Hits, Misses, Evictions  : access Unsigned_64)
+   is
+   begin
+      Clear_Last_Exception;
+      declare
+         Stats : constant Analysis.Cache_Stats :=
+           Get_Lookup_Cache_Stats (Context);
+      begin
+         Entries.all := int (Stats.Entries);
+         Budget.all := int (Stats.Budget);
+         Hits.all := Unsigned_64 (Stats.Hits);
+         Misses.all := Unsigned_64 (Stats.Misses);
+         Evictions.all := Unsigned_64 (Stats.Evictions);
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_lexical_env_stats")}
+     (Context        : ${analysis_context_type};
+      Kind           : int;
+      Gets           : access Unsigned_64;
+      Cache_Hits     : access Unsigned_64;
+      Cache_Misses   : access Unsigned_64;
+      Recursion_Hits : access Unsigned_64;
+      Cache_Resets   : access Unsigned_64)
+   is
+      pragma Unreferenced (Context);
+   begin
+      Clear_Last_Exception;
+      declare
+         Stats : AST_Envs.Env_Kind_Stats renames
+            AST_Envs.Env_Stats.Per_Kind
+              (AST_Envs.Lexical_Env_Kind'Val (Kind));
+      begin
+         Gets.all := Unsigned_64 (Stats.Gets);
+         Cache_Hits.all := Unsigned_64 (Stats.Cache_Hits);
+         Cache_Misses.all := Unsigned_64 (Stats.Cache_Misses);
+         Recursion_Hits.all := Unsigned_64 (Stats.Recursion_Hits);
+         Cache_Resets.all := Unsigned_64 (Stats.Cache_Resets);
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_rebindings_pool_stats")}
+     (Context                             : ${analysis_context_type};
+      Rebindings_Pools, Pooled_Rebindings : access int)
+   is
+      pragma Unreferenced (Context);
+   begin
+      Clear_Last_Exception;
+      Rebindings_Pools.all := int (AST_Envs.Env_Stats.Rebindings_Pools);
+      Pooled_Rebindings.all := int (AST_Envs.Env_Stats.Pooled_Rebindings);
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
+   procedure ${capi.get_name("context_reset_lexical_env_stats")}
+     (Context : ${analysis_context_type})
+   is
+      pragma Unreferenced (Context);
+   begin
+      Clear_Last_Exception;
+      AST_Envs.Reset_Env_Stats;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
    function ${capi.get_name("get_analysis_unit_from_file")}
      (Context           : ${analysis_context_type};
       Filename, Charset : chars_ptr;
@@ -179,6 +308,44 @@ package body ${ada_lib_name}.Implementation.C is
          return null;
    end;
 
+   procedure ${capi.get_name("get_analysis_units_from_files")}
+     (Context   : ${analysis_context_type};
+      Filenames : System.Address;
+      Count     : int;
+      Charset   : chars_ptr;
+      Reparse   : int;
+      Rule      : ${grammar_rule_type};
+      Jobs      : int;
+      Units     : System.Address) is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         C_Filenames : chars_ptr_array (1 .. size_t (Count))
+            with Import, Address => Filenames;
+         Result      : Internal_Unit_Array (1 .. Natural (Count))
+            with Import, Address => Units;
+
+         Ada_Filenames : Filename_Array (1 .. Natural (Count));
+      begin
+         for I in Ada_Filenames'Range loop
+            Ada_Filenames (I) :=
+               To_Unbounded_String (Value (C_Filenames (size_t (I))));
+         end loop;
+
+         Result := Get_From_Files
+           (Context,
+            Ada_Filenames,
+            Value_Or_Empty (Charset),
+            Reparse /= 0,
+            Rule,
+            Jobs => Integer'Max (1, Integer (Jobs)));
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+   end;
+
    function ${capi.get_name("get_analysis_unit_from_buffer")}
      (Context           : ${analysis_context_type};
       Filename, Charset : chars_ptr;
@@ -303,6 +470,99 @@ package body ${ada_lib_name}.Implementation.C is
          return -1;
    end;
 
+   function ${capi.get_name('unit_export_tokens')}
+     (Unit         : ${analysis_unit_type};
+      Capacity     : int;
+      Kinds        : System.Address;
+      Trivia_Flags : System.Address;
+      Offsets      : System.Address;
+      Slocs        : System.Address) return int is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         type Int_Array is array (int range <>) of int;
+
+         Count : constant int :=
+           int (Token_Count (Unit)) + int (Trivia_Count (Unit));
+      begin
+         if Count = 0 or else Count > Capacity then
+            return Count;
+         end if;
+
+         declare
+            Kinds_A        : Int_Array (0 .. Count - 1)
+               with Import, Address => Kinds;
+            Trivia_Flags_A : Int_Array (0 .. Count - 1)
+               with Import, Address => Trivia_Flags;
+            Offsets_A      : Int_Array (0 .. 2 * Count - 1)
+               with Import, Address => Offsets;
+            Slocs_A        : Int_Array (0 .. 4 * Count - 1)
+               with Import, Address => Slocs;
+
+            Next_Index : int := 0;
+            --  Index for the next token to export
+
+            procedure Export
+              (Token      : Stored_Token_Data;
+               Is_Trivia  : Boolean;
+               Sloc_Range : Source_Location_Range);
+            --  Write Token to the output arrays
+
+            procedure Export_All is new Iterate_Tokens (Export);
+
+            ------------
+            -- Export --
+            ------------
+
+            procedure Export
+              (Token      : Stored_Token_Data;
+               Is_Trivia  : Boolean;
+               Sloc_Range : Source_Location_Range)
+            is
+               Index : constant int := Next_Index;
+            begin
+               Next_Index := Next_Index + 1;
+
+               if Kinds /= System.Null_Address then
+                  declare
+                     K : constant Token_Kind := To_Token_Kind (Token.Kind);
+                  begin
+                     Kinds_A (Index) := int (K'Enum_Rep);
+                  end;
+               end if;
+               if Trivia_Flags /= System.Null_Address then
+                  Trivia_Flags_A (Index) := Boolean'Pos (Is_Trivia);
+               end if;
+
+               --  Offsets are 0-based and the end offset is exclusive
+
+               if Offsets /= System.Null_Address then
+                  Offsets_A (2 * Index) :=
+                     int (Token.Source_First - Unit.TDH.Source_First);
+                  Offsets_A (2 * Index + 1) :=
+                     int (Token.Source_Last + 1 - Unit.TDH.Source_First);
+               end if;
+
+               if Slocs /= System.Null_Address then
+                  Slocs_A (4 * Index) := int (Sloc_Range.Start_Line);
+                  Slocs_A (4 * Index + 1) := int (Sloc_Range.Start_Column);
+                  Slocs_A (4 * Index + 2) := int (Sloc_Range.End_Line);
+                  Slocs_A (4 * Index + 3) := int (Sloc_Range.End_Column);
+               end if;
+            end Export;
+
+         begin
+            Export_All (Unit.TDH);
+            return Next_Index;
+         end;
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
    procedure ${capi.get_name('unit_lookup_token')}
      (Unit   : ${analysis_unit_type};
       Sloc   : access ${sloc_type};
@@ -576,6 +836,211 @@ package body ${ada_lib_name}.Implementation.C is
          return 0;
    end;
 
+   function ${capi.get_name('node_flatten')}
+     (Node           : ${entity_type}_Ptr;
+      Capacity       : int;
+      Kinds          : System.Address;
+      Parents        : System.Address;
+      First_Children : System.Address;
+      Next_Siblings  : System.Address;
+      Token_Starts   : System.Address;
+      Token_Ends     : System.Address;
+      Slocs          : System.Address) return int is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         type Int_Array is array (int range <>) of int;
+
+         function Subtree_Size (N : ${root_node_type_name}) return int;
+         --  Return the number of nodes in the tree rooted at N
+
+         ------------------
+         -- Subtree_Size --
+         ------------------
+
+         function Subtree_Size (N : ${root_node_type_name}) return int is
+            Result : int := 1;
+         begin
+            for I in 1 .. N.Abstract_Children_Count loop
+               declare
+                  Child : constant ${root_node_type_name} := N.Child (I);
+               begin
+                  if Child /= null then
+                     Result := Result + Subtree_Size (Child);
+                  end if;
+               end;
+            end loop;
+            return Result;
+         end Subtree_Size;
+
+         Count : constant int :=
+           (if Node.Node = null then 0 else Subtree_Size (Node.Node));
+      begin
+         if Count = 0 or else Count > Capacity then
+            return Count;
+         end if;
+
+         declare
+            Kinds_A          : Int_Array (0 .. Count - 1)
+               with Import, Address => Kinds;
+            Parents_A        : Int_Array (0 .. Count - 1)
+               with Import, Address => Parents;
+            First_Children_A : Int_Array (0 .. Count - 1)
+               with Import, Address => First_Children;
+            Next_Siblings_A  : Int_Array (0 .. Count - 1)
+               with Import, Address => Next_Siblings;
+            Token_Starts_A   : Int_Array (0 .. Count - 1)
+               with Import, Address => Token_Starts;
+            Token_Ends_A     : Int_Array (0 .. Count - 1)
+               with Import, Address => Token_Ends;
+            Slocs_A          : Int_Array (0 .. 4 * Count - 1)
+               with Import, Address => Slocs;
+
+            Next_Index : int := 0;
+            --  Index for the next node to flatten
+
+            procedure Flatten (N : ${root_node_type_name}; Parent : int);
+            --  Write the tree rooted at N to the output arrays, Parent being
+            --  the index of N's parent (-1 if none).
+
+            -------------
+            -- Flatten --
+            -------------
+
+            procedure Flatten (N : ${root_node_type_name}; Parent : int) is
+               Index      : constant int := Next_Index;
+               Last_Child : int := -1;
+            begin
+               Next_Index := Next_Index + 1;
+
+               if Kinds /= System.Null_Address then
+                  declare
+                     K : constant ${root_node_kind_name} := N.Kind;
+                  begin
+                     Kinds_A (Index) := int (K'Enum_Rep);
+                  end;
+               end if;
+               if Parents /= System.Null_Address then
+                  Parents_A (Index) := Parent;
+               end if;
+               if First_Children /= System.Null_Address then
+                  First_Children_A (Index) := -1;
+               end if;
+               if Next_Siblings /= System.Null_Address then
+                  Next_Siblings_A (Index) := -1;
+               end if;
+
+               --  Token indexes are 0-based here, so No_Token_Index is -1
+
+               if Token_Starts /= System.Null_Address then
+                  Token_Starts_A (Index) := int (N.Token_Start_Index) - 1;
+               end if;
+               if Token_Ends /= System.Null_Address then
+                  Token_Ends_A (Index) := int (N.Token_End_Index) - 1;
+               end if;
+
+               if Slocs /= System.Null_Address then
+                  declare
+                     SR : constant Source_Location_Range := Sloc_Range (N);
+                  begin
+                     Slocs_A (4 * Index) := int (SR.Start_Line);
+                     Slocs_A (4 * Index + 1) := int (SR.Start_Column);
+                     Slocs_A (4 * Index + 2) := int (SR.End_Line);
+                     Slocs_A (4 * Index + 3) := int (SR.End_Column);
+                  end;
+               end if;
+
+               for I in 1 .. N.Abstract_Children_Count loop
+                  declare
+                     Child : constant ${root_node_type_name} := N.Child (I);
+                  begin
+                     if Child /= null then
+                        if Last_Child = -1 then
+                           if First_Children /= System.Null_Address then
+                              First_Children_A (Index) := Next_Index;
+                           end if;
+                        elsif Next_Siblings /= System.Null_Address then
+                           Next_Siblings_A (Last_Child) := Next_Index;
+                        end if;
+                        Last_Child := Next_Index;
+                        Flatten (Child, Index);
+                     end if;
+                  end;
+               end loop;
+            end Flatten;
+
+         begin
+            Flatten (Node.Node, -1);
+            return Count;
+         end;
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
+   function ${capi.get_name('node_findall')}
+     (Node     : ${entity_type}_Ptr;
+      Kinds    : System.Address;
+      Limit    : int;
+      Result_P : access ${root_entity.array.c_type(capi).name}) return int is
+   begin
+      Clear_Last_Exception;
+
+      declare
+         type Flag_Array is array (int range <>) of unsigned_char;
+
+         Last_Kind : constant ${root_node_kind_name} :=
+            ${root_node_kind_name}'Last;
+         Flags     : Flag_Array (0 .. int (Last_Kind'Enum_Rep))
+            with Import, Address => Kinds;
+
+         Set : Iterators.Kind_Set;
+      begin
+         if Node.Node = null then
+            Result_P.all := ${root_entity.array.constructor_name} (0);
+            return 1;
+         end if;
+
+         for K in Set'Range loop
+            Set (K) := Flags (int (K'Enum_Rep)) /= 0;
+         end loop;
+
+         declare
+            package Node_Vectors is new Langkit_Support.Vectors
+              (${root_node_type_name});
+
+            It      : Iterators.Traverse_Iterator'Class := Iterators.Find
+              (Wrap_Node (Node.Node, Node.Info), Iterators.Kind_In (Set));
+            Element : ${root_entity.api_name};
+            Matches : Node_Vectors.Vector;
+            Result  : ${root_entity.array.name};
+         begin
+            while (Limit <= 0 or else Matches.Length < Natural (Limit))
+                  and then It.Next (Element)
+            loop
+               Matches.Append (Unwrap_Node (Element));
+            end loop;
+
+            --  All nodes found have the same entity information as Node
+
+            Result := ${root_entity.array.constructor_name} (Matches.Length);
+            for I in 1 .. Matches.Length loop
+               Result.Items (I) := (Matches.Get (I), Node.Info);
+            end loop;
+            Matches.Destroy;
+            Result_P.all := Result;
+            return 1;
+         end;
+      end;
+   exception
+      when Exc : others =>
+         Set_Last_Exception (Exc);
+         return 0;
+   end;
+
    function ${capi.get_name("text_to_locale_string")}
      (Text : ${text_type}) return System.Address is
    begin
@@ -773,21 +1238,26 @@ package body ${ada_lib_name}.Implementation.C is
    begin
       Clear_Last_Exception;
       declare
-         FD : constant Token_Data_Type := Data (Unwrap (First));
-         LD : constant Token_Data_Type := Data (Unwrap (Last));
+         FR : constant Token_Reference := Unwrap (First);
+         LR : constant Token_Reference := Unwrap (Last);
 
-         First_Source_Buffer, Last_Source_Buffer : Text_Cst_Access;
-         First_Index, Ignored_First              : Positive;
-         Last_Index, Ignored_Last                : Natural;
+         TDH : constant Token_Data_Handler_Access := Get_Token_TDH (FR);
+
+         First_Index   : Positive;
+         Last_Index    : Natural;
+         Source_Buffer : Text_Cst_Access;
       begin
-         Extract_Token_Text
-           (FD, First_Source_Buffer, First_Index, Ignored_Last);
-         Extract_Token_Text
-           (LD, Last_Source_Buffer, Ignored_First, Last_Index);
-         if First_Source_Buffer /= Last_Source_Buffer then
+         if Get_Token_TDH (LR) /= TDH then
             return 0;
          end if;
-         Text.all := Wrap (First_Source_Buffer, First_Index, Last_Index);
+
+         --  Decode only the lines that the requested range covers, in a
+         --  single slice so that the returned text is contiguous.
+
+         First_Index := Data (Get_Token_Index (FR), TDH.all).Source_First;
+         Last_Index := Data (Get_Token_Index (LR), TDH.all).Source_Last;
+         Wide_Source_Slice (TDH.all, First_Index, Last_Index, Source_Buffer);
+         Text.all := Wrap (Source_Buffer, First_Index, Last_Index);
          return 1;
       end;
    exception
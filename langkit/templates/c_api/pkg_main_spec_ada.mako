@@ -240,6 +240,71 @@ private package ${ada_lib_name}.Implementation.C is
               'context_discard_errors_in_populate_lexical_env')}";
    ${ada_c_doc('langkit.context_discard_errors_in_populate_lexical_env', 3)}
 
+   procedure ${capi.get_name("context_memoization_stats")}
+     (Context                       : ${analysis_context_type};
+      Kept_Entries, Dropped_Entries : access int)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('context_memoization_stats')}";
+   ${ada_c_doc('langkit.context_memoization_stats', 3)}
+
+   procedure ${capi.get_name("context_set_cache_budget")}
+     (Context                                   : ${analysis_context_type};
+      Memoization_Entries, Lookup_Cache_Entries : int)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('context_set_cache_budget')}";
+   ${ada_c_doc('langkit.context_set_cache_budget', 3)}
+
+   procedure ${capi.get_name("context_memoization_cache_stats")}
+     (Context                  : ${analysis_context_type};
+      Entries, Budget          : access int;
+      Hits, Misses, Evictions  : access Unsigned_64)
+      with Export        => True,
+           Convention    => C,
+           External_name =>
+              "${capi.get_name('context_memoization_cache_stats')}";
+   ${ada_c_doc('langkit.context_memoization_cache_stats', 3)}
+
+   procedure ${capi.get_name("context_lookup_cache_stats")}
+     (Context                  : ${analysis_context_type};
+      Entries, Budget          : access int;
+      Hits, Misses, Evictions  : access Unsigned_64)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('context_lookup_cache_stats')}";
+   ${ada_c_doc('langkit.context_lookup_cache_stats', 3)}
+
+   procedure ${capi.get_name("context_lexical_env_stats")}
+     (Context        : ${analysis_context_type};
+      Kind           : int;
+      Gets           : access Unsigned_64;
+      Cache_Hits     : access Unsigned_64;
+      Cache_Misses   : access Unsigned_64;
+      Recursion_Hits : access Unsigned_64;
+      Cache_Resets   : access Unsigned_64)
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('context_lexical_env_stats')}";
+   ${ada_c_doc('langkit.context_lexical_env_stats', 3)}
+
+   procedure ${capi.get_name("context_rebindings_pool_stats")}
+     (Context                             : ${analysis_context_type};
+      Rebindings_Pools, Pooled_Rebindings : access int)
+      with Export        => True,
+           Convention    => C,
+           External_name =>
+              "${capi.get_name('context_rebindings_pool_stats')}";
+   ${ada_c_doc('langkit.context_rebindings_pool_stats', 3)}
+
+   procedure ${capi.get_name("context_reset_lexical_env_stats")}
+     (Context : ${analysis_context_type})
+      with Export        => True,
+           Convention    => C,
+           External_name =>
+              "${capi.get_name('context_reset_lexical_env_stats')}";
+   ${ada_c_doc('langkit.context_reset_lexical_env_stats', 3)}
+
    function ${capi.get_name('get_analysis_unit_from_file')}
      (Context           : ${analysis_context_type};
       Filename, Charset : chars_ptr;
@@ -252,6 +317,26 @@ private package ${ada_lib_name}.Implementation.C is
               "${capi.get_name('get_analysis_unit_from_file')}";
    ${ada_c_doc('langkit.get_unit_from_file', 3)}
 
+   procedure ${capi.get_name('get_analysis_units_from_files')}
+     (Context   : ${analysis_context_type};
+      Filenames : System.Address;
+      Count     : int;
+      Charset   : chars_ptr;
+      Reparse   : int;
+      Rule      : ${grammar_rule_type};
+      Jobs      : int;
+      Units     : System.Address)
+      with Export        => True,
+           Convention    => C,
+           External_name =>
+              "${capi.get_name('get_analysis_units_from_files')}";
+   ${ada_c_doc('langkit.get_units_from_files', 3)}
+   --
+   --  ``Filenames`` must point to an array of ``Count`` null-terminated
+   --  strings, and ``Units`` to an array of ``Count`` analysis units, to
+   --  contain the result. If ``Jobs`` is not positive, parse in the calling
+   --  task.
+
    function ${capi.get_name('get_analysis_unit_from_buffer')}
      (Context           : ${analysis_context_type};
       Filename, Charset : chars_ptr;
@@ -317,6 +402,18 @@ private package ${ada_lib_name}.Implementation.C is
            External_Name => "${capi.get_name('unit_trivia_count')}";
    ${ada_c_doc('langkit.unit_trivia_count', 3)}
 
+   function ${capi.get_name('unit_export_tokens')}
+     (Unit         : ${analysis_unit_type};
+      Capacity     : int;
+      Kinds        : System.Address;
+      Trivia_Flags : System.Address;
+      Offsets      : System.Address;
+      Slocs        : System.Address) return int
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('unit_export_tokens')}";
+   ${ada_c_doc('langkit.unit_export_tokens', 3)}
+
    procedure ${capi.get_name('unit_lookup_token')}
      (Unit   : ${analysis_unit_type};
       Sloc   : access ${sloc_type};
@@ -455,6 +552,31 @@ private package ${ada_lib_name}.Implementation.C is
            External_name => "${capi.get_name('node_child')}";
    ${ada_c_doc('langkit.node_child', 3)}
 
+   function ${capi.get_name('node_flatten')}
+     (Node           : ${entity_type}_Ptr;
+      Capacity       : int;
+      Kinds          : System.Address;
+      Parents        : System.Address;
+      First_Children : System.Address;
+      Next_Siblings  : System.Address;
+      Token_Starts   : System.Address;
+      Token_Ends     : System.Address;
+      Slocs          : System.Address) return int
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('node_flatten')}";
+   ${ada_c_doc('langkit.node_flatten', 3)}
+
+   function ${capi.get_name('node_findall')}
+     (Node     : ${entity_type}_Ptr;
+      Kinds    : System.Address;
+      Limit    : int;
+      Result_P : access ${root_entity.array.c_type(capi).name}) return int
+      with Export        => True,
+           Convention    => C,
+           External_name => "${capi.get_name('node_findall')}";
+   ${ada_c_doc('langkit.node_findall', 3)}
+
    function ${capi.get_name('text_to_locale_string')}
      (Text : ${text_type}) return System.Address
       with Export        => True,
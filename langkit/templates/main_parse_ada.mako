@@ -1,9 +1,13 @@
 ## vim: filetype=makoada
 
 with Ada.Calendar;              use Ada.Calendar;
+with Ada.Characters.Handling;   use Ada.Characters.Handling;
 with Ada.Containers.Hashed_Sets;
 with Ada.Containers.Vectors;
+with Ada.Directories;
+with Ada.Long_Float_Text_IO;
 with Ada.Strings;               use Ada.Strings;
+with Ada.Strings.Fixed;         use Ada.Strings.Fixed;
 with Ada.Strings.Unbounded;     use Ada.Strings.Unbounded;
 pragma Warnings (Off, "internal");
 with Ada.Text_IO;               use Ada.Text_IO;
@@ -11,6 +15,7 @@ with Ada.Text_IO;               use Ada.Text_IO;
 with GNATCOLL.Opt_Parse;
 
 with Langkit_Support.Slocs; use Langkit_Support.Slocs;
+with Langkit_Support.Types;
 
 with ${ada_lib_name}.Analysis;  use ${ada_lib_name}.Analysis;
 with ${ada_lib_name}.Common;    use ${ada_lib_name}.Common;
@@ -22,6 +27,7 @@ procedure Parse is
      (Natural, Unbounded_String);
 
    function Convert (Grammar_Rule_Name : String) return Grammar_Rule;
+   function Convert (Count : String) return Natural;
 
    package Args is
       use GNATCOLL.Opt_Parse;
@@ -89,6 +95,37 @@ procedure Parse is
         (Parser, "-u", "--unparse",
          Help => "Unparse the code with the built-in unparser");
 
+      package Benchmark is new Parse_Flag
+        (Parser, Long => "--benchmark",
+         Help => "Analyze the files given with -f/-F several times and report"
+                 & " the time spent in each analysis phase instead of"
+                 & " printing trees");
+
+      package Iterations is new Parse_Option
+        (Parser, Long => "--iterations",
+         Arg_Type => Natural,
+         Default_Val => 1,
+         Help => "Number of measured iterations in benchmark mode");
+
+      package Warmup is new Parse_Option
+        (Parser, Long => "--warmup",
+         Arg_Type => Natural,
+         Default_Val => 0,
+         Help => "Number of iterations to run before measuring in benchmark"
+                 & " mode");
+
+      package Cold is new Parse_Flag
+        (Parser, Long => "--cold",
+         Help => "In benchmark mode, create a new analysis context for each"
+                 & " iteration instead of reparsing files in the same one");
+
+      package JSON_Output is new Parse_Option
+        (Parser, Long => "--json",
+         Arg_Type => Unbounded_String,
+         Default_Val => Null_Unbounded_String,
+         Help => "In benchmark mode, also write a JSON summary of the results"
+                 & " to this file");
+
       package Strings is new Parse_Positional_Arg_List
         (Parser,
          Name        => "strings",
@@ -97,10 +134,13 @@ procedure Parse is
          Allow_Empty => True);
    end Args;
 
+   function Lookup_Sloc
+     (Lookup_Str : Unbounded_String) return Source_Location;
    procedure Process_Lookups (Node : ${root_entity.api_name}'Class);
    procedure Process_Node (Res : ${root_entity.api_name}'Class);
    procedure Process_File (Filename : String; Ctx : Analysis_Context);
    procedure Parse_Input (Content : String);
+   procedure Run_Benchmark (Files : String_Vectors.Vector);
 
    -------------
    -- Convert --
@@ -115,6 +155,36 @@ procedure Parse is
            with "Unsupported rule: " & Grammar_Rule_Name;
    end Convert;
 
+   -------------
+   -- Convert --
+   -------------
+
+   function Convert (Count : String) return Natural is
+   begin
+      return Natural'Value (Count);
+   exception
+      when Constraint_Error =>
+         raise GNATCOLL.Opt_Parse.Opt_Parse_Error
+           with "Invalid count: " & Count;
+   end Convert;
+
+   -----------------
+   -- Lookup_Sloc --
+   -----------------
+
+   function Lookup_Sloc
+     (Lookup_Str : Unbounded_String) return Source_Location
+   is
+      Sep : constant Natural := Index (Lookup_Str, ":");
+
+      Line   : constant Line_Number := Line_Number'Value
+        (Slice (Lookup_Str, 1, Sep - 1));
+      Column : constant Column_Number := Column_Number'Value
+        (Slice (Lookup_Str, Sep + 1, Length (Lookup_Str)));
+   begin
+      return (Line, Column);
+   end Lookup_Sloc;
+
    ---------------------
    -- Process_Lookups --
    ---------------------
@@ -125,16 +195,9 @@ procedure Parse is
          New_Line;
 
          declare
-            Sep : constant Natural := Index (Lookup_Str, ":");
-
-            Line   : constant Line_Number := Line_Number'Value
-              (Slice (Lookup_Str, 1, Sep - 1));
-            Column : constant Column_Number := Column_Number'Value
-              (Slice (Lookup_Str, Sep + 1, Length (Lookup_Str)));
-
-            Sloc        : constant Source_Location := (Line, Column);
+            Sloc        : constant Source_Location := Lookup_Sloc (Lookup_Str);
             Lookup_Node : constant ${root_entity.api_name} :=
-               Lookup (Node, (Line, Column));
+               Lookup (Node, Sloc);
          begin
             Put_Line ("Lookup " & Image (Sloc) & ":");
             Print (Lookup_Node, not Args.Hide_Slocs.Get);
@@ -283,12 +346,280 @@ procedure Parse is
 
    end Process_File;
 
+   -------------------
+   -- Run_Benchmark --
+   -------------------
+
+   procedure Run_Benchmark (Files : String_Vectors.Vector) is
+      Iterations : constant Natural := Args.Iterations.Get;
+      Mode       : constant String :=
+        (if Args.Cold.Get then "cold" else "warm");
+
+      Ctx : Analysis_Context := No_Analysis_Context;
+
+      Bytes, Tokens, Nodes : Natural := 0;
+      --  Size of all files, in bytes, and number of tokens (including trivia)
+      --  and nodes they contain.
+
+      Lookups_Time : Duration := 0.0;
+      --  Total time spent in lookups during the measured iterations
+
+      Total_Time : Duration := 0.0;
+      --  Total time spent in the measured iterations
+
+      Profile : Analysis_Profile;
+
+      procedure Run_Iteration (Measured : Boolean);
+      --  Analyze all files once. If Measured, account for the time spent in
+      --  lookups.
+
+      procedure Count (Unit : Analysis_Unit);
+      --  Add the sizes of Unit to Bytes, Tokens and Nodes
+
+      function Phase_Name (Phase : Analysis_Phase) return String
+      is (To_Lower (Analysis_Phase'Image (Phase)));
+
+      function Mean (Total : Duration) return Duration
+      is (if Iterations = 0 then 0.0 else Total / Iterations);
+
+      function Rate (Count : Natural; Total : Duration) return Long_Float
+      is (if Total = 0.0
+          then 0.0
+          else Long_Float (Count) * Long_Float (Iterations)
+               / Long_Float (Total));
+      --  Number of items processed per second, given that Count items were
+      --  processed in each iteration and that all iterations took Total.
+
+      function Image (Value : Natural) return String
+      is (Trim (Natural'Image (Value), Left));
+
+      function Image (Value : Duration) return String
+      is (Trim (Duration'Image (Value), Left));
+
+      function Image (Value : Long_Float) return String;
+
+      procedure Put_Phase_JSON
+        (F : File_Type; Name : String; Total : Duration);
+      --  Write the entry for the Name phase in the "phases" JSON object
+
+      -----------
+      -- Image --
+      -----------
+
+      function Image (Value : Long_Float) return String is
+         Result : String (1 .. 40);
+      begin
+         Ada.Long_Float_Text_IO.Put (Result, Value, Aft => 1, Exp => 0);
+         return Trim (Result, Left);
+      end Image;
+
+      --------------------
+      -- Put_Phase_JSON --
+      --------------------
+
+      procedure Put_Phase_JSON
+        (F : File_Type; Name : String; Total : Duration) is
+      begin
+         Put_Line (F, "    """ & Name & """: {""total"": " & Image (Total)
+                      & ", ""mean"": " & Image (Mean (Total)) & "},");
+      end Put_Phase_JSON;
+
+      -----------
+      -- Count --
+      -----------
+
+      procedure Count (Unit : Analysis_Unit) is
+         function Visit
+           (Node : ${root_entity.api_name}'Class) return Visit_Status;
+
+         -----------
+         -- Visit --
+         -----------
+
+         function Visit
+           (Node : ${root_entity.api_name}'Class) return Visit_Status
+         is
+            pragma Unreferenced (Node);
+         begin
+            Nodes := Nodes + 1;
+            return Into;
+         end Visit;
+      begin
+         Bytes := Bytes + Natural
+           (Ada.Directories.Size (Get_Filename (Unit)));
+         Tokens := Tokens + Token_Count (Unit) + Trivia_Count (Unit);
+         if not Is_Null (Root (Unit)) then
+            Traverse (Root (Unit), Visit'Access);
+         end if;
+      end Count;
+
+      -------------------
+      -- Run_Iteration --
+      -------------------
+
+      procedure Run_Iteration (Measured : Boolean) is
+      begin
+         if Args.Cold.Get or else Ctx = No_Analysis_Context then
+            Ctx := Create_Context
+              (To_String (Args.Charset.Get),
+               With_Trivia => Args.Do_Print_Trivia.Get);
+         end if;
+
+         for Filename of Files loop
+            declare
+               Unit      : constant Analysis_Unit := Get_From_File
+                 (Ctx, To_String (Filename), "", True, Rule => Args.Rule.Get);
+               Root_Node : constant ${root_entity.api_name} := Root (Unit);
+               Start     : Time;
+            begin
+               Populate_Lexical_Env (Unit);
+
+               --  Lookups are not part of the analysis profile: time them
+               --  here.
+
+               Start := Clock;
+               if not Is_Null (Root_Node) then
+                  for Lookup_Str of Args.Lookups.Get loop
+                     declare
+                        Dummy : constant ${root_entity.api_name} :=
+                           Lookup (Root_Node, Lookup_Sloc (Lookup_Str));
+                     begin
+                        null;
+                     end;
+                  end loop;
+               end if;
+               if Measured then
+                  Lookups_Time := Lookups_Time + (Clock - Start);
+               end if;
+            end;
+         end loop;
+      end Run_Iteration;
+
+   begin
+      for Dummy in 1 .. Args.Warmup.Get loop
+         Run_Iteration (Measured => False);
+      end loop;
+
+      Enable_Analysis_Profile;
+      Reset_Analysis_Profile;
+      declare
+         Start : constant Time := Clock;
+      begin
+         for Dummy in 1 .. Iterations loop
+            Run_Iteration (Measured => True);
+         end loop;
+         Total_Time := Clock - Start;
+      end;
+      Profile := Get_Analysis_Profile;
+      Enable_Analysis_Profile (False);
+
+      --  All iterations analyze the same sources, so count bytes, tokens and
+      --  nodes only once.
+
+      if Ctx /= No_Analysis_Context then
+         for Filename of Files loop
+            Count (Get_From_File
+                     (Ctx, To_String (Filename), Rule => Args.Rule.Get));
+         end loop;
+      end if;
+
+      Put_Line ("Benchmark:" & Natural'Image (Natural (Files.Length))
+                & " file(s)," & Natural'Image (Iterations) & " " & Mode
+                & " iteration(s) after" & Natural'Image (Args.Warmup.Get)
+                & " warmup iteration(s)");
+      Put_Line ("Per iteration: " & Image (Bytes) & " bytes, "
+                & Image (Tokens) & " tokens, " & Image (Nodes) & " nodes");
+      New_Line;
+      Put_Line ("Phase            Total (s)      Mean (s)");
+      for Phase in Analysis_Phase loop
+         Put_Line (Head (Phase_Name (Phase), 17)
+                   & Head (Image (Profile.Durations (Phase)), 15)
+                   & Image (Mean (Profile.Durations (Phase))));
+      end loop;
+      Put_Line (Head ("lookups", 17) & Head (Image (Lookups_Time), 15)
+                & Image (Mean (Lookups_Time)));
+      Put_Line (Head ("total", 17) & Head (Image (Total_Time), 15)
+                & Image (Mean (Total_Time)));
+      New_Line;
+
+      declare
+         use Langkit_Support.Types;
+
+         Bytes_Rate  : constant String :=
+           Image (Rate (Bytes, Profile.Durations (Decoding)));
+         Tokens_Rate : constant String :=
+           Image (Rate (Tokens, Profile.Durations (Lexing)));
+         Nodes_Rate  : constant String :=
+           Image (Rate (Nodes, Profile.Durations (Parsing)
+                               + Profile.Durations (Tree_Building)));
+         Pool_Size   : constant String := Image (Profile.Peak_Pool_Size);
+
+         F : File_Type;
+      begin
+         Put_Line ("Decoding: " & Bytes_Rate & " bytes/s");
+         Put_Line ("Lexing: " & Tokens_Rate & " tokens/s");
+         Put_Line ("Parsing and tree building: " & Nodes_Rate & " nodes/s");
+         Put_Line ("Peak node pool size: " & Pool_Size & " bytes");
+
+         if Args.JSON_Output.Get = Null_Unbounded_String then
+            return;
+         end if;
+
+         Create (F, Out_File, To_String (Args.JSON_Output.Get));
+         Put_Line (F, "{");
+         Put_Line (F, "  ""files"": " & Image (Natural (Files.Length)) & ",");
+         Put_Line (F, "  ""iterations"": " & Image (Iterations) & ",");
+         Put_Line (F, "  ""warmup"": " & Image (Args.Warmup.Get) & ",");
+         Put_Line (F, "  ""mode"": """ & Mode & """,");
+         Put_Line (F, "  ""bytes"": " & Image (Bytes) & ",");
+         Put_Line (F, "  ""tokens"": " & Image (Tokens) & ",");
+         Put_Line (F, "  ""nodes"": " & Image (Nodes) & ",");
+         Put_Line (F, "  ""phases"": {");
+         for Phase in Analysis_Phase loop
+            Put_Phase_JSON (F, Phase_Name (Phase), Profile.Durations (Phase));
+         end loop;
+         Put_Phase_JSON (F, "lookups", Lookups_Time);
+         Put_Line (F, "    ""total"": {""total"": " & Image (Total_Time)
+                      & ", ""mean"": " & Image (Mean (Total_Time)) & "}");
+         Put_Line (F, "  },");
+         Put_Line (F, "  ""bytes_per_second"": " & Bytes_Rate & ",");
+         Put_Line (F, "  ""tokens_per_second"": " & Tokens_Rate & ",");
+         Put_Line (F, "  ""nodes_per_second"": " & Nodes_Rate & ",");
+         Put_Line (F, "  ""peak_pool_size"": " & Pool_Size);
+         Put_Line (F, "}");
+         Close (F);
+      end;
+   end Run_Benchmark;
+
 begin
    if not Args.Parser.Parse then
       return;
    end if;
 
-   if Args.File_List.Get /= Null_Unbounded_String then
+   if Args.Benchmark.Get then
+      declare
+         Files : String_Vectors.Vector;
+         F     : File_Type;
+      begin
+         if Args.File_List.Get /= Null_Unbounded_String then
+            Open (F, In_File, To_String (Args.File_List.Get));
+            while not End_Of_File (F) loop
+               Files.Append (To_Unbounded_String (Get_Line (F)));
+            end loop;
+            Close (F);
+         end if;
+         for File_Name of Args.File_Names.Get loop
+            Files.Append (File_Name);
+         end loop;
+
+         if Files.Is_Empty then
+            Put_Line ("--benchmark requires files to analyze (-f or -F)");
+            return;
+         end if;
+         Run_Benchmark (Files);
+      end;
+
+   elsif Args.File_List.Get /= Null_Unbounded_String then
       declare
          F   : File_Type;
          Ctx : constant Analysis_Context :=
@@ -11,6 +11,8 @@
    # We want discrimanted types below to be constrained, so we want
    # discriminant default values.
    default_key = key_types[0].memoization_kind
+
+   max_key_length = max(p.memoization_key_length for p in memoized_props)
 %>
 
 type Mmz_Property is
@@ -29,14 +31,56 @@ type Mmz_Key_Item (Kind : Mmz_Key_Kind := ${default_key}) is record
    end case;
 end record;
 
-type Mmz_Key_Array is array (Positive range <>) of Mmz_Key_Item;
-type Mmz_Key_Array_Access is access all Mmz_Key_Array;
+Mmz_Max_Key_Length : constant Positive := ${max_key_length};
+--  Number of items in the memoization keys for the memoized property that
+--  has the most arguments.
+
+type Mmz_Key_Array is array (1 .. Mmz_Max_Key_Length) of Mmz_Key_Item;
 type Mmz_Key is record
    Property : Mmz_Property;
-   Items    : Mmz_Key_Array_Access;
+
+   Length : Positive;
+   --  Number of items in Items that are actually part of this key. Next
+   --  ones are meaningless.
+
+   Items : Mmz_Key_Array;
+end record;
+--  Keys are stored inline, so that building one to look it up in a
+--  memoization table does not require any dynamic allocation.
+
+procedure Destroy (Key : in out Mmz_Key);
+--  Release the ref-count shares Key owns
+
+package Mmz_Symbol_Sets is new Langkit_Support.Cheap_Sets
+  (Symbol_Type, null);
+
+type Mmz_Deps is record
+   Units : Analysis_Unit_Sets.Set;
+   --  Units, other than the one that owns the memoization entry, that were
+   --  used to compute the memoized result: units for the nodes in its key,
+   --  units that own the lexical environments that lookups went through,
+   --  units for the nodes these lookups returned, etc.
+
+   Symbols : Mmz_Symbol_Sets.Set;
+   --  Symbols that were looked up in lexical environments to compute the
+   --  memoized result.
+
+   Untracked : Boolean := False;
+   --  Whether the memoized result may depend on data that Units and Symbols
+   --  do not track, for instance because it was computed by an external
+   --  property.
 end record;
+--  Dependencies for a memoized result. Reparsing a unit invalidates only
+--  the memoization entries whose dependencies may involve it: see
+--  Invalidate_Memoization.
+
+procedure Destroy (Deps : in out Mmz_Deps);
+--  Free all resources allocated for Deps
 
 type Mmz_Value (Kind : Mmz_Value_Kind := Mmz_Evaluating) is record
+   Deps : Mmz_Deps;
+   --  Dependencies for this result. Always empty for Mmz_Evaluating entries.
+
    case Kind is
       when Mmz_Evaluating | Mmz_Property_Error =>
          null;
@@ -54,10 +98,186 @@ function Equivalent (L, R : Mmz_Key) return Boolean;
 package Memoization_Maps is new Ada.Containers.Hashed_Maps
   (Mmz_Key, Mmz_Value, Hash, Equivalent_Keys => Equivalent);
 
-procedure Destroy (Map : in out Memoization_Maps.Map);
+type Mmz_Entry is record
+   Key   : Mmz_Key;
+   Hash  : Hash_Type;
+   Value : Mmz_Value;
+
+   Used : Boolean;
+   --  Whether this entry is part of the table
+
+   Referenced : Boolean;
+   --  Whether this entry was used since the last time the eviction algorithm
+   --  considered it (see Evict).
+
+   Next_Free : Natural;
+   --  If this entry is not used, index of the next unused entry in the
+   --  table, or 0 if it is the last one.
+end record;
+
+package Mmz_Entry_Vectors is new Langkit_Support.Vectors (Mmz_Entry);
+
+type Mmz_Slot_Array is array (Natural range <>) of Integer;
+type Mmz_Slot_Array_Access is access Mmz_Slot_Array;
+
+Mmz_No_Entry      : constant Integer := 0;
+Mmz_Deleted_Entry : constant Integer := -1;
+
+type Mmz_Compact_Table is record
+   Slots : Mmz_Slot_Array_Access;
+   --  Open addressing hash table, using linear probing. Each slot contains
+   --  either the index in Entries of the entry it designates, Mmz_No_Entry
+   --  if it was never used or Mmz_Deleted_Entry if its entry was removed.
+   --  Its length is always a power of two. Null until the first insertion.
+
+   Entries : Mmz_Entry_Vectors.Vector;
+   --  Storage for entries. Entries never move in this vector, so their
+   --  indexes can be used as cursors even when Slots is resized.
+
+   First_Free : Natural := 0;
+   --  Index in Entries of the first unused entry, or 0 if all are used
+
+   Length : Natural := 0;
+   --  Number of used entries
+
+   Used_Slots : Natural := 0;
+   --  Number of slots that are not Mmz_No_Entry (i.e. including deleted
+   --  ones). Used to decide when to resize Slots.
+
+   Hand : Positive := 1;
+   --  Index in Entries of the next entry that the eviction algorithm will
+   --  consider (see Evict).
+end record;
+--  Memoization table that stores keys and values inline in a single
+--  vector, so that lookups and insertions do not require dynamic
+--  allocations (except for the occasional table growth).
+
+type Mmz_Table is record
+   Compact : Mmz_Compact_Table;
+   --  Table for memoization entries, used by default
+
+   Fallback : Memoization_Maps.Map;
+   --  Hashed map for memoization entries, used instead of Compact when
+   --  Mmz_Use_Hashed_Maps is True.
+end record;
+
+type Mmz_Cursor is record
+   Index : Natural := 0;
+   --  If the entry is in the compact table, its index in Entries. Zero
+   --  otherwise.
+
+   Map_Cursor : Memoization_Maps.Cursor;
+   --  If the entry is in the fallback map, cursor to it
+end record;
+
+Mmz_Use_Hashed_Maps : Boolean := False;
+--  Whether to store new memoization entries in hashed maps rather than in
+--  compact tables. This is a debug helper, to compare both implementations:
+--  see Analysis.Disable_Compact_Memoization.
+
+function Length (Map : Mmz_Table) return Natural;
+--  Return the number of entries in Map
+
+procedure Insert
+  (Map      : in out Mmz_Table;
+   Key      : Mmz_Key;
+   Cursor   : out Mmz_Cursor;
+   Inserted : out Boolean);
+--  Look for an entry in Map that corresponds to Key. If there is one, set
+--  Cursor to it and Inserted to False. Otherwise, create one with an
+--  Mmz_Evaluating value, set Cursor to it and Inserted to True.
+
+function Mmz_Element
+  (Map : Mmz_Table; Cursor : Mmz_Cursor) return Mmz_Value;
+--  Return the value in Map for the entry Cursor designates
+
+procedure Mmz_Replace_Element
+  (Map : in out Mmz_Table; Cursor : Mmz_Cursor; Value : Mmz_Value);
+--  Set the value in Map for the entry Cursor designates to Value
+
+procedure Destroy (Map : in out Mmz_Table);
 --  Free all resources stored in a memoization map. This includes destroying
 --  ref-count shares the map owns.
 
+procedure Evict
+  (Map     : in out Mmz_Table;
+   Count   : Positive;
+   Evicted : out Natural;
+   Wrapped : out Boolean);
+--  Move the eviction hand of Map towards the end of the table, removing up
+--  to Count entries that were not used since the hand last went over them
+--  (except the ones that are still being evaluated) and clearing the
+--  reference bit of the other ones. Set Evicted to the number of removed
+--  entries and Wrapped to whether the hand reached the end of the table, in
+--  which case it goes back to its start. In compact tables, this implements
+--  the CLOCK algorithm, which approximates LRU. Hashed maps remove entries
+--  in no particular order.
+
+procedure Remove_Stale_Entries
+  (Map           : in out Mmz_Table;
+   Symbols       : Mmz_Symbol_Sets.Set;
+   All_Stale     : Boolean;
+   Kept, Dropped : in out Natural);
+--  Remove from Map all entries that depend on units whose Mmz_Stale flag is
+--  set, or on one of the given Symbols, except the ones that are still being
+--  evaluated. If All_Stale is True, consider that all entries are stale
+--  instead. Add the number of entries that were kept and removed to Kept and
+--  Dropped.
+
+procedure Mmz_Delete (Map : in out Mmz_Table; Cursor : Mmz_Cursor);
+--  Remove from Map the entry Cursor designates
+
+function Mmz_Enter
+  (Owner : Internal_Unit; Untracked : Boolean) return Positive;
+--  Start tracking the dependencies of a memoized result that is about to be
+--  computed, to be stored in Owner's memoization map. Untracked is the
+--  initial value for the Untracked component in these dependencies. Return
+--  the index of the corresponding tracking frame, to pass to Mmz_Leave.
+
+function Mmz_Leave (Frame : Positive) return Mmz_Deps;
+--  Stop tracking dependencies for the memoized result corresponding to
+--  Frame and return them. As the memoized result that is being computed in
+--  the enclosing frame (if any) uses this one, add them to the enclosing
+--  frame.
+
+procedure Mmz_Add_Deps (Owner : Internal_Unit; Deps : Mmz_Deps);
+--  Add Owner and Deps to the dependencies of the memoized result being
+--  computed, if any. This is used when a memoized result uses another
+--  memoized result, which is stored in Owner's memoization map and has the
+--  given dependencies.
+
+procedure Mmz_Add_Key (Key : Mmz_Key);
+--  Add the units involved in Key (nodes, lexical environments, ...) to the
+--  dependencies of the memoized result being computed, if any.
+
+procedure Mmz_Add_Lookup
+  (Env : Lexical_Env; Key : Symbol_Type; Lookup_Kind : Lookup_Kind_Type);
+--  Add Key and the units that own the environments that a lookup in Env
+--  goes through (see Add_Lookup_Envs) to the dependencies of the memoized
+--  result being computed, if any. A null Key makes these dependencies
+--  untracked.
+
+procedure Mmz_Add_Entity (E : Internal_Entity);
+--  Add the unit for E's node, as well as the units that own the lexical
+--  environments of E's rebindings, to the dependencies of the memoized
+--  result being computed, if any.
+
+function Env_Get
+  (Self        : Lexical_Env;
+   Key         : Symbol_Type;
+   From        : ${root_node_type_name} := null;
+   Lookup_Kind : Lookup_Kind_Type := Recursive;
+   Categories  : Ref_Categories := All_Cats) return Entity_Array;
+function Env_Get_First
+  (Self        : Lexical_Env;
+   Key         : Symbol_Type;
+   From        : ${root_node_type_name} := null;
+   Lookup_Kind : Lookup_Kind_Type := Recursive;
+   Categories  : Ref_Categories := All_Cats) return Internal_Entity;
+--  Wrappers around AST_Envs.Get and AST_Envs.Get_First that add the lookup
+--  and its result to the dependencies of the memoized result being
+--  computed, if any.
+
 </%def>
 
 <%def name="body()">
@@ -69,7 +289,91 @@ procedure Destroy (Map : in out Memoization_Maps.Map);
 
 function Hash (Key : Mmz_Key_Item) return Hash_Type;
 function Equivalent (L, R : Mmz_Key_Item) return Boolean;
-procedure Destroy (Key : in out Mmz_Key_Array_Access);
+procedure Destroy (Value : in out Mmz_Value);
+
+procedure Free is new Ada.Unchecked_Deallocation
+  (Mmz_Slot_Array, Mmz_Slot_Array_Access);
+
+function Find_Slot
+  (Table : Mmz_Compact_Table; Hash : Hash_Type; Index : Positive)
+   return Natural;
+--  Return the slot in Table that designates the entry at Index, whose hash
+--  is Hash.
+
+procedure Resize (Table : in out Mmz_Compact_Table);
+--  Reallocate Table's slots so that there is enough room for at least one
+--  more entry, dropping deleted slots in the process.
+
+procedure Insert
+  (Table    : in out Mmz_Compact_Table;
+   Key      : Mmz_Key;
+   Index    : out Positive;
+   Inserted : out Boolean);
+procedure Destroy (Table : in out Mmz_Compact_Table);
+procedure Evict
+  (Table   : in out Mmz_Compact_Table;
+   Count   : Positive;
+   Evicted : out Natural;
+   Wrapped : out Boolean);
+procedure Remove_Stale_Entries
+  (Table         : in out Mmz_Compact_Table;
+   Symbols       : Mmz_Symbol_Sets.Set;
+   All_Stale     : Boolean;
+   Kept, Dropped : in out Natural);
+procedure Destroy (Map : in out Memoization_Maps.Map);
+procedure Evict
+  (Map     : in out Memoization_Maps.Map;
+   Count   : Positive;
+   Evicted : out Natural;
+   Wrapped : out Boolean);
+procedure Remove_Stale_Entries
+  (Map           : in out Memoization_Maps.Map;
+   Symbols       : Mmz_Symbol_Sets.Set;
+   All_Stale     : Boolean;
+   Kept, Dropped : in out Natural);
+--  Implementations of the eponym Mmz_Table primitives
+
+procedure Remove_Entry (Table : in out Mmz_Compact_Table; Index : Positive);
+--  Remove the entry at Index from Table, releasing the resources it owns
+
+type Mmz_Frame is record
+   Owner : Internal_Unit;
+   --  Unit whose memoization map will store the result being computed
+
+   Deps : Mmz_Deps;
+   --  Dependencies collected so far for this result
+end record;
+
+package Mmz_Frame_Vectors is new Langkit_Support.Vectors (Mmz_Frame);
+
+Mmz_Frames : Mmz_Frame_Vectors.Vector;
+--  Stack of frames for the memoized results being computed, the innermost
+--  one last. Like the rest of property evaluation, this is not thread-safe.
+
+procedure Add_Unit (Frame : in out Mmz_Frame; Unit : Internal_Unit);
+procedure Add_Node
+  (Frame : in out Mmz_Frame; Node : ${root_node_type_name});
+procedure Add_Env (Frame : in out Mmz_Frame; Env : Lexical_Env);
+procedure Add_Rebindings
+  (Frame : in out Mmz_Frame; Rebindings : Env_Rebindings);
+procedure Add_Deps (Frame : in out Mmz_Frame; Deps : Mmz_Deps);
+--  Add the corresponding units (or symbols) to Frame's dependencies
+
+procedure Add_Lookup_Envs
+  (Frame       : in out Mmz_Frame;
+   Env         : Lexical_Env;
+   Lookup_Kind : Lookup_Kind_Type);
+--  Add to Frame's dependencies the units that own the environments that a
+--  lookup in Env goes through: Env itself, and depending on Lookup_Kind, its
+--  parents and referenced environments, following the same rules as
+--  AST_Envs.Get. Which environment a dynamic env getter designates may
+--  change after any reparse, so reaching one makes Frame's dependencies
+--  untracked instead.
+
+function Is_Stale
+  (Deps : Mmz_Deps; Symbols : Mmz_Symbol_Sets.Set) return Boolean;
+--  Return whether Deps involve a unit whose Mmz_Stale flag is set or one of
+--  the given Symbols.
 
 ----------------
 -- Equivalent --
@@ -122,7 +426,7 @@ end Hash;
 function Hash (Key : Mmz_Key) return Hash_Type is
    Result : Hash_Type := Mmz_Property'Pos (Key.Property);
 begin
-   for K of Key.Items.all loop
+   for K of Key.Items (1 .. Key.Length) loop
       Result := Combine (Result, Hash (K));
    end loop;
    return Result;
@@ -133,15 +437,13 @@ end Hash;
 ----------------
 
 function Equivalent (L, R : Mmz_Key) return Boolean is
-   L_Items : Mmz_Key_Array renames L.Items.all;
-   R_Items : Mmz_Key_Array renames R.Items.all;
 begin
-   if L.Property /= R.Property or else L_Items'Length /= R_Items'Length then
+   if L.Property /= R.Property or else L.Length /= R.Length then
       return False;
    end if;
 
-   for I in L_Items'Range loop
-      if not Equivalent (L_Items (I), R_Items (I)) then
+   for I in 1 .. L.Length loop
+      if not Equivalent (L.Items (I), R.Items (I)) then
          return False;
       end if;
    end loop;
@@ -149,6 +451,387 @@ begin
    return True;
 end Equivalent;
 
+------------
+-- Length --
+------------
+
+function Length (Map : Mmz_Table) return Natural is
+begin
+   return Map.Compact.Length + Natural (Map.Fallback.Length);
+end Length;
+
+------------
+-- Insert --
+------------
+
+procedure Insert
+  (Map      : in out Mmz_Table;
+   Key      : Mmz_Key;
+   Cursor   : out Mmz_Cursor;
+   Inserted : out Boolean) is
+begin
+   if Mmz_Use_Hashed_Maps then
+      Cursor.Index := 0;
+      Map.Fallback.Insert
+        (Key, (Kind => Mmz_Evaluating, others => <>), Cursor.Map_Cursor,
+         Inserted);
+   else
+      Insert (Map.Compact, Key, Cursor.Index, Inserted);
+   end if;
+end Insert;
+
+-----------------
+-- Mmz_Element --
+-----------------
+
+function Mmz_Element
+  (Map : Mmz_Table; Cursor : Mmz_Cursor) return Mmz_Value is
+begin
+   if Cursor.Index = 0 then
+      return Memoization_Maps.Element (Cursor.Map_Cursor);
+   else
+      return Map.Compact.Entries.Get_Access (Cursor.Index).Value;
+   end if;
+end Mmz_Element;
+
+-------------------------
+-- Mmz_Replace_Element --
+-------------------------
+
+procedure Mmz_Replace_Element
+  (Map : in out Mmz_Table; Cursor : Mmz_Cursor; Value : Mmz_Value) is
+begin
+   if Cursor.Index = 0 then
+      Map.Fallback.Replace_Element (Cursor.Map_Cursor, Value);
+   else
+      Map.Compact.Entries.Get_Access (Cursor.Index).Value := Value;
+   end if;
+end Mmz_Replace_Element;
+
+-------------
+-- Destroy --
+-------------
+
+procedure Destroy (Map : in out Mmz_Table) is
+begin
+   Destroy (Map.Compact);
+   Destroy (Map.Fallback);
+end Destroy;
+
+-----------
+-- Evict --
+-----------
+
+procedure Evict
+  (Map     : in out Mmz_Table;
+   Count   : Positive;
+   Evicted : out Natural;
+   Wrapped : out Boolean)
+is
+   Fallback_Evicted : Natural := 0;
+begin
+   Evict (Map.Compact, Count, Evicted, Wrapped);
+   if Wrapped
+      and then Evicted < Count
+      and then not Map.Fallback.Is_Empty
+   then
+      Evict (Map.Fallback, Count - Evicted, Fallback_Evicted, Wrapped);
+   end if;
+   Evicted := Evicted + Fallback_Evicted;
+end Evict;
+
+--------------------------
+-- Remove_Stale_Entries --
+--------------------------
+
+procedure Remove_Stale_Entries
+  (Map           : in out Mmz_Table;
+   Symbols       : Mmz_Symbol_Sets.Set;
+   All_Stale     : Boolean;
+   Kept, Dropped : in out Natural) is
+begin
+   Remove_Stale_Entries (Map.Compact, Symbols, All_Stale, Kept, Dropped);
+   Remove_Stale_Entries (Map.Fallback, Symbols, All_Stale, Kept, Dropped);
+end Remove_Stale_Entries;
+
+----------------
+-- Mmz_Delete --
+----------------
+
+procedure Mmz_Delete (Map : in out Mmz_Table; Cursor : Mmz_Cursor) is
+begin
+   if Cursor.Index = 0 then
+      declare
+         C     : Memoization_Maps.Cursor := Cursor.Map_Cursor;
+         K     : Mmz_Key := Memoization_Maps.Key (C);
+         Value : Mmz_Value := Memoization_Maps.Element (C);
+      begin
+         Map.Fallback.Delete (C);
+         Destroy (K);
+         Destroy (Value);
+      end;
+   else
+      Remove_Entry (Map.Compact, Cursor.Index);
+   end if;
+end Mmz_Delete;
+
+---------------
+-- Find_Slot --
+---------------
+
+function Find_Slot
+  (Table : Mmz_Compact_Table; Hash : Hash_Type; Index : Positive)
+   return Natural
+is
+   Mask   : constant Hash_Type := Table.Slots'Length - 1;
+   Result : Natural := Natural (Hash and Mask);
+begin
+   while Table.Slots (Result) /= Index loop
+      Result := Natural ((Hash_Type (Result) + 1) and Mask);
+   end loop;
+   return Result;
+end Find_Slot;
+
+------------
+-- Resize --
+------------
+
+procedure Resize (Table : in out Mmz_Compact_Table) is
+   Old_Slots : Mmz_Slot_Array_Access := Table.Slots;
+   Capacity  : Positive := 16;
+   Mask      : Hash_Type;
+   Slot      : Natural;
+begin
+   --  Keep the load factor below 1/2 right after resizing, so that we do not
+   --  need to resize again too soon.
+
+   while Capacity < 2 * (Table.Length + 1) loop
+      Capacity := 2 * Capacity;
+   end loop;
+
+   Table.Slots := new Mmz_Slot_Array'(0 .. Capacity - 1 => Mmz_No_Entry);
+   Table.Used_Slots := Table.Length;
+   Mask := Hash_Type (Capacity - 1);
+
+   for I in 1 .. Table.Entries.Length loop
+      declare
+         E : Mmz_Entry renames Table.Entries.Get_Access (I).all;
+      begin
+         if E.Used then
+            Slot := Natural (E.Hash and Mask);
+            while Table.Slots (Slot) /= Mmz_No_Entry loop
+               Slot := Natural ((Hash_Type (Slot) + 1) and Mask);
+            end loop;
+            Table.Slots (Slot) := I;
+         end if;
+      end;
+   end loop;
+
+   Free (Old_Slots);
+end Resize;
+
+------------
+-- Insert --
+------------
+
+procedure Insert
+  (Table    : in out Mmz_Compact_Table;
+   Key      : Mmz_Key;
+   Index    : out Positive;
+   Inserted : out Boolean)
+is
+   H    : constant Hash_Type := Hash (Key);
+   Mask : Hash_Type;
+   Slot : Natural;
+
+   Free_Slot : Integer := -1;
+   --  First deleted slot we found while probing, if any. We can put the new
+   --  entry there if there is no entry for Key.
+begin
+   --  Keep the load factor (including deleted slots) below 3/4 so that
+   --  probing sequences remain short and always end.
+
+   if Table.Slots = null
+      or else 4 * (Table.Used_Slots + 1) > 3 * Table.Slots'Length
+   then
+      Resize (Table);
+   end if;
+
+   Mask := Table.Slots'Length - 1;
+   Slot := Natural (H and Mask);
+   loop
+      declare
+         S : constant Integer := Table.Slots (Slot);
+      begin
+         exit when S = Mmz_No_Entry;
+
+         if S = Mmz_Deleted_Entry then
+            if Free_Slot = -1 then
+               Free_Slot := Slot;
+            end if;
+
+         else
+            declare
+               E : Mmz_Entry renames Table.Entries.Get_Access (S).all;
+            begin
+               if E.Hash = H and then Equivalent (E.Key, Key) then
+                  E.Referenced := True;
+                  Index := S;
+                  Inserted := False;
+                  return;
+               end if;
+            end;
+         end if;
+      end;
+
+      Slot := Natural ((Hash_Type (Slot) + 1) and Mask);
+   end loop;
+
+   --  There is no entry for Key: create one, reusing an unused entry if
+   --  possible.
+
+   if Table.First_Free /= 0 then
+      Index := Table.First_Free;
+      Table.First_Free := Table.Entries.Get_Access (Index).Next_Free;
+      Table.Entries.Set
+        (Index, (Key        => Key,
+                 Hash       => H,
+                 Value      => (Kind => Mmz_Evaluating, others => <>),
+                 Used       => True,
+                 Referenced => True,
+                 Next_Free  => 0));
+   else
+      Table.Entries.Append
+        ((Key        => Key,
+          Hash       => H,
+          Value      => (Kind => Mmz_Evaluating, others => <>),
+          Used       => True,
+          Referenced => True,
+          Next_Free  => 0));
+      Index := Table.Entries.Last_Index;
+   end if;
+
+   if Free_Slot = -1 then
+      Table.Used_Slots := Table.Used_Slots + 1;
+   else
+      Slot := Free_Slot;
+   end if;
+   Table.Slots (Slot) := Index;
+   Table.Length := Table.Length + 1;
+   Inserted := True;
+end Insert;
+
+-------------
+-- Destroy --
+-------------
+
+procedure Destroy (Table : in out Mmz_Compact_Table) is
+begin
+   for I in 1 .. Table.Entries.Length loop
+      declare
+         E : Mmz_Entry renames Table.Entries.Get_Access (I).all;
+      begin
+         if E.Used then
+            Destroy (E.Key);
+            Destroy (E.Value);
+         end if;
+      end;
+   end loop;
+
+   Table.Entries.Destroy;
+   Free (Table.Slots);
+   Table := (others => <>);
+end Destroy;
+
+-----------
+-- Evict --
+-----------
+
+procedure Evict
+  (Table   : in out Mmz_Compact_Table;
+   Count   : Positive;
+   Evicted : out Natural;
+   Wrapped : out Boolean)
+is
+   Last : constant Natural := Table.Entries.Length;
+begin
+   Evicted := 0;
+   while Evicted < Count and then Table.Hand <= Last loop
+      declare
+         E : Mmz_Entry renames Table.Entries.Get_Access (Table.Hand).all;
+      begin
+         --  Evaluations in progress hold cursors to their entries, so keep
+         --  them.
+
+         if E.Used and then E.Value.Kind /= Mmz_Evaluating then
+            if E.Referenced then
+               E.Referenced := False;
+            else
+               Remove_Entry (Table, Table.Hand);
+               Evicted := Evicted + 1;
+            end if;
+         end if;
+      end;
+
+      Table.Hand := Table.Hand + 1;
+   end loop;
+
+   Wrapped := Table.Hand > Last;
+   if Wrapped then
+      Table.Hand := 1;
+   end if;
+end Evict;
+
+------------------
+-- Remove_Entry --
+------------------
+
+procedure Remove_Entry (Table : in out Mmz_Compact_Table; Index : Positive) is
+   E : Mmz_Entry renames Table.Entries.Get_Access (Index).all;
+begin
+   Table.Slots (Find_Slot (Table, E.Hash, Index)) := Mmz_Deleted_Entry;
+   Destroy (E.Key);
+   Destroy (E.Value);
+   E.Used := False;
+   E.Next_Free := Table.First_Free;
+   Table.First_Free := Index;
+   Table.Length := Table.Length - 1;
+end Remove_Entry;
+
+--------------------------
+-- Remove_Stale_Entries --
+--------------------------
+
+procedure Remove_Stale_Entries
+  (Table         : in out Mmz_Compact_Table;
+   Symbols       : Mmz_Symbol_Sets.Set;
+   All_Stale     : Boolean;
+   Kept, Dropped : in out Natural) is
+begin
+   for I in 1 .. Table.Entries.Length loop
+      declare
+         E : Mmz_Entry renames Table.Entries.Get_Access (I).all;
+      begin
+         if not E.Used then
+            null;
+
+         --  Keep entries that are still being evaluated (units can be loaded
+         --  during property evaluation): the corresponding evaluations hold
+         --  cursors to them.
+
+         elsif E.Value.Kind /= Mmz_Evaluating
+               and then (All_Stale or else Is_Stale (E.Value.Deps, Symbols))
+         then
+            Remove_Entry (Table, I);
+            Dropped := Dropped + 1;
+
+         else
+            Kept := Kept + 1;
+         end if;
+      end;
+   end loop;
+end Remove_Stale_Entries;
+
 -------------
 -- Destroy --
 -------------
@@ -164,7 +847,7 @@ procedure Destroy (Map : in out Memoization_Maps.Map) is
 
    Length : constant Natural := Natural (Map.Length);
 
-   type Key_Array is array (1 .. Length) of Mmz_Key_Array_Access;
+   type Key_Array is array (1 .. Length) of Mmz_Key;
    type Key_Array_Access is access Key_Array;
    procedure Free is new Ada.Unchecked_Deallocation
      (Key_Array, Key_Array_Access);
@@ -179,48 +862,544 @@ procedure Destroy (Map : in out Memoization_Maps.Map) is
    I      : Positive := 1;
 begin
    for Cur in Map.Iterate loop
-      Keys (I) := Key (Cur).Items;
+      Keys (I) := Key (Cur);
       Values (I) := Element (Cur);
       I := I + 1;
    end loop;
 
    Map.Clear;
 
-   for K_Array of Keys.all loop
-      Destroy (K_Array);
+   for K of Keys.all loop
+      Destroy (K);
+   end loop;
+
+   for V of Values.all loop
+      Destroy (V);
+   end loop;
+
+   Free (Keys);
+   Free (Values);
+end Destroy;
+
+-----------
+-- Evict --
+-----------
+
+procedure Evict
+  (Map     : in out Memoization_Maps.Map;
+   Count   : Positive;
+   Evicted : out Natural;
+   Wrapped : out Boolean)
+is
+   use Memoization_Maps;
+
+   Cur : Cursor := Map.First;
+begin
+   Evicted := 0;
+   while Evicted < Count and then Has_Element (Cur) loop
+      declare
+         Next_Cur : constant Cursor := Next (Cur);
+         Value    : Mmz_Value := Element (Cur);
+      begin
+         if Value.Kind /= Mmz_Evaluating then
+            declare
+               K : Mmz_Key := Key (Cur);
+            begin
+               Map.Delete (Cur);
+               Destroy (K);
+               Destroy (Value);
+            end;
+            Evicted := Evicted + 1;
+         end if;
+
+         Cur := Next_Cur;
+      end;
    end loop;
 
+   Wrapped := not Has_Element (Cur);
+end Evict;
+
+-------------
+-- Destroy --
+-------------
+
+procedure Destroy (Value : in out Mmz_Value) is
+begin
+   Destroy (Value.Deps);
+
    <% refcounted_value_types = [t for t in value_types if t.is_refcounted] %>
    % if refcounted_value_types:
-      for V of Values.all loop
-         case V.Kind is
-            % for t in refcounted_value_types:
+      case Value.Kind is
+         % for t in refcounted_value_types:
+            when ${t.memoization_kind} =>
+               Dec_Ref (Value.As_${t.name});
+         % endfor
+
+         when others => null;
+      end case;
+   % endif
+end Destroy;
+
+-------------
+-- Destroy --
+-------------
+
+procedure Destroy (Deps : in out Mmz_Deps) is
+begin
+   Analysis_Unit_Sets.Destroy (Deps.Units);
+   Mmz_Symbol_Sets.Destroy (Deps.Symbols);
+end Destroy;
+
+--------------
+-- Is_Stale --
+--------------
+
+function Is_Stale
+  (Deps : Mmz_Deps; Symbols : Mmz_Symbol_Sets.Set) return Boolean is
+begin
+   if Deps.Untracked then
+      return True;
+   end if;
+
+   for U of Analysis_Unit_Sets.Elements (Deps.Units) loop
+      if U.Mmz_Stale then
+         return True;
+      end if;
+   end loop;
+
+   for S of Mmz_Symbol_Sets.Elements (Deps.Symbols) loop
+      if Mmz_Symbol_Sets.Has (Symbols, S) then
+         return True;
+      end if;
+   end loop;
+
+   return False;
+end Is_Stale;
+
+--------------------------
+-- Remove_Stale_Entries --
+--------------------------
+
+procedure Remove_Stale_Entries
+  (Map           : in out Memoization_Maps.Map;
+   Symbols       : Mmz_Symbol_Sets.Set;
+   All_Stale     : Boolean;
+   Kept, Dropped : in out Natural)
+is
+   use Memoization_Maps;
+
+   Cur : Cursor := Map.First;
+begin
+   while Has_Element (Cur) loop
+      declare
+         Next_Cur : constant Cursor := Next (Cur);
+         Value    : Mmz_Value := Element (Cur);
+      begin
+         --  Keep entries that are still being evaluated (units can be
+         --  loaded during property evaluation): the corresponding
+         --  evaluations hold cursors to them.
+
+         if Value.Kind /= Mmz_Evaluating
+            and then (All_Stale or else Is_Stale (Value.Deps, Symbols))
+         then
+            declare
+               K : Mmz_Key := Key (Cur);
+            begin
+               Map.Delete (Cur);
+               Destroy (K);
+               Destroy (Value);
+            end;
+            Dropped := Dropped + 1;
+         else
+            Kept := Kept + 1;
+         end if;
+
+         Cur := Next_Cur;
+      end;
+   end loop;
+end Remove_Stale_Entries;
+
+--------------
+-- Add_Unit --
+--------------
+
+procedure Add_Unit (Frame : in out Mmz_Frame; Unit : Internal_Unit) is
+   Dummy : Boolean;
+begin
+   if Unit /= null and then Unit /= Frame.Owner then
+      Dummy := Analysis_Unit_Sets.Add (Frame.Deps.Units, Unit);
+   end if;
+end Add_Unit;
+
+--------------
+-- Add_Node --
+--------------
+
+procedure Add_Node
+  (Frame : in out Mmz_Frame; Node : ${root_node_type_name}) is
+begin
+   if Node /= null then
+      Add_Unit (Frame, Node.Unit);
+   end if;
+end Add_Node;
+
+-------------
+-- Add_Env --
+-------------
+
+procedure Add_Env (Frame : in out Mmz_Frame; Env : Lexical_Env) is
+begin
+   Add_Unit (Frame, Env.Owner);
+
+   --  Only non-primary environments (which are ref-counted, and thus still
+   --  allocated here) wrap other environments.
+
+   if Env.Env = null then
+      return;
+   end if;
+
+   case Env.Kind is
+      when Primary =>
+         null;
+
+      when Orphaned =>
+         Add_Env (Frame, Env.Env.Orphaned_Env);
+
+      when Grouped =>
+         for E of Env.Env.Grouped_Envs.all loop
+            Add_Env (Frame, E);
+         end loop;
+
+      when Rebound =>
+         Add_Env (Frame, Env.Env.Rebound_Env);
+         Add_Rebindings (Frame, Env.Env.Rebindings);
+   end case;
+end Add_Env;
+
+---------------------
+-- Add_Lookup_Envs --
+---------------------
+
+procedure Add_Lookup_Envs
+  (Frame       : in out Mmz_Frame;
+   Env         : Lexical_Env;
+   Lookup_Kind : Lookup_Kind_Type) is
+begin
+   --  Untracked dependencies already make the result stale after any
+   --  reparse: there is no need to record more units.
+
+   if Frame.Deps.Untracked or else Env.Env = null then
+      return;
+   end if;
+
+   Add_Unit (Frame, Env.Owner);
+
+   case Env.Kind is
+      when Primary =>
+         if Lookup_Kind = Minimal then
+            return;
+         end if;
+
+         for I in Env.Env.Referenced_Envs.First_Index
+           .. Env.Env.Referenced_Envs.Last_Index
+         loop
+            declare
+               Refd_Env : Referenced_Env renames
+                  Env.Env.Referenced_Envs.Get_Access (I).all;
+            begin
+               --  Like AST_Envs.Get, use Being_Visited to avoid infinite
+               --  recursion on cyclic references.
+
+               if (Lookup_Kind = Recursive or else Refd_Env.Kind = Transitive)
+                  and then not Refd_Env.Being_Visited
+               then
+                  if Refd_Env.Getter.Dynamic then
+                     Frame.Deps.Untracked := True;
+                     return;
+                  end if;
+
+                  Refd_Env.Being_Visited := True;
+                  Add_Lookup_Envs
+                    (Frame, Refd_Env.Getter.Env,
+                     (if Lookup_Kind = Recursive
+                         and then Refd_Env.Kind = Transitive
+                      then Recursive
+                      else Flat));
+                  Refd_Env.Being_Visited := False;
+               end if;
+            end;
+         end loop;
+
+         if Lookup_Kind = Recursive or else Env.Env.Transitive_Parent then
+            if Env.Env.Parent.Dynamic then
+               Frame.Deps.Untracked := True;
+            else
+               Add_Lookup_Envs (Frame, Env.Env.Parent.Env, Lookup_Kind);
+            end if;
+         end if;
+
+      when Orphaned =>
+         Add_Lookup_Envs (Frame, Env.Env.Orphaned_Env, Flat);
+
+      when Grouped =>
+         for E of Env.Env.Grouped_Envs.all loop
+            Add_Lookup_Envs (Frame, E, Lookup_Kind);
+         end loop;
+
+      when Rebound =>
+         Add_Lookup_Envs (Frame, Env.Env.Rebound_Env, Lookup_Kind);
+         Add_Rebindings (Frame, Env.Env.Rebindings);
+   end case;
+end Add_Lookup_Envs;
+
+--------------------
+-- Add_Rebindings --
+--------------------
+
+procedure Add_Rebindings
+  (Frame : in out Mmz_Frame; Rebindings : Env_Rebindings)
+is
+   R : Env_Rebindings := Rebindings;
+begin
+   while R /= null loop
+      Add_Unit (Frame, R.Old_Env.Owner);
+      Add_Unit (Frame, R.New_Env.Owner);
+      R := R.Parent;
+   end loop;
+end Add_Rebindings;
+
+--------------
+-- Add_Deps --
+--------------
+
+procedure Add_Deps (Frame : in out Mmz_Frame; Deps : Mmz_Deps) is
+   Dummy : Boolean;
+begin
+   Frame.Deps.Untracked := Frame.Deps.Untracked or else Deps.Untracked;
+
+   for U of Analysis_Unit_Sets.Elements (Deps.Units) loop
+      Add_Unit (Frame, U);
+   end loop;
+
+   for S of Mmz_Symbol_Sets.Elements (Deps.Symbols) loop
+      Dummy := Mmz_Symbol_Sets.Add (Frame.Deps.Symbols, S);
+   end loop;
+end Add_Deps;
+
+---------------
+-- Mmz_Enter --
+---------------
+
+function Mmz_Enter
+  (Owner : Internal_Unit; Untracked : Boolean) return Positive is
+begin
+   Mmz_Frames.Append
+     ((Owner => Owner,
+       Deps  => (Untracked => Untracked, others => <>)));
+   return Mmz_Frames.Last_Index;
+end Mmz_Enter;
+
+---------------
+-- Mmz_Leave --
+---------------
+
+function Mmz_Leave (Frame : Positive) return Mmz_Deps is
+   Result : Mmz_Frame;
+begin
+   --  Frames above Frame belong to evaluations that an exception interrupted
+   --  before they could leave their frame. Their results were used to compute
+   --  Frame's, so merge their dependencies into Frame.
+
+   while Mmz_Frames.Last_Index > Frame loop
+      Result := Mmz_Frames.Pop;
+      declare
+         Enclosing : Mmz_Frame renames
+            Mmz_Frames.Get_Access (Mmz_Frames.Last_Index).all;
+      begin
+         Add_Unit (Enclosing, Result.Owner);
+         Add_Deps (Enclosing, Result.Deps);
+      end;
+      Destroy (Result.Deps);
+   end loop;
+
+   Result := Mmz_Frames.Pop;
+   if not Mmz_Frames.Is_Empty then
+      declare
+         Enclosing : Mmz_Frame renames
+            Mmz_Frames.Get_Access (Mmz_Frames.Last_Index).all;
+      begin
+         Add_Unit (Enclosing, Result.Owner);
+         Add_Deps (Enclosing, Result.Deps);
+      end;
+   end if;
+   return Result.Deps;
+end Mmz_Leave;
+
+------------------
+-- Mmz_Add_Deps --
+------------------
+
+procedure Mmz_Add_Deps (Owner : Internal_Unit; Deps : Mmz_Deps) is
+begin
+   if not Mmz_Frames.Is_Empty then
+      declare
+         Frame : Mmz_Frame renames
+            Mmz_Frames.Get_Access (Mmz_Frames.Last_Index).all;
+      begin
+         Add_Unit (Frame, Owner);
+         Add_Deps (Frame, Deps);
+      end;
+   end if;
+end Mmz_Add_Deps;
+
+-----------------
+-- Mmz_Add_Key --
+-----------------
+
+procedure Mmz_Add_Key (Key : Mmz_Key) is
+begin
+   if Mmz_Frames.Is_Empty then
+      return;
+   end if;
+
+   declare
+      Frame : Mmz_Frame renames
+         Mmz_Frames.Get_Access (Mmz_Frames.Last_Index).all;
+   begin
+      for Item of Key.Items (1 .. Key.Length) loop
+         case Item.Kind is
+            % for t in key_types:
                when ${t.memoization_kind} =>
-                  Dec_Ref (V.As_${t.name});
+                  % if t.is_ast_node:
+                     Add_Node
+                       (Frame, ${root_node_type_name} (Item.As_${t.name}));
+                  % elif t.is_entity_type:
+                     Add_Node
+                       (Frame,
+                        ${root_node_type_name} (Item.As_${t.name}.Node));
+                     Add_Rebindings
+                       (Frame, Item.As_${t.name}.Info.Rebindings);
+                  % elif t == T.entity_info:
+                     Add_Rebindings (Frame, Item.As_${t.name}.Rebindings);
+                  % elif t.is_env_rebindings_type:
+                     Add_Rebindings (Frame, Item.As_${t.name});
+                  % elif t.is_lexical_env_type:
+                     Add_Env (Frame, Item.As_${t.name});
+                  % elif t.is_analysis_unit_type:
+                     Add_Unit (Frame, Item.As_${t.name});
+                  % elif t.is_struct_type:
+                     ## Other structs may contain nodes, but we do not track
+                     ## them.
+                     Frame.Deps.Untracked := True;
+                  % else:
+                     null;
+                  % endif
             % endfor
-
-            when others => null;
          end case;
       end loop;
-   % endif
+   end;
+end Mmz_Add_Key;
 
-   Free (Keys);
-   Free (Values);
-end Destroy;
+--------------------
+-- Mmz_Add_Lookup --
+--------------------
+
+procedure Mmz_Add_Lookup
+  (Env : Lexical_Env; Key : Symbol_Type; Lookup_Kind : Lookup_Kind_Type)
+is
+   Dummy : Boolean;
+begin
+   if not Mmz_Frames.Is_Empty then
+      declare
+         Frame : Mmz_Frame renames
+            Mmz_Frames.Get_Access (Mmz_Frames.Last_Index).all;
+      begin
+         Add_Lookup_Envs (Frame, Env, Lookup_Kind);
+         if Key /= null then
+            Dummy := Mmz_Symbol_Sets.Add (Frame.Deps.Symbols, Key);
+         else
+            --  Lookups for all symbols may yield different results after
+            --  any reparse.
+            Frame.Deps.Untracked := True;
+         end if;
+      end;
+   end if;
+end Mmz_Add_Lookup;
+
+--------------------
+-- Mmz_Add_Entity --
+--------------------
+
+procedure Mmz_Add_Entity (E : Internal_Entity) is
+begin
+   if not Mmz_Frames.Is_Empty then
+      declare
+         Frame : Mmz_Frame renames
+            Mmz_Frames.Get_Access (Mmz_Frames.Last_Index).all;
+      begin
+         Add_Node (Frame, E.Node);
+         Add_Rebindings (Frame, E.Info.Rebindings);
+      end;
+   end if;
+end Mmz_Add_Entity;
 
 -------------
--- Destroy --
+-- Env_Get --
 -------------
 
-procedure Destroy (Key : in out Mmz_Key_Array_Access) is
-   procedure Free is new Ada.Unchecked_Deallocation
-     (Mmz_Key_Array, Mmz_Key_Array_Access);
+function Env_Get
+  (Self        : Lexical_Env;
+   Key         : Symbol_Type;
+   From        : ${root_node_type_name} := null;
+   Lookup_Kind : Lookup_Kind_Type := Recursive;
+   Categories  : Ref_Categories := All_Cats) return Entity_Array is
+begin
+   --  Record the lookup before doing it, so that Property_Error results
+   --  also depend on it.
+
+   Mmz_Add_Lookup (Self, Key, Lookup_Kind);
+   return Result : constant Entity_Array :=
+      AST_Envs.Get (Self, Key, From, Lookup_Kind, Categories)
+   do
+      if not Mmz_Frames.Is_Empty then
+         for E of Result loop
+            Mmz_Add_Entity (E);
+         end loop;
+      end if;
+   end return;
+end Env_Get;
+
+-------------------
+-- Env_Get_First --
+-------------------
+
+function Env_Get_First
+  (Self        : Lexical_Env;
+   Key         : Symbol_Type;
+   From        : ${root_node_type_name} := null;
+   Lookup_Kind : Lookup_Kind_Type := Recursive;
+   Categories  : Ref_Categories := All_Cats) return Internal_Entity is
 begin
-   <% refcounted_key_types = [t for t in key_types
-                              if t.is_refcounted] %>
+   Mmz_Add_Lookup (Self, Key, Lookup_Kind);
+   return Result : constant Internal_Entity :=
+      AST_Envs.Get_First (Self, Key, From, Lookup_Kind, Categories)
+   do
+      Mmz_Add_Entity (Result);
+   end return;
+end Env_Get_First;
 
+-------------
+-- Destroy --
+-------------
+
+<% refcounted_key_types = [t for t in key_types if t.is_refcounted] %>
+procedure Destroy (Key : in out Mmz_Key) is
+   % if not refcounted_key_types:
+      pragma Unreferenced (Key);
+   % endif
+begin
    % if refcounted_key_types:
-      for K of Key.all loop
+      for K of Key.Items (1 .. Key.Length) loop
          case K.Kind is
             % for t in refcounted_key_types:
                when ${t.memoization_kind} =>
@@ -230,8 +1409,9 @@ begin
             when others => null;
          end case;
       end loop;
+   % else:
+      null;
    % endif
-   Free (Key);
 end Destroy;
 
 </%def>
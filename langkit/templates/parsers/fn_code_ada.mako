@@ -9,7 +9,9 @@ function ${parser.gen_fn_name}
   (Parser : in out Parser_Type;
    Pos    : Token_Index) return ${ret_type}
 is
+   % if parser.is_memoized:
    use ${ret_type}_Memos;
+   % endif
 
    % for name, typ in var_context:
       ${name} :
@@ -28,10 +30,15 @@ is
       Mem_Res : ${ret_type} := ${parser.type.storage_nullexpr};
    % endif
 
+   % if parser.is_memoized:
    M : Memo_Entry := Get (${memo}, Pos);
+   % endif
 
 begin
 
+   ## Rules that cannot run twice at the same position have no memo table:
+   ## see Grammar.select_memoized_rules.
+   % if parser.is_memoized:
    if M.State = Success then
       Parser.Current_Pos := M.Final_Pos;
       ${parser.res_var} := M.Instance;
@@ -40,6 +47,7 @@ begin
       Parser.Current_Pos := No_Token_Index;
       return ${parser.res_var};
    end if;
+   % endif
 
    % if parser.is_left_recursive():
        Set (${memo}, False, ${parser.res_var}, Pos, Mem_Pos);
@@ -84,12 +92,14 @@ begin
       end if;
    % endif
 
+   % if parser.is_memoized:
    Set
      (${memo},
       ${parser.pos_var} /= No_Token_Index,
       ${parser.res_var},
       Pos,
       ${parser.pos_var});
+   % endif
 
    % if parser.is_left_recursive():
        <<No_Memo>>
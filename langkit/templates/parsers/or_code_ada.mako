@@ -4,7 +4,22 @@
 
 ${parser.pos_var} := No_Token_Index;
 ${parser.res_var} := ${parser.type.storage_nullexpr};
+
+## If some alternatives cannot match some token kinds (see
+## Or.dispatch_tokens), get the kind of the current token so that we try only
+## alternatives that can match it.
+% if parser.kind_var:
+${parser.kind_var} := To_Token_Kind
+  (Token_Vectors.Get (Parser.TDH.Tokens,
+                      Natural (${parser.start_pos})).Kind);
+% endif
+
 % for subparser in parser.parsers:
+    <% tokens = parser.dispatch_tokens(subparser) %>
+    % if tokens:
+    if ${parser.kind_var} in ${' | '.join(t.ada_name for t in tokens)} then
+    % endif
+
     ${subparser.generate_code()}
     if ${subparser.pos_var} /= No_Token_Index then
         ${parser.pos_var} := ${subparser.pos_var};
@@ -12,6 +27,19 @@ ${parser.res_var} := ${parser.type.storage_nullexpr};
           (${subparser.res_var});
         goto ${exit_label};
     end if;
+
+    % if tokens:
+    ## This alternative would have failed on the current token: document
+    ## this failure as it would have done (Or.dispatch_tokens guarantees that
+    ## we know which token it would have expected).
+    elsif Parser.Last_Fail.Pos <= ${parser.start_pos} then
+       Parser.Last_Fail :=
+         (Kind              => Token_Fail,
+          Pos               => ${parser.start_pos},
+          Expected_Token_Id => ${subparser.fail_token.ada_name},
+          Found_Token_Id    => ${parser.kind_var});
+    end if;
+    % endif
 % endfor
 <<${exit_label}>>
 
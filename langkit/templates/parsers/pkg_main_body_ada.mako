@@ -1,11 +1,20 @@
 ## vim: filetype=makoada
 
+<% memoized_fns = sorted((f for f in ctx.fns if f.is_memoized),
+                         key=lambda f: f.gen_fn_name) %>
+
 with Ada.Containers.Vectors;
+with Ada.Real_Time;
 with Ada.Unchecked_Deallocation;
 
+% if memoized_fns:
+with GNATCOLL.Traces;
+% endif
+
 with Langkit_Support.Diagnostics; use Langkit_Support.Diagnostics;
 with Langkit_Support.Packrat;
 with Langkit_Support.Text;        use Langkit_Support.Text;
+with Langkit_Support.Types;
 
 with ${ada_lib_name}.Common; use ${ada_lib_name}.Common;
 use ${ada_lib_name}.Common.Symbols;
@@ -13,11 +22,17 @@ with ${ada_lib_name}.Converters;     use ${ada_lib_name}.Converters;
 with ${ada_lib_name}.Implementation; use ${ada_lib_name}.Implementation;
 with ${ada_lib_name}.Lexer;          use ${ada_lib_name}.Lexer;
 
-<% sorted_fns = sorted(ctx.fns, key=lambda f: f.gen_fn_name) %>
-
 package body ${ada_lib_name}.Parsers is
    use all type Symbols.Symbol_Type;
 
+   % if memoized_fns:
+   Packrat_Trace : constant GNATCOLL.Traces.Trace_Handle :=
+      GNATCOLL.Traces.Create
+        ("${ctx.lib_name.upper}.PACKRAT_STATS", GNATCOLL.Traces.From_Config);
+   --  When active, report the usage of each memo table (hits, misses and
+   --  evictions) when parsers are destroyed.
+   % endif
+
    --  Prepare packrat instantiations: one per enum type and onefor each kind
    --  of node (including lists). Likewise for bump ptr. allocators, except
    --  we need them only for non-abstract AST nodes.
@@ -65,9 +80,10 @@ package body ${ada_lib_name}.Parsers is
    type Parser_Private_Part_Type is record
       Parse_Lists : Free_Parse_List;
 
-      % for parser in sorted_fns:
+      % for parser in memoized_fns:
       <% ret_type = parser.type.storage_type_name %>
-      ${parser.gen_fn_name}_Memo : ${ret_type}_Memos.Memo_Type;
+      ${parser.gen_fn_name}_Memo : ${ret_type}_Memos.Memo_Type
+        (Size => ${parser.memo_size}, Ways => ${parser.memo_ways});
       % endfor
 
       Dont_Skip : Dont_Skip_Fn_Vectors.Vector;
@@ -127,13 +143,13 @@ package body ${ada_lib_name}.Parsers is
          Get_Token (Parser.TDH.all, Parser.Last_Fail.Pos);
       D : constant Diagnostic :=
         (if Parser.Last_Fail.Kind = Token_Fail then
-          Create (Last_Token.Sloc_Range, To_Text
+          Create (Sloc_Range (Parser.TDH.all, Last_Token), To_Text
             ("Expected "
              & Token_Error_Image (Parser.Last_Fail.Expected_Token_Id)
              & ", got "
              & Token_Error_Image (Parser.Last_Fail.Found_Token_Id)))
          else
-           Create (Last_Token.Sloc_Range,
+           Create (Sloc_Range (Parser.TDH.all, Last_Token),
                    To_Text (Parser.Last_Fail.Custom_Message.all)));
    begin
       Parser.Diagnostics.Append (D);
@@ -163,7 +179,7 @@ package body ${ada_lib_name}.Parsers is
             begin
                Append
                  (Parser.Diagnostics,
-                  First_Garbage_Token.Sloc_Range,
+                  Sloc_Range (Parser.TDH.all, First_Garbage_Token),
                   To_Text
                     ("End of input expected, got """
                      & Token_Kind_Name
@@ -189,7 +205,10 @@ package body ${ada_lib_name}.Parsers is
       Check_Complete : Boolean := True;
       Rule           : Grammar_Rule) return Parsed_Node
    is
+      use Langkit_Support.Types;
+
       Result : ${root_node_type_name};
+      Start  : Ada.Real_Time.Time := Ada.Real_Time.Clock;
    begin
       case Rule is
       % for name in ctx.grammar.user_defined_rules:
@@ -200,7 +219,17 @@ package body ${ada_lib_name}.Parsers is
       % endfor
       end case;
       Process_Parsing_Error (Parser, Check_Complete);
+
+      if Profile_Analysis then
+         Analysis_Profiler.Add (Parsing, Start);
+         Start := Ada.Real_Time.Clock;
+      end if;
+
       Set_Parents (Result, null);
+
+      if Profile_Analysis then
+         Analysis_Profiler.Add (Tree_Building, Start);
+      end if;
       return Parsed_Node (Result);
    end Parse;
 
@@ -224,7 +253,7 @@ package body ${ada_lib_name}.Parsers is
       Parser := New_Parser;
 
       --  Reset the memo tables in the private part
-      % for fn in sorted_fns:
+      % for fn in memoized_fns:
          ${fn.type.storage_type_name}_Memos.Clear
            (Parser.Private_Part.${fn.gen_fn_name}_Memo);
       % endfor
@@ -242,6 +271,16 @@ package body ${ada_lib_name}.Parsers is
 
       Cur : Free_Parse_List renames Parser.Private_Part.Parse_Lists;
    begin
+      % if memoized_fns:
+      if Packrat_Trace.Is_Active then
+         % for fn in memoized_fns:
+            Packrat_Trace.Trace
+              ("${fn.name}: " & ${fn.type.storage_type_name}_Memos.Image
+                 (Parser.Private_Part.${fn.gen_fn_name}_Memo));
+         % endfor
+      end if;
+      % endif
+
       while Cur /= null loop
          declare
             Next : constant Free_Parse_List := Cur.Next;
@@ -37,6 +37,7 @@ pragma Warnings (On, "referenced");
 with ${ada_lib_name}.Common;
 use ${ada_lib_name}.Common.Symbols;
 with ${ada_lib_name}.Converters; use ${ada_lib_name}.Converters;
+with ${ada_lib_name}.Lexer_Implementation;
 
 ${(exts.with_clauses(with_clauses + [
    ((ctx.default_unit_provider.unit_fqn, False, False)
@@ -196,6 +197,29 @@ package body ${ada_lib_name}.Analysis is
                         Reparse, Rule));
    end Get_From_File;
 
+   --------------------
+   -- Get_From_Files --
+   --------------------
+
+   function Get_From_Files
+     (Context   : Analysis_Context'Class;
+      Filenames : Filename_Array;
+      Charset   : String := "";
+      Reparse   : Boolean := False;
+      Rule      : Grammar_Rule := Default_Grammar_Rule;
+      Jobs      : Positive := 1) return Analysis_Unit_Array
+   is
+      Units : constant Internal_Unit_Array := Get_From_Files
+        (Unwrap_Context (Context), Implementation.Filename_Array (Filenames),
+         Charset, Reparse, Rule, Jobs);
+   begin
+      return Result : Analysis_Unit_Array (Units'Range) do
+         for I in Units'Range loop
+            Result (I) := Wrap_Unit (Units (I));
+         end loop;
+      end return;
+   end Get_From_Files;
+
    ---------------------
    -- Get_From_Buffer --
    ---------------------
@@ -339,6 +363,117 @@ package body ${ada_lib_name}.Analysis is
       Implementation.AST_Envs.Activate_Lookup_Cache := not Disable;
    end Disable_Lookup_Cache;
 
+   ---------------------------------
+   -- Disable_Compact_Memoization --
+   ---------------------------------
+
+   procedure Disable_Compact_Memoization (Disable : Boolean := True) is
+      % if not ctx.has_memoization:
+         pragma Unreferenced (Disable);
+      % endif
+   begin
+      % if ctx.has_memoization:
+         Implementation.Mmz_Use_Hashed_Maps := Disable;
+      % else:
+         null;
+      % endif
+   end Disable_Compact_Memoization;
+
+   ---------------------------
+   -- Get_Memoization_Stats --
+   ---------------------------
+
+   function Get_Memoization_Stats
+     (Context : Analysis_Context'Class) return Memoization_Stats
+   is
+      Result : Memoization_Stats;
+   begin
+      Get_Memoization_Stats
+        (Unwrap_Context (Context), Result.Kept_Entries,
+         Result.Dropped_Entries);
+      return Result;
+   end Get_Memoization_Stats;
+
+   ----------------------
+   -- Set_Cache_Budget --
+   ----------------------
+
+   procedure Set_Cache_Budget
+     (Context              : Analysis_Context'Class;
+      Memoization_Entries  : Natural;
+      Lookup_Cache_Entries : Natural) is
+   begin
+      Set_Cache_Budget
+        (Unwrap_Context (Context), Memoization_Entries, Lookup_Cache_Entries);
+   end Set_Cache_Budget;
+
+   ---------------------------------
+   -- Get_Memoization_Cache_Stats --
+   ---------------------------------
+
+   function Get_Memoization_Cache_Stats
+     (Context : Analysis_Context'Class) return Cache_Stats is
+   begin
+      return Get_Memoization_Cache_Stats (Unwrap_Context (Context));
+   end Get_Memoization_Cache_Stats;
+
+   ----------------------------
+   -- Get_Lookup_Cache_Stats --
+   ----------------------------
+
+   function Get_Lookup_Cache_Stats
+     (Context : Analysis_Context'Class) return Cache_Stats is
+   begin
+      return Get_Lookup_Cache_Stats (Unwrap_Context (Context));
+   end Get_Lookup_Cache_Stats;
+
+   -----------------------------
+   -- Set_Page_Cache_Capacity --
+   -----------------------------
+
+   procedure Set_Page_Cache_Capacity
+     (Context : Analysis_Context'Class; Pages : Natural) is
+   begin
+      Set_Page_Cache_Capacity (Unwrap_Context (Context), Pages);
+   end Set_Page_Cache_Capacity;
+
+   -------------------------
+   -- Get_Node_Pool_Stats --
+   -------------------------
+
+   function Get_Node_Pool_Stats (Unit : Analysis_Unit'Class) return Pool_Stats
+   is
+   begin
+      return Get_Node_Pool_Stats (Unwrap_Unit (Unit));
+   end Get_Node_Pool_Stats;
+
+   -----------------------------
+   -- Enable_Analysis_Profile --
+   -----------------------------
+
+   procedure Enable_Analysis_Profile (Enable : Boolean := True) is
+   begin
+      Lexer_Implementation.Profile_Analysis := Enable;
+   end Enable_Analysis_Profile;
+
+   --------------------------
+   -- Get_Analysis_Profile --
+   --------------------------
+
+   function Get_Analysis_Profile return Analysis_Profile is
+   begin
+      return Lexer_Implementation.Analysis_Profiler.Get;
+   end Get_Analysis_Profile;
+
+   ----------------------------
+   -- Reset_Analysis_Profile --
+   ----------------------------
+
+   procedure Reset_Analysis_Profile is
+   begin
+      Lexer_Implementation.Analysis_Profiler.Reset;
+   end Reset_Analysis_Profile;
+
    --------------------------
    -- Has_Rewriting_Handle --
    --------------------------
@@ -25,6 +25,7 @@ with Langkit_Support.Bump_Ptr;    use Langkit_Support.Bump_Ptr;
 with Langkit_Support.Diagnostics; use Langkit_Support.Diagnostics;
 with Langkit_Support.Slocs;       use Langkit_Support.Slocs;
 with Langkit_Support.Text;        use Langkit_Support.Text;
+with Langkit_Support.Types;
 
 with ${ada_lib_name}.Common; use ${ada_lib_name}.Common;
 use ${ada_lib_name}.Common.Token_Data_Handlers;
@@ -174,6 +175,20 @@ package ${ada_lib_name}.Analysis is
       with Pre => not Reparse or else not Has_Rewriting_Handle (Context);
    ${ada_doc('langkit.get_unit_from_file', 3)}
 
+   type Filename_Array is
+      array (Positive range <>) of Ada.Strings.Unbounded.Unbounded_String;
+   type Analysis_Unit_Array is array (Positive range <>) of Analysis_Unit;
+
+   function Get_From_Files
+     (Context   : Analysis_Context'Class;
+      Filenames : Filename_Array;
+      Charset   : String := "";
+      Reparse   : Boolean := False;
+      Rule      : Grammar_Rule := Default_Grammar_Rule;
+      Jobs      : Positive := 1) return Analysis_Unit_Array
+      with Pre => not Reparse or else not Has_Rewriting_Handle (Context);
+   ${ada_doc('langkit.get_units_from_files', 3)}
+
    function Get_From_Buffer
      (Context  : Analysis_Context'Class;
       Filename : String;
@@ -235,10 +250,72 @@ package ${ada_lib_name}.Analysis is
      (Context : Analysis_Context'Class; Timeout : Natural);
    ${ada_doc('langkit.context_set_logic_resolution_timeout', 3)}
 
+   type Memoization_Stats is record
+      Kept_Entries, Dropped_Entries : Natural;
+   end record;
+
+   function Get_Memoization_Stats
+     (Context : Analysis_Context'Class) return Memoization_Stats;
+   ${ada_doc('langkit.context_memoization_stats', 3)}
+
+   subtype Cache_Stats is Langkit_Support.Types.Cache_Stats;
+
+   procedure Set_Cache_Budget
+     (Context              : Analysis_Context'Class;
+      Memoization_Entries  : Natural;
+      Lookup_Cache_Entries : Natural);
+   ${ada_doc('langkit.context_set_cache_budget', 3)}
+
+   function Get_Memoization_Cache_Stats
+     (Context : Analysis_Context'Class) return Cache_Stats;
+   ${ada_doc('langkit.context_memoization_cache_stats', 3)}
+
+   function Get_Lookup_Cache_Stats
+     (Context : Analysis_Context'Class) return Cache_Stats;
+   ${ada_doc('langkit.context_lookup_cache_stats', 3)}
+
+   procedure Set_Page_Cache_Capacity
+     (Context : Analysis_Context'Class; Pages : Natural);
+   --  When units are reparsed or destroyed, Context keeps the memory pages
+   --  that stored their nodes so that the next parsings reuse them. Set the
+   --  maximum number of such pages that Context keeps to ``Pages``. Pages
+   --  are 16KiB large, and by default Context keeps at most 256 of them.
+
+   subtype Pool_Stats is Langkit_Support.Bump_Ptr.Pool_Stats;
+
+   function Get_Node_Pool_Stats (Unit : Analysis_Unit'Class) return Pool_Stats;
+   --  Return statistics about the memory that ``Unit`` uses to store its
+   --  nodes: number of pages and of separately allocated large nodes, number
+   --  of bytes allocated, actually used, and left unused at the end of pages.
+
+   subtype Analysis_Phase is Langkit_Support.Types.Analysis_Phase;
+   subtype Analysis_Profile is Langkit_Support.Types.Analysis_Profile;
+
+   procedure Enable_Analysis_Profile (Enable : Boolean := True);
+   --  Benchmarking helper: if ``Enable`` is true, accumulate the time spent
+   --  in each analysis phase (decoding, lexing, parsing, tree building and
+   --  lexical environment population) for all analysis contexts, as well as
+   --  the peak size of memory pools for parse trees. Otherwise, stop
+   --  accumulating. Profiling is disabled by default.
+
+   function Get_Analysis_Profile return Analysis_Profile;
+   --  Return the analysis profile accumulated since the last call to
+   --  ``Reset_Analysis_Profile``. Note that the times spent in phases that
+   --  run in parallel tasks are added up.
+
+   procedure Reset_Analysis_Profile;
+   --  Reset all durations and sizes in the analysis profile to zero
+
    procedure Disable_Lookup_Cache (Disable : Boolean := True);
    --  Debug helper: if ``Disable`` is true, disable the use of caches in
    --  lexical environment lookups. Otherwise, activate it.
 
+   procedure Disable_Compact_Memoization (Disable : Boolean := True);
+   --  Debug helper: if ``Disable`` is true, store the memoized results of
+   --  properties in hashed maps instead of compact tables, for instance to
+   --  compare the performance of both. Otherwise, use compact tables. This
+   --  affects only the results that are memoized after the call.
+
    function Has_Rewriting_Handle
      (Context : Analysis_Context'Class) return Boolean;
    --  Return whether ``Context`` has a rewriting handler (see
@@ -356,7 +433,8 @@ package ${ada_lib_name}.Analysis is
 
    % for t in ctx.composite_types:
       % if t.is_array_type:
-         % if t.exposed:
+         ## Analysis_Unit_Array is declared with Get_From_Files
+         % if t.exposed and not t.element_type.is_analysis_unit_type:
             ${array_types.public_api_decl(t)}
          % endif
       % elif t.is_struct_type:
@@ -216,7 +216,7 @@ package body ${ada_lib_name}.Common is
    function Text (Token : Token_Reference) return Text_Type is
       RD : constant Stored_Token_Data := Raw_Data (Token);
    begin
-      return Token.TDH.Source_Buffer (RD.Source_First .. RD.Source_Last);
+      return Text (Token.TDH.all, RD);
    end Text;
 
    ----------------
@@ -237,7 +237,7 @@ package body ${ada_lib_name}.Common is
       if First.TDH /= Last.TDH then
          raise Constraint_Error;
       end if;
-      return FD.Source_Buffer.all (FD.Source_First .. LD.Source_Last);
+      return Source_Slice (FD.TDH.all, FD.Source_First, LD.Source_Last);
    end Text;
 
    ----------------
@@ -354,10 +354,10 @@ package body ${ada_lib_name}.Common is
               Index         => (if Token.Index.Trivia = No_Token_Index
                                 then Token.Index.Token
                                 else Token.Index.Trivia),
-              Source_Buffer => Text_Cst_Access (TDH.Source_Buffer),
+              TDH           => Token.TDH,
               Source_First  => Raw_Data.Source_First,
               Source_Last   => Raw_Data.Source_Last,
-              Sloc_Range    => Raw_Data.Sloc_Range);
+              Sloc_Range    => Sloc_Range (TDH, Raw_Data));
    end Convert;
 
    --------------------------
@@ -416,7 +416,12 @@ package body ${ada_lib_name}.Common is
       First         : out Positive;
       Last          : out Natural) is
    begin
-      Source_Buffer := Token.Source_Buffer;
+      --  The caller needs a pointer to decoded text: decode only the lines
+      --  that contain this token so that the rest of the source buffer keeps
+      --  its compact representation.
+
+      Wide_Source_Slice
+        (Token.TDH.all, Token.Source_First, Token.Source_Last, Source_Buffer);
       First := Token.Source_First;
       Last := Token.Source_Last;
    end Extract_Token_Text;
@@ -302,12 +302,12 @@ private
       Index : Token_Index;
       --  See documentation for the Index accessor
 
-      Source_Buffer : Text_Cst_Access;
-      --  Text for the original source file
+      TDH : Token_Data_Handler_Access;
+      --  Token data handler that owns this token, and thus its source text
 
       Source_First : Positive;
       Source_Last  : Natural;
-      --  Bounds in Source_Buffer for the text corresponding to this token
+      --  Bounds in TDH's source buffer for the text of this token
 
       Sloc_Range : Source_Location_Range;
       --  See documenation for the Sloc_Range accessor
@@ -10,10 +10,12 @@
 <% root_node_array = T.root_node.array %>
 
 with Ada.Containers;                  use Ada.Containers;
+with Ada.Containers.Hashed_Sets;
 with Ada.Containers.Vectors;
 with Ada.Directories;
 with Ada.Exceptions;
 with Ada.Finalization;
+with Ada.Real_Time;
 with Ada.Strings.Wide_Wide_Unbounded; use Ada.Strings.Wide_Wide_Unbounded;
 with Ada.Text_IO;                     use Ada.Text_IO;
 with Ada.Unchecked_Conversion;
@@ -292,10 +294,12 @@ package body ${ada_lib_name}.Implementation is
       Context.Charset := To_Unbounded_String (Actual_Charset);
       Context.Tab_Stop := Tab_Stop;
       Context.With_Trivia := With_Trivia;
+      Context.Lookup_Caches := (others => <>);
       Context.Root_Scope := AST_Envs.Create_Lexical_Env
-        (Parent => AST_Envs.No_Env_Getter,
-         Node   => null,
-         Owner  => No_Analysis_Unit);
+        (Parent        => AST_Envs.No_Env_Getter,
+         Node          => null,
+         Owner         => No_Analysis_Unit,
+         Lookup_Caches => Context.Lookup_Caches'Access);
 
       Context.Unit_Provider := Unit_Provider;
 
@@ -305,10 +309,16 @@ package body ${ada_lib_name}.Implementation is
       Context.Logic_Resolution_Timeout := 100_000;
       Context.In_Populate_Lexical_Env := False;
       Context.Cache_Version := 0;
-      Context.Reparse_Cache_Version := 0;
+      % if ctx.has_memoization:
+         Context.Mmz_Kept_Entries := 0;
+         Context.Mmz_Dropped_Entries := 0;
+         Context.Mmz_Stats := (others => <>);
+         Context.Mmz_Hand := No_Analysis_Unit;
+      % endif
 
       Context.Rewriting_Handle := No_Rewriting_Handle_Pointer;
       Context.Templates_Unit := No_Analysis_Unit;
+      Context.AST_Page_Cache := Create_Page_Cache;
 
       ${exts.include_extension(ctx.ext('analysis', 'context', 'create'))}
 
@@ -335,31 +345,29 @@ package body ${ada_lib_name}.Implementation is
       return Unit;
    end Create_Unit;
 
-   --------------
-   -- Get_Unit --
-   --------------
+   ------------------
+   -- Prepare_Unit --
+   ------------------
 
-   function Get_Unit
+   procedure Prepare_Unit
      (Context           : Internal_Context;
       Filename, Charset : String;
-      Reparse           : Boolean;
-      Input             : Internal_Lexer_Input;
-      Rule              : Grammar_Rule) return Internal_Unit
+      Rule              : Grammar_Rule;
+      Input             : in out Internal_Lexer_Input;
+      Unit              : out Internal_Unit;
+      Created           : out Boolean)
    is
       use Units_Maps;
 
       Normalized_Filename : constant GNATCOLL.VFS.Virtual_File :=
          Normalized_Unit_Filename (Context, Filename);
 
-      Cur     : constant Cursor :=
-         Context.Units.Find (Normalized_Filename);
-      Created : constant Boolean := Cur = No_Element;
-      Unit    : Internal_Unit;
+      Cur : constant Cursor := Context.Units.Find (Normalized_Filename);
 
       Actual_Charset : Unbounded_String;
-      Refined_Input  : Internal_Lexer_Input := Input;
-
    begin
+      Created := Cur = No_Element;
+
       --  Determine which encoding to use. The parameter comes first, then the
       --  unit-specific default, then the context-specific one.
 
@@ -371,19 +379,19 @@ package body ${ada_lib_name}.Implementation is
          Actual_Charset := Context.Charset;
       end if;
 
-      if Refined_Input.Kind = File then
-         Refined_Input.Filename := Normalized_Filename;
+      if Input.Kind = File then
+         Input.Filename := Normalized_Filename;
       end if;
 
-      if Refined_Input.Kind in File | Bytes_Buffer then
-         Refined_Input.Charset := Actual_Charset;
+      if Input.Kind in File | Bytes_Buffer then
+         Input.Charset := Actual_Charset;
 
          --  Unless the caller requested a specific charset for this unit,
          --  allow the lexer to automatically discover the source file encoding
          --  before defaulting to the context-specific one. We do this trying
          --  to match a byte order mark.
 
-         Refined_Input.Read_BOM := Charset'Length = 0;
+         Input.Read_BOM := Charset'Length = 0;
       end if;
 
       --  Create the Internal_Unit if needed
@@ -395,6 +403,25 @@ package body ${ada_lib_name}.Implementation is
          Unit := Element (Cur);
       end if;
       Unit.Charset := Actual_Charset;
+   end Prepare_Unit;
+
+   --------------
+   -- Get_Unit --
+   --------------
+
+   function Get_Unit
+     (Context           : Internal_Context;
+      Filename, Charset : String;
+      Reparse           : Boolean;
+      Input             : Internal_Lexer_Input;
+      Rule              : Grammar_Rule) return Internal_Unit
+   is
+      Created       : Boolean;
+      Unit          : Internal_Unit;
+      Refined_Input : Internal_Lexer_Input := Input;
+   begin
+      Prepare_Unit
+        (Context, Filename, Charset, Rule, Refined_Input, Unit, Created);
 
       --  (Re)parse it if needed
 
@@ -463,6 +490,236 @@ package body ${ada_lib_name}.Implementation is
       return Get_Unit (Context, Filename, Charset, True, Input, Rule);
    end Get_From_Buffer;
 
+   --------------------
+   -- Get_From_Files --
+   --------------------
+
+   function Get_From_Files
+     (Context   : Internal_Context;
+      Filenames : Filename_Array;
+      Charset   : String;
+      Reparse   : Boolean;
+      Rule      : Grammar_Rule;
+      Jobs      : Positive) return Internal_Unit_Array
+   is
+      use Ada.Exceptions;
+
+      type Parsing_Job is limited record
+         Unit     : Internal_Unit;
+         Input    : Internal_Lexer_Input (File);
+         Reparsed : Reparsed_Unit;
+
+         Failed : Boolean := False;
+         Error  : Exception_Occurrence;
+         --  If parsing this unit raised an exception, set Failed to True and
+         --  save the exception in Error.
+      end record;
+
+      type Parsing_Job_Array is array (Positive range <>) of Parsing_Job;
+      type Parsing_Job_Array_Access is access Parsing_Job_Array;
+      procedure Free is new Ada.Unchecked_Deallocation
+        (Parsing_Job_Array, Parsing_Job_Array_Access);
+
+      package File_Sets is new Ada.Containers.Hashed_Sets
+        (Element_Type        => GNATCOLL.VFS.Virtual_File,
+         Hash                => GNATCOLL.VFS.Full_Name_Hash,
+         Equivalent_Elements => GNATCOLL.VFS."=");
+
+      Result : Internal_Unit_Array (Filenames'Range);
+
+      Parsing_Jobs : Parsing_Job_Array_Access :=
+         new Parsing_Job_Array (1 .. Filenames'Length);
+      Job_Count    : Natural := 0;
+      --  Units to parse, in Parsing_Jobs (1 .. Job_Count)
+
+      Scheduled : File_Sets.Set;
+      --  Set of files for the units in Parsing_Jobs, so that we parse units
+      --  only once even if Filenames contains duplicates.
+
+      Applied : Natural := 0;
+      --  Parsing_Jobs (1 .. Applied) are the jobs whose result was applied to
+      --  their unit (or discarded, for jobs that failed).
+
+      procedure Parse_Jobs;
+      --  Parse all units in Parsing_Jobs using Jobs tasks
+
+      procedure Free_Jobs;
+      --  Free the results of parsing jobs that were not applied and then
+      --  Parsing_Jobs itself. Do nothing if Parsing_Jobs is already freed.
+
+      ----------------
+      -- Parse_Jobs --
+      ----------------
+
+      procedure Parse_Jobs is
+
+         protected Queue is
+            procedure Next (Index : out Natural);
+            --  Return the index of the next job to process in Parsing_Jobs,
+            --  or 0 if there is no job left.
+         private
+            Last : Natural := 0;
+         end Queue;
+
+         task type Worker;
+         --  Process jobs from Queue until there is none left, using its own
+         --  parser.
+
+         -----------
+         -- Queue --
+         -----------
+
+         protected body Queue is
+            procedure Next (Index : out Natural) is
+            begin
+               if Last < Job_Count then
+                  Last := Last + 1;
+                  Index := Last;
+               else
+                  Index := 0;
+               end if;
+            end Next;
+         end Queue;
+
+         ------------
+         -- Worker --
+         ------------
+
+         task body Worker is
+            Parser : Parser_Type;
+            Index  : Natural;
+         begin
+            Initialize (Parser);
+            loop
+               Queue.Next (Index);
+               exit when Index = 0;
+
+               declare
+                  Job : Parsing_Job renames Parsing_Jobs (Index);
+               begin
+                  Do_Parsing (Job.Unit, Job.Input, Parser, Job.Reparsed);
+               exception
+                  when Exc : others =>
+                     Job.Failed := True;
+                     Save_Occurrence (Job.Error, Exc);
+               end;
+            end loop;
+            Destroy (Parser);
+         end Worker;
+
+         Workers : array (1 .. Natural'Min (Jobs, Job_Count)) of Worker;
+         pragma Unreferenced (Workers);
+      begin
+         --  Leaving this procedure waits for all workers to complete
+         null;
+      end Parse_Jobs;
+
+      ---------------
+      -- Free_Jobs --
+      ---------------
+
+      procedure Free_Jobs is
+      begin
+         if Parsing_Jobs = null then
+            return;
+         end if;
+
+         for Job of Parsing_Jobs (Applied + 1 .. Job_Count) loop
+            Destroy (Job.Reparsed);
+         end loop;
+         Free (Parsing_Jobs);
+      end Free_Jobs;
+
+   begin
+      --  First get the analysis units, creating them if needed, and
+      --  determine which ones to parse. This updates Context, so do this in
+      --  the current task.
+
+      for I in Filenames'Range loop
+         declare
+            Input   : Internal_Lexer_Input :=
+              (Kind     => File,
+               Charset  => <>,
+               Read_BOM => False,
+               Filename => <>);
+            Created : Boolean;
+         begin
+            Prepare_Unit
+              (Context, To_String (Filenames (I)), Charset, Rule, Input,
+               Result (I), Created);
+
+            if (Created or else Reparse)
+               and then not Scheduled.Contains (Input.Filename)
+            then
+               Scheduled.Insert (Input.Filename);
+               Job_Count := Job_Count + 1;
+               Parsing_Jobs (Job_Count).Unit := Result (I);
+               Parsing_Jobs (Job_Count).Input := Input;
+            end if;
+         end;
+      end loop;
+
+      --  Then lex and parse them. Each parsing job works only on the data of
+      --  the unit to parse, except for the symbol table, which supports
+      --  concurrent lookups, so they can run in parallel.
+
+      if Jobs = 1 or else Job_Count <= 1 then
+         for Job of Parsing_Jobs (1 .. Job_Count) loop
+            begin
+               Do_Parsing (Job.Unit, Job.Input, Job.Reparsed);
+            exception
+               when Exc : others =>
+                  Job.Failed := True;
+                  Save_Occurrence (Job.Error, Exc);
+            end;
+         end loop;
+      else
+         Parse_Jobs;
+      end if;
+
+      --  Finally replace the old trees with the new ones. This can
+      --  (re)populate lexical environments, which updates Context, so do this
+      --  in the current task, in the order of Filenames.
+
+      declare
+         Error  : Exception_Occurrence;
+         Failed : Boolean := False;
+      begin
+         for I in 1 .. Job_Count loop
+            declare
+               Job : Parsing_Job renames Parsing_Jobs (I);
+            begin
+               if Job.Failed then
+                  if not Failed then
+                     Failed := True;
+                     Save_Occurrence (Error, Job.Error);
+                  end if;
+                  Destroy (Job.Reparsed);
+               else
+                  Update_After_Reparse (Job.Unit, Job.Reparsed);
+               end if;
+            end;
+            Applied := I;
+         end loop;
+
+         Free_Jobs;
+         if Failed then
+            Reraise_Occurrence (Error);
+         end if;
+      end;
+
+      return Result;
+
+   exception
+      when others =>
+         --  Do not leak the results of the jobs that were not applied,
+         --  including the one whose Update_After_Reparse raised: what it
+         --  already moved to its unit is no longer in Job.Reparsed.
+
+         Free_Jobs;
+         raise;
+   end Get_From_Files;
+
    --------------------
    -- Get_With_Error --
    --------------------
@@ -567,6 +824,89 @@ package body ${ada_lib_name}.Implementation is
       Context.Logic_Resolution_Timeout := Timeout;
    end Set_Logic_Resolution_Timeout;
 
+   ---------------------------
+   -- Get_Memoization_Stats --
+   ---------------------------
+
+   procedure Get_Memoization_Stats
+     (Context : Internal_Context; Kept, Dropped : out Natural) is
+   begin
+      % if ctx.has_memoization:
+         Kept := Context.Mmz_Kept_Entries;
+         Dropped := Context.Mmz_Dropped_Entries;
+      % else:
+         pragma Unreferenced (Context);
+         Kept := 0;
+         Dropped := 0;
+      % endif
+   end Get_Memoization_Stats;
+
+   ----------------------
+   -- Set_Cache_Budget --
+   ----------------------
+
+   procedure Set_Cache_Budget
+     (Context              : Internal_Context;
+      Memoization_Entries  : Natural;
+      Lookup_Cache_Entries : Natural)
+   is
+      % if not ctx.has_memoization:
+         pragma Unreferenced (Memoization_Entries);
+      % endif
+   begin
+      % if ctx.has_memoization:
+         Context.Mmz_Stats.Budget := Memoization_Entries;
+      % endif
+      Context.Lookup_Caches.Stats.Budget := Lookup_Cache_Entries;
+   end Set_Cache_Budget;
+
+   ---------------------------------
+   -- Get_Memoization_Cache_Stats --
+   ---------------------------------
+
+   function Get_Memoization_Cache_Stats
+     (Context : Internal_Context) return Cache_Stats
+   is
+      % if not ctx.has_memoization:
+         pragma Unreferenced (Context);
+      % endif
+   begin
+      % if ctx.has_memoization:
+         return Context.Mmz_Stats;
+      % else:
+         return (others => <>);
+      % endif
+   end Get_Memoization_Cache_Stats;
+
+   ----------------------------
+   -- Get_Lookup_Cache_Stats --
+   ----------------------------
+
+   function Get_Lookup_Cache_Stats
+     (Context : Internal_Context) return Cache_Stats is
+   begin
+      return Context.Lookup_Caches.Stats;
+   end Get_Lookup_Cache_Stats;
+
+   -----------------------------
+   -- Set_Page_Cache_Capacity --
+   -----------------------------
+
+   procedure Set_Page_Cache_Capacity
+     (Context : Internal_Context; Pages : Natural) is
+   begin
+      Set_Capacity (Context.AST_Page_Cache, Pages);
+   end Set_Page_Cache_Capacity;
+
+   -------------------------
+   -- Get_Node_Pool_Stats --
+   -------------------------
+
+   function Get_Node_Pool_Stats (Unit : Internal_Unit) return Pool_Stats is
+   begin
+      return Get_Stats (Unit.AST_Mem_Pool);
+   end Get_Node_Pool_Stats;
+
    --------------------------
    -- Has_Rewriting_Handle --
    --------------------------
@@ -617,9 +957,15 @@ package body ${ada_lib_name}.Implementation is
 
       Destroy (Context.Templates_Unit);
       AST_Envs.Destroy (Context.Root_Scope);
+      AST_Envs.Destroy (Context.Lookup_Caches);
       Destroy (Context.Symbols);
       Destroy (Context.Parser);
       Destroy (Context.Unit_Provider);
+
+      --  All units are destroyed, and so are their node memory pools: we can
+      --  release the pages they left to the context.
+      Destroy (Context.AST_Page_Cache);
+
       Context_Pool.Release (Context);
    end Destroy;
 
@@ -680,6 +1026,9 @@ package body ${ada_lib_name}.Implementation is
       Saved_In_Populate_Lexical_Env : constant Boolean :=
          Unit.Context.In_Populate_Lexical_Env;
 
+      Start : Ada.Real_Time.Time;
+      --  When profiling analysis, time at which this PLE pass started
+
       procedure Reset_Envs_Caches (Unit : Internal_Unit) is
          procedure Internal
            (Node : access ${root_node_value_type}'Class) is
@@ -712,6 +1061,11 @@ package body ${ada_lib_name}.Implementation is
                                          & Basename (Unit));
       GNATCOLL.Traces.Increase_Indent (Main_Trace);
 
+      --  Nested PLE passes are accounted for in the outermost one
+      if Profile_Analysis and then not Saved_In_Populate_Lexical_Env then
+         Start := Ada.Real_Time.Clock;
+      end if;
+
       Context.In_Populate_Lexical_Env := True;
 
       % if ctx.ple_unit_root:
@@ -741,6 +1095,21 @@ package body ${ada_lib_name}.Implementation is
 
       Reset_Envs_Caches (Unit);
 
+      % if ctx.has_memoization:
+         --  This pass may have created exiled entries, for instance in the
+         --  root scope: lookups for their symbols in environments that Unit
+         --  does not own may now yield different results, so drop the
+         --  memoized results that depend on them. This matters even for
+         --  units that are populated for the first time, as other units may
+         --  have tried to resolve names that they define before they were
+         --  loaded.
+         Invalidate_Memoization (Unit);
+      % endif
+
+      if Profile_Analysis and then not Saved_In_Populate_Lexical_Env then
+         Analysis_Profiler.Add (Env_Population, Start);
+      end if;
+
       if Has_Errors and then not Context.Discard_Errors_In_Populate_Lexical_Env
       then
          raise Property_Error with
@@ -983,6 +1352,8 @@ package body ${ada_lib_name}.Implementation is
       Analysis_Unit_Sets.Destroy (Unit.Referenced_Units);
 
       % if ctx.has_memoization:
+         Unit.Context.Mmz_Stats.Entries :=
+            Unit.Context.Mmz_Stats.Entries - Length (Unit.Memoization_Map);
          Destroy (Unit.Memoization_Map);
       % endif
 
@@ -1522,8 +1893,8 @@ package body ${ada_lib_name}.Implementation is
 
       function Sloc (T : Token_Pos) return Source_Location is
         (if T.Anchor = T_Start
-         then Start_Sloc (Get (T.Pos).Sloc_Range)
-         else End_Sloc (Get (T.Pos).Sloc_Range));
+         then Sloc_Start (TDH, Get (T.Pos))
+         else Sloc_End (TDH, Get (T.Pos)));
 
    begin
       if Node.Is_Synthetic then
@@ -3376,6 +3747,7 @@ package body ${ada_lib_name}.Implementation is
          Unit_Version      => <>
          % if ctx.has_memoization:
          , Memoization_Map => <>
+         , Mmz_Stale       => <>
          % endif
       );
    begin
@@ -3468,6 +3840,10 @@ package body ${ada_lib_name}.Implementation is
    procedure Invalidate_Caches
      (Context : Internal_Context; Invalidate_Envs : Boolean) is
    begin
+      if not Invalidate_Envs then
+         return;
+      end if;
+
       --  Increase Context's version number. If we are about to overflow, reset
       --  all version numbers from analysis units.
       if Context.Cache_Version = Natural'Last then
@@ -3478,12 +3854,93 @@ package body ${ada_lib_name}.Implementation is
       else
          Context.Cache_Version := Context.Cache_Version + 1;
       end if;
-
-      if Invalidate_Envs then
-         Context.Reparse_Cache_Version := Context.Cache_Version;
-      end if;
    end Invalidate_Caches;
 
+   % if ctx.has_memoization:
+
+      ----------------------------
+      -- Invalidate_Memoization --
+      ----------------------------
+
+      procedure Invalidate_Memoization (Unit : Internal_Unit) is
+         Context : constant Internal_Context := Unit.Context;
+         Symbols : Mmz_Symbol_Sets.Set;
+         Kept    : Natural := 0;
+         Dropped : Natural := 0;
+         Changed : Boolean := True;
+         Dummy   : Boolean;
+
+         procedure Process (U : Internal_Unit);
+         --  Remove the stale entries from U's memoization map
+
+         -------------
+         -- Process --
+         -------------
+
+         procedure Process (U : Internal_Unit) is
+         begin
+            --  All entries in U's memoization map have U in their keys, so if
+            --  U is stale, they are all stale.
+
+            Remove_Stale_Entries
+              (U.Memoization_Map, Symbols, U.Mmz_Stale, Kept, Dropped);
+         end Process;
+
+      begin
+         --  Flag Unit as stale, as well as all the units that reference it,
+         --  directly or not: their lexical environments may now contain
+         --  different entries.
+
+         Unit.Mmz_Stale := True;
+         while Changed loop
+            Changed := False;
+            for U of Context.Units loop
+               if not U.Mmz_Stale then
+                  for Referenced of
+                     Analysis_Unit_Sets.Elements (U.Referenced_Units)
+                  loop
+                     if Referenced.Mmz_Stale then
+                        U.Mmz_Stale := True;
+                        Changed := True;
+                        exit;
+                     end if;
+                  end loop;
+               end if;
+            end loop;
+         end loop;
+
+         --  Lookups in environments that Unit does not own may also yield
+         --  different results for the symbols of its exiled entries.
+
+         for E of Unit.Exiled_Entries loop
+            Dummy := Mmz_Symbol_Sets.Add (Symbols, E.Key);
+         end loop;
+
+         for U of Context.Units loop
+            Process (U);
+         end loop;
+         if Context.Templates_Unit /= No_Analysis_Unit then
+            Process (Context.Templates_Unit);
+         end if;
+
+         --  Reset stale flags for the next invalidation
+
+         for U of Context.Units loop
+            U.Mmz_Stale := False;
+         end loop;
+         Unit.Mmz_Stale := False;
+         Mmz_Symbol_Sets.Destroy (Symbols);
+
+         Context.Mmz_Kept_Entries := Context.Mmz_Kept_Entries + Kept;
+         Context.Mmz_Dropped_Entries := Context.Mmz_Dropped_Entries + Dropped;
+         Context.Mmz_Stats.Entries := Context.Mmz_Stats.Entries - Dropped;
+         GNATCOLL.Traces.Trace
+           (Main_Trace, "Memoization invalidation for " & Basename (Unit)
+                        & ":" & Kept'Img & " entries kept,"
+                        & Dropped'Img & " entries dropped");
+      end Invalidate_Memoization;
+   % endif
+
    ------------------
    --  Reset_Envs  --
    ------------------
@@ -3571,23 +4028,95 @@ package body ${ada_lib_name}.Implementation is
    ------------------
 
    procedure Reset_Caches (Unit : Internal_Unit) is
-      Cache_Version : constant Natural := Unit.Cache_Version;
    begin
-      if Cache_Version < Unit.Context.Reparse_Cache_Version then
-         Unit.Cache_Version := Unit.Context.Reparse_Cache_Version;
-         Reset_Envs (Unit);
-      end if;
-
-      if Cache_Version < Unit.Context.Cache_Version then
+      if Unit.Cache_Version < Unit.Context.Cache_Version then
          Unit.Cache_Version := Unit.Context.Cache_Version;
-         % if ctx.has_memoization:
-            Destroy (Unit.Memoization_Map);
-         % endif
+         Reset_Envs (Unit);
       end if;
    end Reset_Caches;
 
    % if ctx.has_memoization:
 
+      function Next_Mmz_Unit
+        (Context : Internal_Context;
+         Unit    : Internal_Unit) return Internal_Unit;
+      --  Return the unit after Unit in the cycle of units whose memoization
+      --  tables the eviction algorithm goes over: all units in
+      --  Context.Units, then Context.Templates_Unit if it exists. If Unit is
+      --  No_Analysis_Unit, return the first unit of the cycle.
+
+      procedure Evict_Memoization_Entries (Context : Internal_Context);
+      --  Remove entries from the memoization tables of all units in Context
+      --  until they contain no more entries than Context.Mmz_Stats.Budget,
+      --  or until all remaining entries are being evaluated. Entries to
+      --  remove are chosen using the CLOCK algorithm, which approximates
+      --  LRU, with a hand that goes over each unit's table in turn.
+
+      -------------------
+      -- Next_Mmz_Unit --
+      -------------------
+
+      function Next_Mmz_Unit
+        (Context : Internal_Context;
+         Unit    : Internal_Unit) return Internal_Unit
+      is
+         use Units_Maps;
+
+         Cur : Cursor := No_Element;
+      begin
+         if Unit /= No_Analysis_Unit and then Unit /= Context.Templates_Unit
+         then
+            Cur := Next (Context.Units.Find (Unit.Filename));
+            if not Has_Element (Cur)
+               and then Context.Templates_Unit /= No_Analysis_Unit
+            then
+               return Context.Templates_Unit;
+            end if;
+         end if;
+
+         if not Has_Element (Cur) then
+            Cur := Context.Units.First;
+         end if;
+         return (if Has_Element (Cur)
+                 then Element (Cur)
+                 else Context.Templates_Unit);
+      end Next_Mmz_Unit;
+
+      -------------------------------
+      -- Evict_Memoization_Entries --
+      -------------------------------
+
+      procedure Evict_Memoization_Entries (Context : Internal_Context) is
+         Stats   : Cache_Stats renames Context.Mmz_Stats;
+         Evicted : Natural;
+         Wrapped : Boolean;
+
+         Visits : Natural := 2 * (Natural (Context.Units.Length) + 1) + 1;
+         --  Two rounds over all tables (including the one of the templates
+         --  unit) are enough to evict any entry that is not being evaluated:
+         --  the first one clears all reference bits. The hand may start in
+         --  the middle of a table, hence the extra visit.
+      begin
+         if Context.Mmz_Hand = No_Analysis_Unit then
+            Context.Mmz_Hand := Next_Mmz_Unit (Context, No_Analysis_Unit);
+         end if;
+
+         while Stats.Entries > Stats.Budget and then Visits > 0 loop
+            Evict
+              (Context.Mmz_Hand.Memoization_Map,
+               Stats.Entries - Stats.Budget,
+               Evicted,
+               Wrapped);
+            Stats.Entries := Stats.Entries - Evicted;
+            Stats.Evictions := Stats.Evictions + Cache_Counter (Evicted);
+            if Wrapped then
+               Context.Mmz_Hand := Next_Mmz_Unit (Context, Context.Mmz_Hand);
+            end if;
+
+            Visits := Visits - 1;
+         end loop;
+      end Evict_Memoization_Entries;
+
       ----------------------------
       -- Lookup_Memoization_Map --
       ----------------------------
@@ -3595,19 +4124,28 @@ package body ${ada_lib_name}.Implementation is
       function Lookup_Memoization_Map
         (Unit   : Internal_Unit;
          Key    : in out Mmz_Key;
-         Cursor : out Memoization_Maps.Cursor) return Boolean
+         Cursor : out Mmz_Cursor) return Boolean
       is
+         Stats    : Cache_Stats renames Unit.Context.Mmz_Stats;
          Inserted : Boolean;
-         Value    : constant Mmz_Value := (Kind => Mmz_Evaluating);
       begin
-         --  Make sure that we don't lookup stale caches
-         Reset_Caches (Unit);
+         Insert (Unit.Memoization_Map, Key, Cursor, Inserted);
+
+         if Inserted then
+            Stats.Misses := Stats.Misses + 1;
+            Stats.Entries := Stats.Entries + 1;
 
-         Unit.Memoization_Map.Insert (Key, Value, Cursor, Inserted);
+            --  Stay within the budget if there is one. The budget applies to
+            --  all the memoization tables of the context, so eviction can
+            --  remove entries from other units' tables.
 
-         if not Inserted then
-            Destroy (Key.Items);
-            Key := Memoization_Maps.Key (Cursor);
+            if Stats.Budget > 0 and then Stats.Entries > Stats.Budget then
+               Evict_Memoization_Entries (Unit.Context);
+            end if;
+
+         else
+            Stats.Hits := Stats.Hits + 1;
+            Destroy (Key);
          end if;
 
          return Inserted;
@@ -3647,6 +4185,19 @@ package body ${ada_lib_name}.Implementation is
    procedure Do_Parsing
      (Unit   : Internal_Unit;
       Input  : Internal_Lexer_Input;
+      Result : out Reparsed_Unit) is
+   begin
+      Do_Parsing (Unit, Input, Unit.Context.Parser, Result);
+   end Do_Parsing;
+
+   ----------------
+   -- Do_Parsing --
+   ----------------
+
+   procedure Do_Parsing
+     (Unit   : Internal_Unit;
+      Input  : Internal_Lexer_Input;
+      Parser : in out Parser_Type;
       Result : out Reparsed_Unit)
    is
       Context  : constant Internal_Context := Unit.Context;
@@ -3727,7 +4278,7 @@ package body ${ada_lib_name}.Implementation is
       begin
          Init_Parser
            (Input, Context.Tab_Stop, Context.With_Trivia, Unit, Unit_TDH,
-            Unit.Context.Parser);
+            Parser);
       exception
          when Exc : Name_Error =>
             --  This happens when we cannot open the source file for lexing:
@@ -3760,13 +4311,18 @@ package body ${ada_lib_name}.Implementation is
       --  We have correctly setup a parser! Now let's parse and return what we
       --  get.
 
-      Result.AST_Mem_Pool := Create;
-      Unit.Context.Parser.Mem_Pool := Result.AST_Mem_Pool;
+      Result.AST_Mem_Pool := Create (Unit.Context.AST_Page_Cache);
+      Parser.Mem_Pool := Result.AST_Mem_Pool;
 
       Result.AST_Root := ${root_node_type_name}
-        (Parse (Unit.Context.Parser, Rule => Unit.Rule));
-      Result.Diagnostics.Append (Unit.Context.Parser.Diagnostics);
+        (Parse (Parser, Rule => Unit.Rule));
+      Result.Diagnostics.Append (Parser.Diagnostics);
       Rotate_TDH;
+
+      if Profile_Analysis then
+         Analysis_Profiler.Add_Pool_Size
+           (Natural (Allocated_Size (Result.AST_Mem_Pool)));
+      end if;
    end Do_Parsing;
 
    --------------------------
@@ -3781,13 +4337,17 @@ package body ${ada_lib_name}.Implementation is
       Reparsed.Diagnostics.Clear;
 
       --  As (re-)loading a unit can change how any AST node property in the
-      --  whole analysis context behaves, we have to invalidate caches. This
-      --  is likely overkill, but kill all caches here as it's easy to do.
+      --  whole analysis context behaves, we have to invalidate caches. Only
+      --  drop the memoized results that depend on Unit: this must happen
+      --  before its old nodes and exiled entries are gone.
       --
       --  As an optimization, invalidate referenced envs cache only if this is
       --  not the first time we parse Unit.
       Invalidate_Caches
         (Unit.Context, Invalidate_Envs => Unit.AST_Root /= null);
+      % if ctx.has_memoization:
+         Invalidate_Memoization (Unit);
+      % endif
 
       --  Likewise for token data
       Free (Unit.TDH);
@@ -3827,6 +4387,8 @@ package body ${ada_lib_name}.Implementation is
 
          Saved_In_Populate_Lexical_Env : constant Boolean :=
             Context.In_Populate_Lexical_Env;
+
+         Start : constant Ada.Real_Time.Time := Ada.Real_Time.Clock;
       begin
          GNATCOLL.Traces.Trace
            (Main_Trace, "Updating lexical envs for " & Unit_Name
@@ -3865,8 +4427,15 @@ package body ${ada_lib_name}.Implementation is
          end loop;
          Foreign_Nodes.Destroy;
 
+         --  Note that re-populating Unit's lexical envs also drops the
+         --  memoized results that depend on its new exiled entries.
          Populate_Lexical_Env (Unit);
          Context.In_Populate_Lexical_Env := Saved_In_Populate_Lexical_Env;
+
+         if Profile_Analysis and then not Saved_In_Populate_Lexical_Env then
+            Analysis_Profiler.Add (Env_Population, Start);
+         end if;
+
          GNATCOLL.Traces.Decrease_Indent (Main_Trace);
       end;
    end Update_After_Reparse;
@@ -4069,6 +4638,8 @@ package body ${ada_lib_name}.Implementation is
             --  in its Parent's Children list.
             if R.Parent = null then
                R.Old_Env.Env.Rebindings_Pool.Delete (R.New_Env);
+               AST_Envs.Env_Stats.Pooled_Rebindings :=
+                  AST_Envs.Env_Stats.Pooled_Rebindings - 1;
             else
                Unregister (R, R.Parent.Children);
             end if;
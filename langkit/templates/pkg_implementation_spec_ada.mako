@@ -818,6 +818,9 @@ private package ${ada_lib_name}.Implementation is
    --  this is implemented using the untyped (using System.Address)
    --  implementation helper.
 
+   package Analysis_Unit_Sets is new Langkit_Support.Cheap_Sets
+     (Internal_Unit, null);
+
    % if ctx.has_memoization:
    ------------------------
    --  Memoization state --
@@ -845,9 +848,6 @@ private package ${ada_lib_name}.Implementation is
    package Destroyable_Vectors is new Langkit_Support.Vectors
      (Destroyable_Type);
 
-   package Analysis_Unit_Sets is new Langkit_Support.Cheap_Sets
-     (Internal_Unit, null);
-
    package Units_Maps is new Ada.Containers.Hashed_Maps
      (Key_Type        => GNATCOLL.VFS.Virtual_File,
       Element_Type    => Internal_Unit,
@@ -949,12 +949,16 @@ private package ${ada_lib_name}.Implementation is
       --  The lexical scope that is shared amongst every compilation unit. Used
       --  to resolve cross file references.
 
+      Lookup_Caches : aliased AST_Envs.Lookup_Cache_Set;
+      --  Statistics for the lookup caches of all lexical environments in this
+      --  context, and the maximum number of entries they can contain.
+
       Unit_Provider : Internal_Unit_Provider_Access;
       --  Object to translate unit names to file names
 
       Parser : Parser_Type;
-      --  Main parser type. TODO: If we want to parse in several tasks, we'll
-      --  replace that by an array of parsers.
+      --  Main parser type. Units parsed in several tasks (see Get_From_Files)
+      --  use one parser per task instead.
 
       Discard_Errors_In_Populate_Lexical_Env : Boolean;
       --  See the eponym procedure
@@ -971,13 +975,25 @@ private package ${ada_lib_name}.Implementation is
       --  Set_Logic_Resolution_Timeout procedure.
 
       Cache_Version : Natural;
-      --  Version number used to invalidate memoization caches in a lazy
-      --  fashion. If an analysis unit's version number is strictly inferior to
-      --  this, its memoization map should be cleared.
+      --  Version number used to invalidate referenced envs caches in a lazy
+      --  fashion. It is incremented only when a unit is reparsed in the
+      --  context. If an analysis unit's version number is strictly inferior
+      --  to this, its referenced envs caches should be reset.
 
-      Reparse_Cache_Version : Natural;
-      --  Version number used to invalidate referenced envs caches. It is
-      --  incremented only when a unit is reparsed in the context.
+      % if ctx.has_memoization:
+         Mmz_Kept_Entries, Mmz_Dropped_Entries : Natural;
+         --  Number of memoization entries that invalidations after reparsing
+         --  kept/dropped so far (see Invalidate_Memoization).
+
+         Mmz_Stats : Cache_Stats;
+         --  Statistics for the memoization tables of all units in this
+         --  context, and the maximum number of entries they can contain (see
+         --  Lookup_Memoization_Map).
+
+         Mmz_Hand : Internal_Unit;
+         --  Unit whose memoization table the eviction algorithm will consider
+         --  next, or No_Analysis_Unit if it has not run yet.
+      % endif
 
       Rewriting_Handle : Rewriting_Handle_Pointer :=
          No_Rewriting_Handle_Pointer;
@@ -988,6 +1004,11 @@ private package ${ada_lib_name}.Implementation is
       --  Special analysis unit used only as a containing unit to parse
       --  templates in the context of tree rewriting.
 
+      AST_Page_Cache : Page_Cache := No_Page_Cache;
+      --  Free pages for the node memory pools of this context's units. Pools
+      --  give their pages back to it when units are reparsed or destroyed, so
+      --  that the next parsing reuses them.
+
       Released : Boolean;
       --  Whether this context has been released and thus is available in
       --  Context_Pool.
@@ -1063,8 +1084,12 @@ private package ${ada_lib_name}.Implementation is
       --  need to be destroyed too (see Destroy_Rebindings).
 
       % if ctx.has_memoization:
-         Memoization_Map : Memoization_Maps.Map;
+         Memoization_Map : Mmz_Table;
          --  Mapping of arguments tuple to property result for memoization
+
+         Mmz_Stale : Boolean := False;
+         --  Whether the memoization entries that depend on this unit are
+         --  stale. This is used only during Invalidate_Memoization.
       % endif
 
       Cache_Version : Natural := 0;
@@ -1111,6 +1136,17 @@ private package ${ada_lib_name}.Implementation is
       with Pre => not Has_Unit (Context, +Normalized_Filename.Full_Name);
    --  Create a new analysis unit and register it in Context
 
+   procedure Prepare_Unit
+     (Context           : Internal_Context;
+      Filename, Charset : String;
+      Rule              : Grammar_Rule;
+      Input             : in out Internal_Lexer_Input;
+      Unit              : out Internal_Unit;
+      Created           : out Boolean);
+   --  Helper for Get_Unit and Get_From_Files. Get the analysis unit for
+   --  Filename in Context, creating it if needed (in which case set Created to
+   --  True), and refine Input so that it can be used to parse this unit.
+
    function Get_Unit
      (Context           : Internal_Context;
       Filename, Charset : String;
@@ -1143,6 +1179,19 @@ private package ${ada_lib_name}.Implementation is
       with Pre => not Has_Rewriting_Handle (Context);
    --  Implementation for Analysis.Get_From_Buffer
 
+   type Internal_Unit_Array is array (Positive range <>) of Internal_Unit;
+   type Filename_Array is array (Positive range <>) of Unbounded_String;
+
+   function Get_From_Files
+     (Context   : Internal_Context;
+      Filenames : Filename_Array;
+      Charset   : String;
+      Reparse   : Boolean;
+      Rule      : Grammar_Rule;
+      Jobs      : Positive) return Internal_Unit_Array
+      with Pre => not Reparse or else not Has_Rewriting_Handle (Context);
+   --  Implementation for Analysis.Get_From_Files
+
    function Get_With_Error
      (Context  : Internal_Context;
       Filename : String;
@@ -1182,6 +1231,31 @@ private package ${ada_lib_name}.Implementation is
      (Context : Internal_Context; Timeout : Natural);
    --  Implementation for Analysis.Set_Logic_Resolution_Timeout
 
+   procedure Get_Memoization_Stats
+     (Context : Internal_Context; Kept, Dropped : out Natural);
+   --  Implementation for Analysis.Get_Memoization_Stats
+
+   procedure Set_Cache_Budget
+     (Context              : Internal_Context;
+      Memoization_Entries  : Natural;
+      Lookup_Cache_Entries : Natural);
+   --  Implementation for Analysis.Set_Cache_Budget
+
+   function Get_Memoization_Cache_Stats
+     (Context : Internal_Context) return Cache_Stats;
+   --  Implementation for Analysis.Get_Memoization_Cache_Stats
+
+   function Get_Lookup_Cache_Stats
+     (Context : Internal_Context) return Cache_Stats;
+   --  Implementation for Analysis.Get_Lookup_Cache_Stats
+
+   procedure Set_Page_Cache_Capacity
+     (Context : Internal_Context; Pages : Natural);
+   --  Implementation for Analysis.Set_Page_Cache_Capacity
+
+   function Get_Node_Pool_Stats (Unit : Internal_Unit) return Pool_Stats;
+   --  Implementation for Analysis.Get_Node_Pool_Stats
+
    function Has_Rewriting_Handle (Context : Internal_Context) return Boolean;
    --  Implementation for Analysis.Has_Rewriting_Handle
 
@@ -1272,21 +1346,36 @@ private package ${ada_lib_name}.Implementation is
 
    procedure Invalidate_Caches
      (Context : Internal_Context; Invalidate_Envs : Boolean);
-   --  Invalidate memoization caches. If Invalidate_Envs is true, also
-   --  invalidate referenced envs caches.
+   --  If Invalidate_Envs is true, invalidate referenced envs caches. Note
+   --  that memoization caches are invalidated separately, see
+   --  Invalidate_Memoization.
 
    procedure Reset_Caches (Unit : Internal_Unit);
-   --  Destroy Unit's memoization cache. This resets Unit's version number to
-   --  Unit.Context.Cache_Version.
+   --  Reset Unit's referenced envs caches if they are stale. This resets
+   --  Unit's version number to Unit.Context.Cache_Version.
 
    % if ctx.has_memoization:
+      procedure Invalidate_Memoization (Unit : Internal_Unit);
+      --  Remove the memoization entries that may be stale after Unit was
+      --  (re)parsed or had its lexical environments (re)populated, in all
+      --  units of Unit's context. The entries to remove are the ones whose
+      --  dependencies (see Mmz_Deps) involve Unit, any unit that references
+      --  it, directly or not (see Reference_Unit), or a symbol for which Unit
+      --  has exiled entries, as looking it up in the corresponding
+      --  environments may now yield different results. The entries that have
+      --  untracked dependencies are removed as well, but not the ones that
+      --  are still being evaluated.
+
       function Lookup_Memoization_Map
         (Unit   : Internal_Unit;
          Key    : in out Mmz_Key;
-         Cursor : out Memoization_Maps.Cursor) return Boolean;
+         Cursor : out Mmz_Cursor) return Boolean;
       --  Look for a memoization entry in Unit.Memoization_Map that correspond
       --  to Key, creating one if none is found, and store it in Cursor. If one
       --  was created, return True. Otherwise, destroy Key and return False.
+      --
+      --  If creating an entry makes the memoization tables of Unit's context
+      --  exceed the memoization budget, evict other entries from them.
    % endif
 
    procedure Reference_Unit (From, Referenced : Internal_Unit);
@@ -1304,6 +1393,15 @@ private package ${ada_lib_name}.Implementation is
    --  Parse text for Unit using Input and store the result in Result. This
    --  leaves Unit unchanged.
 
+   procedure Do_Parsing
+     (Unit   : Internal_Unit;
+      Input  : Internal_Lexer_Input;
+      Parser : in out Parser_Type;
+      Result : out Reparsed_Unit);
+   --  Likewise, but use Parser instead of Unit's context parser. Calls for
+   --  different units with different parsers can run in parallel, as long
+   --  as no other task updates their context.
+
    procedure Update_After_Reparse
      (Unit : Internal_Unit; Reparsed : in out Reparsed_Unit);
    --  Update Unit's AST from Reparsed and update stale lexical environment
@@ -198,6 +198,17 @@ package body ${ada_lib_name}.Iterators is
       end return;
    end Kind_Is;
 
+   -------------
+   -- Kind_In --
+   -------------
+
+   function Kind_In (Kinds : Kind_Set) return ${pred_ref} is
+   begin
+      return Result : ${pred_ref} do
+         Result.Set (Kind_Set_Predicate'(${pred_iface} with Kinds => Kinds));
+      end return;
+   end Kind_In;
+
    -------------
    -- Text_Is --
    -------------
@@ -488,6 +499,16 @@ package body ${ada_lib_name}.Iterators is
    -- Evaluate --
    --------------
 
+   overriding function Evaluate
+     (P : in out Kind_Set_Predicate; N : ${node}) return Boolean is
+   begin
+      return P.Kinds (Kind (N));
+   end Evaluate;
+
+   --------------
+   -- Evaluate --
+   --------------
+
    overriding function Evaluate
      (P : in out Text_Predicate; N : ${node}) return Boolean
    is
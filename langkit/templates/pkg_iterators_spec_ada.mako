@@ -186,6 +186,16 @@ package ${ada_lib_name}.Iterators is
    --
    --% belongs-to: ${pred_ref}
 
+   type Kind_Set is array (${root_node_kind_name}) of Boolean;
+   --  Set of node kinds
+
+   function Kind_In (Kinds : Kind_Set) return ${pred_ref};
+   --  Return a predicate that accepts only nodes whose kind is in ``Kinds``.
+   --  This is equivalent to, but much faster than, combining one ``Kind_Is``
+   --  predicate per kind with the ``or`` operator.
+   --
+   --% belongs-to: ${pred_ref}
+
    function Text_Is (Text : Text_Type) return ${pred_ref};
    --  Return a predicate that accepts only nodes that match the given ``Text``
    --
@@ -298,6 +308,14 @@ private
    overriding function Evaluate
      (P : in out Kind_Predicate; N : ${node}) return Boolean;
 
+   type Kind_Set_Predicate is new ${pred_iface} with record
+      Kinds : Kind_Set;
+   end record;
+   --  Predicate that returns true for all nodes whose kind is in some set
+
+   overriding function Evaluate
+     (P : in out Kind_Set_Predicate; N : ${node}) return Boolean;
+
    type Text_Predicate is new ${pred_iface} with record
       Text : Unbounded_Text_Type;
    end record;
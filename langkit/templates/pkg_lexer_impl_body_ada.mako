@@ -11,6 +11,7 @@
    with_trivia_actions = token_actions('WithTrivia')
 %>
 
+with Ada.Characters.Handling;
 with Ada.Unchecked_Conversion;
 
 with System;
@@ -52,6 +53,21 @@ package body ${ada_lib_name}.Lexer_Implementation is
    --  Invalid_Input if Buffer contains invalid byte sequences according to
    --  Charset.
 
+   procedure Decode_Without_Iconv
+     (Buffer      : String;
+      Input_Index : Positive;
+      Charset     : String;
+      Result      : in out Text_Type;
+      Last        : out Natural;
+      Success     : out Boolean);
+   --  Fast path for Decode_Buffer: if Charset is ASCII, ISO-8859-1 or UTF-8,
+   --  decode Buffer (Input_Index .. Buffer'Last) directly into Result, set
+   --  Last to the index in Result of the last decoded character and set
+   --  Success to True. Set Success to False if Charset is not one of these or
+   --  if Buffer contains anything but well-formed input for it: in that case,
+   --  the caller must fall back to Iconv, which also takes care of reporting
+   --  errors.
+
    procedure Extract_Tokens_From_Text_Buffer
      (Decoded_Buffer : Text_Access;
       Source_First   : Positive;
@@ -77,7 +93,6 @@ package body ${ada_lib_name}.Lexer_Implementation is
      (Input       : Text_Access;
       Input_First : Positive;
       Input_Last  : Natural;
-      Tab_Stop    : Positive;
       TDH         : in out Token_Data_Handler;
       Diagnostics : in out Diagnostics_Vectors.Vector);
 
@@ -95,7 +110,6 @@ package body ${ada_lib_name}.Lexer_Implementation is
      (Input       : Text_Access;
       Input_First : Positive;
       Input_Last  : Natural;
-      Tab_Stop    : Positive;
       TDH         : in out Token_Data_Handler;
       Diagnostics : in out Diagnostics_Vectors.Vector)
    is
@@ -107,17 +121,6 @@ package body ${ada_lib_name}.Lexer_Implementation is
       % endif
       Symbol                : Symbol_Type;
       Last_Token_Was_Trivia : Boolean := False;
-
-      Current_Sloc : Source_Location := (1, 1);
-      --  Source location before scanning the current token
-
-      Next_Sloc : Source_Location;
-      --  Source location after scanning the current token
-
-      Last_Token_Last : Natural := Input'First - 1;
-      --  Index in TDH.Source_Buffer for the last character of the previous
-      --  token. Used to process chunks of ignored text.
-
       ## Variables specific to indentation tracking
       % if lexer.track_indent:
 
@@ -147,7 +150,8 @@ package body ${ada_lib_name}.Lexer_Implementation is
       --  Likewise, for the last character
 
       function Sloc_Range return Source_Location_Range is
-        (Make_Range (Current_Sloc, Next_Sloc));
+        (Make_Range (Get_Sloc (TDH, Source_First),
+                     Get_Sloc (TDH, Source_Last + 1)));
       --  Create a sloc range value corresponding to Token
 
       procedure Prepare_For_Trivia
@@ -155,10 +159,6 @@ package body ${ada_lib_name}.Lexer_Implementation is
       --  Append an entry for the current token in the Tokens_To_Trivias
       --  correspondence vector.
 
-      function Sloc_After
-        (Base_Sloc : Source_Location; Text : Text_Type) return Source_Location;
-      --  Return Base_Sloc updated as if Text was appended
-
       ------------------------
       -- Prepare_For_Trivia --
       ------------------------
@@ -175,41 +175,6 @@ package body ${ada_lib_name}.Lexer_Implementation is
          end if;
       end Prepare_For_Trivia;
 
-      ----------------
-      -- Sloc_After --
-      ----------------
-
-      function Sloc_After
-        (Base_Sloc : Source_Location; Text : Text_Type) return Source_Location
-      is
-      begin
-         return Result : Source_Location := Base_Sloc do
-            --  TODO: use the Unicode algorithm to account for grapheme
-            --  clusters.
-            for T of Text loop
-               case T is
-                  when Chars.LF =>
-                     Result := (Result.Line + 1, 1);
-
-                  when Chars.HT =>
-                     --  Make horizontal tabulations move by stride of 8
-                     --  columns, as usually implemented in code editors.
-                     declare
-                        Zero_Based : constant Natural :=
-                           Natural (Result.Column - 1);
-                        Aligned    : constant Natural :=
-                           (Zero_Based + Tab_Stop) / Tab_Stop * Tab_Stop;
-                     begin
-                        Result.Column := Column_Number (Aligned + 1);
-                     end;
-
-                  when others =>
-                     Result.Column := Result.Column + 1;
-               end case;
-            end loop;
-         end return;
-      end Sloc_After;
-
       State : Lexer_State;
 
    begin
@@ -230,25 +195,6 @@ package body ${ada_lib_name}.Lexer_Implementation is
          Token_Id := Token.Kind;
          Symbol := null;
 
-         --  Initialize the first sloc for the token to come. For this, process
-         --  the text that was ignored since the last token.
-         declare
-            Ignored_Text : Text_Type renames
-               TDH.Source_Buffer (Last_Token_Last + 1 .. Source_First - 1);
-         begin
-            Current_Sloc := Sloc_After (Current_Sloc, Ignored_Text);
-            Last_Token_Last := Source_Last;
-         end;
-
-         --  Then update Next_Sloc according to Token's text
-         if Token_Id /= ${termination} then
-            declare
-               Text : Text_Type renames Input (Source_First .. Source_Last);
-            begin
-               Next_Sloc := Sloc_After (Current_Sloc, Text);
-            end;
-         end if;
-
          case Token_Id is
 
          % if with_symbol_actions:
@@ -293,8 +239,7 @@ package body ${ada_lib_name}.Lexer_Implementation is
                       T        => (Kind         => From_Token_Kind (Token_Id),
                                    Source_First => Source_First,
                                    Source_Last  => Source_Last,
-                                   Symbol       => null,
-                                   Sloc_Range   => Sloc_Range)));
+                                   Symbol       => null)));
 
                   Last_Token_Was_Trivia := True;
                end if;
@@ -321,8 +266,7 @@ package body ${ada_lib_name}.Lexer_Implementation is
            ((Kind         => From_Token_Kind (Token_Id),
              Source_First => Source_First,
              Source_Last  => Source_Last,
-             Symbol       => Symbol,
-             Sloc_Range   => Sloc_Range));
+             Symbol       => Symbol));
 
          ##  This whole section is only emitted if the user chose to track
          ##  indentation in the lexer. It has complex machinery to emit
@@ -337,8 +281,7 @@ package body ${ada_lib_name}.Lexer_Implementation is
                  ((Kind         => From_Token_Kind (${lexer.Dedent.ada_name}),
                    Source_First => TDH.Source_Last + 1,
                    Source_Last  => TDH.Source_Last,
-                   Symbol       => null,
-                   Sloc_Range   => Sloc_Range));
+                   Symbol       => null));
                Columns_Stack_Len := Columns_Stack_Len - 1;
             end loop;
          end if;
@@ -369,30 +312,33 @@ package body ${ada_lib_name}.Lexer_Implementation is
             and then Token_Id /= ${lexer.Newline.ada_name}
          then
             declare
+               --  Indent/dedent tokens are empty and located at the start of
+               --  the current token.
+
                T : Stored_Token_Data :=
                  (Kind         => <>,
-                  Source_First => Source_First + 1,
-                  Source_Last  => Source_First,
-                  Symbol       => null,
-                  Sloc_Range   =>
-                    (Sloc_Range.Start_Line, Sloc_Range.Start_Line,
-                     Sloc_Range.Start_Column, Sloc_Range.Start_Column));
+                  Source_First => Source_First,
+                  Source_Last  => Source_First - 1,
+                  Symbol       => null);
+
+               Start_Column : constant Column_Number :=
+                  Get_Sloc (TDH, Source_First).Column;
             begin
-               if Sloc_Range.Start_Column < Get_Col then
+               if Start_Column < Get_Col then
                   --  Emit every necessary dedent token if the line is
                   --  dedented, and pop values from the stack.
-                  while Sloc_Range.Start_Column < Get_Col loop
+                  while Start_Column < Get_Col loop
                      T.Kind := From_Token_Kind (${lexer.Dedent.ada_name});
                      TDH.Tokens.Append (T);
                      Columns_Stack_Len := Columns_Stack_Len - 1;
                   end loop;
-               elsif Sloc_Range.Start_Column > Get_Col then
+               elsif Start_Column > Get_Col then
                   --  Emit a single indent token, and put the new value on the
                   --  indent stack.
                   T.Kind := From_Token_Kind (${lexer.Indent.ada_name});
                   TDH.Tokens.Append (T);
                   Columns_Stack_Len := Columns_Stack_Len + 1;
-                  Columns_Stack (Columns_Stack_Len) := Sloc_Range.Start_Column;
+                  Columns_Stack (Columns_Stack_Len) := Start_Column;
                end if;
             end;
 
@@ -415,8 +361,7 @@ package body ${ada_lib_name}.Lexer_Implementation is
               ((Kind         => From_Token_Kind (Token_Id),
                 Source_First => Source_First,
                 Source_Last  => Source_Last,
-                Symbol       => Symbol,
-                Sloc_Range   => Sloc_Range));
+                Symbol       => Symbol));
          end if;
          % endif
 
@@ -424,8 +369,8 @@ package body ${ada_lib_name}.Lexer_Implementation is
 
       % if lexer.token_actions['WithTrivia']:
          <<Dont_Append>>
+         null;
       % endif
-         Current_Sloc := Next_Sloc;
       end loop;
 
    end Process_All_Tokens;
@@ -444,22 +389,31 @@ package body ${ada_lib_name}.Lexer_Implementation is
       Tab_Stop       : Positive;
       With_Trivia    : Boolean;
       TDH            : in out Token_Data_Handler;
-      Diagnostics    : in out Diagnostics_Vectors.Vector) is
+      Diagnostics    : in out Diagnostics_Vectors.Vector)
+   is
+      Start : constant Time := Clock;
    begin
 
       --  In the case we are reparsing an analysis unit, we want to get rid of
       --  the tokens from the old one.
 
-      Reset (TDH, Decoded_Buffer, Source_First, Source_Last);
+      Reset (TDH, Decoded_Buffer, Source_First, Source_Last, Tab_Stop);
 
       if With_Trivia then
          Process_All_Tokens_With_Trivia
-           (Decoded_Buffer, Source_First, Source_Last, Tab_Stop, TDH,
-            Diagnostics);
+           (Decoded_Buffer, Source_First, Source_Last, TDH, Diagnostics);
       else
          Process_All_Tokens_No_Trivia
-           (Decoded_Buffer, Source_First, Source_Last, Tab_Stop, TDH,
-            Diagnostics);
+           (Decoded_Buffer, Source_First, Source_Last, TDH, Diagnostics);
+      end if;
+
+      --  Lexing is done: now that the lexer does not need the decoded buffer
+      --  anymore, shrink it if possible.
+
+      Narrow_Source_Buffer (TDH);
+
+      if Profile_Analysis then
+         Analysis_Profiler.Add (Lexing, Start);
       end if;
    end Extract_Tokens_From_Text_Buffer;
 
@@ -478,9 +432,14 @@ package body ${ada_lib_name}.Lexer_Implementation is
       Decoded_Buffer : Text_Access;
       Source_First   : Positive;
       Source_Last    : Natural;
+      Start          : constant Time := Clock;
    begin
       Decode_Buffer (Buffer, Charset, Read_BOM, Decoded_Buffer, Source_First,
                      Source_Last);
+      if Profile_Analysis then
+         Analysis_Profiler.Add (Decoding, Start);
+      end if;
+
       Extract_Tokens_From_Text_Buffer
         (Decoded_Buffer, Source_First, Source_Last, Tab_Stop, With_Trivia, TDH,
          Diagnostics);
@@ -612,8 +571,6 @@ package body ${ada_lib_name}.Lexer_Implementation is
          return;
       end if;
 
-      --  Create the Iconv converter. We will notice unknown charsets here
-
       declare
          BOM_Kind_To_Charset : constant
             array (UTF8_All .. UTF32_BE) of String_Access :=
@@ -627,7 +584,28 @@ package body ${ada_lib_name}.Lexer_Implementation is
            (if BOM in UTF8_All .. UTF32_BE
             then BOM_Kind_To_Charset (BOM).all
             else Charset);
+
+         Success : Boolean;
       begin
+         --  Most sources are ASCII, Latin-1 or UTF-8: decode them straight
+         --  from Buffer (which, for files, is the memory-mapped region) so
+         --  that we do not pay for the Iconv machinery.
+         --
+         --  Note that this still fills a full decoded copy of the source:
+         --  the lexer works on Text_Type, and the token data handler keeps
+         --  the decoded buffer as the unit's source text once lexing is done
+         --  (see Narrow_Source_Buffer), so decoding into Result is the only
+         --  copy of the source that lexing makes, not an intermediate one.
+
+         Decode_Without_Iconv
+           (Buffer, Input_Index, Actual_Charset, Result.all, Source_Last,
+            Success);
+         if Success then
+            return;
+         end if;
+
+         --  Create the Iconv converter. We will notice unknown charsets here
+
          State := Iconv_Open (Text_Charset, Actual_Charset);
       exception
          when Unsupported_Conversion =>
@@ -670,6 +648,108 @@ package body ${ada_lib_name}.Lexer_Implementation is
       Iconv_Close (State);
    end Decode_Buffer;
 
+   --------------------------
+   -- Decode_Without_Iconv --
+   --------------------------
+
+   procedure Decode_Without_Iconv
+     (Buffer      : String;
+      Input_Index : Positive;
+      Charset     : String;
+      Result      : in out Text_Type;
+      Last        : out Natural;
+      Success     : out Boolean)
+   is
+      type Native_Charset is (Unsupported, ASCII_7, ISO_8859_1, UTF_8);
+
+      Upper_Charset : constant String :=
+         Ada.Characters.Handling.To_Upper (Charset);
+      Kind          : constant Native_Charset :=
+        (if Upper_Charset in "ASCII" | "US-ASCII"
+         then ASCII_7
+         elsif Upper_Charset in "ISO-8859-1" | "ISO8859-1" | "LATIN1"
+         then ISO_8859_1
+         elsif Upper_Charset in "UTF-8" | "UTF8"
+         then UTF_8
+         else Unsupported);
+
+      I    : Positive := Input_Index;
+      Byte : Natural;
+
+      Length    : Positive;
+      Code, Min : Natural;
+      --  Length of the UTF-8 sequence being decoded, code point decoded so
+      --  far and minimum code point value for this sequence length.
+   begin
+      Last := Result'First - 1;
+      Success := False;
+      if Kind = Unsupported then
+         return;
+      end if;
+
+      while I <= Buffer'Last loop
+         Byte := Character'Pos (Buffer (I));
+
+         if Byte < 16#80# or else Kind = ISO_8859_1 then
+            --  Both ASCII and Latin-1 map each byte to the code point that has
+            --  the same value.
+
+            Last := Last + 1;
+            Result (Last) := Wide_Wide_Character'Val (Byte);
+            I := I + 1;
+
+         elsif Kind = ASCII_7 then
+            return;
+
+         else
+            --  Decode a multi-byte UTF-8 sequence. Reject overlong encodings,
+            --  surrogates and code points beyond U+10FFFF: Iconv will report
+            --  them.
+
+            if Byte in 16#C2# .. 16#DF# then
+               Length := 2;
+               Code := Byte - 16#C0#;
+               Min := 16#80#;
+            elsif Byte in 16#E0# .. 16#EF# then
+               Length := 3;
+               Code := Byte - 16#E0#;
+               Min := 16#800#;
+            elsif Byte in 16#F0# .. 16#F4# then
+               Length := 4;
+               Code := Byte - 16#F0#;
+               Min := 16#1_0000#;
+            else
+               return;
+            end if;
+
+            if I + Length - 1 > Buffer'Last then
+               return;
+            end if;
+
+            for J in I + 1 .. I + Length - 1 loop
+               Byte := Character'Pos (Buffer (J));
+               if Byte not in 16#80# .. 16#BF# then
+                  return;
+               end if;
+               Code := Code * 16#40# + (Byte - 16#80#);
+            end loop;
+
+            if Code < Min
+               or else Code in 16#D800# .. 16#DFFF#
+               or else Code > 16#10_FFFF#
+            then
+               return;
+            end if;
+
+            Last := Last + 1;
+            Result (Last) := Wide_Wide_Character'Val (Code);
+            I := I + Length;
+         end if;
+      end loop;
+
+      Success := True;
+   end Decode_Without_Iconv;
+
    ----------------
    -- Get_Symbol --
    ----------------
@@ -700,13 +780,12 @@ package body ${ada_lib_name}.Lexer_Implementation is
    begin
       if T.Symbol = null then
          declare
-            Text   : Text_Type renames
-               TDH.Source_Buffer (T.Source_First ..  T.Source_Last);
-            Symbol : constant Symbolization_Result :=
+            Token_Text : constant Text_Type := Text (TDH, T);
+            Symbol     : constant Symbolization_Result :=
                % if ctx.symbol_canonicalizer:
-                  ${ctx.symbol_canonicalizer.fqn} (Text)
+                  ${ctx.symbol_canonicalizer.fqn} (Token_Text)
                % else:
-                  Create_Symbol (Text)
+                  Create_Symbol (Token_Text)
                % endif
             ;
          begin
@@ -721,4 +800,49 @@ package body ${ada_lib_name}.Lexer_Implementation is
       return T.Symbol;
    end Force_Symbol;
 
+   -----------------------
+   -- Analysis_Profiler --
+   -----------------------
+
+   protected body Analysis_Profiler is
+
+      ---------
+      -- Add --
+      ---------
+
+      procedure Add (Phase : Analysis_Phase; Start : Time) is
+      begin
+         Profile.Durations (Phase) :=
+            Profile.Durations (Phase) + To_Duration (Clock - Start);
+      end Add;
+
+      -------------------
+      -- Add_Pool_Size --
+      -------------------
+
+      procedure Add_Pool_Size (Size : Natural) is
+      begin
+         Profile.Peak_Pool_Size := Natural'Max (Profile.Peak_Pool_Size, Size);
+      end Add_Pool_Size;
+
+      ---------
+      -- Get --
+      ---------
+
+      function Get return Analysis_Profile is
+      begin
+         return Profile;
+      end Get;
+
+      -----------
+      -- Reset --
+      -----------
+
+      procedure Reset is
+      begin
+         Profile := (others => <>);
+      end Reset;
+
+   end Analysis_Profiler;
+
 end ${ada_lib_name}.Lexer_Implementation;
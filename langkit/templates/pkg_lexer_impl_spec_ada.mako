@@ -1,11 +1,13 @@
 ## vim: filetype=makoada
 
+with Ada.Real_Time;         use Ada.Real_Time;
 with Ada.Strings.Unbounded; use Ada.Strings.Unbounded;
 with System;
 
 with GNATCOLL.VFS;
 
 with Langkit_Support.Diagnostics; use Langkit_Support.Diagnostics;
+with Langkit_Support.Types;       use Langkit_Support.Types;
 
 with ${ada_lib_name}.Common; use ${ada_lib_name}.Common;
 use ${ada_lib_name}.Common.Token_Data_Handlers;
@@ -51,4 +53,31 @@ private package ${ada_lib_name}.Lexer_Implementation is
    --  Assuming that ``Token`` refers to a token that contains a symbol, return
    --  the corresponding symbol.
 
+   ------------------------
+   -- Analysis profiling --
+   ------------------------
+
+   --  Lexing, parsing and lexical env population all record the time they
+   --  take here, as this is the only package that is visible to all of them.
+
+   Profile_Analysis : Boolean := False;
+   --  Whether to record in Analysis_Profiler the time spent in each analysis
+   --  phase (see Analysis.Enable_Analysis_Profile).
+
+   protected Analysis_Profiler is
+      procedure Add (Phase : Analysis_Phase; Start : Time);
+      --  Add the time elapsed since Start to the duration of Phase
+
+      procedure Add_Pool_Size (Size : Natural);
+      --  Record that Size bytes were allocated to store the nodes of a unit
+
+      function Get return Analysis_Profile;
+      --  Return the profile recorded so far
+
+      procedure Reset;
+      --  Discard the profile recorded so far
+   private
+      Profile : Analysis_Profile;
+   end Analysis_Profiler;
+
 end ${ada_lib_name}.Lexer_Implementation;
@@ -4,8 +4,32 @@
    lexer = ctx.lexer
    termination = lexer.Termination.ada_name
    lexing_failure = lexer.LexingFailure.ada_name
+   dfa_code = emitter.dfa_code
 %>
 
+## Emit code to execute the given lexer action when reaching a state
+<%def name="execute_action(action)">\
+   % if action.is_case_action:
+      case Self.Last_Token_Kind is
+         % for alt in action.all_alts:
+            when ${('others' if alt.prev_token_cond is None else
+                    ' | '.join(t.ada_name
+                               for t in alt.prev_token_cond))} =>
+               Match_Kind := ${alt.send.ada_name};
+               Match_Index := Index - 1 - ${(
+                  action.match_length - alt.match_size
+               )};
+         % endfor
+      end case;
+   % elif action.is_ignore:
+      Match_Index := Index - 1;
+      Match_Ignore := True;
+   % else:
+      Match_Index := Index - 1;
+      Match_Kind := ${action.ada_name};
+   % endif
+</%def>
+
 package body ${ada_lib_name}.Lexer_State_Machine is
 
    Is_Trivia : constant array (Token_Kind) of Boolean := (
@@ -13,6 +37,7 @@ package body ${ada_lib_name}.Lexer_State_Machine is
                   for t in lexer.sorted_tokens)}
    );
 
+   % if dfa_code.backend == 'case':
    type Character_Range is record
       First, Last : Character_Type;
    end record;
@@ -24,6 +49,20 @@ package body ${ada_lib_name}.Lexer_State_Machine is
      (Char : Character_Type; Ranges : Character_Range_Array) return Boolean;
    --  Return whether Char is included in the given ranges
 
+   % else:
+   --  The state machine is table-driven: input characters are mapped to
+   --  character classes (Get_Class), then the next state is looked up in the
+   --  transition row for the current state (State_Rows, Transitions). 0 means
+   --  "no transition" for character classes and "no state" for states.
+
+${dfa_code.ada_table_decls('   ')}
+
+   function Get_Class (Char : Character_Type) return Character_Class;
+   pragma Inline (Get_Class);
+   --  Return the class for Char in the transition tables
+
+   % endif
+
    ----------------
    -- Initialize --
    ----------------
@@ -62,6 +101,7 @@ package body ${ada_lib_name}.Lexer_State_Machine is
       return Self.Has_Next;
    end Has_Next;
 
+   % if dfa_code.backend == 'case':
    --------------
    -- Contains --
    --------------
@@ -89,7 +129,27 @@ package body ${ada_lib_name}.Lexer_State_Machine is
       return False;
    end Contains;
 
-${emitter.dfa_code.ada_table_decls('   ')}
+${dfa_code.ada_table_decls('   ')}
+
+   % else:
+   ---------------
+   -- Get_Class --
+   ---------------
+
+   function Get_Class (Char : Character_Type) return Character_Class is
+      Code : constant Natural := Character_Type'Pos (Char);
+   begin
+      if Code < 128 then
+         return Ascii_Classes (Code);
+      elsif Code < ${dfa_code.pages_count * dfa_code.page_size} then
+         return Class_Pages (Page_Map (Code / ${dfa_code.page_size}))
+                  (Code mod ${dfa_code.page_size});
+      else
+         return 0;
+      end if;
+   end Get_Class;
+
+   % endif
 
    ----------------
    -- Next_Token --
@@ -116,6 +176,11 @@ ${emitter.dfa_code.ada_table_decls('   ')}
       Match_Kind : Token_Kind;
       --  If we found a match and it is not ignored, kind for the token to
       --  emit. Meaningless otherwise.
+
+      % if dfa_code.backend == 'table':
+      State : State_Id;
+      --  Current state in the automaton
+      % endif
    begin
       First_Index := Self.Last_Token.Text_Last + 1;
 
@@ -124,7 +189,33 @@ ${emitter.dfa_code.ada_table_decls('   ')}
       Match_Index := 0;
       Match_Ignore := False;
 
-      % for i, state in enumerate(emitter.dfa_code.states):
+      % if dfa_code.backend == 'table':
+      State := 1;
+      loop
+         ## Execute the action associated to this state, if any. Just like
+         ## for the case-based state machine, we keep running the automaton
+         ## to find the longest match.
+         case State_Actions (State) is
+            when 0 =>
+               null;
+            % for i, action in enumerate(dfa_code.actions, 1):
+            when ${i} =>
+               ${execute_action(action)}\
+            % endfor
+         end case;
+
+         ## If we are about to read past the input buffer, just stop there
+         exit when Index > Self.Input_Last;
+
+         ## Read the current character and transition to the next state, or
+         ## stop if there is no transition for that character.
+         State := Transitions (State_Rows (State)) (Get_Class (Input (Index)));
+         Index := Index + 1;
+         exit when State = No_State;
+      end loop;
+
+      % else:
+      % for i, state in enumerate(dfa_code.states):
          ## No transition can go to the first state, so don't emit a label
          ## for it. This avoids an "unreferenced" warning.
          % if i > 0:
@@ -136,27 +227,7 @@ ${emitter.dfa_code.ada_table_decls('   ')}
          ## return a token as soon as we find one, but rather return the
          ## longest one.
          % if state.action is not None:
-            % if state.action.is_case_action:
-               case Self.Last_Token_Kind is
-                  % for alt in state.action.all_alts:
-                     when ${('others' if alt.prev_token_cond is None else
-                             ' | '.join(t.ada_name
-                                        for t in alt.prev_token_cond))} =>
-                        Match_Kind := ${alt.send.ada_name};
-                        Match_Index := Index - 1 - ${(
-                           state.action.match_length - alt.match_size
-                        )};
-                  % endfor
-               end case;
-
-            % elif state.action.is_ignore:
-               Match_Index := Index - 1;
-               Match_Ignore := True;
-
-            % else:
-               Match_Index := Index - 1;
-               Match_Kind := ${state.action.ada_name};
-            % endif
+            ${execute_action(state.action)}\
          % endif
 
          ## If we are about to read past the input buffer, just stop there
@@ -205,6 +276,7 @@ ${emitter.dfa_code.ada_table_decls('   ')}
       % endfor
 
       <<Stop>>
+      % endif
       --  We end up here as soon as the currently analyzed character was not
       --  accepted by any transitions from the current state. Two cases from
       --  there:
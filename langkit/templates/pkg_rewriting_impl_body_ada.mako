@@ -1201,12 +1201,12 @@ package body ${ada_lib_name}.Rewriting_Implementation is
                   Index : constant Natural := Natural (Node.Token_Start_Index);
                   Data  : constant Stored_Token_Data :=
                      Reparsed.TDH.Tokens.Get (Index);
-                  Text  : constant Text_Type := Reparsed.TDH.Source_Buffer
-                    (Data.Source_First .. Data.Source_Last);
+                  Token_Text : constant Text_Type :=
+                     Text (Reparsed.TDH, Data);
                begin
                   Result.Children :=
                     (Kind => Expanded_Token_Node,
-                     Text => To_Unbounded_Wide_Wide_String (Text));
+                     Text => To_Unbounded_Wide_Wide_String (Token_Text));
                end;
 
             else
@@ -70,16 +70,15 @@ is
    % endfor
 
    % if property.memoized:
-         <%
-            key_length = 1 + len(property.arguments)
-            if property.uses_entity_info:
-               key_length += 1
-         %>
-         use Memoization_Maps;
-         Mmz_Map : Map renames Node.Unit.Memoization_Map;
-         Mmz_Cur : Cursor;
+         <% key_length = property.memoization_key_length %>
+         Mmz_Map : Mmz_Table renames Node.Unit.Memoization_Map;
+         Mmz_Cur : Mmz_Cursor;
          Mmz_K   : Mmz_Key;
          Mmz_Val : Mmz_Value;
+
+         Mmz_Frame : Natural := 0;
+         --  If we are computing a result to memoize, index of the frame that
+         --  tracks its dependencies (see Mmz_Enter).
    % endif
 
 begin
@@ -124,9 +123,8 @@ begin
       if not Node.Unit.Context.In_Populate_Lexical_Env then
       % endif
 
-         Mmz_K :=
-           (Property => ${property.memoization_enum},
-            Items    => new Mmz_Key_Array (1 ..  ${key_length}));
+         Mmz_K.Property := ${property.memoization_enum};
+         Mmz_K.Length := ${key_length};
          Mmz_K.Items (1) := (Kind => ${property.struct.memoization_kind},
                              As_${property.struct.name} => Self);
          % for i, arg in enumerate(property.arguments, 2):
@@ -144,7 +142,7 @@ begin
 
          if not Lookup_Memoization_Map (Node.Unit, Mmz_K, Mmz_Cur) then
             ${gdb_memoization_lookup()}
-            Mmz_Val := Memoization_Maps.Element (Mmz_Cur);
+            Mmz_Val := Mmz_Element (Mmz_Map, Mmz_Cur);
 
             if Mmz_Val.Kind = Mmz_Evaluating then
                % if has_logging:
@@ -155,6 +153,7 @@ begin
                raise Property_Error with "Infinite recursion detected";
 
             elsif Mmz_Val.Kind = Mmz_Property_Error then
+               Mmz_Add_Deps (Node.Unit, Mmz_Val.Deps);
                % if has_logging:
                   Properties_Traces.Trace
                     ("Result: Property_Error");
@@ -164,6 +163,7 @@ begin
                raise Property_Error with "Memoized error";
 
             else
+               Mmz_Add_Deps (Node.Unit, Mmz_Val.Deps);
                Property_Result := Mmz_Val.As_${property.type.name};
                % if property.type.is_refcounted:
                   Inc_Ref (Property_Result);
@@ -180,6 +180,12 @@ begin
             ${gdb_end()}
          end if;
 
+         ## No result is memoized yet: track the dependencies of the result
+         ## we are about to compute.
+         Mmz_Frame := Mmz_Enter
+           (Node.Unit, Untracked => ${property.has_untracked_deps});
+         Mmz_Add_Key (Mmz_K);
+
       % if not property.memoize_in_populate:
       end if;
       % endif
@@ -202,8 +208,9 @@ begin
       % endif
 
          Mmz_Val := (Kind => ${property.type.memoization_kind},
-                       As_${property.type.name} => Property_Result);
-         Mmz_Map.Replace_Element (Mmz_Cur, Mmz_Val);
+                     Deps => Mmz_Leave (Mmz_Frame),
+                     As_${property.type.name} => Property_Result);
+         Mmz_Replace_Element (Mmz_Map, Mmz_Cur, Mmz_Val);
          % if property.type.is_refcounted:
             Inc_Ref (Property_Result);
          % endif
@@ -230,16 +237,14 @@ begin
             % endif
          % endfor
 
+         ## Memoize the error only if it comes from the computation of this
+         ## property, not from a memoized result.
          % if property.memoized:
-            % if not property.memoize_in_populate:
-            if not Node.Unit.Context.In_Populate_Lexical_Env then
-            % endif
-
-               Mmz_Map.Replace_Element (Mmz_Cur, (Kind => Mmz_Property_Error));
-
-            % if not property.memoize_in_populate:
+            if Mmz_Frame /= 0 then
+               Mmz_Replace_Element
+                 (Mmz_Map, Mmz_Cur, (Kind => Mmz_Property_Error,
+                                     Deps => Mmz_Leave (Mmz_Frame)));
             end if;
-            % endif
          % endif
 
          % if has_logging:
@@ -248,6 +253,26 @@ begin
          % endif
 
          raise;
+
+   % if property.memoized:
+      when others =>
+         ## Other exceptions are not memoized: leave the dependency tracking
+         ## frame and remove the entry for the result being computed, so that
+         ## the next evaluation starts over instead of reporting an infinite
+         ## recursion.
+         if Mmz_Frame /= 0 then
+            declare
+               Deps : Mmz_Deps := Mmz_Leave (Mmz_Frame);
+            begin
+               Destroy (Deps);
+            end;
+            Mmz_Delete (Mmz_Map, Mmz_Cur);
+            Node.Unit.Context.Mmz_Stats.Entries :=
+              Node.Unit.Context.Mmz_Stats.Entries - 1;
+         end if;
+
+         raise;
+   % endif
 % endif
 end ${property.name};
 ${gdb_end()}
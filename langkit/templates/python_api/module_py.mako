@@ -26,6 +26,7 @@ from __future__ import (absolute_import, division, print_function,
 %>
 
 
+import array
 import collections
 import ctypes
 import json
@@ -391,6 +392,41 @@ ${exts.include_extension(
 )}
 
 
+class CacheStats(collections.namedtuple(
+    'CacheStats', 'entries budget hits misses evictions'
+)):
+    """
+    Statistics for a bounded cache, as returned by
+    ``AnalysisContext.memoization_cache_stats`` and
+    ``AnalysisContext.lookup_cache_stats``. A budget of 0 means that the cache
+    is unbounded.
+    """
+    pass
+
+
+class LexicalEnvKindStats(collections.namedtuple(
+    'LexicalEnvKindStats',
+    'gets cache_hits cache_misses recursion_hits cache_resets'
+)):
+    """
+    Lookup statistics for lexical environments of a given kind: number of
+    lookups, of lookup cache hits and misses, of lookups that were detected as
+    infinite recursions and of stale lookup caches that were cleared.
+    """
+    pass
+
+
+class LexicalEnvStats(collections.namedtuple(
+    'LexicalEnvStats', 'per_kind rebindings_pools pooled_rebindings'
+)):
+    """
+    Statistics for all lexical environments. ``per_kind`` maps kinds of
+    lexical environments (see ``kinds``) to ``LexicalEnvKindStats`` instances.
+    """
+
+    kinds = ('primary', 'orphaned', 'grouped', 'rebound')
+
+
 class AnalysisContext(object):
     ${py_doc('langkit.analysis_context_type', 4)}
 
@@ -466,6 +502,18 @@ class AnalysisContext(object):
                                                GrammarRule._unwrap(rule))
         return AnalysisUnit._wrap(c_value)
 
+    def get_from_files(self, filenames, charset=None, reparse=False,
+                       rule=default_grammar_rule, jobs=1):
+        ${py_doc('langkit.get_units_from_files', 8)}
+        count = len(filenames)
+        c_filenames = (ctypes.c_char_p * count)(*filenames)
+        c_units = (AnalysisUnit._c_type * count)()
+        _get_analysis_units_from_files(self._c_value, c_filenames, count,
+                                       charset or '', reparse,
+                                       GrammarRule._unwrap(rule), jobs,
+                                       c_units)
+        return [AnalysisUnit._wrap(c_value) for c_value in c_units]
+
     def get_from_buffer(self, filename, buffer, charset=None, reparse=False,
                         rule=default_grammar_rule):
         ${py_doc('langkit.get_unit_from_buffer', 8)}
@@ -493,6 +541,53 @@ class AnalysisContext(object):
         ${py_doc('langkit.context_discard_errors_in_populate_lexical_env', 8)}
         _discard_errors_in_populate_lexical_env(self._c_value, bool(discard))
 
+    @property
+    def memoization_stats(self):
+        ${py_doc('langkit.context_memoization_stats', 8)}
+        kept = ctypes.c_int()
+        dropped = ctypes.c_int()
+        _context_memoization_stats(self._c_value, ctypes.byref(kept),
+                                   ctypes.byref(dropped))
+        return (kept.value, dropped.value)
+
+    def set_cache_budget(self, memoization_entries=0,
+                         lookup_cache_entries=0):
+        ${py_doc('langkit.context_set_cache_budget', 8)}
+        _context_set_cache_budget(self._c_value, memoization_entries,
+                                  lookup_cache_entries)
+
+    @property
+    def memoization_cache_stats(self):
+        ${py_doc('langkit.context_memoization_cache_stats', 8)}
+        return _get_cache_stats(_context_memoization_cache_stats,
+                                self._c_value)
+
+    @property
+    def lookup_cache_stats(self):
+        ${py_doc('langkit.context_lookup_cache_stats', 8)}
+        return _get_cache_stats(_context_lookup_cache_stats, self._c_value)
+
+    @property
+    def lexical_env_stats(self):
+        ${py_doc('langkit.context_lexical_env_stats_generic', 8)}
+        per_kind = {}
+        for kind, name in enumerate(LexicalEnvStats.kinds):
+            counters = [ctypes.c_uint64() for _ in LexicalEnvKindStats._fields]
+            _context_lexical_env_stats(
+                self._c_value, kind, *[ctypes.byref(c) for c in counters]
+            )
+            per_kind[name] = LexicalEnvKindStats(*[c.value for c in counters])
+
+        pools = ctypes.c_int()
+        rebindings = ctypes.c_int()
+        _context_rebindings_pool_stats(self._c_value, ctypes.byref(pools),
+                                       ctypes.byref(rebindings))
+        return LexicalEnvStats(per_kind, pools.value, rebindings.value)
+
+    def reset_lexical_env_stats(self):
+        ${py_doc('langkit.context_reset_lexical_env_stats', 8)}
+        _context_reset_lexical_env_stats(self._c_value)
+
     class _c_struct(ctypes.Structure):
         _fields_ = [('serial_number', ctypes.c_uint64)]
     _c_type = _hashable_c_pointer(_c_struct)
@@ -666,6 +761,16 @@ class AnalysisUnit(object):
         """
         return self.TokenIterator(self.first_token)
 
+    def token_array(self):
+        """
+        Return a ``TokenArray`` for all the tokens and trivias in this unit.
+
+        This exports all tokens in only two calls to the C API, so this is
+        much faster than iterating on tokens one by one when scanning big
+        units.
+        """
+        return TokenArray._from_unit(self)
+
     @property
     def filename(self):
         ${py_doc('langkit.unit_filename', 8)}
@@ -982,6 +1087,107 @@ class Token(ctypes.Structure):
         return (self._token_data, self._token_index, self._trivia_index)
 
 
+class TokenArray(object):
+    """
+    Flat representation of all the tokens and trivias in an analysis unit, in
+    source order, as returned by ``AnalysisUnit.token_array``.
+
+    For each token index ``i``:
+
+    * ``kinds[i]`` is the kind of the token (see ``kind``);
+    * ``trivia_flags[i]`` is 1 if the token is a trivia, 0 otherwise;
+    * ``offsets[2 * i]`` and ``offsets[2 * i + 1]`` are the 0-based offsets of
+      its first character and of the character that follows its last one in
+      the source buffer;
+    * ``slocs[4 * i:4 * i + 4]`` are its start line, start column, end line
+      and end column.
+
+    All these attributes are ``array.array`` instances of C ints: they expose
+    their memory through the buffer protocol, so they can be wrapped without
+    copy, for instance in NumPy arrays. The helper methods below create Python
+    objects only for the tokens they are called on.
+    """
+
+    _kind_names = {}
+    """
+    Cache for token kind names, indexed by token kind.
+    """
+
+    def __init__(self, unit, count):
+        """
+        This constructor is an implementation detail, and is not meant to be
+        used directly.
+        """
+        def new_array(size):
+            return array.array('i', [0]) * size
+
+        self._unit = unit
+        self._source_text = None
+        self.kinds = new_array(count)
+        self.trivia_flags = new_array(count)
+        self.offsets = new_array(2 * count)
+        self.slocs = new_array(4 * count)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def kind(self, index):
+        """
+        Return the name of the kind for the token at ``index``, as in
+        ``Token.kind``.
+        """
+        kind = self.kinds[index]
+        try:
+            return self._kind_names[kind]
+        except KeyError:
+            name = _unwrap_str(_token_kind_name(kind))
+            self._kind_names[kind] = name
+            return name
+
+    def is_trivia(self, index):
+        """
+        Return whether the token at ``index`` is a trivia.
+        """
+        return bool(self.trivia_flags[index])
+
+    def text(self, index):
+        """
+        Return the text of the token at ``index``.
+        """
+        # Fetch the source text only once, on demand. As it starts with the
+        # first token, shift offsets accordingly.
+        if self._source_text is None:
+            self._source_text = (
+                Token.text_range(self._unit.first_token,
+                                 self._unit.last_token)
+                if len(self) else u''
+            )
+        base = self.offsets[0]
+        return self._source_text[self.offsets[2 * index] - base:
+                                 self.offsets[2 * index + 1] - base]
+
+    def sloc_range(self, index):
+        """
+        Return the source location range for the token at ``index``.
+        """
+        sl, sc, el, ec = self.slocs[4 * index:4 * index + 4]
+        return SlocRange(Sloc(sl, sc), Sloc(el, ec))
+
+    @classmethod
+    def _from_unit(cls, unit):
+        c_unit = unit._c_value
+        count = _unit_export_tokens(c_unit, 0, *([None] * 4))
+        result = cls(unit, count)
+        if count:
+            _unit_export_tokens(
+                c_unit, count,
+                *[arr.buffer_info()[0]
+                  for arr in (result.kinds, result.trivia_flags,
+                              result.offsets, result.slocs)]
+            )
+        return result
+
+
 ## TODO: if this is needed some day, also bind create_unit_provider to allow
 ## Python users to create their own unit providers.
 class UnitProvider(object):
@@ -1002,6 +1208,86 @@ ${exts.include_extension(
 )}
 
 
+class FlatTree(object):
+    """
+    Flat representation of a tree of nodes, as returned by
+    ``${root_astnode_name}.flatten``.
+
+    Nodes are numbered in prefix order, the root of the tree being 0. For each
+    node index ``i``:
+
+    * ``kinds[i]`` is the kind of the node (see ``node_type``);
+    * ``parents[i]`` is the index of its parent;
+    * ``first_children[i]`` is the index of its first child;
+    * ``next_siblings[i]`` is the index of its next sibling;
+    * ``token_starts[i]`` and ``token_ends[i]`` are the indexes (as in
+      ``Token.index``) of its first and last tokens;
+    * ``slocs[4 * i:4 * i + 4]`` are its start line, start column, end line and
+      end column.
+
+    Indexes are -1 when there is no such node or token. All these attributes
+    are ``array.array`` instances of C ints: they expose their memory through
+    the buffer protocol, so they can be wrapped without copy, for instance in
+    NumPy arrays.
+    """
+
+    def __init__(self, count):
+        """
+        This constructor is an implementation detail, and is not meant to be
+        used directly.
+        """
+        def new_array(size):
+            return array.array('i', [0]) * size
+
+        self.kinds = new_array(count)
+        self.parents = new_array(count)
+        self.first_children = new_array(count)
+        self.next_siblings = new_array(count)
+        self.token_starts = new_array(count)
+        self.token_ends = new_array(count)
+        self.slocs = new_array(4 * count)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def node_type(self, index):
+        """
+        Return the ${root_astnode_name} subclass for the node at ``index``.
+        """
+        return _kind_to_astnode_cls[self.kinds[index]]
+
+    def sloc_range(self, index):
+        """
+        Return the source location range for the node at ``index``.
+        """
+        sl, sc, el, ec = self.slocs[4 * index:4 * index + 4]
+        return SlocRange(Sloc(sl, sc), Sloc(el, ec))
+
+    def children(self, index):
+        """
+        Yield the indexes of the children of the node at ``index``.
+        """
+        child = self.first_children[index]
+        while child != -1:
+            yield child
+            child = self.next_siblings[child]
+
+    @classmethod
+    def _from_node(cls, c_node):
+        count = _node_flatten(ctypes.byref(c_node), 0, *([None] * 7))
+        result = cls(count)
+        if count:
+            _node_flatten(
+                ctypes.byref(c_node), count,
+                *[arr.buffer_info()[0]
+                  for arr in (result.kinds, result.parents,
+                              result.first_children, result.next_siblings,
+                              result.token_starts, result.token_ends,
+                              result.slocs)]
+            )
+        return result
+
+
 class ${root_astnode_name}(object):
     ${py_doc(T.root_node, 4)}
 
@@ -1163,6 +1449,16 @@ class ${root_astnode_name}(object):
             self._getitem_cache[key] = result
             return result
 
+    def flatten(self):
+        """
+        Return a ``FlatTree`` for the sub-tree rooted at this node.
+
+        This serializes the whole sub-tree in only two calls to the C API, so
+        this is much faster than browsing it node by node when processing big
+        trees. To flatten a whole unit, call this on its root node.
+        """
+        return FlatTree._from_node(self._unwrap(self))
+
     def iter_fields(self):
         """
         Iterate through all the fields this node contains.
@@ -1231,6 +1527,12 @@ class ${root_astnode_name}(object):
         Helper for finditer that will return only the first result. See
         finditer's documentation for more details.
         """
+        # When looking for node types only, let the C API stop browsing the
+        # tree at the first match.
+        sought_types = self._sought_types(ast_type_or_pred)
+        if sought_types is not None and not kwargs:
+            return next(self._find_kinds(sought_types, limit=1), None)
+
         try:
             return next(self.finditer(ast_type_or_pred, **kwargs))
         except Exception:
@@ -1242,13 +1544,8 @@ class ${root_astnode_name}(object):
         Return the parent chain of self. Self will be the first element,
         followed by the first parent, then this parent's parent, etc.
         """
-        def _parent_chain(node):
-            yield node
-            if node.parent is not None:
-                for p in _parent_chain(node.parent):
-                    yield p
-
-        return list(_parent_chain(self))
+        # Get the whole chain in a single call to the C API
+        return self.parents
 
     def finditer(self, ast_type_or_pred, **kwargs):
         """
@@ -1269,16 +1566,12 @@ class ${root_astnode_name}(object):
             key that has the specified value, then the child is kept.
         :type kwargs: dict[str, Any]
         """
-        # Create a "pred" function to use as the node filter during the
-        # traversal.
-        if isinstance(ast_type_or_pred, type):
-            sought_type = ast_type_or_pred
-            pred = lambda node: isinstance(node, sought_type)
-        elif isinstance(ast_type_or_pred, collections.Sequence):
-            sought_types = ast_type_or_pred
-            pred = lambda node: isinstance(node, tuple(sought_types))
-        else:
-            pred = ast_type_or_pred
+        # When looking for instances of node types, let the C API browse the
+        # tree and filter nodes, so that only matching nodes cross the
+        # language boundary. Otherwise, use the "pred" function as the node
+        # filter during the traversal.
+        sought_types = self._sought_types(ast_type_or_pred)
+        pred = ast_type_or_pred
 
         def match(left, right):
             """
@@ -1292,21 +1585,67 @@ class ${root_astnode_name}(object):
             else:
                 return left == right
 
+        def match_kwargs(node):
+            return all(match(getattr(node, key, None), val)
+                       for key, val in kwargs.items())
+
         def helper(node):
             for child in node:
                 if child is not None:
-                    if pred(child):
-                        if not kwargs:
-                            yield child
-                        elif all([match(getattr(child, key, None), val)
-                                  for key, val in kwargs.items()]):
-                            yield child
+                    if pred(child) and match_kwargs(child):
+                        yield child
                     for c in helper(child):
                         if c is not None:
                             yield c
 
+        if sought_types is not None:
+            return (node for node in self._find_kinds(sought_types)
+                    if match_kwargs(node))
         return helper(self)
 
+    @staticmethod
+    def _sought_types(ast_type_or_pred):
+        """
+        If ``ast_type_or_pred`` designates node types (see ``finditer``),
+        return them as a tuple. Return None otherwise.
+
+        :rtype: None|tuple[type]
+        """
+        if isinstance(ast_type_or_pred, type):
+            return (ast_type_or_pred, )
+        elif isinstance(ast_type_or_pred, collections.Sequence):
+            return tuple(ast_type_or_pred)
+        else:
+            return None
+
+    def _find_kinds(self, types, limit=0):
+        """
+        Yield all nodes under this one (excluded) that are instances of any of
+        the given ``types``, in prefix order. The tree is browsed in a single
+        call to the C API, and nodes are wrapped only as they are yielded.
+
+        :param tuple[type] types: Subclasses of ${root_astnode_name} to look
+            for.
+        :param int limit: If positive, stop looking for nodes after finding
+            this number of them.
+        :rtype: collections.Iterable[${root_astnode_name}]
+        """
+        converter = ${T.entity.array.py_converter}
+
+        # The C API includes this node in the result if it matches: skip it
+        skip_self = isinstance(self, types)
+        if limit > 0 and skip_self:
+            limit += 1
+
+        c_result = self._eval_field(converter.c_type(), _node_findall,
+                                    _kind_set(types), limit)
+        array = converter(c_result)
+        for i in range(1 if skip_self else 0, array.length):
+            # See _BaseArray.wrap: copy items so that they do not depend on
+            # the lifetime of the array.
+            item = converter.c_element_type.from_buffer_copy(array.items[i])
+            yield converter.wrap_item(item)
+
     def __repr__(self):
         return self.short_image
 
@@ -1575,6 +1914,49 @@ _discard_errors_in_populate_lexical_env = _import_func(
    '${capi.get_name("context_discard_errors_in_populate_lexical_env")}',
    [AnalysisContext._c_type, ctypes.c_int], None
 )
+_context_memoization_stats = _import_func(
+    '${capi.get_name("context_memoization_stats")}',
+    [AnalysisContext._c_type,
+     ctypes.POINTER(ctypes.c_int),
+     ctypes.POINTER(ctypes.c_int)], None
+)
+_context_set_cache_budget = _import_func(
+    '${capi.get_name("context_set_cache_budget")}',
+    [AnalysisContext._c_type, ctypes.c_int, ctypes.c_int], None
+)
+_context_memoization_cache_stats = _import_func(
+    '${capi.get_name("context_memoization_cache_stats")}',
+    [AnalysisContext._c_type,
+     ctypes.POINTER(ctypes.c_int),
+     ctypes.POINTER(ctypes.c_int),
+     ctypes.POINTER(ctypes.c_uint64),
+     ctypes.POINTER(ctypes.c_uint64),
+     ctypes.POINTER(ctypes.c_uint64)], None
+)
+_context_lookup_cache_stats = _import_func(
+    '${capi.get_name("context_lookup_cache_stats")}',
+    [AnalysisContext._c_type,
+     ctypes.POINTER(ctypes.c_int),
+     ctypes.POINTER(ctypes.c_int),
+     ctypes.POINTER(ctypes.c_uint64),
+     ctypes.POINTER(ctypes.c_uint64),
+     ctypes.POINTER(ctypes.c_uint64)], None
+)
+_context_lexical_env_stats = _import_func(
+    '${capi.get_name("context_lexical_env_stats")}',
+    [AnalysisContext._c_type, ctypes.c_int]
+    + [ctypes.POINTER(ctypes.c_uint64)] * 5, None
+)
+_context_rebindings_pool_stats = _import_func(
+    '${capi.get_name("context_rebindings_pool_stats")}',
+    [AnalysisContext._c_type,
+     ctypes.POINTER(ctypes.c_int),
+     ctypes.POINTER(ctypes.c_int)], None
+)
+_context_reset_lexical_env_stats = _import_func(
+    '${capi.get_name("context_reset_lexical_env_stats")}',
+    [AnalysisContext._c_type], None
+)
 _get_analysis_unit_from_file = _import_func(
     '${capi.get_name("get_analysis_unit_from_file")}',
     [AnalysisContext._c_type,  # context
@@ -1584,6 +1966,18 @@ _get_analysis_unit_from_file = _import_func(
      ctypes.c_int],            # grammar rule
     AnalysisUnit._c_type
 )
+_get_analysis_units_from_files = _import_func(
+    '${capi.get_name("get_analysis_units_from_files")}',
+    [AnalysisContext._c_type,                 # context
+     ctypes.POINTER(ctypes.c_char_p),         # filenames
+     ctypes.c_int,                            # count
+     ctypes.c_char_p,                         # charset
+     ctypes.c_int,                            # reparse
+     ctypes.c_int,                            # grammar rule
+     ctypes.c_int,                            # jobs
+     ctypes.POINTER(AnalysisUnit._c_type)],   # units
+    None
+)
 _get_analysis_unit_from_buffer = _import_func(
     '${capi.get_name("get_analysis_unit_from_buffer")}',
     [AnalysisContext._c_type,  # context
@@ -1625,6 +2019,11 @@ _unit_trivia_count = _import_func(
     "${capi.get_name('unit_trivia_count')}",
     [AnalysisUnit._c_type], ctypes.c_int
 )
+_unit_export_tokens = _import_func(
+    "${capi.get_name('unit_export_tokens')}",
+    [AnalysisUnit._c_type, ctypes.c_int] + [ctypes.c_void_p] * 4,
+    ctypes.c_int
+)
 _unit_lookup_token = _import_func(
     "${capi.get_name('unit_lookup_token')}",
     [AnalysisUnit._c_type,
@@ -1708,6 +2107,19 @@ _node_child = _import_func(
     [ctypes.POINTER(${c_entity}), ctypes.c_uint, ctypes.POINTER(${c_entity})],
     ctypes.c_int
 )
+_node_findall = _import_func(
+    '${capi.get_name("node_findall")}',
+    [ctypes.POINTER(${c_entity}),
+     ctypes.POINTER(ctypes.c_ubyte),
+     ctypes.c_int,
+     ctypes.POINTER(${T.entity.array.py_converter}.c_type)],
+    ctypes.c_int
+)
+_node_flatten = _import_func(
+    '${capi.get_name("node_flatten")}',
+    [ctypes.POINTER(${c_entity}), ctypes.c_int] + [ctypes.c_void_p] * 7,
+    ctypes.c_int
+)
 
 % for astnode in ctx.astnode_types:
     % for field in astnode.fields_with_accessors():
@@ -1781,6 +2193,22 @@ def _unwrap_str(c_char_p_value):
     return result
 
 
+def _get_cache_stats(c_func, c_context):
+    """
+    Call ``c_func``, one of the C API functions that return cache statistics,
+    on ``c_context`` and wrap the result in a ``CacheStats`` instance.
+    """
+    entries = ctypes.c_int()
+    budget = ctypes.c_int()
+    hits = ctypes.c_uint64()
+    misses = ctypes.c_uint64()
+    evictions = ctypes.c_uint64()
+    c_func(c_context, ctypes.byref(entries), ctypes.byref(budget),
+           ctypes.byref(hits), ctypes.byref(misses), ctypes.byref(evictions))
+    return CacheStats(entries.value, budget.value, hits.value, misses.value,
+                      evictions.value)
+
+
 _kind_to_astnode_cls = {
     % for subclass in ctx.astnode_types:
         % if not subclass.abstract:
@@ -1789,6 +2217,28 @@ _kind_to_astnode_cls = {
     % endfor
 }
 
+_kind_sets = {}
+"""
+Cache for kind sets computed by ``_kind_set``, indexed by tuple of types.
+"""
+
+
+def _kind_set(types):
+    """
+    Return the kind set to pass to the C API in order to look for instances of
+    any of the given ``types``.
+
+    :param tuple[type] types: Subclasses of ${root_astnode_name}.
+    """
+    try:
+        return _kind_sets[types]
+    except KeyError:
+        result = (ctypes.c_ubyte * (max(_kind_to_astnode_cls) + 1))()
+        for kind, cls in _kind_to_astnode_cls.items():
+            result[kind] = issubclass(cls, types)
+        _kind_sets[types] = result
+        return result
+
 
 def _field_address(struct, field_name):
     """
@@ -0,0 +1,110 @@
+#! /usr/bin/env python
+
+"""
+Benchmark the lexer DFA construction on a synthetic lexer.
+
+The lexer contains a configurable number of keywords plus the usual
+identifier, number, string, comment and whitespace rules. Identifiers accept
+Unicode letters, which makes transitions use large character sets.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import random
+import string
+import time
+
+from langkit.compile_context import CompileCtx
+from langkit.lexer import (Lexer, LexerToken, Literal, Pattern, WithSymbol,
+                           WithText, WithTrivia)
+from langkit.lexer.regexp import DFACodeGenHolder
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument(
+    '--keywords', '-k', type=int, default=500,
+    help='Number of keywords in the synthetic lexer (default: 500)'
+)
+parser.add_argument(
+    '--seed', type=int, default=0,
+    help='Seed for the pseudo-random generation of keywords (default: 0)'
+)
+
+
+def make_lexer(keywords_count, seed):
+    """
+    Create a synthetic lexer with ``keywords_count`` keywords.
+
+    :rtype: Lexer
+    """
+    rnd = random.Random(seed)
+    keywords = set()
+    while len(keywords) < keywords_count:
+        keywords.add(''.join(rnd.choice(string.ascii_lowercase)
+                             for _ in range(rnd.randint(2, 10))))
+    keywords = sorted(keywords)
+
+    token_attrs = {
+        'Identifier': WithSymbol(),
+        'Number': WithText(),
+        'String': WithText(),
+        'Comment': WithTrivia(),
+        'Whitespace': WithTrivia(),
+    }
+    keyword_tokens = []
+    for i, kw in enumerate(keywords):
+        token_name = 'Kw{}'.format(i)
+        token_attrs[token_name] = WithText()
+        keyword_tokens.append((kw, token_name))
+    token_class = type(str('Token'), (LexerToken, ), token_attrs)
+
+    lexer = Lexer(token_class)
+    lexer.add_patterns(
+        ('letter', r'[a-zA-Z_]|\p{L}'),
+        ('digit', r'[0-9]'),
+    )
+    lexer.add_rules(
+        (Pattern(r'[ \n\r\t]+'), token_class.Whitespace),
+        *[(Literal(kw), getattr(token_class, name))
+          for kw, name in keyword_tokens]
+    )
+    lexer.add_rules(
+        (Pattern(r'{letter}({letter}|{digit})*'), token_class.Identifier),
+        (Pattern(r'{digit}+(\.{digit}+)?'), token_class.Number),
+        (Pattern(r'"([^"\n\\]|\\.)*"'), token_class.String),
+        (Pattern(r'#(.?)+'), token_class.Comment),
+    )
+    return lexer
+
+
+def main(args):
+    lexer = make_lexer(args.keywords, args.seed)
+    ctx = CompileCtx(lang_name='Bench', lexer=lexer, grammar=None)
+    get_action = lexer.get_action
+
+    timings = []
+
+    def step(label, fn):
+        start = time.time()
+        result = fn()
+        timings.append((label, time.time() - start))
+        return result
+
+    step('compile rules', lambda: lexer.compile_rules(ctx))
+    dfa = step('NFA to DFA', ctx.nfa_start.to_dfa)
+    minimized = step('minimize DFA', lambda: dfa.minimize(get_action))
+    step('codegen holder', lambda: DFACodeGenHolder(minimized, get_action))
+
+    print('{} keywords, {} DFA states ({} after minimization)'.format(
+        args.keywords, len(dfa.reachable_states()),
+        len(minimized.reachable_states())
+    ))
+    for label, duration in timings:
+        print('{:<20} {:8.3f}s'.format(label, duration))
+    print('{:<20} {:8.3f}s'.format('total',
+                                   sum(d for _, d in timings)))
+
+
+if __name__ == '__main__':
+    main(parser.parse_args())
@@ -23,6 +23,7 @@ default_warning_set.disable(WarningSet.undocumented_nodes)
 default_warning_set.disable(WarningSet.undocumented_public_properties)
 
 pretty_print = bool(int(os.environ.get('LANGKIT_PRETTY_PRINT', '0')))
+lexer_backend = os.environ.get('LANGKIT_LEXER_BACKEND', 'case')
 
 project_template = """
 with "libfoolang";
@@ -113,7 +114,8 @@ def emit_and_print_errors(grammar, lexer=None,
     try:
         ctx = prepare_context(grammar, lexer, warning_set,
                               symbol_canonicalizer=symbol_canonicalizer)
-        ctx.emit('build', generate_unparser=generate_unparser)
+        ctx.emit('build', generate_unparser=generate_unparser,
+                 lexer_backend=lexer_backend)
         # ... and tell about how it went
     except DiagnosticError:
         # If there is a diagnostic error, don't say anything, the diagnostics
@@ -183,6 +185,7 @@ def build_and_run(grammar, py_script=None, ada_main=None, lexer=None,
         argv.append('--no-pretty-print')
     if generate_unparser:
         argv.append('--generate-unparser')
+    argv.append('--lexer-backend={}'.format(lexer_backend))
     m.run(argv)
 
     # Flush stdout and stderr, so that diagnostics appear deterministically
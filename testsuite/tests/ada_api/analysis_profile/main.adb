@@ -0,0 +1,62 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+
+procedure Main is
+
+   procedure Analyze (Ctx : Analysis_Context; Buffer : String);
+   --  Parse Buffer in Ctx and populate the lexical envs of the resulting unit
+
+   procedure Check (Label : String; Expect_Empty : Boolean);
+   --  Check whether the current analysis profile is empty or not, as
+   --  Expect_Empty requires.
+
+   -------------
+   -- Analyze --
+   -------------
+
+   procedure Analyze (Ctx : Analysis_Context; Buffer : String) is
+      U : constant Analysis_Unit := Ctx.Get_From_Buffer
+        (Filename => "main.txt", Buffer => Buffer);
+   begin
+      if U.Has_Diagnostics then
+         Put_Line ("Unexpected diagnostics for main.txt");
+      end if;
+      U.Populate_Lexical_Env;
+   end Analyze;
+
+   -----------
+   -- Check --
+   -----------
+
+   procedure Check (Label : String; Expect_Empty : Boolean) is
+      Profile  : constant Analysis_Profile := Get_Analysis_Profile;
+      Is_Empty : Boolean := Profile.Peak_Pool_Size = 0;
+   begin
+      for D of Profile.Durations loop
+         if D < 0.0 then
+            Put_Line ("Negative duration in the profile");
+         end if;
+         Is_Empty := Is_Empty and then D = 0.0;
+      end loop;
+
+      Put_Line (Label & ": "
+                & (if Is_Empty = Expect_Empty then "OK" else "FAIL"));
+   end Check;
+
+   Ctx : constant Analysis_Context := Create_Context;
+begin
+   Analyze (Ctx, "def a (b c)");
+   Check ("Profiling disabled", Expect_Empty => True);
+
+   Enable_Analysis_Profile;
+   Analyze (Ctx, "def a (b c) def d ()");
+   Check ("Profiling enabled", Expect_Empty => False);
+
+   Enable_Analysis_Profile (False);
+   Reset_Analysis_Profile;
+   Analyze (Ctx, "def a (b c)");
+   Check ("Profile reset", Expect_Empty => True);
+
+   Put_Line ("main.adb: Done.");
+end Main;
@@ -0,0 +1,35 @@
+"""
+Test that the analysis profile in the Ada API accumulates time and memory only
+when it is enabled.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field
+from langkit.parsers import Grammar, List
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Name(FooNode):
+    token_node = True
+
+
+class Def(FooNode):
+    name = Field()
+    body = Field()
+
+
+g = Grammar('main_rule')
+g.add_rules(
+    main_rule=List(g.def_rule),
+    def_rule=Def('def', g.name, '(', List(g.name, empty_valid=True), ')'),
+    name=Name(Token.Identifier),
+)
+build_and_run(g, ada_main=['main.adb'])
+print('Done')
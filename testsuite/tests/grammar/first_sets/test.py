@@ -0,0 +1,110 @@
+"""
+Test the computation of FIRST sets for parsers, which Or parsers use to try
+only the alternatives that can match the current token.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, abstract
+from langkit.parsers import Grammar, List, NoBacktrack, Null, Opt, Or
+
+from lexer_example import Token
+from utils import prepare_context
+
+
+class FooNode(ASTNode):
+    pass
+
+
+@abstract
+class Expr(FooNode):
+    pass
+
+
+class Ref(Expr):
+    token_node = True
+
+
+class Num(Expr):
+    token_node = True
+
+
+class ParenExpr(Expr):
+    expr = Field()
+
+
+class Plus(Expr):
+    lhs = Field()
+    rhs = Field()
+
+
+class Decl(FooNode):
+    name = Field()
+    value = Field()
+
+
+class VarDecl(FooNode):
+    name = Field()
+    value = Field()
+
+
+g = Grammar('main_rule')
+g.add_rules(
+    # This Decl parser is in a List and contains a NoBacktrack parser: once
+    # the latter has run, the former recovers from errors on any token. This
+    # is not the case for the decl rule, whose parsing function starts with no
+    # NoBacktrack parser run.
+    main_rule=List(
+        Or(Decl('def', NoBacktrack(), g.name, Opt('=', g.expr)),
+           g.decl, g.var_decl, g.expr_stmt),
+        empty_valid=True
+    ),
+
+    decl=Decl('def', NoBacktrack(), g.name, '=', g.expr),
+    var_decl=VarDecl(Opt('var'), g.name, '=', g.expr),
+    expr_stmt=Or(g.expr, Null(Expr)),
+
+    # Left recursion
+    expr=Or(Plus(g.expr, '+', g.atom), g.atom),
+    atom=Or(Ref(Token.Identifier), Num(Token.Number),
+            ParenExpr('(', g.expr, ')')),
+    name=Ref(Token.Identifier),
+)
+
+ctx = prepare_context(g)
+ctx.emit('build', check_only=True)
+
+
+def tokens_repr(tokens):
+    return ('any' if tokens is None else
+            '{{{}}}'.format(', '.join(sorted(t.dsl_name for t in tokens))))
+
+
+def print_parser(parser, indent):
+    tokens, nullable = parser.first_set
+    print('{}{}: {}{}{}'.format(
+        ' ' * indent, type(parser).__name__.strip('_'), tokens_repr(tokens),
+        ' (nullable)' if nullable else '',
+        ', fails on {}'.format(parser.fail_token.dsl_name)
+        if parser.fail_token else ''
+    ))
+    if isinstance(parser, Or):
+        for alt in parser.parsers:
+            dispatch = parser.dispatch_tokens(alt)
+            print('{}  * {}'.format(
+                ' ' * indent,
+                'always tried' if dispatch is None else
+                'tried on {}'.format(tokens_repr(dispatch))
+            ))
+            print_parser(alt, indent + 4)
+    else:
+        for child in parser.children:
+            print_parser(child, indent + 2)
+
+
+for name, rule in sorted(g.rules.items()):
+    print('== {} =='.format(name))
+    print_parser(rule, 0)
+    print('')
+
+print('Done')
@@ -0,0 +1,40 @@
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, abstract
+from langkit.parsers import Grammar, Or
+
+from lexer_example import Token
+from utils import emit_and_print_errors
+
+
+def run(name, expr_fn):
+    print('== {} =='.format(name))
+
+    class FooNode(ASTNode):
+        pass
+
+    @abstract
+    class Expr(FooNode):
+        pass
+
+    class Num(Expr):
+        token_node = True
+
+    class Plus(Expr):
+        lhs = Field()
+        rhs = Field()
+
+    grammar = Grammar('main_rule')
+    grammar.add_rules(
+        main_rule=grammar.expr,
+        expr=expr_fn(Or(Plus(grammar.expr, '+', grammar.num), grammar.num)),
+        num=Num(Token.Number),
+    )
+    emit_and_print_errors(grammar)
+    print('')
+
+
+run('Left recursion', lambda p: p.memoize(False))
+run('Empty memo table', lambda p: p.memoize(size=0))
+run('Empty memo sets', lambda p: p.memoize(ways=0))
+print('Done')
@@ -0,0 +1,106 @@
+"""
+Test the selection of parsing rules that need a memo table, i.e. the rules
+that can run several times at the same position.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, abstract
+from langkit.parsers import Grammar, List, Opt, Or
+
+from lexer_example import Token
+from utils import prepare_context
+
+
+class FooNode(ASTNode):
+    pass
+
+
+@abstract
+class Expr(FooNode):
+    pass
+
+
+class Name(Expr):
+    token_node = True
+
+
+class Num(Expr):
+    token_node = True
+
+
+class ParenExpr(Expr):
+    expr = Field()
+
+
+class Plus(Expr):
+    lhs = Field()
+    rhs = Field()
+
+
+class Decl(FooNode):
+    name = Field()
+    value = Field()
+
+
+class VarDecl(FooNode):
+    type_name = Field()
+    name = Field()
+    value = Field()
+
+
+class Assign(FooNode):
+    name = Field()
+    value = Field()
+
+
+class Incr(FooNode):
+    name = Field()
+
+
+g = Grammar('main_rule')
+g.add_rules(
+    main_rule=List(g.stmt, empty_valid=True),
+
+    # Alternatives for Decl and VarDecl start with different tokens, so at
+    # most one of them runs at a given position. However both Assign and
+    # Incr start with "target".
+    stmt=Or(g.decl, g.var_decl, g.assign, g.incr, g.expr),
+
+    # Memoization can be forced for rules that cannot run twice at the same
+    # position, possibly with a custom memo table size...
+    decl=Decl('def', g.name, '=', g.expr).memoize(True, size=64, ways=2),
+
+    # If the optional type name is not followed by a dot, the parser
+    # backtracks but parses the same token with a different rule.
+    var_decl=VarDecl('var', Opt(g.type_name, '.'), g.name, '=', g.expr),
+
+    assign=Assign(g.target, '=', g.expr),
+    incr=Incr(g.target, '+', '+'),
+
+    # Left recursion
+    expr=Or(Plus(g.expr, '+', g.atom), g.atom),
+
+    # ... and disabled for the other ones
+    atom=Or(g.name, g.num, ParenExpr('(', g.expr, ')')).memoize(False),
+
+    name=Name(Token.Identifier),
+    num=Num(Token.Number),
+    # A custom memo table size alone does not force memoization on, whether
+    # the rule needs a memo table or not.
+    target=Name(Token.Identifier).memoize(ways=4),
+    type_name=Name(Token.Identifier).memoize(size=32),
+)
+
+ctx = prepare_context(g)
+ctx.emit('build', check_only=True)
+
+for name, rule in sorted(g.rules.items()):
+    print('{}: {}'.format(
+        name,
+        'memoized ({}), {}x{}'.format(rule.memoization_reason,
+                                      rule.memo_size, rule.memo_ways)
+        if rule.is_memoized else 'not memoized'
+    ))
+
+print('Done')
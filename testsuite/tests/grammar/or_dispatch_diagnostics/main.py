@@ -0,0 +1,15 @@
+from __future__ import absolute_import, division, print_function
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+
+for text in ['= 1', 'def x =', 'var x = (1 + )', 'x + 1 2', 'def x = (1 + y)']:
+    print('== {} =='.format(text))
+    u = ctx.get_from_buffer('main.txt', text)
+    for d in u.diagnostics:
+        print(d)
+    if not u.diagnostics:
+        print('No diagnostic')
+    print('')
@@ -0,0 +1,63 @@
+"""
+Test that Or parsers that do not try the alternatives that cannot match the
+current token still produce the same parsing error diagnostics as if they
+tried them.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, abstract
+from langkit.parsers import Grammar, Or
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+@abstract
+class Expr(FooNode):
+    pass
+
+
+class Ref(Expr):
+    token_node = True
+
+
+class Num(Expr):
+    token_node = True
+
+
+class ParenExpr(Expr):
+    expr = Field()
+
+
+class Plus(Expr):
+    lhs = Field()
+    rhs = Field()
+
+
+class Decl(FooNode):
+    name = Field()
+    value = Field()
+
+
+class VarDecl(FooNode):
+    name = Field()
+    value = Field()
+
+
+g = Grammar('main_rule')
+g.add_rules(
+    main_rule=Or(g.decl, g.var_decl, g.expr),
+    decl=Decl('def', g.name, '=', g.expr),
+    var_decl=VarDecl('var', g.name, '=', g.expr),
+    expr=Or(Plus(g.atom, '+', g.expr), g.atom),
+    atom=Or(Ref(Token.Identifier), Num(Token.Number),
+            ParenExpr('(', g.expr, ')')),
+    name=Ref(Token.Identifier),
+)
+build_and_run(g, 'main.py')
+print('Done')
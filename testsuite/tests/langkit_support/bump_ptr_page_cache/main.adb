@@ -0,0 +1,87 @@
+--  Test that bump pointer pools reuse the pages of their page cache, put large
+--  objects in separate memory blocks and report accurate statistics.
+
+with Ada.Text_IO; use Ada.Text_IO;
+
+with System;
+with System.Storage_Elements; use System.Storage_Elements;
+
+with Langkit_Support.Bump_Ptr; use Langkit_Support.Bump_Ptr;
+
+procedure Main is
+
+   procedure Put_Stats (Label : String; Pool : Bump_Ptr_Pool);
+   --  Print statistics for Pool
+
+   procedure Fill (Pool : Bump_Ptr_Pool; Pages : Positive);
+   --  Allocate small objects in Pool until it uses the given number of pages
+
+   ---------------
+   -- Put_Stats --
+   ---------------
+
+   procedure Put_Stats (Label : String; Pool : Bump_Ptr_Pool) is
+      S : constant Pool_Stats := Get_Stats (Pool);
+   begin
+      Put_Line (Label & ":");
+      Put_Line ("  pages:" & Natural'Image (S.Pages));
+      Put_Line ("  large objects:" & Natural'Image (S.Large_Objects));
+      Put_Line ("  allocated:" & Storage_Count'Image (S.Allocated_Bytes));
+      Put_Line ("  used:" & Storage_Count'Image (S.Used_Bytes));
+      Put_Line ("  wasted:" & Storage_Count'Image (S.Wasted_Bytes));
+   end Put_Stats;
+
+   ----------
+   -- Fill --
+   ----------
+
+   procedure Fill (Pool : Bump_Ptr_Pool; Pages : Positive) is
+      Dummy : System.Address;
+   begin
+      while Get_Stats (Pool).Pages < Pages loop
+         Dummy := Allocate (Pool, 1000);
+      end loop;
+   end Fill;
+
+   Cache : Page_Cache := Create_Page_Cache (Capacity => 3);
+   Pool  : Bump_Ptr_Pool;
+   Dummy : System.Address;
+begin
+   Put_Line ("Cached pages at creation:"
+             & Natural'Image (Cached_Pages (Cache)));
+
+   --  Allocating a large object must not make the pool switch to a new page,
+   --  and freeing the pool must not put large objects in the cache.
+
+   Pool := Create (Cache);
+   Dummy := Allocate (Pool, 10_000);
+   Dummy := Allocate (Pool, 100_000);
+   Dummy := Allocate (Pool, 16);
+   Put_Stats ("Pool with large objects", Pool);
+   Free (Pool);
+   Put_Line ("Cached pages:" & Natural'Image (Cached_Pages (Cache)));
+
+   --  Pages in excess of the cache capacity are released
+
+   Pool := Create (Cache);
+   Fill (Pool, 5);
+   Put_Stats ("Pool with 5 pages", Pool);
+   Free (Pool);
+   Put_Line ("Cached pages:" & Natural'Image (Cached_Pages (Cache)));
+
+   --  New pools take their pages from the cache first
+
+   Pool := Create (Cache);
+   Fill (Pool, 2);
+   Put_Line ("Cached pages with a 2 pages pool:"
+             & Natural'Image (Cached_Pages (Cache)));
+   Free (Pool);
+   Put_Line ("Cached pages:" & Natural'Image (Cached_Pages (Cache)));
+
+   Set_Capacity (Cache, 1);
+   Put_Line ("Cached pages after shrinking the cache:"
+             & Natural'Image (Cached_Pages (Cache)));
+
+   Destroy (Cache);
+   Put_Line ("Done.");
+end Main;
@@ -0,0 +1,76 @@
+--  Test that lookup caches in deeply nested lexical envs are invalidated when
+--  any env in their parent chain is modified, even when the modified env was
+--  looked up first.
+--
+--  When given a depth and a number of lookups on the command line, this also
+--  acts as a benchmark for lookups in deeply nested scopes: for instance,
+--  "main 1000 1000000" times one million lookups in the innermost of 1000
+--  nested scopes.
+
+with Ada.Calendar;     use Ada.Calendar;
+with Ada.Command_Line; use Ada.Command_Line;
+with Ada.Text_IO;      use Ada.Text_IO;
+
+with Support; use Support;
+use Support.Envs;
+use Support.Symbols;
+
+procedure Main is
+   Symbols : constant Symbol_Table := Create_Symbol_Table;
+   Key_X   : constant Symbol_Type := Find (Symbols, "X");
+
+   Depth : constant Positive :=
+     (if Argument_Count >= 1 then Positive'Value (Argument (1)) else 100);
+   --  Number of nested scopes
+
+   Lookups : constant Natural :=
+     (if Argument_Count >= 2 then Natural'Value (Argument (2)) else 0);
+   --  Number of lookups to time in the innermost scope
+
+   Scopes : array (1 .. Depth) of Lexical_Env;
+   --  Scopes (1) is the outermost scope and Scopes (Depth) the innermost one
+
+   Outermost : Lexical_Env renames Scopes (1);
+   Middle    : Lexical_Env renames Scopes ((Depth + 1) / 2);
+   Innermost : Lexical_Env renames Scopes (Depth);
+begin
+   Outermost := Create_Lexical_Env (No_Env_Getter, 'o', Owner => True);
+   for I in 2 .. Depth loop
+      Scopes (I) := Create_Lexical_Env
+        (Simple_Env_Getter (Scopes (I - 1)), 's', Owner => True);
+   end loop;
+
+   Add (Outermost, Key_X, '1');
+   Put_Line ("Looking in the innermost scope:");
+   Put_Line (Get (Innermost, Key_X));
+
+   Add (Middle, Key_X, '2');
+   Put_Line ("Looking in the innermost scope after adding to the middle one:");
+   Put_Line (Get (Innermost, Key_X));
+
+   Add (Outermost, Key_X, '3');
+   Put_Line ("Looking in the outermost scope after adding to it:");
+   Put_Line (Get (Outermost, Key_X));
+   Put_Line ("Looking in the innermost scope:");
+   Put_Line (Get (Innermost, Key_X));
+
+   if Lookups > 0 then
+      declare
+         Start : constant Time := Clock;
+         Count : Natural := 0;
+      begin
+         for Dummy in 1 .. Lookups loop
+            Count := Count + Get (Innermost, Key_X)'Length;
+         end loop;
+         Put_Line
+           ("Depth:" & Positive'Image (Depth)
+            & ", lookups:" & Natural'Image (Lookups)
+            & ", results:" & Natural'Image (Count)
+            & ", time:" & Duration'Image (Clock - Start) & "s");
+      end;
+   end if;
+
+   for I in reverse Scopes'Range loop
+      Destroy (Scopes (I));
+   end loop;
+end Main;
@@ -0,0 +1,91 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Langkit_Support.Slocs;  use Langkit_Support.Slocs;
+with Langkit_Support.Symbols;
+with Langkit_Support.Text;   use Langkit_Support.Text;
+with Langkit_Support.Token_Data_Handlers;
+
+procedure Main is
+
+   type Precomputed_Symbol_Index is new Integer range 1 .. 0;
+   function Precomputed_Symbol
+     (Dummy_Index : Precomputed_Symbol_Index) return Text_Type
+   is (raise Program_Error);
+
+   package Symbols is new Langkit_Support.Symbols
+     (Precomputed_Symbol_Index, Precomputed_Symbol);
+   package TDHs is new Langkit_Support.Token_Data_Handlers
+     (Precomputed_Symbol_Index, Precomputed_Symbol, Symbols);
+   use Symbols, TDHs;
+
+   ST : Symbol_Table := Create_Symbol_Table;
+
+   procedure Check (Label : String; Source : Text_Type);
+   --  Load Source in a token data handler, narrow it and then print the text
+   --  and source location for each of its words.
+
+   -----------
+   -- Check --
+   -----------
+
+   procedure Check (Label : String; Source : Text_Type) is
+      TDH   : Token_Data_Handler;
+      First : Positive := Source'First;
+
+      procedure Dump;
+      --  Print the storage mode for TDH's source buffer, and then each word
+
+      ----------
+      -- Dump --
+      ----------
+
+      procedure Dump is
+      begin
+         Put_Line ("  wide: " & Boolean'Image (TDH.Source_Buffer /= null)
+                   & ", narrow: "
+                   & Boolean'Image (TDH.Narrow_Source_Buffer /= null));
+         for T of TDH.Tokens loop
+            Put_Line ("  " & Image (Sloc_Range (TDH, T)) & ": "
+                      & Image (TDH, T));
+         end loop;
+      end Dump;
+
+   begin
+      Put_Line ("== " & Label & " ==");
+      Initialize (TDH, ST);
+      Reset (TDH, new Text_Type'(Source), Source'First, Source'Last,
+             Tab_Stop => 4);
+
+      --  Create one token per sequence of non-blank characters
+
+      for I in Source'Range loop
+         if Source (I) in ' ' | Chars.HT | Chars.LF then
+            if First < I then
+               Token_Vectors.Append
+                 (TDH.Tokens, (Kind         => 0,
+                               Source_First => First,
+                               Source_Last  => I - 1,
+                               Symbol       => null));
+            end if;
+            First := I + 1;
+         end if;
+      end loop;
+
+      Narrow_Source_Buffer (TDH);
+      Dump;
+
+      Put_Line ("  Widening...");
+      Widen_Source_Buffer (TDH);
+      Dump;
+      Free (TDH);
+      New_Line;
+   end Check;
+
+begin
+   Check ("Latin-1", "abc d" & Chars.LF & Chars.HT & "caf"
+                     & Wide_Wide_Character'Val (16#E9#) & " x" & Chars.LF);
+   Check ("Unicode", "one" & Chars.LF & "  two "
+                     & Wide_Wide_Character'Val (16#3BB#) & Chars.LF);
+   Destroy (ST);
+   Put_Line ("Done");
+end Main;
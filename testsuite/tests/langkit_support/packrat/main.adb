@@ -0,0 +1,79 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Langkit_Support.Packrat;
+
+procedure Main is
+
+   type Token_Index is range 0 .. 1000;
+
+   package Int_Memos is new Langkit_Support.Packrat (Integer, Token_Index);
+   use Int_Memos;
+
+   Memo : Memo_Type (Size => 4, Ways => 2);
+
+   procedure Query (Offset : Token_Index);
+   procedure Store
+     (Offset : Token_Index; Is_Success : Boolean; Instance : Integer);
+
+   -----------
+   -- Query --
+   -----------
+
+   procedure Query (Offset : Token_Index) is
+      E : constant Memo_Entry := Get (Memo, Offset);
+   begin
+      Put ("Get (" & Token_Index'Image (Offset) & ") = "
+           & Memo_State'Image (E.State));
+      if E.State = Success then
+         Put (Integer'Image (E.Instance)
+              & " up to" & Token_Index'Image (E.Final_Pos));
+      end if;
+      New_Line;
+   end Query;
+
+   -----------
+   -- Store --
+   -----------
+
+   procedure Store
+     (Offset : Token_Index; Is_Success : Boolean; Instance : Integer) is
+   begin
+      Put_Line ("Set (" & Token_Index'Image (Offset) & ")");
+      Set (Memo, Is_Success, Instance, Offset, Offset + 1);
+   end Store;
+
+begin
+   --  Offsets 10, 14 and 18 all go to the same set, which can hold two
+   --  entries.
+
+   Store (10, True, 100);
+   Query (10);
+   Query (14);
+   Store (14, True, 140);
+   Query (10);
+   Query (14);
+   Put_Line (Image (Memo));
+   New_Line;
+
+   Put_Line ("Evict the least recently set entry");
+   Store (18, True, 180);
+   Query (10);
+   Query (14);
+   Query (18);
+   Put_Line (Image (Memo));
+   New_Line;
+
+   Put_Line ("Overwrite an existing entry");
+   Store (14, False, 0);
+   Query (14);
+   Query (18);
+   Put_Line (Image (Memo));
+   New_Line;
+
+   Put_Line ("Clear keeps statistics");
+   Clear (Memo);
+   Query (14);
+   Put_Line (Image (Memo));
+   Reset_Stats (Memo);
+   Put_Line (Image (Memo));
+end Main;
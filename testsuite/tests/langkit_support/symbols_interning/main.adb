@@ -0,0 +1,175 @@
+--  Microbenchmark for symbol tables: intern the same set of words in a
+--  single task and then in several tasks at the same time, and check that
+--  equal texts always yield the same symbol.
+--
+--  Pass the --timings argument to print how long each step took.
+
+with Ada.Calendar;    use Ada.Calendar;
+with Ada.Command_Line;
+with Ada.Strings;     use Ada.Strings;
+with Ada.Strings.Fixed;
+with Ada.Text_IO;     use Ada.Text_IO;
+with Ada.Unchecked_Deallocation;
+
+with Langkit_Support.Symbols;
+with Langkit_Support.Text; use Langkit_Support.Text;
+
+procedure Main is
+
+   type Precomputed_Symbol_Index is new Integer range 1 .. 0;
+   function Precomputed_Symbol
+     (Dummy_Index : Precomputed_Symbol_Index) return Text_Type
+   is (raise Program_Error);
+
+   package Symbols is new Langkit_Support.Symbols
+     (Precomputed_Symbol_Index, Precomputed_Symbol);
+   use Symbols;
+
+   Word_Count : constant := 20_000;
+   Rounds     : constant := 10;
+   Task_Count : constant := 4;
+
+   type Word_Index is range 1 .. Word_Count;
+   type Word_Array is array (Word_Index) of Text_Access;
+   type Symbol_Array is array (Word_Index) of Symbol_Type;
+   type Symbol_Array_Access is access Symbol_Array;
+   procedure Free is new Ada.Unchecked_Deallocation
+     (Symbol_Array, Symbol_Array_Access);
+
+   Print_Timings : constant Boolean :=
+     Ada.Command_Line.Argument_Count = 1
+     and then Ada.Command_Line.Argument (1) = "--timings";
+
+   Words : Word_Array;
+
+   procedure Intern
+     (ST : Symbol_Table; Start : Word_Index; Result : out Symbol_Array);
+   --  Look for all words in ST Rounds times, starting with Words (Start),
+   --  and store the corresponding symbols in Result.
+
+   procedure Report (Label : String; Start_Time : Time; Consistent : Boolean);
+   --  Print the result of a benchmark step
+
+   ------------
+   -- Intern --
+   ------------
+
+   procedure Intern
+     (ST : Symbol_Table; Start : Word_Index; Result : out Symbol_Array)
+   is
+      I : Word_Index := Start;
+   begin
+      for Dummy_Round in 1 .. Rounds loop
+         for Dummy_Word in Word_Index loop
+            Result (I) := Find (ST, Words (I).all);
+            I := (if I = Word_Index'Last then Word_Index'First else I + 1);
+         end loop;
+      end loop;
+   end Intern;
+
+   ------------
+   -- Report --
+   ------------
+
+   procedure Report (Label : String; Start_Time : Time; Consistent : Boolean)
+   is
+      Elapsed : constant Duration := Clock - Start_Time;
+   begin
+      Put_Line (Label & ": consistent symbols: " & Boolean'Image (Consistent));
+      if Print_Timings then
+         Put_Line ("  " & Duration'Image (Elapsed) & "s");
+      end if;
+   end Report;
+
+begin
+   for I in Words'Range loop
+      Words (I) := new Text_Type'
+        (To_Text ("word_" & Fixed.Trim (Word_Index'Image (I), Left)));
+   end loop;
+
+   --  Single task interning: symbols for equal texts must be the same, and
+   --  looking for an unknown text without creating it must yield no symbol.
+
+   declare
+      ST         : Symbol_Table := Create_Symbol_Table;
+      First      : Symbol_Array_Access := new Symbol_Array;
+      Again      : Symbol_Array_Access := new Symbol_Array;
+      Start_Time : constant Time := Clock;
+      Consistent : Boolean := True;
+   begin
+      Intern (ST, Word_Index'First, First.all);
+      Intern (ST, Word_Index'Last, Again.all);
+      for I in Word_Index loop
+         Consistent := Consistent
+           and then First (I) = Again (I)
+           and then First (I).all = Words (I).all;
+      end loop;
+      Report ("1 task", Start_Time, Consistent);
+
+      Put_Line ("Unknown word: "
+                & Image (Find (ST, "unknown", Create => False),
+                         With_Quotes => True));
+      Put_Line ("Known word: "
+                & Image (Find (ST, "word_42", Create => False),
+                         With_Quotes => True));
+
+      Free (First);
+      Free (Again);
+      Destroy (ST);
+   end;
+
+   --  Several tasks interning the same words at the same time, each one
+   --  starting at a different word: all tasks must get the same symbols.
+
+   declare
+      ST         : Symbol_Table := Create_Symbol_Table;
+      Results    : array (1 .. Task_Count) of Symbol_Array_Access;
+      Start_Time : constant Time := Clock;
+      Consistent : Boolean := True;
+   begin
+      declare
+         task type Worker is
+            entry Start (Index : Positive);
+         end Worker;
+
+         task body Worker is
+            Self : Positive;
+         begin
+            accept Start (Index : Positive) do
+               Self := Index;
+            end Start;
+            Intern
+              (ST,
+               Word_Index (1 + (Self - 1) * Word_Count / Task_Count),
+               Results (Self).all);
+         end Worker;
+
+         Workers : array (1 .. Task_Count) of Worker;
+      begin
+         for I in Workers'Range loop
+            Results (I) := new Symbol_Array;
+            Workers (I).Start (I);
+         end loop;
+      end;
+
+      for I in Word_Index loop
+         for R of Results loop
+            Consistent := Consistent
+              and then R (I) = Results (1) (I)
+              and then R (I).all = Words (I).all;
+         end loop;
+      end loop;
+      Report (Fixed.Trim (Integer'Image (Task_Count), Left) & " tasks",
+              Start_Time, Consistent);
+
+      for R of Results loop
+         Free (R);
+      end loop;
+      Destroy (ST);
+   end;
+
+   for W of Words loop
+      Free (W);
+   end loop;
+   Put_Line ("Done");
+end Main;
@@ -0,0 +1,151 @@
+with Ada.Text_IO; use Ada.Text_IO;
+
+with Langkit_Support.Slocs;  use Langkit_Support.Slocs;
+with Langkit_Support.Symbols;
+with Langkit_Support.Text;   use Langkit_Support.Text;
+with Langkit_Support.Token_Data_Handlers;
+
+procedure Main is
+
+   type Precomputed_Symbol_Index is new Integer range 1 .. 0;
+   function Precomputed_Symbol
+     (Dummy_Index : Precomputed_Symbol_Index) return Text_Type
+   is (raise Program_Error);
+
+   package Symbols is new Langkit_Support.Symbols
+     (Precomputed_Symbol_Index, Precomputed_Symbol);
+   package TDHs is new Langkit_Support.Token_Data_Handlers
+     (Precomputed_Symbol_Index, Precomputed_Symbol, Symbols);
+   use Symbols, TDHs;
+
+   Tab_Stop : constant Positive := 4;
+
+   ST : Symbol_Table := Create_Symbol_Table;
+
+   function Expected_Sloc
+     (Source : Text_Type; Index : Positive) return Source_Location;
+   --  Compute the source location of the character at Index in Source,
+   --  scanning it character by character from its beginning.
+
+   procedure Check (Label : String; Source : Text_Type);
+   --  Load Source in a token data handler, and check that Get_Sloc returns
+   --  the expected source location for all indexes in it, both with a wide
+   --  and a narrow source buffer. Then print the source location range for
+   --  each of its words.
+
+   -------------------
+   -- Expected_Sloc --
+   -------------------
+
+   function Expected_Sloc
+     (Source : Text_Type; Index : Positive) return Source_Location
+   is
+      Line   : Natural := 1;
+      Column : Natural := 0;
+   begin
+      for I in Source'First .. Index - 1 loop
+         if Source (I) = Chars.LF then
+            Line := Line + 1;
+            Column := 0;
+         elsif Source (I) = Chars.HT then
+            Column := (Column + Tab_Stop) / Tab_Stop * Tab_Stop;
+         else
+            Column := Column + 1;
+         end if;
+      end loop;
+      return (Line_Number (Line), Column_Number (Column + 1));
+   end Expected_Sloc;
+
+   -----------
+   -- Check --
+   -----------
+
+   procedure Check (Label : String; Source : Text_Type) is
+      TDH   : Token_Data_Handler;
+      First : Positive := Source'First;
+
+      procedure Check_Slocs (Mode : String);
+      --  Compare the result of Get_Sloc with Expected_Sloc for all indexes
+
+      -----------------
+      -- Check_Slocs --
+      -----------------
+
+      procedure Check_Slocs (Mode : String) is
+         Mismatches : Natural := 0;
+      begin
+         for I in Source'First .. Source'Last + 1 loop
+            declare
+               Expected : constant Source_Location :=
+                  Expected_Sloc (Source, I);
+               Actual   : constant Source_Location := Get_Sloc (TDH, I);
+            begin
+               if Actual /= Expected then
+                  Put_Line ("  " & Mode & ": mismatch at" & Integer'Image (I)
+                            & ": got " & Image (Actual) & ", expected "
+                            & Image (Expected));
+                  Mismatches := Mismatches + 1;
+               end if;
+            end;
+         end loop;
+         Put_Line ("  " & Mode & ":" & Natural'Image (Mismatches)
+                   & " mismatch(es)");
+      end Check_Slocs;
+
+   begin
+      Put_Line ("== " & Label & " ==");
+      Initialize (TDH, ST);
+      Reset (TDH, new Text_Type'(Source), Source'First, Source'Last,
+             Tab_Stop => Tab_Stop);
+
+      --  Create one token per sequence of non-blank characters
+
+      for I in Source'First .. Source'Last + 1 loop
+         if I > Source'Last or else Source (I) in ' ' | Chars.HT | Chars.LF
+         then
+            if First < I then
+               Token_Vectors.Append
+                 (TDH.Tokens, (Kind         => 0,
+                               Source_First => First,
+                               Source_Last  => I - 1,
+                               Symbol       => null));
+            end if;
+            First := I + 1;
+         end if;
+      end loop;
+
+      Check_Slocs ("wide");
+      Narrow_Source_Buffer (TDH);
+      Check_Slocs ("narrow");
+
+      for T of TDH.Tokens loop
+         declare
+            Last : constant Natural :=
+               Natural'Min (T.Source_Last, T.Source_First + 9);
+         begin
+            Put_Line ("  " & Image (Sloc_Range (TDH, T)) & ": "
+                      & Image (Source_Slice (TDH, T.Source_First, Last))
+                      & (if Last < T.Source_Last then "..." else ""));
+         end;
+      end loop;
+
+      Free (TDH);
+      New_Line;
+   end Check;
+
+   Long_Line : constant Text_Type (1 .. 2_000) := (others => 'x');
+
+begin
+   Check ("No tabulation", "abc d" & Chars.LF & Chars.LF & "  e" & Chars.LF);
+   Check ("Tabulations",
+          Chars.HT & "a" & Chars.HT & Chars.HT & "bc" & Chars.LF
+          & "de" & Chars.HT & "f g" & Chars.HT & "h" & Chars.LF
+          & "ij " & Chars.HT & Chars.LF
+          & Chars.HT);
+   Check ("Long lines",
+          Long_Line & " y" & Chars.LF
+          & "z" & Chars.HT & Long_Line & " t" & Chars.HT & "u" & Chars.LF
+          & Long_Line & Chars.HT & "v");
+   Destroy (ST);
+   Put_Line ("Done");
+end Main;
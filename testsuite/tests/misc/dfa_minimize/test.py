@@ -0,0 +1,60 @@
+"""
+Test that the minimization of lexer DFAs merges equivalent states.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.lexer.char_set import CharSet
+from langkit.lexer.regexp import NFAState, RegexpCollection
+
+
+# Disable ellipsis for CharSet.__repr__, as we need full output in this
+# testcase to check transitions.
+CharSet._repr_ellipsis = False
+
+
+def get_action(labels):
+    return min(labels)[1] if labels else None
+
+
+def check(label, rules):
+    """
+    Build a DFA for the given rules, minimize it and print its states.
+
+    :param str label: Label for this check.
+    :param list[(str, str)] rules: List of regexp/action couples. Rules that
+        come first have precedence.
+    """
+    print('== {} =='.format(label))
+
+    regexps = RegexpCollection()
+    start = NFAState()
+    for i, (regexp, action) in enumerate(rules):
+        nfa_start, nfa_end = regexps.nfa_for(regexp)
+        nfa_end.label = (i, action)
+        start.add_transition(None, nfa_start)
+
+    dfa = start.to_dfa()
+    minimized = dfa.minimize(get_action)
+    states = minimized.reachable_states()
+    print('{} states -> {} states'.format(len(dfa.reachable_states()),
+                                          len(states)))
+
+    ids = {s: i for i, s in enumerate(states)}
+    for s in states:
+        print('{}: {}'.format(ids[s], get_action(s.labels)))
+        for char_set, next_state in s.sorted_transitions:
+            print('   {} -> {}'.format(char_set, ids[next_state]))
+    print('')
+
+
+check('Single literal', [('abc', 'Abc')])
+check('Alternatives with common suffix', [('(a|b)c', 'Ac')])
+check('Redundant repetitions', [('a*a*', 'As')])
+check('Keywords and identifiers', [('if', 'If'),
+                                   ('in', 'In'),
+                                   ('[a-z]+', 'Id')])
+check('Distinct actions', [('ab', 'Ab'), ('cb', 'Cb')])
+check('Same actions', [('ab', 'Id'), ('cb', 'Id')])
+
+print('Done')
@@ -0,0 +1,105 @@
+"""
+Test that the tables computed for the table-driven lexer backend match the
+DFA they come from.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.lexer.regexp import (DFATableCodeGenHolder, NFAState,
+                                  RegexpCollection)
+
+
+def get_action(labels):
+    return min(labels)[1] if labels else None
+
+
+def get_class(holder, char):
+    """
+    Return the class for the given character, as computed in the generated
+    Get_Class function.
+    """
+    code = ord(char)
+    if code < 128:
+        segments = holder.ascii_classes
+    else:
+        page, code = divmod(code, holder.page_size)
+        page_id = 0
+        for first, last, value in holder.page_map:
+            if first <= page <= last:
+                page_id = value
+        segments = holder.pages[page_id]
+    for first, last, class_id in segments:
+        if first <= code <= last:
+            return class_id
+    return 0
+
+
+def match(holder, text):
+    """
+    Return the longest match for ``text`` and its action, walking the
+    transition tables the same way the generated lexer does.
+    """
+    state = 1
+    result = (None, 0)
+    index = 0
+    while True:
+        action_id = holder.state_actions[state - 1]
+        if action_id:
+            result = (holder.actions[action_id - 1], index)
+        if index >= len(text):
+            break
+        row = dict(holder.rows[holder.state_rows[state - 1] - 1])
+        state = row.get(get_class(holder, text[index]), 0)
+        index += 1
+        if state == 0:
+            break
+    return result
+
+
+def escape(text):
+    """
+    Return an ASCII-only representation of ``text``.
+    """
+    return text.encode('unicode_escape').decode('ascii')
+
+
+def check(label, rules, inputs):
+    """
+    Build tables for the given rules and print the longest match for each
+    input.
+
+    :param str label: Label for this check.
+    :param list[(str, str)] rules: List of regexp/action couples. Rules that
+        come first have precedence.
+    :param list[unicode] inputs: Strings to match.
+    """
+    print('== {} =='.format(label))
+
+    regexps = RegexpCollection()
+    start = NFAState()
+    for i, (regexp, action) in enumerate(rules):
+        nfa_start, nfa_end = regexps.nfa_for(regexp)
+        nfa_end.label = (i, action)
+        start.add_transition(None, nfa_start)
+
+    holder = DFATableCodeGenHolder(start.to_dfa().minimize(get_action),
+                                   get_action)
+    print('{} states, {} classes, {} rows, {} pages'.format(
+        holder.states_count, holder.classes_count, len(holder.rows),
+        len(holder.pages)))
+    for text in inputs:
+        action, length = match(holder, text)
+        print('{}: {} ({})'.format(escape(text), action, length))
+    print('')
+
+
+check('Keywords and identifiers',
+      [('if', 'If'), ('in', 'In'), ('[a-z]+', 'Id'), ('[0-9]+', 'Num')],
+      [u'if', u'in', u'ifx', u'i', u'int2', u'42a', u'+'])
+check('Non-ASCII ranges',
+      [(u'[\u00e0-\u00ff]+', 'Latin'), (u'[\u03b1-\u03c9]+', 'Greek'),
+       (u'[\u4e00-\u4eff]', 'Cjk')],
+      [u'\u00e9t\u00e9', u'\u03b1\u03b2\u03b3!', u'\u4e2d\u4e2d',
+       u'\u0100'])
+
+print('Done')
@@ -0,0 +1,54 @@
+"""
+Generate a library in the "build" directory. The first command-line argument
+selects a variant of the language specification.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import sys
+
+from langkit.compile_context import CompileCtx, Verbosity
+from langkit.dsl import ASTNode, T
+from langkit.envs import EnvSpec, add_env, add_to_env
+from langkit.expressions import No, Property, Self
+from langkit.parsers import Grammar, List
+
+from lexer_example import Token, foo_lexer
+from utils import default_warning_set
+
+
+variant = sys.argv[1]
+
+
+class FooNode(ASTNode):
+    if variant == 'base':
+        prop = Property(Self.children.length, public=True)
+    elif variant == 'body':
+        prop = Property(Self.children.length + 1, public=True)
+    elif variant in ('doc', 'env'):
+        prop = Property(Self.children.length + 1, public=True,
+                        doc='Documentation for prop.')
+
+    # Lambdas in the language specification must not make sources look
+    # out-of-date (see also the environment specification for Name).
+    add_prop = Property(lambda x=T.Int: x + Self.children.length, public=True)
+
+    env_spec = EnvSpec(add_env(no_parent=variant == 'env'))
+
+
+class Name(FooNode):
+    token_node = True
+
+    env_spec = EnvSpec(add_to_env(Self.match(
+        lambda n=T.Name: T.env_assoc.new(key=n.symbol, val=Self).singleton,
+        lambda _: No(T.env_assoc.array),
+    )))
+
+
+grammar = Grammar('main_rule')
+grammar.add_rules(main_rule=List(Name(Token.Identifier)))
+
+ctx = CompileCtx(lang_name='Foo', lexer=foo_lexer, grammar=grammar,
+                 verbosity=Verbosity('debug'))
+ctx.warnings = default_warning_set
+ctx.emit('build', generate_astdoc=False, generate_gdb_hook=False)
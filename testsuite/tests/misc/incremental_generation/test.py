@@ -0,0 +1,57 @@
+"""
+Test that code generation does not render again sources whose inputs did not
+change since the previous generation.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import json
+import os.path
+import re
+import shutil
+import subprocess
+import sys
+
+
+def generate(label, variant):
+    """
+    Run "gen.py" on the given language variant and print the list of sources
+    that were rendered.
+
+    :param str label: Label for this generation.
+    :param str variant: Language specification variant. See "gen.py".
+    """
+    print('== {} =='.format(label))
+
+    output = subprocess.check_output([sys.executable, 'gen.py', variant])
+    skipped = set(re.findall(r'Skipping up-to-date source: ([^\x1b\n]*)',
+                             output))
+    with open(os.path.join('build', 'obj', 'langkit_cache')) as f:
+        sources = {key.split(':', 1)[1] for key in json.load(f)
+                   if key.startswith('inputs:')}
+
+    rendered = sorted(os.path.basename(s) for s in sources - skipped)
+    if not rendered:
+        print('No source rendered')
+    elif len(rendered) == len(sources):
+        print('All sources rendered')
+    elif len(rendered) > 3:
+        print('{} sources out of {} rendered'.format(len(rendered),
+                                                     len(sources)))
+    else:
+        print('Sources rendered:')
+        for s in rendered:
+            print('  {}'.format(s))
+    print('')
+
+
+if os.path.exists('build'):
+    shutil.rmtree('build')
+
+generate('First generation', 'base')
+generate('No change', 'base')
+generate('Change in a property body', 'body')
+generate('Change in a property documentation', 'doc')
+generate('Change in an environment specification', 'env')
+
+print('Done')
@@ -0,0 +1,40 @@
+"""
+Generate a library in the "build" directory. The first command-line argument
+is the number of processes to use in order to render sources.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import sys
+
+from langkit.compile_context import CompileCtx
+from langkit.dsl import ASTNode, Field
+from langkit.expressions import Property, Self
+from langkit.parsers import Grammar, List
+
+from lexer_example import Token, foo_lexer
+from utils import default_warning_set
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Name(FooNode):
+    token_node = True
+
+    prop = Property(Self.text.length, public=True,
+                    doc='Length of this name.')
+
+
+class Decl(FooNode):
+    name = Field()
+    prop = Property(Self.name.prop + 1, public=True)
+
+
+grammar = Grammar('main_rule')
+grammar.add_rules(main_rule=List(Decl(Token.Def, Name(Token.Identifier))))
+
+ctx = CompileCtx(lang_name='Foo', lexer=foo_lexer, grammar=grammar)
+ctx.warnings = default_warning_set
+ctx.emit('build', generate_gdb_hook=False, jobs=int(sys.argv[1]))
@@ -0,0 +1,48 @@
+"""
+Test that rendering sources with several processes generates exactly the same
+files as sequential rendering.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import os
+import shutil
+import subprocess
+import sys
+
+
+def generate(jobs):
+    """
+    Run "gen.py" in a fresh build directory and return the generated files.
+
+    :param int jobs: Number of processes to render sources.
+    :rtype: dict[str, str]
+    """
+    if os.path.exists('build'):
+        shutil.rmtree('build')
+    output = subprocess.check_output([sys.executable, 'gen.py', str(jobs)])
+    if output:
+        print('Output for jobs={}:'.format(jobs))
+        print(output)
+
+    result = {}
+    for dirpath, dirnames, filenames in os.walk('build'):
+        # Compiled templates are not part of the generated library
+        if dirpath == os.path.join('build', 'obj'):
+            dirnames.remove('mako')
+        for f in filenames:
+            filepath = os.path.join(dirpath, f)
+            with open(filepath, 'rb') as f:
+                result[filepath] = f.read()
+    return result
+
+
+sequential = generate(1)
+parallel = generate(3)
+
+print('Generated files: {}'.format(len(sequential)))
+for f in sorted(set(sequential) | set(parallel)):
+    if sequential.get(f) != parallel.get(f):
+        print('Mismatch for {}'.format(f))
+
+print('Done')
@@ -0,0 +1,68 @@
+"""
+Test that the pass profile mode records measurements for all executed passes,
+prints a summary table and writes a Chrome trace file.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from io import BytesIO
+import json
+import sys
+
+from langkit.dsl import ASTNode
+from langkit.expressions import Property, Self
+from langkit.parsers import Grammar, List
+
+from lexer_example import Token
+from utils import prepare_context
+
+
+class FooNode(ASTNode):
+    prop = Property(Self.children.length, public=True)
+
+
+class Name(FooNode):
+    token_node = True
+
+
+grammar = Grammar('main_rule')
+grammar.add_rules(main_rule=List(Name(Token.Identifier)))
+
+ctx = prepare_context(grammar)
+stdout = sys.stdout
+sys.stdout = table = BytesIO()
+try:
+    ctx.emit('build', generate_astdoc=False, generate_gdb_hook=False,
+             pass_profile='trace.json')
+finally:
+    sys.stdout = stdout
+
+table_lines = table.getvalue().splitlines()
+print('Table header: {}'.format(table_lines[0].split()))
+print('Table footer: {}'.format(table_lines[-1].split()[-1]))
+
+with open('trace.json') as f:
+    events = json.load(f)['traceEvents']
+
+print('One table row per event: {}'.format(
+    len(table_lines) - 2 == len(events)
+))
+print('Well-formed events: {}'.format(all(
+    e['ph'] == 'X' and e['dur'] >= 0 and e['args']['cpu_time'] >= 0
+    for e in events
+)))
+print('Events are sorted: {}'.format(
+    [e['ts'] for e in events] == sorted(e['ts'] for e in events)
+))
+
+kinds = {}
+for e in events:
+    kinds.setdefault(e['cat'], e['name'])
+for kind in ('ASTNodePass', 'EmitterPass', 'GlobalPass', 'GrammarRulePass',
+             'PropertyPass'):
+    print('{} recorded: {}'.format(kind, kind in kinds))
+
+names = [e['name'] for e in events]
+for name in ('compute types', 'render property', 'render and write sources'):
+    print('{} recorded: {}'.format(name, name in names))
+print('Done')
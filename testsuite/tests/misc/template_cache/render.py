@@ -0,0 +1,14 @@
+"""
+Render the "test_foo" template using the "cache" template cache directory and
+print the result.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.template_utils import (add_template_dir, mako_template,
+                                    set_template_cache_dir)
+
+
+set_template_cache_dir('cache')
+add_template_dir('templates')
+print(mako_template('test_foo').render(x=1).strip())
@@ -0,0 +1,80 @@
+"""
+Test the on-disk cache for compiled templates.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import glob
+import os
+import shutil
+import subprocess
+import sys
+
+from langkit.template_utils import add_template_dir, mako_template
+
+
+for d in ('templates', 'more_templates', 'cache'):
+    if os.path.exists(d):
+        shutil.rmtree(d)
+    os.mkdir(d)
+
+
+def write_template(dirname, name, content, mtime=None):
+    filename = os.path.join(dirname, '{}.mako'.format(name))
+    with open(filename, 'w') as f:
+        f.write(content)
+    if mtime is not None:
+        os.utime(filename, (mtime, mtime))
+
+
+def cached_modules():
+    return sorted(glob.glob(os.path.join('cache', '*', '*.py')))
+
+
+def render():
+    """
+    Render the "test_foo" template in a separate process, so that only the
+    on-disk cache can be reused.
+    """
+    output = subprocess.check_output([sys.executable, 'render.py'])
+    print('Output: {}'.format(output.strip()))
+    print('Cached modules: {}'.format(len(cached_modules())))
+    print('')
+
+
+print('== First rendering ==')
+write_template('templates', 'test_foo', 'Foo ${x}')
+render()
+
+print('== Rendering with an up-to-date cache ==')
+# Tamper with the compiled module to check that it is reused
+module, = cached_modules()
+with open(module) as f:
+    content = f.read()
+with open(module, 'w') as f:
+    f.write(content.replace("u'Foo '", "u'Cached '"))
+for pyc in glob.glob(module + 'c'):
+    os.remove(pyc)
+render()
+
+print('== Rendering after a template change ==')
+# Even if the template looks older than the compiled module, its new content
+# must be taken into account.
+# Modules compiled for the previous content must be removed.
+write_template('templates', 'test_foo', 'Foo ${x + 1}', mtime=0)
+render()
+
+print('== Rendering after another template change ==')
+write_template('templates', 'test_foo', 'Foo ${x + 2}', mtime=0)
+render()
+
+print('== Adding a template directory keeps compiled templates ==')
+add_template_dir('templates')
+foo = mako_template('test_foo')
+write_template('more_templates', 'test_bar', 'Bar ${x}')
+add_template_dir('more_templates')
+print('Same template: {}'.format(mako_template('test_foo') is foo))
+print('Bar: {}'.format(mako_template('test_bar').render(x=1)))
+print('')
+
+print('Done')
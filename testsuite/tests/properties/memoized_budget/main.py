@@ -0,0 +1,76 @@
+from __future__ import absolute_import, division, print_function
+
+print('main.py: Running...')
+
+
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+u = ctx.get_from_buffer('main.txt', 'example')
+other = ctx.get_from_buffer('other.txt', 'example')
+for unit in (u, other):
+    if unit.diagnostics:
+        for d in unit.diagnostics:
+            print(d)
+        sys.exit(1)
+
+
+def compute_all(unit=u):
+    for i in range(20):
+        for j in range(20):
+            assert unit.root.p_compute(i, j) == i + j
+
+
+def check_stats(label, calls):
+    stats = ctx.memoization_cache_stats
+    print('{}: budget={} entries={}'.format(
+        label, stats.budget, stats.entries
+    ))
+    assert stats.hits + stats.misses == calls
+    assert stats.entries == stats.misses - stats.evictions
+
+
+ctx.set_cache_budget(memoization_entries=50)
+compute_all()
+check_stats('Bounded', 400)
+assert ctx.memoization_cache_stats.evictions == 350
+
+ctx.set_cache_budget()
+compute_all()
+check_stats('Unbounded', 800)
+
+# The budget applies to the tables of all units together, so filling the
+# table of one unit evicts entries from the table of the other one.
+ctx.set_cache_budget(memoization_entries=50)
+compute_all(other)
+check_stats('Two units', 1200)
+ctx.set_cache_budget()
+
+# Likewise, the lookup cache budget applies to the lookup caches of all
+# lexical environments in the context together. Each lookup below goes
+# through the environment of the unit's root node and the root environment.
+names = ['example'] + ['x{}'.format(i) for i in range(50)]
+ctx.set_cache_budget(lookup_cache_entries=10)
+first = [u.root.p_lookup(n) for n in names]
+second = [u.root.p_lookup(n) for n in names]
+assert first == second
+assert len(first[0]) == 2
+stats = ctx.lookup_cache_stats
+print('Lookup caches: budget={} entries={}'.format(
+    stats.budget, stats.entries
+))
+assert stats.evictions > 0
+assert stats.entries == stats.misses - stats.evictions
+
+# Lookup cache budgets and statistics belong to each context
+other_ctx = libfoolang.AnalysisContext()
+stats = other_ctx.lookup_cache_stats
+print('Other context: budget={} entries={}'.format(
+    stats.budget, stats.entries
+))
+ctx.set_cache_budget()
+
+print('main.py: Done.')
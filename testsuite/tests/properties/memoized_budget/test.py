@@ -0,0 +1,42 @@
+"""
+Check that memoization tables and lookup caches honor the cache budgets set
+on analysis contexts, and that evicting entries does not change property
+results.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Int, T
+from langkit.envs import EnvSpec, add_env, add_to_env
+from langkit.expressions import New, Self, langkit_property
+from langkit.parsers import Grammar
+
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Example(FooNode):
+
+    @langkit_property(public=True, memoized=True, return_type=Int)
+    def compute(i=Int, j=Int):
+        return i + j
+
+    @langkit_property(public=True)
+    def lookup(name=T.Symbol):
+        return Self.children_env.get(name)
+
+    env_spec = EnvSpec(
+        add_to_env(mappings=New(T.env_assoc, key='example', val=Self)),
+        add_env()
+    )
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=Example('example'),
+)
+build_and_run(foo_grammar, 'main.py')
+print('Done')
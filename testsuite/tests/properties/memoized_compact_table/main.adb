@@ -0,0 +1,79 @@
+--  Fill memoization tables with a lot of entries, look them up, invalidate
+--  them and start again, both with compact tables and with hashed maps.
+--
+--  Pass the --timings argument to print how long each step took.
+
+with Ada.Calendar;     use Ada.Calendar;
+with Ada.Command_Line;
+with Ada.Text_IO;      use Ada.Text_IO;
+
+with Langkit_Support.Diagnostics; use Langkit_Support.Diagnostics;
+
+with Libfoolang.Analysis; use Libfoolang.Analysis;
+
+procedure Main is
+   Ctx  : constant Analysis_Context := Create_Context;
+   Unit : Analysis_Unit :=
+      Get_From_Buffer (Ctx, "foo.txt", Buffer => "example");
+
+   Print_Timings : constant Boolean :=
+     Ada.Command_Line.Argument_Count = 1
+     and then Ada.Command_Line.Argument (1) = "--timings";
+
+   procedure Run (Label : String);
+   --  Evaluate the memoized property for a lot of different arguments, twice
+   --  (the second time should only fetch memoized results), and check its
+   --  results.
+
+   ---------
+   -- Run --
+   ---------
+
+   procedure Run (Label : String) is
+      Node       : constant Example := Root (Unit).As_Example;
+      Start_Time : constant Time := Clock;
+      Consistent : Boolean := True;
+   begin
+      for Round in 1 .. 2 loop
+         for I in 1 .. 300 loop
+            for J in 1 .. 300 loop
+               if Node.P_Compute (I, J) /= I + J then
+                  Consistent := False;
+               end if;
+            end loop;
+         end loop;
+      end loop;
+
+      Put_Line
+        (Label & ": " & (if Consistent then "consistent" else "INCONSISTENT"));
+      if Print_Timings then
+         Put_Line ("  time:" & Duration'Image (Clock - Start_Time));
+      end if;
+   end Run;
+
+begin
+   if Has_Diagnostics (Unit) then
+      for D of Diagnostics (Unit) loop
+         Put_Line (To_Pretty_String (D));
+      end loop;
+      raise Program_Error;
+   end if;
+
+   Run ("Compact tables");
+   Run ("Compact tables (memoized)");
+
+   Disable_Compact_Memoization;
+   Run ("Hashed maps");
+   Run ("Hashed maps (memoized)");
+
+   --  Reparsing the unit invalidates all memoized results for its nodes
+
+   Unit := Get_From_Buffer (Ctx, "foo.txt", Buffer => "example");
+   Run ("Hashed maps (after reparse)");
+
+   Disable_Compact_Memoization (False);
+   Unit := Get_From_Buffer (Ctx, "foo.txt", Buffer => "example");
+   Run ("Compact tables (after reparse)");
+
+   Put_Line ("main.adb: Done.");
+end Main;
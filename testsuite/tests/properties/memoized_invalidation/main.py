@@ -0,0 +1,60 @@
+from __future__ import absolute_import, division, print_function
+
+print('main.py: Running...')
+
+
+import sys
+
+import libfoolang
+
+
+def load_unit(filename, content):
+    unit = ctx.get_from_buffer(filename, content)
+    if unit.diagnostics:
+        for d in unit.diagnostics:
+            print(d)
+        sys.exit(1)
+    unit.populate_lexical_env()
+    return unit
+
+
+def resolve():
+    for u in units:
+        print('{} references: {}'.format(
+            u.filename.split('/')[-1],
+            [n.p_referenced for n in u.root.f_content]
+        ))
+    print('Memoization stats: {}'.format(ctx.memoization_stats))
+
+
+ctx = libfoolang.AnalysisContext()
+ctx.discard_errors_in_populate_lexical_env(False)
+units = [load_unit('a.txt', 'a (b)'),
+         load_unit('b.txt', 'b (a)'),
+         load_unit('c.txt', 'c (c)')]
+resolve()
+
+# Only the results for a.txt (which references b.txt) and for b.txt itself
+# must be dropped.
+print('Reparse b.txt')
+units[1].reparse('b (a)')
+resolve()
+
+# Nothing references c.txt, so only its own results must be dropped
+print('Reparse c.txt')
+units[2].reparse('c (a)')
+resolve()
+
+# d.txt references a unit that is not loaded yet: the memoized error must be
+# dropped once e.txt is loaded and its lexical environments are populated.
+print('Load d.txt')
+units.append(load_unit('d.txt', 'd (e)'))
+try:
+    units[3].root.f_content[0].p_referenced
+except libfoolang.PropertyError:
+    print('d.txt references: <PropertyError>')
+print('Load e.txt')
+units.append(load_unit('e.txt', 'e (d)'))
+resolve()
+
+print('main.py: Done.')
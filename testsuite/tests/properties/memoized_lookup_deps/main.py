@@ -0,0 +1,43 @@
+from __future__ import absolute_import, division, print_function
+
+print('main.py: Running...')
+
+
+import sys
+
+import libfoolang
+
+
+def load_unit(filename, content):
+    unit = ctx.get_from_buffer(filename, content)
+    if unit.diagnostics:
+        for d in unit.diagnostics:
+            print(d)
+        sys.exit(1)
+    unit.populate_lexical_env()
+    return unit
+
+
+def resolve():
+    for u in units[1:]:
+        print('{} references: {}'.format(
+            u.filename.split('/')[-1],
+            [n.p_referenced for n in u.root[0].f_content]
+        ))
+
+
+ctx = libfoolang.AnalysisContext()
+ctx.discard_errors_in_populate_lexical_env(False)
+units = [load_unit('a.txt', 'a { }'),
+         load_unit('b.txt', 'b < a { x }'),
+         load_unit('c.txt', 'c { x }')]
+resolve()
+
+# Looking up "x" from b.txt goes through the environment of the block in
+# a.txt, so its memoized result must be dropped when a.txt now defines "x".
+# c.txt is not related to a.txt.
+print('Reparse a.txt')
+units[0].reparse('a { def x }')
+resolve()
+
+print('main.py: Done.')
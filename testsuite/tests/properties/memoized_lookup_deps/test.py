@@ -0,0 +1,80 @@
+"""
+Check that reparsing a unit invalidates the memoized results of lookups that
+go through its lexical environments, even when they start in other units.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, T
+from langkit.envs import EnvSpec, add_env, add_to_env, set_initial_env
+from langkit.expressions import Self, langkit_property
+from langkit.parsers import Grammar, List, Opt, Or, Pick
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Name(FooNode):
+    token_node = True
+
+
+class Decl(FooNode):
+    name = Field(type=Name)
+
+    env_spec = EnvSpec(
+        add_to_env(T.env_assoc.new(key=Self.name.symbol, val=Self)),
+    )
+
+
+class Ref(FooNode):
+    name = Field(type=Name)
+
+    @langkit_property(public=True, memoized=True)
+    def referenced():
+        return Self.node_env.get_first(Self.name.symbol)
+
+
+class Block(FooNode):
+    name = Field(type=Name)
+    parent_name = Field(type=Name)
+    content = Field()
+
+    @langkit_property()
+    def initial_env():
+        # Blocks with a parent name have their environment nested in the
+        # parent block's one, which belongs to another unit.
+        return Self.parent_name.then(
+            lambda n: Self.root_env.get_first(n.symbol).children_env,
+            default_val=Self.root_env
+        )
+
+    @langkit_property()
+    def root_env():
+        return Self.parent.children_env
+
+    env_spec = EnvSpec(
+        set_initial_env(Self.initial_env),
+        add_to_env(T.env_assoc.new(key=Self.name.symbol, val=Self),
+                   dest_env=Self.root_env),
+        add_env(),
+    )
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=List(foo_grammar.block),
+    block=Block(
+        foo_grammar.name,
+        Opt('<', foo_grammar.name),
+        Pick('{', List(Or(Decl('def', foo_grammar.name),
+                          Ref(foo_grammar.name)),
+                       empty_valid=True), '}')
+    ),
+    name=Name(Token.Identifier),
+)
+build_and_run(foo_grammar, 'main.py')
+print('Done')
@@ -0,0 +1,33 @@
+from __future__ import absolute_import, division, print_function
+
+import libfoolang
+
+
+print('main.py: Running...')
+
+ctx = libfoolang.AnalysisContext()
+
+for charset, buffer in [
+    ('ascii', b'abc def'),
+    ('ascii', b'abc d\xe9f'),
+    ('iso-8859-1', b'caf\xe9 na\xefve'),
+    ('utf-8', u'caf\xe9 \u2200x \U0001d11e'.encode('utf-8')),
+    ('UTF8', u'se\xf1or'.encode('utf-8')),
+    ('utf-8', b'overlong \xc0\xaf'),
+    ('utf-8', b'truncated \xe2\x88'),
+    ('utf-8', b'continuation \x80'),
+    ('utf-16le', u'\u2200x y'.encode('utf-16le')),
+    ('no-such-charset', b'abc'),
+]:
+    u = ctx.get_from_buffer('main.txt', buffer, charset=charset)
+    print('{}: {}'.format(charset, repr(buffer)))
+    if u.diagnostics:
+        for d in u.diagnostics:
+            print('  error: {}'.format(d.message))
+    else:
+        print('  {}'.format(' '.join(
+            repr(w.text) for w in u.root
+        )))
+    print('')
+
+print('main.py: Done.')
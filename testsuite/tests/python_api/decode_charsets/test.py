@@ -0,0 +1,41 @@
+"""
+Test that sources are properly decoded for the various supported charsets,
+including the ones that are decoded without Iconv.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode
+from langkit.lexer import Ignore, Lexer, LexerToken, Pattern, WithText
+from langkit.parsers import Grammar, List
+
+from utils import build_and_run
+
+
+class Token(LexerToken):
+    Word = WithText()
+
+
+foo_lexer = Lexer(Token)
+foo_lexer.add_rules(
+    (Pattern(r'[ \r\n\t]+'), Ignore()),
+    (Pattern(r'[^ \r\n\t]+'), Token.Word),
+)
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Word(FooNode):
+    token_node = True
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=List(Word(Token.Word), empty_valid=True),
+)
+
+build_and_run(foo_grammar, 'main.py', lexer=foo_lexer)
+
+print('Done')
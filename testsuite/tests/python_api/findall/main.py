@@ -0,0 +1,51 @@
+from __future__ import absolute_import, division, print_function
+
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+u = ctx.get_from_buffer('main.txt', """def a (b c) = 1
+def d ()
+def e (f) = 2""")
+if u.diagnostics:
+    for d in u.diagnostics:
+        print(d)
+    sys.exit(1)
+
+
+def check(node, types, **kwargs):
+    """
+    Look for ``types`` under ``node`` and check that the result is the same as
+    with the equivalent predicate.
+    """
+    result = node.findall(types, **kwargs)
+    types_tuple = tuple(types) if isinstance(types, list) else types
+    expected = node.findall(lambda n: isinstance(n, types_tuple), **kwargs)
+    assert result == expected
+    assert node.find(types, **kwargs) == (expected[0] if expected else None)
+
+    print('{} under {}{}:'.format(
+        ([t.__name__ for t in types] if isinstance(types, list)
+         else types.__name__),
+        node,
+        ' with {}'.format(kwargs) if kwargs else ''
+    ))
+    for n in result:
+        print('  {}'.format(n))
+
+
+check(u.root, libfoolang.Name)
+check(u.root, libfoolang.Expr)
+check(u.root, [libfoolang.Def, libfoolang.Number])
+check(u.root, libfoolang.FooNode, text='e')
+check(u.root[0], libfoolang.Def)
+check(u.root[1], libfoolang.Number)
+
+f = u.root.find(libfoolang.Name, text='f')
+print('Parent chain of {}:'.format(f))
+for n in f.parent_chain:
+    print('  {}'.format(n))
+
+print('main.py: Done')
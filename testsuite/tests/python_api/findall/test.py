@@ -0,0 +1,48 @@
+"""
+Check that looking for node types with finditer/findall, which browses trees
+through the C API, gives the same results as looking for them with a
+predicate.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field, abstract
+from langkit.parsers import Grammar, List, Opt
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+@abstract
+class Expr(FooNode):
+    pass
+
+
+class Name(Expr):
+    token_node = True
+
+
+class Number(Expr):
+    token_node = True
+
+
+class Def(FooNode):
+    name = Field()
+    args = Field()
+    value = Field()
+
+
+g = Grammar('main_rule')
+g.add_rules(
+    main_rule=List(g.def_rule),
+    def_rule=Def('def', g.name, '(', List(g.name, empty_valid=True), ')',
+                 Opt('=', g.number)),
+    name=Name(Token.Identifier),
+    number=Number(Token.Number),
+)
+build_and_run(g, 'main.py')
+print('Done')
@@ -0,0 +1,66 @@
+from __future__ import absolute_import, division, print_function
+
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+u = ctx.get_from_buffer('main.txt', """def a (b c) = 1
+def d ()
+def e (f)""")
+if u.diagnostics:
+    for d in u.diagnostics:
+        print(d)
+    sys.exit(1)
+
+
+def check(node):
+    """
+    Flatten the tree rooted at ``node`` and check that the result matches the
+    tree itself.
+    """
+    flat = node.flatten()
+
+    # Browse the tree in prefix order, skipping null children, and check each
+    # node against the corresponding entries in ``flat``.
+    nodes = []
+
+    def browse(n, parent_index):
+        index = len(nodes)
+        nodes.append(n)
+
+        assert flat.node_type(index) is type(n)
+        assert flat.parents[index] == parent_index
+        assert flat.sloc_range(index) == n.sloc_range
+
+        start, end = n.token_start, n.token_end
+        assert flat.token_starts[index] == (start.index if start else -1)
+        assert flat.token_ends[index] == (-1 if n.is_ghost else end.index)
+
+        children = []
+        for child in n:
+            if child is not None:
+                children.append(len(nodes))
+                browse(child, index)
+        assert list(flat.children(index)) == children
+
+    browse(node, -1)
+    assert len(flat) == len(nodes)
+    return flat
+
+
+flat = check(u.root)
+print('Nodes in the unit: {}'.format(len(flat)))
+print('Kinds: {}'.format(', '.join(flat.node_type(i).__name__
+                                   for i in range(len(flat)))))
+print('Slocs of the first Def: {}'.format(flat.sloc_range(1)))
+print('Last token of the ghost {}: {}'.format(flat.node_type(9).__name__,
+                                              flat.token_ends[9]))
+print('Children of the root: {}'.format(list(flat.children(0))))
+
+flat = check(u.root[1])
+print('Nodes in the second Def: {}'.format(len(flat)))
+print('Parents: {}'.format(list(flat.parents)))
+
+print('main.py: Done')
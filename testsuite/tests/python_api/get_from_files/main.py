@@ -0,0 +1,57 @@
+from __future__ import absolute_import, division, print_function
+
+print('main.py: Running...')
+
+
+import os.path
+
+import libfoolang
+
+
+def write(filename, content):
+    with open(filename, 'w') as f:
+        f.write(content)
+
+
+def summary(unit):
+    name = os.path.basename(unit.filename)
+    if unit.diagnostics:
+        return '{}: <diagnostics>'.format(name)
+    return '{}:{}'.format(name, ''.join(' ' + d.f_name.text
+                                        for d in unit.root))
+
+
+filenames = []
+for i in range(20):
+    filename = 'src{}.txt'.format(i)
+    write(filename, ''.join('a{}_{} = b{}\n'.format(i, j, j)
+                            for j in range(i % 4)))
+    filenames.append(filename)
+write('error.txt', 'a = = b')
+filenames += ['error.txt', 'src3.txt', 'missing.txt']
+
+ctx = libfoolang.AnalysisContext()
+
+print('== Load units in 4 jobs ==')
+units = ctx.get_from_files(filenames, jobs=4)
+for u in units:
+    print(summary(u))
+print('src3.txt loaded once: {}'.format(units[3] == units[-2]))
+print('missing.txt: {}'.format(units[-1].diagnostics[0].message))
+print('')
+
+print('== Reparse some units in 2 jobs ==')
+write('src1.txt', 'c = d\n')
+write('error.txt', 'e = f\n')
+units = ctx.get_from_files(['src1.txt', 'error.txt'], reparse=True, jobs=2)
+for u in units:
+    print(summary(u))
+print('')
+
+print('== Get units without reparsing them ==')
+write('src1.txt', 'g = h\n')
+units = ctx.get_from_files(['src1.txt'], jobs=2)
+for u in units:
+    print(summary(u))
+
+print('main.py: Done.')
@@ -0,0 +1,35 @@
+"""
+Test loading several analysis units at once, parsing them in several tasks.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field
+from langkit.parsers import Grammar, List
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Name(FooNode):
+    token_node = True
+
+
+class Decl(FooNode):
+    name = Field(type=Name)
+    value = Field(type=Name)
+
+
+foo_grammar = Grammar('main_rule')
+foo_grammar.add_rules(
+    main_rule=List(Decl(Name(Token.Identifier), '=', Name(Token.Identifier)),
+                   empty_valid=True),
+)
+
+build_and_run(foo_grammar, 'main.py')
+
+print('Done')
@@ -0,0 +1,61 @@
+from __future__ import absolute_import, division, print_function
+
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+u = ctx.get_from_buffer('main.txt', """
+(T) foo { a b }
+
+(T U) old_bar { c d }
+(T U) new_bar { e f }
+
+(V) old_baz { g }
+(V) new_baz { h }
+""")
+if u.diagnostics:
+    for d in u.diagnostics:
+        print(d)
+    sys.exit(1)
+
+foo, old_bar, new_bar, old_baz, new_baz = u.root
+
+
+def primary_stats():
+    return ctx.lexical_env_stats.per_kind['primary']
+
+
+ctx.reset_lexical_env_stats()
+stats = ctx.lexical_env_stats
+print('After reset:')
+for kind in libfoolang.LexicalEnvStats.kinds:
+    print('  {}: {}'.format(kind, all(c == 0 for c in stats.per_kind[kind])))
+
+foo.p_lookup('a')
+first = primary_stats()
+print('First lookup:')
+print('  gets: {}'.format(first.gets > 0))
+print('  cache misses: {}'.format(first.cache_misses > 0))
+
+foo.p_lookup('a')
+second = primary_stats()
+print('Second lookup:')
+print('  gets: +{}'.format(second.gets - first.gets))
+print('  cache hits: +{}'.format(second.cache_hits - first.cache_hits))
+print('  cache misses: +{}'.format(second.cache_misses - first.cache_misses))
+
+stats = ctx.lexical_env_stats
+print('Rebindings pools before rebinding: {} pools, {} rebindings'.format(
+    stats.rebindings_pools, stats.pooled_rebindings
+))
+foo.p_rebind(old_bar, new_bar)
+foo.p_rebind(old_bar, new_bar)
+foo.p_rebind(old_baz, new_baz)
+stats = ctx.lexical_env_stats
+print('Rebindings pools after rebinding: {} pools, {} rebindings'.format(
+    stats.rebindings_pools, stats.pooled_rebindings
+))
+
+print('main.py: Done.')
@@ -0,0 +1,46 @@
+from __future__ import absolute_import, division, print_function
+
+import sys
+
+import libfoolang
+
+
+ctx = libfoolang.AnalysisContext()
+
+
+def check(buffer):
+    """
+    Parse ``buffer``, export its tokens and check that the result matches
+    tokens as returned by ``AnalysisUnit.iter_tokens``.
+    """
+    u = ctx.get_from_buffer('main.txt', buffer)
+    if u.diagnostics:
+        for d in u.diagnostics:
+            print(d)
+        sys.exit(1)
+
+    tokens = list(u.iter_tokens())
+    array = u.token_array()
+    assert len(array) == len(tokens)
+    assert len(array) == u.token_count + u.trivia_count
+    for i, t in enumerate(tokens):
+        assert array.kind(i) == t.kind
+        assert array.is_trivia(i) == t.is_trivia
+        assert array.text(i) == t.text
+        assert array.sloc_range(i) == t.sloc_range
+    return array
+
+
+array = check('# hello\ndef a\t(b) = 1\n')
+print('Tokens in the unit: {}'.format(len(array)))
+print('Trivias in the unit: {}'.format(sum(array.trivia_flags)))
+for i in range(len(array)):
+    print('  {}{} {} at {}'.format('trivia ' if array.is_trivia(i) else '',
+                                   array.kind(i), repr(array.text(i)),
+                                   array.sloc_range(i)))
+print('Offsets of the first Identifier: {}'.format(list(array.offsets[8:10])))
+
+array = check('def b ()')
+print('Tokens in the second unit: {}'.format(len(array)))
+
+print('main.py: Done')
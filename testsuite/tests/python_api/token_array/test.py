@@ -0,0 +1,42 @@
+"""
+Check that exporting tokens through the Python API gives the same results as
+iterating on them one by one.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+from langkit.dsl import ASTNode, Field
+from langkit.parsers import Grammar, List, Opt
+
+from lexer_example import Token
+from utils import build_and_run
+
+
+class FooNode(ASTNode):
+    pass
+
+
+class Name(FooNode):
+    token_node = True
+
+
+class Number(FooNode):
+    token_node = True
+
+
+class Def(FooNode):
+    name = Field()
+    args = Field()
+    value = Field()
+
+
+g = Grammar('main_rule')
+g.add_rules(
+    main_rule=List(g.def_rule),
+    def_rule=Def('def', g.name, '(', List(g.name, empty_valid=True), ')',
+                 Opt('=', g.number)),
+    name=Name(Token.Identifier),
+    number=Number(Token.Number),
+)
+build_and_run(g, 'main.py')
+print('Done')
@@ -73,6 +73,11 @@ class Testsuite(BaseTestsuite):
             '--pretty-print', action='store_true',
             help='Pretty-print generated source code.'
         )
+        self.main.add_option(
+            '--lexer-backend', default='case',
+            help='Code generation backend for lexer state machines ("case"'
+                 ' or "table"). Default is "case".'
+        )
 
         # Tests update
         self.main.add_option(
@@ -105,6 +110,8 @@ class Testsuite(BaseTestsuite):
         # coerce to bool.
         self.global_env['pretty_print'] = bool(
             self.global_env['options'].pretty_print)
+        self.global_env['lexer_backend'] = (
+            self.global_env['options'].lexer_backend or 'case')
 
         if self.coverage_enabled:
             # Create a directory that we'll use to:
@@ -44,6 +44,7 @@ class PythonDriver(BaseDriver):
         derived_env[b'LANGKIT_ROOT_DIR'] = self.langkit_root_dir
         derived_env['LANGKIT_PRETTY_PRINT'] = str(
             int(self.global_env['pretty_print']))
+        derived_env['LANGKIT_LEXER_BACKEND'] = self.global_env['lexer_backend']
 
         # Assign a sane default language source directory for Langkit's
         # diagnostics.